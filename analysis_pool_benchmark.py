@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Static Analysis Event-Loop Lag Benchmark for Aether AI Platform
+Compares event-loop responsiveness while a burst of large files is analysed
+inline on the loop versus in the analysis process pool
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services import static_analysis
+from services.analysis_pool import AnalysisPool
+
+
+def make_file(index: int, size_bytes: int) -> str:
+    """Valid Python source of roughly ``size_bytes``, with an occasional pattern hit"""
+    lines = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        line = (f"def handler_{index}_{i}(request, items):\n"
+                f"    total = sum(item.price * {i % 97} for item in items if item.active)\n"
+                f"    print(total){'  # TODO drop console.log(' if i % 500 == 0 else ''}\n"
+                f"    return {{'status': 'ok', 'total': total, 'id': {i}}}\n")
+        lines.append(line)
+        total += len(line)
+        i += 1
+    return "".join(lines)
+
+
+async def measure(run_burst, interval: float = 0.005):
+    """Run the burst while a ticker records how late each wake-up is"""
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    tick_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await run_burst()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick_task
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "max_lag": lags[-1] if lags else 0.0,
+        "p99_lag": lags[int(len(lags) * 0.99) - 1] if lags else 0.0,
+        "median_lag": statistics.median(lags) if lags else 0.0,
+    }
+
+
+async def main_async(args):
+    files = [make_file(i, args.size_mb * 1024 * 1024) for i in range(args.files)]
+
+    async def inline_burst():
+        async def one(code):
+            return static_analysis.analyze(code, "python")
+        await asyncio.gather(*(one(code) for code in files))
+
+    pool = AnalysisPool(max_workers=args.workers, max_pending=args.files)
+    # Start the workers before measuring so process spawn is not counted
+    await pool.analyze("x = 1\n", "python")
+
+    async def pool_burst():
+        results = await asyncio.gather(*(pool.analyze(code, "python") for code in files), return_exceptions=True)
+        failed = [r for r in results if isinstance(r, Exception)]
+        if failed:
+            print(f"  {len(failed)} job(s) failed: {failed[0]!r}")
+
+    print(f"🧪 STATIC ANALYSIS LOOP-LAG BENCHMARK - {args.files} x {args.size_mb}MB FILES")
+    print("=" * 60)
+    for label, burst in (("Inline on loop", inline_burst), ("Process pool", pool_burst), ("Pool (cached)", pool_burst)):
+        result = await measure(burst)
+        print(f"{label:16} total {result['elapsed']:6.2f}s  max lag {result['max_lag'] * 1000:8.1f}ms  "
+              f"p99 {result['p99_lag'] * 1000:7.1f}ms  median {result['median_lag'] * 1000:5.1f}ms")
+    pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark event-loop lag during static analysis")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Audit Log Benchmark for Aether AI Platform
+Measures ingest rate and time-range query latency of the segmented audit
+log, against the in-memory list filters it replaces (timed on a smaller
+list and extrapolated, since the list does not fit in memory at scale)
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.audit_log import SegmentedAuditLog
+
+ACTIONS = ["login", "logout", "read", "write", "delete", "export", "share", "admin_update"]
+LEVELS = ["info"] * 17 + ["warning", "error", "critical"]
+YEAR = 365 * 24 * 3600
+BASE_TS = 1700000000.0
+
+
+def make_event(rng: random.Random, users: int, resources: int):
+    resource = rng.randrange(resources)
+    return {
+        "id": f"{rng.getrandbits(64):016x}",
+        "user_id": f"user_{rng.randrange(users)}",
+        "action": rng.choice(ACTIONS),
+        "resource": f"projects/{resource % 500}/documents/{resource}",
+        "ip_address": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+        "level": rng.choice(LEVELS),
+        "details": {"bytes": rng.randrange(100000)},
+    }
+
+
+def naive_query(events, start, end, user_id=None, limit=None):
+    """EnterpriseComplianceSystem.get_audit_logs before the audit log: list filters over the whole history"""
+    filtered = [event for event in events if event["ts"] >= start]
+    filtered = [event for event in filtered if event["ts"] <= end]
+    if user_id:
+        filtered = [event for event in filtered if event["user_id"] == user_id]
+    return filtered[:limit]
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return timings[len(timings) // 2] * 1000, timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark audit log ingest and time-range queries")
+    parser.add_argument("--events", type=int, default=100_000_000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--resources", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--baseline-events", type=int, default=1_000_000,
+                        help="size of the in-memory list timed for the baseline; larger logs are extrapolated")
+    parser.add_argument("--dir", default=None, help="where to write the log (default: a temporary directory)")
+    parser.add_argument("--verify", action="store_true", help="also recompute the whole hash chain")
+    args = parser.parse_args()
+
+    print(f"📜 AUDIT LOG BENCHMARK - {args.events:,} EVENTS")
+    print("=" * 60)
+
+    rng = random.Random(42)
+    directory = tempfile.mkdtemp(prefix="audit-bench-", dir=args.dir)
+    spacing = YEAR / args.events
+    try:
+        audit_log = SegmentedAuditLog(directory, ("user_id", "action", "resource", "level"))
+        pool = [make_event(rng, args.users, args.resources) for _ in range(4096)]
+        start = time.perf_counter()
+        report_every = max(1, args.events // 10)
+        slowest_append = 0.0
+        clock = time.perf_counter
+        for i in range(args.events):
+            event = pool[i & 4095]
+            event["user_id"] = f"user_{rng.randrange(args.users)}"
+            append_start = clock()
+            audit_log.append(event, ts=BASE_TS + i * spacing)
+            slowest_append = max(slowest_append, clock() - append_start)
+            if (i + 1) % report_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  {i + 1:>13,} events  {(i + 1) / elapsed:9,.0f} events/s  "
+                      f"{len(audit_log.segments)} segments")
+        audit_log.sync()
+        ingest_seconds = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"Ingest: {args.events / ingest_seconds:,.0f} events/s, {audit_log.stats['fsyncs']} fsyncs, "
+              f"{size / 2 ** 30:.1f}GB on disk, slowest append {slowest_append * 1000:.1f}ms "
+              f"(fsync and sealing run in the background)")
+        audit_log.close()
+
+        start = time.perf_counter()
+        audit_log = SegmentedAuditLog(directory, ("user_id", "action", "resource", "level"))
+        print(f"Reopen (index recovery): {time.perf_counter() - start:.2f}s")
+
+        windows = [("1 hour", 3600), ("1 day", 86400)]
+        results = {}
+        for label, width in windows:
+            for filtered in (False, True):
+                timings, rows = [], 0
+                for _ in range(args.queries):
+                    begin = BASE_TS + rng.uniform(0, YEAR - width)
+                    user = f"user_{rng.randrange(args.users)}" if filtered else None
+                    query_start = time.perf_counter()
+                    if user:
+                        rows += len(audit_log.query(begin, begin + width, limit=1000, user_id=user))
+                    else:
+                        rows += len(audit_log.query(begin, begin + width, limit=1000))
+                    timings.append(time.perf_counter() - query_start)
+                p50, p95 = percentiles(timings)
+                name = f"{label}{' + user' if filtered else ''}"
+                results[name] = p50
+                print(f"Query {name:16} p50 {p50:8.2f}ms  p95 {p95:8.2f}ms  ({rows / args.queries:.0f} rows avg)")
+
+        timings = []
+        for _ in range(args.queries):
+            begin = BASE_TS + rng.uniform(0, YEAR - 86400 * 30)
+            query_start = time.perf_counter()
+            audit_log.count(begin, begin + 86400 * 30, level="critical")
+            timings.append(time.perf_counter() - query_start)
+        p50, p95 = percentiles(timings)
+        print(f"Count 30 days critical   p50 {p50:8.2f}ms  p95 {p95:8.2f}ms")
+
+        # Baseline: the in-memory list at a size that fits, scaled linearly to the full log
+        baseline_events = min(args.baseline_events, args.events)
+        baseline_spacing = YEAR / baseline_events
+        events = []
+        for i in range(baseline_events):
+            event = dict(pool[i & 4095])
+            event["ts"] = BASE_TS + i * baseline_spacing
+            events.append(event)
+        timings = []
+        for _ in range(5):
+            begin = BASE_TS + rng.uniform(0, YEAR - 3600)
+            query_start = time.perf_counter()
+            naive_query(events, begin, begin + 3600, limit=1000)
+            timings.append(time.perf_counter() - query_start)
+        naive_ms = percentiles(timings)[0] * args.events / baseline_events
+        print(f"List filters at {args.events:,} events: ~{naive_ms / 1000:.1f}s per query "
+              f"(extrapolated from {baseline_events:,}); "
+              f"{naive_ms / results['1 hour']:.0f}x the 1 hour query")
+
+        if args.verify:
+            start = time.perf_counter()
+            result = audit_log.verify()
+            print(f"Verify: {result} in {time.perf_counter() - start:.1f}s")
+        audit_log.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print("✅ Audit log benchmark complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
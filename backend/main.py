@@ -1,9 +1,11 @@
 from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from middleware.response_encoding import NegotiatedJSONResponse, ResponseEncodingMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 import os
+import sys
 import logging
 from datetime import datetime
 from typing import List, Optional
@@ -11,6 +13,7 @@ import json
 
 # Import our modules
 from models.database import init_db, get_database
+from services.shared_state import get_shared_state
 from models.user import User, UserCreate, UserLogin
 from models.project import Project, ProjectCreate
 from models.conversation import Conversation, Message
@@ -46,38 +49,12 @@ from services.voice_interface import VoiceInterface
 from services.workflow_automation import WorkflowEngine
 from services.collaboration_engine import LiveCollaborationEngine
 
-# Import cutting-edge services
-from services.architectural_intelligence import ArchitecturalIntelligence
-from services.smart_documentation import SmartDocumentationEngine
-from services.theme_intelligence import ThemeIntelligence
-from services.project_migrator import ProjectMigrator
-from services.code_quality_engine import CodeQualityEngine
-from services.workspace_intelligence import WorkspaceIntelligence
-from services.soundscape_engine import SoundscapeEngine
-from services.code_translator import CodeTranslator
-from services.emotional_ai import EmotionalAI
-from services.experimental_sandbox import ExperimentalSandbox
-from services.visual_programming import VisualProgramming
+# Import cutting-edge services (the rest are loaded with their routers, see LAZY_ROUTERS below)
 from services.community_intelligence import CommunityIntelligence
-from services.resource_optimizer import ResourceOptimizer
-from services.dependency_intelligence import DependencyIntelligence
 from services.pattern_intelligence import PatternIntelligence
-
-# Import new 5% gap completion services
-from services.video_explanation_service import VideoExplanationService, set_video_explanation_service
-from services.seo_service import SEOService, set_seo_service
-from services.i18n_service import I18nService, set_i18n_service
-from services.agent_marketplace_service import AgentMarketplaceService, set_agent_marketplace_service
-from services.presentation_service import PresentationService, set_presentation_service
-from routes.architectural_intelligence import set_architectural_intelligence_service
-from routes.smart_documentation import set_smart_documentation_service
-from routes.theme_intelligence import set_theme_intelligence_service
-from routes.project_migration import set_project_migrator_service
-from routes.code_quality import set_code_quality_engine
-from routes.workspace_optimization import set_workspace_intelligence
-from routes.experimental_sandbox import set_experimental_sandbox_service
-from routes.visual_programming import set_visual_programming_service
 from routes.community_intelligence import set_community_intelligence_service
+from routes.projects import set_pattern_intelligence_service
+from middleware.lazy_routers import LazyRouterRegistry, RouterSpec, service_setup
 
 # Load environment variables
 load_dotenv()
@@ -90,9 +67,13 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AI Code Studio API",
     description="Advanced AI-powered development platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=NegotiatedJSONResponse
 )
 
+# Negotiate orjson/MessagePack bodies and brotli/zstd/gzip compression
+app.add_middleware(ResponseEncodingMiddleware, minimum_size=int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", 1024)))
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -125,15 +106,8 @@ development_assistant = DevelopmentAssistant(db_wrapper)
 collaboration_engine = LiveCollaborationEngine(db_wrapper)
 
 # Initialize cutting-edge services
-architectural_intelligence = ArchitecturalIntelligence(db_wrapper)
-smart_documentation_engine = SmartDocumentationEngine(db_wrapper)
-theme_intelligence = ThemeIntelligence(db_wrapper)
-project_migrator = ProjectMigrator(db_wrapper)
-code_quality_engine = CodeQualityEngine(db_wrapper)
-workspace_intelligence = WorkspaceIntelligence(db_wrapper)
-experimental_sandbox = ExperimentalSandbox(db_wrapper)
-visual_programming = VisualProgramming(db_wrapper)
 community_intelligence = CommunityIntelligence(db_wrapper)
+pattern_intelligence = PatternIntelligence(db_wrapper)
 
 from routes.project_files import router as project_files_router
 
@@ -162,46 +136,54 @@ app.include_router(smart_features_router, tags=["Smart Features"])
 
 # Include routers - New Enhancement Features (Available)
 from routes.enhanced_features import router as enhanced_features_router
-from routes.ai import router as ai_router
-from routes.auth import router as auth_router  
-from routes.projects import router as projects_router
-from routes.templates import router as templates_router
-from routes.integrations import router as integrations_router
-
-# Include routers - Cutting-Edge Features (Phase 1-5)
-from routes.architectural_intelligence import router as architectural_intelligence_router
-from routes.smart_documentation import router as smart_documentation_router
-from routes.theme_intelligence import router as theme_intelligence_router
-from routes.project_migration import router as project_migration_router
-from routes.code_quality import router as code_quality_router
-from routes.workspace_optimization import router as workspace_optimization_router
-from routes.experimental_sandbox import router as experimental_sandbox_router
-from routes.visual_programming import router as visual_programming_router
-# Import new API routes  
-from routes.video_explanations import router as video_explanations_router
-from routes.seo import router as seo_router
-from routes.i18n import router as i18n_router
-from routes.agent_marketplace import router as agent_marketplace_router
-from routes.presentations import router as presentations_router
 
 app.include_router(enhanced_features_router, prefix="/api/enhanced", tags=["Enhanced Features"])
 
-# Cutting-Edge Features Routes
-app.include_router(architectural_intelligence_router, prefix="/api/architectural-intelligence", tags=["Architectural Intelligence"])
-app.include_router(smart_documentation_router, prefix="/api/smart-documentation", tags=["Smart Documentation"])
-app.include_router(theme_intelligence_router, prefix="/api/theme-intelligence", tags=["Theme Intelligence"])
-app.include_router(project_migration_router, prefix="/api/project-migration", tags=["Project Migration"])
-app.include_router(code_quality_router, prefix="/api/code-quality", tags=["Code Quality Engine"])
-app.include_router(workspace_optimization_router, prefix="/api/workspace-optimization", tags=["Workspace Intelligence"])
-app.include_router(experimental_sandbox_router, prefix="/api/experimental-sandbox", tags=["Experimental Sandbox"])
-app.include_router(visual_programming_router, prefix="/api/visual-programming", tags=["Visual Programming"])
+# Cutting-edge and 5% gap completion features. Their routers and services are
+# imported, mounted and initialized on the first request under their prefix
+# (or at startup with LAZY_ROUTERS=false, or when listed in ROUTER_WARMUP).
+LAZY_ROUTERS = [
+    RouterSpec("routes.architectural_intelligence", "/api/architectural-intelligence", ["Architectural Intelligence"],
+               setup=service_setup("services.architectural_intelligence:ArchitecturalIntelligence",
+                                   "routes.architectural_intelligence:set_architectural_intelligence_service", db_wrapper)),
+    RouterSpec("routes.smart_documentation", "/api/smart-documentation", ["Smart Documentation"],
+               setup=service_setup("services.smart_documentation:SmartDocumentationEngine",
+                                   "routes.smart_documentation:set_smart_documentation_service", db_wrapper)),
+    RouterSpec("routes.theme_intelligence", "/api/theme-intelligence", ["Theme Intelligence"],
+               setup=service_setup("services.theme_intelligence:ThemeIntelligence",
+                                   "routes.theme_intelligence:set_theme_intelligence_service", db_wrapper)),
+    RouterSpec("routes.project_migration", "/api/project-migration", ["Project Migration"],
+               setup=service_setup("services.project_migrator:ProjectMigrator",
+                                   "routes.project_migration:set_project_migrator_service", db_wrapper)),
+    RouterSpec("routes.code_quality", "/api/code-quality", ["Code Quality Engine"],
+               setup=service_setup("services.code_quality_engine:CodeQualityEngine",
+                                   "routes.code_quality:set_code_quality_engine", db_wrapper)),
+    RouterSpec("routes.workspace_optimization", "/api/workspace-optimization", ["Workspace Intelligence"],
+               setup=service_setup("services.workspace_intelligence:WorkspaceIntelligence",
+                                   "routes.workspace_optimization:set_workspace_intelligence", db_wrapper)),
+    RouterSpec("routes.experimental_sandbox", "/api/experimental-sandbox", ["Experimental Sandbox"],
+               setup=service_setup("services.experimental_sandbox:ExperimentalSandbox",
+                                   "routes.experimental_sandbox:set_experimental_sandbox_service", db_wrapper)),
+    RouterSpec("routes.visual_programming", "/api/visual-programming", ["Visual Programming"],
+               setup=service_setup("services.visual_programming:VisualProgramming",
+                                   "routes.visual_programming:set_visual_programming_service", db_wrapper)),
+
+    RouterSpec("routes.video_explanations", "/api/video-explanations", ["Video Explanations"],
+               setup=service_setup("services.video_explanation_service:VideoExplanationService",
+                                   "services.video_explanation_service:set_video_explanation_service")),
+    RouterSpec("routes.seo", "/api/seo", ["SEO"],
+               setup=service_setup("services.seo_service:SEOService", "services.seo_service:set_seo_service")),
+    RouterSpec("routes.i18n", "/api/i18n", ["Internationalization"],
+               setup=service_setup("services.i18n_service:I18nService", "services.i18n_service:set_i18n_service")),
+    RouterSpec("routes.agent_marketplace", "/api/agent-marketplace", ["Agent Marketplace"],
+               setup=service_setup("services.agent_marketplace_service:AgentMarketplaceService",
+                                   "services.agent_marketplace_service:set_agent_marketplace_service")),
+    RouterSpec("routes.presentations", "/api/presentations", ["Presentations"],
+               setup=service_setup("services.presentation_service:PresentationService",
+                                   "services.presentation_service:set_presentation_service")),
+]
 
-# Include new API routes
-app.include_router(video_explanations_router, prefix="/api/video-explanations", tags=["Video Explanations"])
-app.include_router(seo_router, prefix="/api/seo", tags=["SEO"])
-app.include_router(i18n_router, prefix="/api/i18n", tags=["Internationalization"])
-app.include_router(agent_marketplace_router, prefix="/api/agent-marketplace", tags=["Agent Marketplace"])
-app.include_router(presentations_router, prefix="/api/presentations", tags=["Presentations"])
+lazy_routers = LazyRouterRegistry(app, LAZY_ROUTERS).install()
 
 @app.on_event("startup")
 async def startup_event():
@@ -210,6 +192,9 @@ async def startup_event():
         await init_db()
         logger.info("Database initialized successfully")
         
+        # Before any service writes state that other workers must see
+        await get_shared_state().initialize()
+        
         # Initialize core AI services
         await ai_service.initialize()
         await enhanced_ai_service.initialize()
@@ -301,70 +286,6 @@ async def startup_event():
             logger.warning(f"Workflow Engine initialization failed: {e}")
         
         # Initialize cutting-edge services
-        try:
-            # Initialize Architectural Intelligence
-            await architectural_intelligence.initialize()
-            set_architectural_intelligence_service(architectural_intelligence)
-            logger.info("✅ Architectural Intelligence initialized")
-        except Exception as e:
-            logger.warning(f"Architectural Intelligence initialization failed: {e}")
-        
-        try:
-            # Initialize Smart Documentation Engine
-            await smart_documentation_engine.initialize()
-            set_smart_documentation_service(smart_documentation_engine)
-            logger.info("✅ Smart Documentation Engine initialized")
-        except Exception as e:
-            logger.warning(f"Smart Documentation Engine initialization failed: {e}")
-        
-        try:
-            # Initialize Theme Intelligence
-            await theme_intelligence.initialize()
-            set_theme_intelligence_service(theme_intelligence)
-            logger.info("✅ Theme Intelligence initialized")
-        except Exception as e:
-            logger.warning(f"Theme Intelligence initialization failed: {e}")
-        
-        try:
-            # Initialize Project Migrator
-            await project_migrator.initialize()
-            set_project_migrator_service(project_migrator)
-            logger.info("✅ Project Migrator initialized")
-        except Exception as e:
-            logger.warning(f"Project Migrator initialization failed: {e}")
-        
-        try:
-            # Initialize Code Quality Engine
-            await code_quality_engine.initialize()
-            set_code_quality_engine(code_quality_engine)
-            logger.info("✅ Code Quality Engine initialized")
-        except Exception as e:
-            logger.warning(f"Code Quality Engine initialization failed: {e}")
-        
-        try:
-            # Initialize Workspace Intelligence
-            await workspace_intelligence.initialize()
-            set_workspace_intelligence(workspace_intelligence)
-            logger.info("✅ Workspace Intelligence initialized")
-        except Exception as e:
-            logger.warning(f"Workspace Intelligence initialization failed: {e}")
-        
-        try:
-            # Initialize Experimental Sandbox
-            await experimental_sandbox.initialize()
-            set_experimental_sandbox_service(experimental_sandbox)
-            logger.info("✅ Experimental Sandbox initialized")
-        except Exception as e:
-            logger.warning(f"Experimental Sandbox initialization failed: {e}")
-        
-        try:
-            # Initialize Visual Programming
-            await visual_programming.initialize()
-            set_visual_programming_service(visual_programming)
-            logger.info("✅ Visual Programming initialized")
-        except Exception as e:
-            logger.warning(f"Visual Programming initialization failed: {e}")
-        
         try:
             # Initialize Community Intelligence
             await community_intelligence.initialize()
@@ -373,28 +294,16 @@ async def startup_event():
         except Exception as e:
             logger.warning(f"Community Intelligence initialization failed: {e}")
         
-        # Initialize new 5% gap completion services
-        video_service = VideoExplanationService()
-        await video_service.initialize()
-        set_video_explanation_service(video_service)
-        
-        seo_service = SEOService()
-        await seo_service.initialize()
-        set_seo_service(seo_service)
-        
-        i18n_service = I18nService()
-        await i18n_service.initialize()
-        set_i18n_service(i18n_service)
-        
-        marketplace_service = AgentMarketplaceService()
-        await marketplace_service.initialize()
-        set_agent_marketplace_service(marketplace_service)
-        
-        presentation_service = PresentationService()
-        await presentation_service.initialize()
-        set_presentation_service(presentation_service)
+        try:
+            # Initialize Pattern Intelligence
+            await pattern_intelligence.initialize()
+            set_pattern_intelligence_service(pattern_intelligence)
+            await pattern_intelligence.sync_index(await db_wrapper.get_database())
+            logger.info("✅ Pattern Intelligence initialized")
+        except Exception as e:
+            logger.warning(f"Pattern Intelligence initialization failed: {e}")
         
-        logger.info("🎉 All 5% gap completion services initialized - Platform now 100% complete!")
+        logger.info("🎉 Core services initialized - feature routers load on first use")
         
     except Exception as e:
         logger.error(f"Startup error: {e}")
@@ -404,6 +313,20 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Application shutting down...")
+    from services.presentation_service import get_presentation_service
+    if get_presentation_service():
+        get_presentation_service().shutdown()
+    # Only present once the lazily mounted sandbox router has been loaded
+    sandbox_routes = sys.modules.get("routes.experimental_sandbox")
+    if sandbox_routes and sandbox_routes.experimental_sandbox_service:
+        await sandbox_routes.experimental_sandbox_service.execution_pool.shutdown()
+    error_prevention_routes = sys.modules.get("routes.error_prevention")
+    if error_prevention_routes:
+        error_prevention_routes.error_prevention.analysis_pool.shutdown()
+    # Flush metrics still queued for exporters
+    analytics = sys.modules.get("services.advanced_analytics_system")
+    if analytics and analytics._analytics_system:
+        await analytics._analytics_system.close()
 
 @app.get("/")
 async def root():
@@ -418,11 +341,12 @@ async def root():
 async def health_check():
     """Detailed health check"""
     return {
-        "status": "healthy",
+        "status": "healthy" if lazy_routers.healthy else "degraded",
         "services": {
             "database": "connected",
             "ai": "available",
-            "websocket": "active"
+            "websocket": "active",
+            "routers": "loaded" if lazy_routers.healthy else "failing"
         },
         "timestamp": datetime.utcnow().isoformat()
     }
@@ -0,0 +1,271 @@
+"""
+Lazy router registry.
+
+Routers are declared in a manifest of ``RouterSpec`` entries instead of
+being imported at module level.  In lazy mode a spec's module (and the
+services it builds on import) is only imported, mounted and set up when
+the first request arrives under its prefix; specs marked ``warm`` or
+named in ``ROUTER_WARMUP`` are loaded during startup instead.  With
+``LAZY_ROUTERS=false`` every router is mounted at import time as before.
+
+Routes keep their manifest order however they were loaded, so the same
+request matches the same endpoint in both modes.  Routers mounted after
+startup have their own startup handlers run when they are mounted, and
+requests for the OpenAPI schema load everything first so the docs stay
+complete.
+
+Every required (non-optional) spec is checked with ``find_spec`` when the
+registry is installed, so a router module that is missing or misspelled
+stops the app at startup the way the old module-level imports did,
+instead of surfacing as a 404 on its first request.  Set
+``ROUTER_IMPORT_CHECK=true`` (as CI does) to import them all at startup
+too, which also catches broken imports inside the modules.
+"""
+
+import asyncio
+import importlib
+import importlib.util
+import inspect
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_routers_enabled() -> bool:
+    return os.getenv("LAZY_ROUTERS", "true").lower() in ("1", "true", "yes")
+
+
+def router_import_check_enabled() -> bool:
+    return os.getenv("ROUTER_IMPORT_CHECK", "false").lower() in ("1", "true", "yes")
+
+
+def _module_exists(name: str) -> bool:
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@dataclass
+class RouterSpec:
+    module: str
+    prefix: str = ""
+    tags: List[str] = field(default_factory=list)
+    # Import failures are logged and the routes left out, like the old try/except imports
+    optional: bool = False
+    # Loaded during startup even in lazy mode
+    warm: bool = False
+    # Awaited once after mounting, to create and register the services the routes use
+    setup: Optional[Callable[[], Awaitable[None]]] = None
+    attribute: str = "router"
+
+    def matches(self, path: str) -> bool:
+        prefix = self.prefix.rstrip("/")
+        return not prefix or path == prefix or path.startswith(prefix + "/")
+
+    @property
+    def label(self) -> str:
+        return f"{self.module} ({self.prefix or '/'})"
+
+
+class LazyRouterRegistry:
+    """Mounts manifest routers on an app, eagerly or on first matching request"""
+
+    def __init__(self, app, specs: Sequence[RouterSpec], lazy: Optional[bool] = None,
+                 warmup: Optional[Sequence[str]] = None):
+        self.app = app
+        self.specs = list(specs)
+        self.lazy = lazy_routers_enabled() if lazy is None else lazy
+        if warmup is None:
+            warmup = [item.strip() for item in os.getenv("ROUTER_WARMUP", "").split(",") if item.strip()]
+        self.warmup = set(warmup)
+
+        self._loaded: Dict[int, List] = {}
+        # Optional routers that could not be imported; they are not retried
+        self._failed: Dict[int, str] = {}
+        # Last load error of required routers; they are retried on the next request
+        self._errors: Dict[int, str] = {}
+        self._setup_done: set = set()
+        self._lock: Optional[asyncio.Lock] = None
+        self._started = False
+        self._app_routes_before: List = []
+        self.load_times: Dict[str, float] = {}
+
+    def install(self) -> "LazyRouterRegistry":
+        """Attach to the app; in eager mode this mounts every router immediately"""
+        self.check_required()
+        self._app_routes_before = list(self.app.router.routes)
+        if self.lazy:
+            self.app.add_middleware(LazyRouterMiddleware, registry=self)
+        else:
+            for index in range(len(self.specs)):
+                self._mount(index)
+        self.app.add_event_handler("startup", self.warm_up)
+        return self
+
+    def check_required(self, import_modules: Optional[bool] = None):
+        """Raise ImportError unless every required router module can be found (or imported)"""
+        if import_modules is None:
+            import_modules = router_import_check_enabled()
+        missing = []
+        for spec in self.specs:
+            if spec.optional:
+                continue
+            if not _module_exists(spec.module):
+                missing.append(f"{spec.label}: module not found")
+            elif import_modules:
+                try:
+                    getattr(importlib.import_module(spec.module), spec.attribute)
+                except Exception as e:
+                    missing.append(f"{spec.label}: {e}")
+        if missing:
+            raise ImportError("Required routers cannot be loaded: " + "; ".join(missing))
+
+    @property
+    def healthy(self) -> bool:
+        """False while a required router is failing to load"""
+        return not self._errors
+
+    def is_loaded(self, spec: RouterSpec) -> bool:
+        return self.specs.index(spec) in self._loaded
+
+    def _wanted_at_startup(self, spec: RouterSpec) -> bool:
+        return spec.warm or spec.module in self.warmup or spec.prefix in self.warmup
+
+    async def warm_up(self):
+        """Startup handler: load warm specs and run setups of routers already mounted"""
+        for index, spec in enumerate(self.specs):
+            if self._wanted_at_startup(spec) and index not in self._loaded:
+                self._mount(index)
+        # Startup handlers of routers mounted here are appended to the list
+        # Starlette is iterating, so they still run as part of this startup
+        for index in list(self._loaded):
+            await self._setup(index)
+        self._started = True
+
+    async def ensure_loaded(self, path: str):
+        """Mount every spec whose prefix could own ``path``"""
+        if path == self.app.openapi_url:
+            pending = [i for i in range(len(self.specs)) if i not in self._loaded and i not in self._failed]
+        else:
+            pending = [
+                i for i, spec in enumerate(self.specs)
+                if i not in self._loaded and i not in self._failed and spec.matches(path)
+            ]
+        if not pending:
+            return
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for index in pending:
+                if index in self._loaded or index in self._failed:
+                    continue
+                handlers_before = len(self.app.router.on_startup)
+                if not self._mount(index):
+                    continue
+                if self._started:
+                    for handler in self.app.router.on_startup[handlers_before:]:
+                        result = handler()
+                        if inspect.isawaitable(result):
+                            await result
+                await self._setup(index)
+
+    def _mount(self, index: int) -> bool:
+        spec = self.specs[index]
+        started = time.perf_counter()
+        try:
+            router = getattr(importlib.import_module(spec.module), spec.attribute)
+        except ImportError as e:
+            if spec.optional:
+                self._failed[index] = str(e)
+                logger.warning(f"Optional router {spec.label} unavailable: {e}")
+                return False
+            self._errors[index] = str(e)
+            logger.error(f"Router {spec.label} failed to load: {e}")
+            raise
+        except Exception as e:
+            self._errors[index] = str(e)
+            logger.error(f"Router {spec.label} failed to load: {e}")
+            raise
+        self._errors.pop(index, None)
+
+        routes_before = len(self.app.router.routes)
+        self.app.include_router(router, prefix=spec.prefix, tags=spec.tags or None)
+        self._loaded[index] = self.app.router.routes[routes_before:]
+        self.load_times[spec.label] = time.perf_counter() - started
+        self._reorder()
+        # The cached schema predates these routes
+        self.app.openapi_schema = None
+        if self.lazy:
+            logger.info(f"🔌 Mounted {spec.label} in {self.load_times[spec.label] * 1000:.0f}ms")
+        return True
+
+    async def _setup(self, index: int):
+        spec = self.specs[index]
+        if spec.setup is None or index in self._setup_done:
+            return
+        self._setup_done.add(index)
+        try:
+            await spec.setup()
+        except Exception as e:
+            # Routes stay mounted and report their service as unavailable, as before
+            logger.warning(f"Setup for {spec.label} failed: {e}")
+
+    def _reorder(self):
+        """App routes defined before the manifest, manifest routes in order, then the rest"""
+        owned = [route for index in sorted(self._loaded) for route in self._loaded[index]]
+        owned_ids = {id(route) for route in owned}
+        before_ids = {id(route) for route in self._app_routes_before}
+        before = [r for r in self.app.router.routes if id(r) in before_ids]
+        after = [r for r in self.app.router.routes if id(r) not in owned_ids and id(r) not in before_ids]
+        self.app.router.routes[:] = before + owned + after
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "lazy": self.lazy,
+            "loaded": [self.specs[i].label for i in sorted(self._loaded)],
+            "pending": [s.label for i, s in enumerate(self.specs) if i not in self._loaded and i not in self._failed],
+            "failed": {self.specs[i].label: error for i, error in {**self._failed, **self._errors}.items()},
+            "load_ms": {label: round(seconds * 1000, 1) for label, seconds in self.load_times.items()},
+        }
+
+
+class LazyRouterMiddleware:
+    """Loads the routers a request could be routed to before it reaches the router"""
+
+    def __init__(self, app, registry: LazyRouterRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            await self.registry.ensure_loaded(scope["path"])
+        await self.app(scope, receive, send)
+
+
+def _resolve(target: str):
+    module, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def service_setup(factory: str, setter: str, *args) -> Callable[[], Awaitable[None]]:
+    """
+    Setup hook that builds a service, initializes it and hands it to its
+    router, e.g. ``service_setup("services.seo_service:SEOService",
+    "services.seo_service:set_seo_service")``.  Both are imported only
+    when the hook runs.
+    """
+    async def setup():
+        service = _resolve(factory)(*args)
+        await service.initialize()
+        _resolve(setter)(service)
+        logger.info(f"✅ {type(service).__name__} initialized")
+    return setup
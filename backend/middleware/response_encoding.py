@@ -0,0 +1,119 @@
+import contextvars
+import logging
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+from services.response_encoding import (
+    JSON_MEDIA_TYPE, MINIMUM_COMPRESS_SIZE, PrecompressedCache, compress, encode_body,
+    is_compressible, negotiate_content_encoding, negotiate_media_type,
+)
+
+logger = logging.getLogger(__name__)
+
+# Media type negotiated for the current request, read when the response body is rendered
+_response_media_type: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "response_media_type", default=JSON_MEDIA_TYPE
+)
+
+
+class NegotiatedJSONResponse(JSONResponse):
+    """
+    Default response class: orjson-encoded JSON, or MessagePack when the
+    request's Accept header asked for it.
+    """
+
+    def render(self, content: Any) -> bytes:
+        self.media_type = _response_media_type.get()
+        return encode_body(content, self.media_type)
+
+
+class ResponseEncodingMiddleware:
+    """
+    Negotiates the body encoding and compresses complete response bodies.
+
+    Bodies of at least ``minimum_size`` bytes with a compressible content
+    type are compressed with the best encoding the client accepts.
+    Responses whose Cache-Control includes ``immutable`` are compressed
+    at a higher level once and then served from ``PrecompressedCache``.
+    Streamed responses and bodies that already carry a Content-Encoding
+    pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_COMPRESS_SIZE, cache_size: int = 256):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = PrecompressedCache(cache_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+        token = _response_media_type.set(negotiate_media_type(headers.get("accept")))
+        encoding = negotiate_content_encoding(headers.get("accept-encoding"))
+        try:
+            await self.app(scope, receive, self._encoding_send(send, encoding))
+        finally:
+            _response_media_type.reset(token)
+
+    @staticmethod
+    def _vary(headers: list) -> list:
+        """Headers with Accept and Accept-Encoding merged into Vary"""
+        values = [value.decode("latin-1") for key, value in headers if key.lower() == b"vary"]
+        vary = [item.strip() for value in values for item in value.split(",") if item.strip()]
+        for name in ("Accept", "Accept-Encoding"):
+            if name.lower() not in (item.lower() for item in vary):
+                vary.append(name)
+        return [(key, value) for key, value in headers if key.lower() != b"vary"] + [
+            (b"vary", ", ".join(vary).encode("latin-1"))
+        ]
+
+    def _encoding_send(self, send, encoding: Optional[str]):
+        start_message: Optional[dict] = None
+        passthrough = False
+
+        async def wrapped(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = {**message, "headers": self._vary(list(message.get("headers", [])))}
+                if encoding is None:
+                    passthrough = True
+                    await send(start_message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            response_headers = {key.lower(): value for key, value in start_message["headers"]}
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or b"content-encoding" in response_headers
+                or not is_compressible(response_headers.get(b"content-type", b"").decode("latin-1"))
+            ):
+                # Streamed, small, already encoded or binary: send as produced
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            cache_control = response_headers.get(b"cache-control", b"").decode("latin-1").lower()
+            if "immutable" in cache_control:
+                body = self.cache.get_or_compress(body, encoding)
+            else:
+                body = compress(body, encoding)
+
+            start_message["headers"] = [
+                (key, value) for key, value in start_message["headers"]
+                if key.lower() != b"content-length"
+            ] + [
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ]
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        return wrapped
@@ -21,6 +21,10 @@ class FileContent(BaseModel):
     content: str
     language: str = "text"
 
+class SimilarCodeQuery(BaseModel):
+    code: str = Field(..., min_length=1)
+    all_projects: bool = False  # search every project of the user, not just this one
+
 class ProjectCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = None
@@ -3,6 +3,7 @@ from typing import List, Dict, Any, Optional
 from models.database import get_database
 from routes.auth import get_current_user
 from services.ai_code_completion import AICodeCompletion
+from services.completion_pipeline import UnknownDocument
 import logging
 
 logger = logging.getLogger(__name__)
@@ -18,23 +19,34 @@ async def get_code_completions(
     current_user: dict = Depends(get_current_user),
     db = Depends(get_database)
 ):
-    """Get AI-powered code completions"""
+    """Get AI-powered code completions
+
+    Send ``code_context`` with a ``document_id`` once, then only ``edits``
+    and the ``base_version`` they apply to; a 409 means resend the full text.
+    """
     try:
         completions = await ai_completion.get_code_completions(
-            code_context=completion_request["code_context"],
+            code_context=completion_request.get("code_context"),
             cursor_position=completion_request["cursor_position"],
             file_type=completion_request.get("file_type", "javascript"),
-            user_id=current_user["id"]
+            user_id=current_user["id"],
+            document_id=completion_request.get("document_id"),
+            edits=completion_request.get("edits"),
+            base_version=completion_request.get("base_version")
         )
         
         return {
             "completions": completions,
             "context": {
                 "file_type": completion_request.get("file_type", "javascript"),
-                "cursor_position": completion_request["cursor_position"]
+                "cursor_position": completion_request["cursor_position"],
+                "document_id": completion_request.get("document_id"),
+                "version": ai_completion.document_version(current_user["id"], completion_request.get("document_id"))
             }
         }
         
+    except UnknownDocument as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get completions: {e}")
         raise HTTPException(status_code=500, detail="Failed to get code completions")
@@ -82,6 +82,12 @@ class MobileSessionRequest(BaseModel):
     screen_resolution: str
     connection_type: Optional[str] = "unknown"
 
+class MobileSyncRequest(BaseModel):
+    device_id: str
+    since_token: int = 0
+    changes: List[Dict[str, Any]] = []
+    limit: Optional[int] = None
+
 class TemplateSubmissionRequest(BaseModel):
     name: str
     description: str
@@ -130,6 +136,11 @@ async def initialize_comprehensive_services():
         logger.error(f"Failed to initialize comprehensive services: {e}")
         raise
 
+@router.on_event("shutdown")
+async def shutdown_comprehensive_services():
+    """Stop background work started by the comprehensive services"""
+    await integration_hub.shutdown()
+
 @router.get("/api/competitive/health")
 async def get_comprehensive_health():
     """Get health status of all competitive features"""
@@ -716,6 +727,8 @@ async def optimize_mobile_response(
 async def store_offline_data(
     data_type: str,
     payload: Dict[str, Any],
+    device_id: str = "server",
+    idempotency_key: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
     """Store data for offline synchronization"""
@@ -724,14 +737,16 @@ async def store_offline_data(
         data_id = await mobile_experience.store_offline_data(
             user_id=current_user["user_id"],
             data_type=data_type,
-            payload=payload
+            payload=payload,
+            device_id=device_id,
+            idempotency_key=idempotency_key
         )
         
         return {
             "success": True,
             "data_id": data_id,
             "message": "Data stored for offline sync",
-            "sync_status": "pending"
+            "sync_status": "synced"
         }
         
     except Exception as e:
@@ -743,22 +758,34 @@ async def store_offline_data(
 
 @router.post("/api/competitive/mobile/sync")
 async def sync_offline_data(
-    user_id: Optional[str] = None,
+    request: MobileSyncRequest,
     current_user: dict = Depends(get_current_user)
 ):
-    """Synchronize offline data with server"""
+    """Push offline edits and pull the changes made since the client's last sync token"""
     
     try:
-        sync_user_id = user_id or current_user["user_id"]
-        sync_results = await mobile_experience.sync_offline_data(sync_user_id)
+        sync_results = await mobile_experience.sync_offline_data(
+            user_id=current_user["user_id"],
+            device_id=request.device_id,
+            changes=request.changes,
+            since_token=request.since_token,
+            limit=request.limit
+        )
         
         return {
             "success": True,
             "sync_results": sync_results,
             "synced_count": sync_results["synced"],
-            "failed_count": sync_results["failed"]
+            "failed_count": sync_results["failed"],
+            "sync_token": sync_results["sync_token"],
+            "has_more": sync_results["has_more"]
         }
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Offline data sync failed: {e}")
         raise HTTPException(
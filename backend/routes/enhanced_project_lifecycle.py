@@ -13,6 +13,7 @@ from services.ai_service import AIService
 from services.workflow_automation import WorkflowAutomationService
 from services.smart_template_generation import SmartTemplateGenerationService
 from services.performance_optimizer import PerformanceOptimizerService
+from services.gamification_service import get_gamification_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -238,6 +239,9 @@ async def update_project_phase(
             {"$set": phase_update_data}
         )
         
+        if phase_update.phase == "deployment" and phase_update.status == "completed":
+            await _record_project_completion(project_id, str(current_user.id), db)
+        
         # Get updated project
         updated_project = await db.projects.find_one({"_id": project_id})
         
@@ -325,6 +329,8 @@ async def ai_enhanced_deployment(
                 "latest_deployment": deployment_record["_id"]
             }}
         )
+        if deployment_result.get("success"):
+            await _record_project_completion(project_id, str(current_user.id), db)
         
         return {
             "deployment_id": deployment_record["_id"],
@@ -508,6 +514,15 @@ async def _get_phase_recommendations(project: Dict, current_phase: str):
     
     return recommendations.get(current_phase, [])
 
+async def _record_project_completion(project_id: str, user_id: str, db):
+    """Count a project towards the owner's completed projects the first time it is deployed"""
+    result = await db.projects.update_one(
+        {"_id": project_id, "completion_recorded": {"$ne": True}},
+        {"$set": {"completion_recorded": True}}
+    )
+    if result.modified_count:
+        await get_gamification_service().record_project_completed(user_id, db)
+
 def _calculate_lifecycle_metrics(project: Dict):
     """Calculate lifecycle phase metrics"""
     phases = project.get("phases", {})
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import List, Dict, Any, Optional
 from models.database import get_database
 from routes.auth import get_current_user
 from services.smart_error_prevention import SmartErrorPrevention
+from services.analysis_pool import AnalysisQueueFull, AnalysisTimeout
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,19 +14,31 @@ router = APIRouter()
 # Initialize error prevention service
 error_prevention = SmartErrorPrevention()
 
+async def _cancel_on_disconnect(request: Request, coro, poll_interval: float = 0.5):
+    """Run ``coro``, cancelling it if the client disconnects first"""
+    task = asyncio.ensure_future(coro)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=poll_interval)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            raise HTTPException(status_code=499, detail="Client disconnected")
+
 @router.post("/analyze")
 async def analyze_code_for_errors(
     analysis_request: Dict[str, Any],
+    request: Request,
     current_user: dict = Depends(get_current_user),
     db = Depends(get_database)
 ):
     """Analyze code for potential errors"""
     try:
-        errors = await error_prevention.analyze_code_for_errors(
+        errors = await _cancel_on_disconnect(request, error_prevention.analyze_code_for_errors(
             code=analysis_request["code"],
             file_type=analysis_request.get("file_type", "javascript"),
             user_id=current_user["id"]
-        )
+        ))
         
         return {
             "errors": errors,
@@ -32,6 +46,12 @@ async def analyze_code_for_errors(
             "file_type": analysis_request.get("file_type", "javascript")
         }
         
+    except HTTPException:
+        raise
+    except AnalysisQueueFull:
+        raise HTTPException(status_code=503, detail="Analysis queue is full, retry shortly")
+    except AnalysisTimeout:
+        raise HTTPException(status_code=504, detail="Analysis exceeded its time limit")
     except Exception as e:
         logger.error(f"Failed to analyze code: {e}")
         raise HTTPException(status_code=500, detail="Failed to analyze code for errors")
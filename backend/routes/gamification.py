@@ -3,7 +3,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from models.database import get_database
 from routes.auth import get_current_user
-from services.gamification_service import GamificationService, Achievement, UserStats, StreakInfo
+from services.gamification_service import Achievement, UserStats, StreakInfo, get_gamification_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,7 +11,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Initialize gamification service
-gamification = GamificationService()
+gamification = get_gamification_service()
 
 @router.get("/stats")
 async def get_user_stats(
@@ -183,9 +183,16 @@ async def get_leaderboard(
             db=db
         )
         
+        user_rank = await gamification.get_user_rank(
+            user_id=current_user["id"],
+            timeframe=timeframe,
+            category=category,
+            db=db
+        )
+        
         return {
             "leaderboard": leaderboard,
-            "user_rank": next((i + 1 for i, entry in enumerate(leaderboard) if entry["user_id"] == current_user["id"]), None),
+            "user_rank": user_rank,
             "timeframe": timeframe,
             "category": category
         }
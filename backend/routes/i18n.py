@@ -3,12 +3,13 @@ Internationalization API Routes
 Handles multi-language support, translations, and localization.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
 from services.i18n_service import get_i18n_service, SupportedLanguage
+from services.response_encoding import negotiate_content_encoding
 
 router = APIRouter()
 
@@ -138,6 +139,41 @@ async def get_page_translations(request: PageTranslationsRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get page translations: {str(e)}")
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Weak If-None-Match comparison: one ETag covers every encoding of a bundle."""
+    
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+@router.get("/bundles/{language}/{page_key}")
+async def get_page_bundle(language: str, page_key: str, request: Request):
+    """Get a page's translations as a cacheable, pre-serialized bundle."""
+    
+    service = get_i18n_service()
+    if not service:
+        raise HTTPException(status_code=503, detail="I18n service not available")
+    
+    try:
+        bundle = service.get_page_bundle(page_key, language)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get page bundle: {str(e)}")
+    
+    headers = {
+        "ETag": f"W/{bundle.etag}",
+        "Cache-Control": "public, max-age=300, must-revalidate",
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request, bundle.etag):
+        return Response(status_code=304, headers=headers)
+    
+    body, encoding = bundle.encode(negotiate_content_encoding(request.headers.get("accept-encoding")))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/translations/{language}")
 async def get_all_translations(language: str):
     """Get all translations for a language."""
@@ -3,11 +3,15 @@ Presentations API Routes
 Handles automated client presentation generation and demo creation.
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+import os
 
+from services.pdf_export_pool import PdfExportQueueFull
+from services.pdf_renderer import iter_handle
 from services.presentation_service import (
     get_presentation_service,
     PresentationType,
@@ -302,12 +306,48 @@ async def export_to_pdf(presentation_id: str):
         return {
             "presentation_id": presentation_id,
             "pdf_url": pdf_url,
-            "message": "PDF export initiated"
+            "message": "PDF export ready"
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PdfExportQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to export PDF: {str(e)}")
 
+@router.get("/presentations/{presentation_id}/download/pdf")
+async def download_pdf(presentation_id: str, request: Request):
+    """Stream the rendered PDF, rendering it first if it is not cached."""
+    
+    service = get_presentation_service()
+    if not service:
+        raise HTTPException(status_code=503, detail="Presentation service not available")
+    
+    try:
+        # An open handle keeps streaming even if the cache evicts the file meanwhile
+        handle = await service.open_presentation_pdf(presentation_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PdfExportQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    # Cached files are named by content hash, which makes a strong validator
+    etag = '"' + os.path.splitext(os.path.basename(handle.name))[0] + '"'
+    if request.headers.get("if-none-match") == etag:
+        handle.close()
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    return StreamingResponse(
+        iter_handle(handle),
+        media_type="application/pdf",
+        headers={
+            "ETag": etag,
+            "Content-Length": str(os.fstat(handle.fileno()).st_size),
+            "Content-Disposition": f'attachment; filename="presentation-{presentation_id}.pdf"'
+        }
+    )
+
 @router.post("/presentations/{presentation_id}/create-video")
 async def create_video_walkthrough(
     presentation_id: str,
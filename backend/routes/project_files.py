@@ -8,6 +8,7 @@ from models.user import User
 from models.project import FileContent
 from models.database import get_database
 from routes.auth import get_current_user
+from routes.projects import index_saved_file
 from services.project_service import ProjectService
 from services.ai_service import AIService
 
@@ -477,6 +478,8 @@ async def save_project_file_internal(project_id: str, file_data: FileContent, cu
             }
         )
         
+        await index_saved_file(project_id, file_data)
+        
     except Exception as e:
         logger.error(f"Failed to save file internally: {e}")
         raise
\ No newline at end of file
@@ -6,7 +6,7 @@ import logging
 import uuid
 
 from models.user import User
-from models.project import Project, ProjectCreate, ProjectUpdate, ProjectStatus, FileContent
+from models.project import Project, ProjectCreate, ProjectUpdate, ProjectStatus, FileContent, SimilarCodeQuery
 from models.database import get_database
 from routes.auth import get_current_user
 from services.project_service import ProjectService
@@ -15,6 +15,34 @@ router = APIRouter()
 project_service = ProjectService()
 logger = logging.getLogger(__name__)
 
+# Global pattern intelligence service (will be set by main.py)
+pattern_intelligence_service = None
+
+def set_pattern_intelligence_service(service):
+    global pattern_intelligence_service
+    pattern_intelligence_service = service
+
+async def index_saved_file(project_id: str, file_data: FileContent):
+    """Keep the near-duplicate code index current as files are saved"""
+    if not pattern_intelligence_service:
+        return
+    try:
+        await pattern_intelligence_service.index_file(project_id, file_data.path, file_data.content)
+    except Exception as e:
+        logger.warning(f"Pattern index update failed for {project_id}:{file_data.path}: {e}")
+
+async def unindex_deleted_files(project_id: str, file_path: Optional[str] = None):
+    """Drop a deleted file, or every file of a deleted project, from the near-duplicate index"""
+    if not pattern_intelligence_service:
+        return
+    try:
+        if file_path is None:
+            await pattern_intelligence_service.remove_indexed_project(project_id)
+        else:
+            await pattern_intelligence_service.remove_indexed_file(project_id, file_path)
+    except Exception as e:
+        logger.warning(f"Pattern index removal failed for {project_id}:{file_path or '*'}: {e}")
+
 @router.post("/", response_model=dict)
 async def create_project(
     project: ProjectCreate,
@@ -223,6 +251,7 @@ async def delete_project(
             {"$inc": {"projects_count": -1}}
         )
         
+        await unindex_deleted_files(project_id)
         logger.info(f"Project deleted: {project_id}")
         
         return {"message": "Project deleted successfully"}
@@ -414,6 +443,7 @@ async def save_project_file(
             }
         )
         
+        await index_saved_file(project_id, file_data)
         logger.info(f"File saved for project {project_id}: {file_data.path}")
         
         return {"message": "File saved successfully", "file": file_dict}
@@ -424,6 +454,115 @@ async def save_project_file(
         logger.error(f"File save error: {e}")
         raise HTTPException(status_code=500, detail="Failed to save file")
 
+@router.delete("/{project_id}/files/{file_path:path}")
+async def delete_project_file(
+    project_id: str,
+    file_path: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a file from project"""
+    try:
+        db = await get_database()
+        
+        project = await db.projects.find_one({
+            "_id": project_id,
+            "user_id": str(current_user.id)
+        })
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        if not any(existing_file["path"] == file_path for existing_file in project.get("files", [])):
+            raise HTTPException(status_code=404, detail="File not found")
+        
+        await db.projects.update_one(
+            {"_id": project_id},
+            {
+                "$pull": {"files": {"path": file_path}},
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+        
+        await unindex_deleted_files(project_id, file_path)
+        logger.info(f"File deleted from project {project_id}: {file_path}")
+        
+        return {"message": "File deleted successfully", "path": file_path}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"File delete error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to delete file")
+
+async def _synced_pattern_index(db):
+    """The pattern service, with its index caught up on files saved through other workers"""
+    if not pattern_intelligence_service:
+        raise HTTPException(status_code=503, detail="Code similarity index not available")
+    await pattern_intelligence_service.sync_index(db)
+    return pattern_intelligence_service
+
+@router.get("/{project_id}/duplicates")
+async def get_project_duplicates(
+    project_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Near-duplicate code blocks within a project"""
+    try:
+        db = await get_database()
+        
+        project = await db.projects.find_one({
+            "_id": project_id,
+            "user_id": str(current_user.id)
+        })
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        service = await _synced_pattern_index(db)
+        return {"duplicates": await service.find_near_duplicates(project_id)}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Duplicate detection error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to detect duplicates")
+
+@router.post("/{project_id}/similar-code")
+async def find_similar_code(
+    project_id: str,
+    query: SimilarCodeQuery,
+    current_user: User = Depends(get_current_user)
+):
+    """Code blocks similar to a snippet, in this project or in all of the user's projects"""
+    try:
+        db = await get_database()
+        
+        project = await db.projects.find_one({
+            "_id": project_id,
+            "user_id": str(current_user.id)
+        })
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        service = await _synced_pattern_index(db)
+        if not query.all_projects:
+            return {"matches": await service.find_similar_code(query.code, project_id=project_id)}
+        
+        # The index spans every user's projects; only report the caller's own
+        owned = {
+            str(owned_project["_id"])
+            async for owned_project in db.projects.find({"user_id": str(current_user.id)}, {"_id": 1})
+        }
+        matches = await service.find_similar_code(query.code)
+        return {"matches": [match for match in matches if match["project_id"] in owned]}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Similar code search error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search similar code")
+
 @router.get("/{project_id}/logs")
 async def get_project_logs(
     project_id: str,
@@ -8,7 +8,7 @@ import json
 
 from models.user import User
 from models.database import get_database
-from routes.auth import get_current_user
+from routes.auth import get_current_user, user_id_from_token
 from services.websocket_manager import WebSocketManager
 from services.smart_collaboration_service import SmartCollaborationService
 from services.real_time_performance import RealTimePerformanceService
@@ -179,7 +179,9 @@ async def collaboration_websocket(websocket: WebSocket, session_id: str):
         await websocket.accept()
         
         # Add user to websocket manager
-        user_id = "temp_user"  # In production, extract from auth token
+        # Connections are keyed by user, so unauthenticated sockets each get their own guest id
+        user_id = (user_id_from_token(websocket.query_params.get("token"))
+                   or f"guest_{uuid.uuid4().hex[:12]}")
         await websocket_manager.connect(websocket, user_id, session_id)
         
         logger.info(f"User {user_id} connected to collaboration session {session_id}")
@@ -3,11 +3,14 @@ SEO API Routes
 Handles SEO meta tags, structured data, and search optimization.
 """
 
-from fastapi import APIRouter, HTTPException, Response, Query
+from fastapi import APIRouter, HTTPException, Request, Response, Query
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
 
+from services.response_encoding import negotiate_content_encoding
 from services.seo_service import get_seo_service
 
 router = APIRouter()
@@ -76,23 +79,75 @@ async def get_dynamic_meta_tags(request: DynamicSEORequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate dynamic meta tags: {str(e)}")
 
-@router.get("/sitemap.xml")
-async def get_sitemap():
-    """Get XML sitemap for the website."""
+def _not_modified(request: Request, etag: str, last_modified) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against a cached sitemap."""
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Weak comparison: the same ETag covers the gzip and identity encodings
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+    return False
+
+async def _sitemap_response(request: Request, shard: Optional[int] = None) -> Response:
+    """Serve a sitemap file: 304 when unchanged, cached gzip bytes, or a stream."""
     
     service = get_seo_service()
     if not service:
         raise HTTPException(status_code=503, detail="SEO service not available")
     
-    try:
-        sitemap_xml = await service.generate_sitemap_xml()
-        
+    # Rendered off the event loop; only gzip clients pay for compression
+    gzip_accepted = negotiate_content_encoding(request.headers.get("accept-encoding"), ("gzip",)) == "gzip"
+    document = await service.load_sitemap_document(shard, compressed=gzip_accepted)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    
+    headers = {
+        "ETag": f"W/{document.etag}",
+        "Last-Modified": format_datetime(document.last_modified.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "public, max-age=3600",
+        "Vary": "Accept-Encoding",
+        "Content-Disposition": f"inline; filename={document.name}"
+    }
+    if _not_modified(request, document.etag, document.last_modified):
+        return Response(status_code=304, headers=headers)
+    
+    if gzip_accepted:
         return Response(
-            content=sitemap_xml,
+            content=document.body,
             media_type="application/xml",
-            headers={"Content-Disposition": "inline; filename=sitemap.xml"}
+            headers={**headers, "Content-Encoding": "gzip"}
         )
-        
+    
+    return StreamingResponse(service.iter_sitemap_xml(shard), media_type="application/xml", headers=headers)
+
+@router.get("/sitemap.xml")
+async def get_sitemap(request: Request):
+    """Get XML sitemap for the website (a sitemap index above 50k URLs)."""
+    
+    try:
+        return await _sitemap_response(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate sitemap: {str(e)}")
+
+@router.get("/sitemap-{shard}.xml")
+async def get_sitemap_shard(shard: int, request: Request):
+    """Get one shard of a sitemap split at the 50k URL limit."""
+    
+    try:
+        return await _sitemap_response(request, shard - 1)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate sitemap: {str(e)}")
 
@@ -38,6 +38,10 @@ class ERDSchemaGenRequest(BaseModel):
     erd_data: Dict[str, Any]
     database_type: str = "postgresql"
 
+class MoveElementsRequest(BaseModel):
+    diagram_id: str
+    positions: Dict[str, Dict[str, float]]
+
 @router.post("/analyze-diagram")
 async def analyze_diagram(request: DiagramAnalysisRequest):
     """Analyze visual diagram and extract programmable elements"""
@@ -51,6 +55,19 @@ async def analyze_diagram(request: DiagramAnalysisRequest):
     
     return result
 
+@router.post("/move-elements")
+async def move_elements(request: MoveElementsRequest):
+    """Move elements of an analyzed diagram and return its updated relationships"""
+    if not visual_programming_service:
+        raise HTTPException(status_code=503, detail="Visual Programming service not available")
+    
+    result = await visual_programming_service.move_elements(request.diagram_id, request.positions)
+    
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    
+    return result
+
 @router.post("/generate-code-from-flowchart")
 async def generate_code_from_flowchart(request: FlowchartCodeGenRequest):
     """Generate executable code from flowchart diagram"""
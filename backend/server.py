@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from middleware.response_encoding import NegotiatedJSONResponse, ResponseEncodingMiddleware
 from fastapi.responses import RedirectResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
@@ -7,113 +8,10 @@ import os
 import logging
 from datetime import datetime
 
-# Import our routes
-from routes.auth import router as auth_router
-from routes.projects import router as projects_router
-from routes.ai import router as ai_router
-from routes.templates import router as templates_router
-from routes.integrations import router as integrations_router
+from middleware.lazy_routers import LazyRouterRegistry, RouterSpec
 
-# Import enhanced routes
-from routes.enhanced_ai_workflows import router as enhanced_ai_router
-from routes.real_time_collaboration import router as collaboration_router
-from routes.enhanced_project_lifecycle import router as lifecycle_router
-from routes.enhanced_features import router as enhanced_features_router
-from routes.integrations_enhanced import router as integrations_enhanced_router
-from routes.subscription import router as subscription_router
-
-# Import additional missing routes (only working ones)
-from routes.advanced_ai import router as advanced_ai_router
-from routes.enterprise import router as enterprise_router
-from routes.analytics_dashboard import router as analytics_dashboard_router
-from routes.performance import router as performance_router
-from routes.visual_programming import router as visual_programming_router
-from routes.security import router as security_router
-from routes.architectural_intelligence import router as architectural_intelligence_router
-from routes.voice import router as voice_router
-from routes.agents import router as agents_router
-
-# Import new enhanced AI route
-from routes.enhanced_ai import router as enhanced_ai_new_router
-from routes.enhanced_ai_v2 import router as enhanced_ai_v2_router
-from routes.enhanced_ai_v3 import router as enhanced_ai_v3_router
-
-# Import Phase 1 Optimized AI Routes
-from routes.optimized_ai_v4 import router as optimized_ai_v4_router
-
-# Import ALL ENHANCEMENT PHASES INTEGRATED - v4 Complete
-from routes.enhanced_ai_v4_complete import router as enhanced_ai_v4_complete_router
-
-# Import Gap-Closing Enhancement Routes - Competitive Features (working routes only)
-try:
-    from routes.autonomous_planning import router as autonomous_planning_router
-except ImportError:
-    autonomous_planning_router = None
-    
-try:
-    from routes.git_cicd_integration import router as git_cicd_router
-except ImportError:
-    git_cicd_router = None
-    
-try:
-    from routes.memory_system import router as memory_system_router
-except ImportError:
-    memory_system_router = None
-
-try:
-    from routes.conversational_debugging import router as conversational_debugging_router
-except ImportError:
-    conversational_debugging_router = None
-
-try:
-    from routes.enhanced_editor import router as enhanced_editor_router
-except ImportError:
-    enhanced_editor_router = None
-
-try:
-    from routes.enhanced_templates import router as enhanced_templates_router
-except ImportError:
-    enhanced_templates_router = None
-
-# Import NEW COMPETITIVE FEATURES - COMPLETE IMPLEMENTATION (optional imports)
-try:
-    from routes.natural_language_planning import router as natural_language_planning_router
-except ImportError:
-    natural_language_planning_router = None
-
-try:
-    from routes.persistent_memory import router as persistent_memory_router
-except ImportError:
-    persistent_memory_router = None
-
-try:
-    from routes.git_cicd_enhanced import router as git_cicd_enhanced_router
-except ImportError:
-    git_cicd_enhanced_router = None
-
-try:
-    from routes.enhanced_templates_expanded import router as enhanced_templates_expanded_router
-except ImportError:
-    enhanced_templates_expanded_router = None
-
-try:
-    from routes.conversational_debugging_enhanced import router as conversational_debugging_enhanced_router
-except ImportError:
-    conversational_debugging_enhanced_router = None
-
-try:
-    from routes.competitive_features_api import router as competitive_features_api_router
-except ImportError:
-    competitive_features_api_router = None
-
-# Import NEW 5 MISSING COMPETITIVE FEATURES - JANUARY 2025 IMPLEMENTATION
-from routes.enterprise_compliance import router as enterprise_compliance_router
-from routes.mobile_experience_fixed import router as mobile_experience_router_fixed
-from routes.advanced_analytics_fixed import router as advanced_analytics_router_fixed
-from routes.enhanced_onboarding import router as enhanced_onboarding_router
-from routes.workflow_builder import router as workflow_builder_router
-
-from models.database import init_db
+from models.database import get_database, init_db
+from services.shared_state import get_shared_state
 
 # Load environment variables
 load_dotenv()
@@ -126,9 +24,13 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Aether AI API",
     description="Next-generation AI-powered development platform with advanced multi-agent intelligence",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=NegotiatedJSONResponse
 )
 
+# Negotiate orjson/MessagePack bodies and brotli/zstd/gzip compression
+app.add_middleware(ResponseEncodingMiddleware, minimum_size=int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", 1024)))
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -145,6 +47,9 @@ async def startup_event():
         await init_db()
         logger.info("✅ Database initialized successfully")
         
+        # Before any service writes state that other workers must see
+        await get_shared_state().initialize()
+        
         # Create demo user if not exists
         from routes.auth import create_demo_user
         await create_demo_user()
@@ -155,6 +60,19 @@ async def startup_event():
         await ai_service.initialize()
         logger.info("🤖 AI services initialized")
         
+        # Near-duplicate code index, kept current as project files are saved
+        from services.pattern_intelligence import PatternIntelligence
+        from routes.projects import set_pattern_intelligence_service
+        pattern_intelligence = PatternIntelligence(None)
+        await pattern_intelligence.initialize()
+        set_pattern_intelligence_service(pattern_intelligence)
+        try:
+            indexed = await pattern_intelligence.sync_index(await get_database())
+            logger.info(f"🧬 Code similarity index hydrated from {indexed} stored files")
+        except Exception as e:
+            # The first duplicate query retries the full hydration
+            logger.warning(f"Code similarity index hydration failed: {e}")
+        
         logger.info("🎉 Aether AI API is ready!")
         
     except Exception as e:
@@ -166,121 +84,86 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Aether AI shutting down...")
 
-# Include routers with /api prefix
-app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
-app.include_router(projects_router, prefix="/api/projects", tags=["Projects"])
-app.include_router(ai_router, prefix="/api/ai", tags=["AI"])
-app.include_router(templates_router, prefix="/api/templates", tags=["Templates"])
-app.include_router(integrations_router, prefix="/api/integrations", tags=["Integrations"])
-
-# Include enhanced routers
-app.include_router(enhanced_ai_router, prefix="/api/ai/enhanced", tags=["Enhanced AI Workflows"])
-app.include_router(collaboration_router, prefix="/api/collaboration", tags=["Real-time Collaboration"])
-app.include_router(lifecycle_router, prefix="/api/projects", tags=["Enhanced Project Lifecycle"])
-app.include_router(enhanced_features_router, prefix="/api/enhanced", tags=["Enhanced Features"])
-app.include_router(integrations_enhanced_router, prefix="/api/integrations/enhanced", tags=["Enhanced Integrations"])
-app.include_router(subscription_router, prefix="/api/subscription", tags=["Subscription Management"])
-
-# Include new enhanced AI router with better capabilities
-app.include_router(enhanced_ai_new_router, prefix="/api/ai/v2", tags=["Enhanced AI v2"])
-app.include_router(enhanced_ai_v2_router, prefix="/api/ai/v2/enhanced", tags=["Enhanced AI v2 Advanced"])
-app.include_router(enhanced_ai_v3_router, prefix="/api/ai/v3", tags=["Enhanced AI v3 Multi-Agent"])
-
-# Import and include comprehensive AI enhancement router
-from routes.comprehensive_ai_api import router as comprehensive_ai_router
-app.include_router(comprehensive_ai_router, prefix="/api/ai/comprehensive", tags=["Comprehensive AI Enhancement v2.0"])
-
-# Include Phase 1 Optimized AI Routes - Enterprise Performance
-app.include_router(optimized_ai_v4_router, prefix="/api/ai", tags=["Optimized AI v4 - Enterprise"])
-
-# Include ALL ENHANCEMENT PHASES INTEGRATED - v4 Complete (NEW)
-app.include_router(enhanced_ai_v4_complete_router, prefix="/api/ai/v4", tags=["Enhanced AI v4 Complete - All 6 Phases"])
-
-# Include Advanced AI Intelligence Enhancement Routes (PRESERVES EXISTING UI/WORKFLOW)
-from routes.enhanced_ai_v3_intelligence import router as enhanced_ai_intelligence_router
-app.include_router(enhanced_ai_intelligence_router, prefix="/api/ai/v3/intelligence", tags=["AI Intelligence Enhancement - Backend Only"])
-
-# Include Advanced Accessibility API Routes (WCAG COMPLIANT - NO UI CHANGES)
-from routes.accessibility_api import router as accessibility_api_router
-app.include_router(accessibility_api_router, prefix="/api/accessibility", tags=["Advanced Accessibility - WCAG Compliant"])
-
-# Include Advanced Robustness & Reliability API Routes (ERROR HANDLING - NO UI CHANGES)
-from routes.robustness_api import router as robustness_api_router
-app.include_router(robustness_api_router, prefix="/api/robustness", tags=["Advanced Robustness & Reliability"])
-
-# Include Comprehensive Enhancement Coordinator API (MASTER CONTROLLER - NO UI CHANGES)
-from routes.comprehensive_enhancement_api import router as comprehensive_enhancement_router
-app.include_router(comprehensive_enhancement_router, prefix="/api/comprehensive", tags=["Comprehensive Enhancement - All 6 Phases"])
-
-# Include Gap-Closing Enhancement Routes - All Competitive Features (with error handling)
-if autonomous_planning_router:
-    app.include_router(autonomous_planning_router, prefix="/api/planning", tags=["Autonomous Planning"])
-if git_cicd_router:
-    app.include_router(git_cicd_router, prefix="/api/git", tags=["Git & CI/CD Integration"])
-if memory_system_router:
-    app.include_router(memory_system_router, prefix="/api/memory", tags=["Memory System"])
-if conversational_debugging_router:
-    app.include_router(conversational_debugging_router, prefix="/api/debug", tags=["Conversational Debugging"])
-if enhanced_editor_router:
-    app.include_router(enhanced_editor_router, prefix="/api/editor", tags=["Enhanced Editor & VS Code"])
-if enhanced_templates_router:
-    app.include_router(enhanced_templates_router, prefix="/api/templates/enhanced", tags=["Enhanced Templates"])
-
-# Include ALL NEW COMPETITIVE FEATURES - COMPLETE IMPLEMENTATION (with error handling)
-if competitive_features_api_router:
-    app.include_router(competitive_features_api_router, prefix="/api/competitive", tags=["Competitive Features API - Main Interface"])
-if natural_language_planning_router:
-    app.include_router(natural_language_planning_router, prefix="/api/planning/nl", tags=["Natural Language Planning"])
-if persistent_memory_router:
-    app.include_router(persistent_memory_router, prefix="/api/memory/persistent", tags=["Persistent Memory System"])
-if git_cicd_enhanced_router:
-    app.include_router(git_cicd_enhanced_router, prefix="/api/git/enhanced", tags=["Enhanced Git & CI/CD"])
-if enhanced_templates_expanded_router:
-    app.include_router(enhanced_templates_expanded_router, prefix="/api/templates/enhanced", tags=["Enhanced Templates Expanded"])
-if conversational_debugging_enhanced_router:
-    app.include_router(conversational_debugging_enhanced_router, prefix="/api/debugging/enhanced", tags=["Enhanced Conversational Debugging"])
-
-# Include NEW COMPETITIVE FEATURES COMPLETE - All 5 Priority Features
-# TEMPORARILY DISABLED DUE TO IMPORT ISSUES - NEEDS FIXING
-# from routes.competitive_features_complete import router as competitive_features_complete_router
-# app.include_router(competitive_features_complete_router, prefix="/api/competitive-complete", tags=["All 5 Competitive Features - Complete"])
-
-# Include ALL 5 COMPETITIVE FEATURES - BACKEND IMPLEMENTATION COMPLETE
-from routes.enterprise_compliance_api import router as enterprise_compliance_api_router
-from routes.advanced_analytics_api import router as advanced_analytics_api_router
-from routes.enhanced_onboarding_api import router as enhanced_onboarding_api_router
-from routes.mobile_experience_api import router as mobile_experience_api_router
-from routes.workflow_builder_api import router as workflow_builder_api_router
-
-app.include_router(enterprise_compliance_api_router, prefix="/api/compliance", tags=["Enterprise Compliance - SOC2, GDPR, HIPAA"])
-app.include_router(advanced_analytics_api_router, prefix="/api/analytics", tags=["Advanced Analytics - Dashboard & Third-Party"])
-app.include_router(enhanced_onboarding_api_router, prefix="/api/onboarding", tags=["Enhanced Onboarding - One-Click Deploy"])
-app.include_router(mobile_experience_api_router, prefix="/api/mobile", tags=["Mobile Experience - PWA & Offline"])
-app.include_router(workflow_builder_api_router, prefix="/api/workflows", tags=["Workflow Builder - Visual Drag-and-Drop"])
-
-# Include NEW 5 MISSING COMPETITIVE FEATURES - JANUARY 2025 IMPLEMENTATION
-app.include_router(enterprise_compliance_router, prefix="/api/compliance", tags=["Enterprise Compliance - New Implementation"])
-app.include_router(mobile_experience_router_fixed, prefix="/api/mobile", tags=["Mobile Experience - New Implementation"])
-app.include_router(advanced_analytics_router_fixed, prefix="/api/analytics", tags=["Advanced Analytics - New Implementation"])
-app.include_router(enhanced_onboarding_router, prefix="/api/onboarding", tags=["Enhanced Onboarding - New Implementation"])
-app.include_router(workflow_builder_router, prefix="/api/workflows", tags=["Workflow Builder - New Implementation"])
-
-# Legacy routes (maintain backward compatibility) - with error handling
-if git_cicd_router:
-    app.include_router(git_cicd_router, prefix="/api/cicd", tags=["Git & CI/CD Integration"])
-if conversational_debugging_router:
-    app.include_router(conversational_debugging_router, prefix="/api/debugging", tags=["Conversational Debugging"])
-
-# Include additional missing routers
-app.include_router(advanced_ai_router, prefix="/api/advanced-ai", tags=["Advanced AI"])
-app.include_router(enterprise_router, prefix="/api/enterprise", tags=["Enterprise"])
-app.include_router(analytics_dashboard_router, prefix="/api/dashboard/analytics", tags=["Analytics Dashboard"])
-app.include_router(performance_router, prefix="/api/performance", tags=["Performance"])
-app.include_router(visual_programming_router, prefix="/api/visual-programming", tags=["Visual Programming"])
-app.include_router(security_router, prefix="/api/security", tags=["Security"])
-app.include_router(architectural_intelligence_router, prefix="/api/architectural-intelligence", tags=["Architectural Intelligence"])
-app.include_router(voice_router, prefix="/api/voice", tags=["Voice"])
-app.include_router(agents_router, prefix="/api/agents", tags=["Agents"])
+# Router manifest, in mounting order. In lazy mode (LAZY_ROUTERS, default on)
+# each module is imported on the first request under its prefix; "warm"
+# routers and those named in ROUTER_WARMUP are loaded during startup.
+ROUTERS = [
+    RouterSpec("routes.auth", "/api/auth", ["Authentication"], warm=True),
+    RouterSpec("routes.projects", "/api/projects", ["Projects"], warm=True),
+    RouterSpec("routes.ai", "/api/ai", ["AI"], warm=True),
+    RouterSpec("routes.templates", "/api/templates", ["Templates"]),
+    RouterSpec("routes.integrations", "/api/integrations", ["Integrations"]),
+
+    # Enhanced routers
+    RouterSpec("routes.enhanced_ai_workflows", "/api/ai/enhanced", ["Enhanced AI Workflows"]),
+    RouterSpec("routes.real_time_collaboration", "/api/collaboration", ["Real-time Collaboration"]),
+    RouterSpec("routes.enhanced_project_lifecycle", "/api/projects", ["Enhanced Project Lifecycle"]),
+    RouterSpec("routes.enhanced_features", "/api/enhanced", ["Enhanced Features"]),
+    RouterSpec("routes.integrations_enhanced", "/api/integrations/enhanced", ["Enhanced Integrations"]),
+    RouterSpec("routes.subscription", "/api/subscription", ["Subscription Management"]),
+
+    # Enhanced AI routers
+    RouterSpec("routes.enhanced_ai", "/api/ai/v2", ["Enhanced AI v2"]),
+    RouterSpec("routes.enhanced_ai_v2", "/api/ai/v2/enhanced", ["Enhanced AI v2 Advanced"]),
+    RouterSpec("routes.enhanced_ai_v3", "/api/ai/v3", ["Enhanced AI v3 Multi-Agent"]),
+    RouterSpec("routes.comprehensive_ai_api", "/api/ai/comprehensive", ["Comprehensive AI Enhancement v2.0"]),
+    RouterSpec("routes.optimized_ai_v4", "/api/ai", ["Optimized AI v4 - Enterprise"]),
+    RouterSpec("routes.enhanced_ai_v4_complete", "/api/ai/v4", ["Enhanced AI v4 Complete - All 6 Phases"]),
+    RouterSpec("routes.enhanced_ai_v3_intelligence", "/api/ai/v3/intelligence", ["AI Intelligence Enhancement - Backend Only"]),
+    RouterSpec("routes.accessibility_api", "/api/accessibility", ["Advanced Accessibility - WCAG Compliant"]),
+    RouterSpec("routes.robustness_api", "/api/robustness", ["Advanced Robustness & Reliability"]),
+    RouterSpec("routes.comprehensive_enhancement_api", "/api/comprehensive", ["Comprehensive Enhancement - All 6 Phases"]),
+
+    # Gap-closing competitive features (optional)
+    RouterSpec("routes.autonomous_planning", "/api/planning", ["Autonomous Planning"], optional=True),
+    RouterSpec("routes.git_cicd_integration", "/api/git", ["Git & CI/CD Integration"], optional=True),
+    RouterSpec("routes.memory_system", "/api/memory", ["Memory System"], optional=True),
+    RouterSpec("routes.conversational_debugging", "/api/debug", ["Conversational Debugging"], optional=True),
+    RouterSpec("routes.enhanced_editor", "/api/editor", ["Enhanced Editor & VS Code"], optional=True),
+    RouterSpec("routes.enhanced_templates", "/api/templates/enhanced", ["Enhanced Templates"], optional=True),
+
+    # Competitive features - complete implementation (optional)
+    RouterSpec("routes.competitive_features_api", "/api/competitive", ["Competitive Features API - Main Interface"], optional=True),
+    RouterSpec("routes.natural_language_planning", "/api/planning/nl", ["Natural Language Planning"], optional=True),
+    RouterSpec("routes.persistent_memory", "/api/memory/persistent", ["Persistent Memory System"], optional=True),
+    RouterSpec("routes.git_cicd_enhanced", "/api/git/enhanced", ["Enhanced Git & CI/CD"], optional=True),
+    RouterSpec("routes.enhanced_templates_expanded", "/api/templates/enhanced", ["Enhanced Templates Expanded"], optional=True),
+    RouterSpec("routes.conversational_debugging_enhanced", "/api/debugging/enhanced", ["Enhanced Conversational Debugging"], optional=True),
+
+    # NEW COMPETITIVE FEATURES COMPLETE - TEMPORARILY DISABLED DUE TO IMPORT ISSUES - NEEDS FIXING
+    # RouterSpec("routes.competitive_features_complete", "/api/competitive-complete", ["All 5 Competitive Features - Complete"]),
+
+    # All 5 competitive features - backend implementation
+    RouterSpec("routes.enterprise_compliance_api", "/api/compliance", ["Enterprise Compliance - SOC2, GDPR, HIPAA"]),
+    RouterSpec("routes.advanced_analytics_api", "/api/analytics", ["Advanced Analytics - Dashboard & Third-Party"]),
+    RouterSpec("routes.enhanced_onboarding_api", "/api/onboarding", ["Enhanced Onboarding - One-Click Deploy"]),
+    RouterSpec("routes.mobile_experience_api", "/api/mobile", ["Mobile Experience - PWA & Offline"]),
+    RouterSpec("routes.workflow_builder_api", "/api/workflows", ["Workflow Builder - Visual Drag-and-Drop"]),
+
+    # 5 missing competitive features - January 2025 implementation
+    RouterSpec("routes.enterprise_compliance", "/api/compliance", ["Enterprise Compliance - New Implementation"]),
+    RouterSpec("routes.mobile_experience_fixed", "/api/mobile", ["Mobile Experience - New Implementation"]),
+    RouterSpec("routes.advanced_analytics_fixed", "/api/analytics", ["Advanced Analytics - New Implementation"]),
+    RouterSpec("routes.enhanced_onboarding", "/api/onboarding", ["Enhanced Onboarding - New Implementation"]),
+    RouterSpec("routes.workflow_builder", "/api/workflows", ["Workflow Builder - New Implementation"]),
+
+    # Legacy routes (maintain backward compatibility)
+    RouterSpec("routes.git_cicd_integration", "/api/cicd", ["Git & CI/CD Integration"], optional=True),
+    RouterSpec("routes.conversational_debugging", "/api/debugging", ["Conversational Debugging"], optional=True),
+
+    # Additional routers
+    RouterSpec("routes.advanced_ai", "/api/advanced-ai", ["Advanced AI"]),
+    RouterSpec("routes.enterprise", "/api/enterprise", ["Enterprise"]),
+    RouterSpec("routes.analytics_dashboard", "/api/dashboard/analytics", ["Analytics Dashboard"]),
+    RouterSpec("routes.performance", "/api/performance", ["Performance"]),
+    RouterSpec("routes.visual_programming", "/api/visual-programming", ["Visual Programming"]),
+    RouterSpec("routes.security", "/api/security", ["Security"]),
+    RouterSpec("routes.architectural_intelligence", "/api/architectural-intelligence", ["Architectural Intelligence"]),
+    RouterSpec("routes.voice", "/api/voice", ["Voice"]),
+    RouterSpec("routes.agents", "/api/agents", ["Agents"]),
+]
+
+routers = LazyRouterRegistry(app, ROUTERS).install()
 
 @app.get("/")
 async def root():
@@ -297,7 +180,7 @@ async def root():
 async def health_check():
     """Detailed health check"""
     return {
-        "status": "healthy",
+        "status": "healthy" if routers.healthy else "degraded",
         "services": {
             "database": "connected",
             "ai": "available",
@@ -305,7 +188,9 @@ async def health_check():
             "voice": "enabled"
         },
         "timestamp": datetime.utcnow().isoformat(),
-        "version": "2.0.0"
+        "version": "2.0.0",
+        "routers": routers.status(),
+        "shared_state": get_shared_state().status()
     }
 
 if __name__ == "__main__":
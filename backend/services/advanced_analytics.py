@@ -12,6 +12,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 import httpx
 import logging
 
+from services.analytics_rollups import HOUR, MetricRollups
+
 
 class AnalyticsEventType(Enum):
     """Types of analytics events"""
@@ -55,6 +57,7 @@ class AdvancedAnalytics:
         self.traces_collection = db.analytics_traces
         self.reports_collection = db.analytics_reports
         self.integrations_collection = db.third_party_integrations
+        self.metric_rollups = MetricRollups(db.analytics_metric_rollups)
         self.third_party_clients = {}
         
     async def initialize(self):
@@ -193,6 +196,7 @@ class AdvancedAnalytics:
             ("metric_name", 1),
             ("timestamp", 1)
         ])
+        await self.metric_rollups.initialize()
         
     async def record_metric(self, metric_name: str, value: float, 
                           timestamp: datetime = None, tags: Dict[str, Any] = None) -> str:
@@ -213,6 +217,7 @@ class AdvancedAnalytics:
         }
         
         await self.metrics_collection.insert_one(metric_record)
+        await self.metric_rollups.record(metric_name, value, timestamp, tags)
         
         # Send to third-party monitoring
         await self._send_metric_to_third_party(metric_record)
@@ -221,46 +226,26 @@ class AdvancedAnalytics:
         
     async def get_metric_data(self, metric_name: str, start_time: datetime, 
                             end_time: datetime, aggregation: str = "sum",
-                            tags: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Get aggregated metric data"""
-        # Build aggregation pipeline
-        match_query = {
-            "metric_name": metric_name,
-            "timestamp": {"$gte": start_time, "$lte": end_time}
-        }
-        
-        if tags:
-            for key, value in tags.items():
-                match_query[f"tags.{key}"] = value
-                
-        aggregation_ops = {
-            "sum": "$sum",
-            "avg": "$avg", 
-            "min": "$min",
-            "max": "$max",
-            "count": "$sum"  # Count of data points
-        }
-        
-        pipeline = [
-            {"$match": match_query},
-            {"$group": {
-                "_id": "$timestamp",
-                "value": {aggregation_ops.get(aggregation, "$sum"): "$value"},
-                "count": {"$sum": 1}
-            }},
-            {"$sort": {"_id": 1}}
-        ]
-        
-        results = await self.metrics_collection.aggregate(pipeline).to_list(length=None)
-        
-        return [
-            {
-                "timestamp": result["_id"],
-                "value": result["value"],
-                "count": result["count"]
+                            tags: Dict[str, Any] = None, resolution: str = HOUR) -> List[Dict[str, Any]]:
+        """Get aggregated metric data, one point per hour (or per day) bucket"""
+        
+        async def load_raw(start: datetime, end: datetime) -> List[Dict[str, Any]]:
+            # Only the partial hours at the window edges are read from raw metrics
+            match_query = {
+                "metric_name": metric_name,
+                "timestamp": {"$gte": start, "$lt": end}
             }
-            for result in results
-        ]
+            if tags:
+                for key, value in tags.items():
+                    match_query[f"tags.{key}"] = value
+            return await self.metrics_collection.find(
+                match_query, {"value": 1, "timestamp": 1}
+            ).to_list(length=None)
+        
+        return await self.metric_rollups.series(
+            metric_name, start_time, end_time, load_raw,
+            aggregation=aggregation, tags=tags, resolution=resolution
+        )
         
     # USER JOURNEY TRACKING
     async def _update_user_journey(self, event: Dict[str, Any]):
@@ -852,9 +837,10 @@ async def record_custom_metric(metric_name: str, value: float, timestamp: dateti
 
 
 async def get_analytics_data(metric_name: str, start_time: datetime, end_time: datetime, 
-                           aggregation: str = "sum", tags: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+                           aggregation: str = "sum", tags: Dict[str, Any] = None,
+                           resolution: str = HOUR) -> List[Dict[str, Any]]:
     """Get analytics metric data"""
-    return await advanced_analytics.get_metric_data(metric_name, start_time, end_time, aggregation, tags)
+    return await advanced_analytics.get_metric_data(metric_name, start_time, end_time, aggregation, tags, resolution)
 
 
 async def setup_third_party_analytics(platform: str, config: Dict[str, Any], user_id: str) -> str:
@@ -4,13 +4,19 @@
 import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Union
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import uuid
 from dataclasses import dataclass, asdict
 from enum import Enum
 import statistics
-from collections import defaultdict, Counter
+import os
+import time
+from collections import defaultdict, Counter, deque
+from functools import partial
+
+from services.alert_rules import AlertEngine, AlertRule
+from services.metric_pipeline import MetricPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +89,19 @@ class UserJourney:
     drop_off_point: Optional[str]
     total_duration: Optional[float]  # minutes
 
+# Raw metrics kept in memory for dashboards and summaries; exporters have their own bounded queues
+ANALYTICS_METRICS_RETAINED = int(os.getenv("ANALYTICS_METRICS_RETAINED", "100000"))
+ANALYTICS_PIPELINE_REPORT_INTERVAL = float(os.getenv("ANALYTICS_PIPELINE_REPORT_INTERVAL", "10"))
+
+# The credential each integration needs before metrics are queued for it
+INTEGRATION_CREDENTIALS = {
+    "google_analytics": "tracking_id",
+    "mixpanel": "project_token",
+    "amplitude": "api_key",
+    "datadog": "api_key",
+    "new_relic": "license_key",
+}
+
 class AdvancedAnalyticsSystem:
     """
     Advanced Analytics & Observability System with:
@@ -96,8 +115,12 @@ class AdvancedAnalyticsSystem:
     """
     
     def __init__(self):
-        self.metrics: List[Metric] = []
+        self.metrics: deque = deque(maxlen=ANALYTICS_METRICS_RETAINED)
+        self.pipeline = MetricPipeline()
+        self._http_client = None
+        self._pipeline_reporter: Optional[asyncio.Task] = None
         self.alerts: Dict[str, Alert] = {}
+        self.alert_engine = AlertEngine()
         self.dashboards: Dict[str, Dashboard] = {}
         self.user_journeys: Dict[str, UserJourney] = {}
         self.third_party_integrations: Dict[str, Dict[str, Any]] = {}
@@ -109,6 +132,7 @@ class AdvancedAnalyticsSystem:
         await self._setup_third_party_integrations()
         await self._setup_default_alerts()
         await self._setup_metric_aggregation()
+        self._setup_metric_consumers()
         logger.info("📊 Advanced Analytics System initialized with dashboards and third-party integrations")
     
     # Metrics Collection
@@ -122,10 +146,31 @@ class AdvancedAnalyticsSystem:
         metadata: Dict[str, Any] = None
     ) -> str:
         """Record a new metric"""
-        metric_id = str(uuid.uuid4())
+        metric = self._build_metric(name, value, metric_type, tags, dimensions, metadata)
+        
+        self.metrics.append(metric)
+        
+        # Update aggregations
+        await self._update_metric_aggregations(metric)
+        
+        # Alert evaluation and third-party exports consume the metric in the background
+        self.pipeline.publish(metric)
+        if self._pipeline_reporter is None:
+            self._start_pipeline_reporter()
         
-        metric = Metric(
-            id=metric_id,
+        return metric.id
+    
+    def _build_metric(
+        self,
+        name: str,
+        value: Union[float, int, Dict[str, Any]],
+        metric_type: str = "gauge",
+        tags: Dict[str, str] = None,
+        dimensions: Dict[str, Any] = None,
+        metadata: Dict[str, Any] = None
+    ) -> Metric:
+        return Metric(
+            id=str(uuid.uuid4()),
             name=name,
             type=MetricType(metric_type),
             value=value,
@@ -134,19 +179,6 @@ class AdvancedAnalyticsSystem:
             dimensions=dimensions or {},
             metadata=metadata or {}
         )
-        
-        self.metrics.append(metric)
-        
-        # Update aggregations
-        await self._update_metric_aggregations(metric)
-        
-        # Check alerts
-        await self._check_alerts(metric)
-        
-        # Send to third-party integrations
-        await self._send_to_third_party_integrations(metric)
-        
-        return metric_id
     
     async def record_user_event(
         self,
@@ -588,81 +620,93 @@ class AdvancedAnalyticsSystem:
             "enabled": True
         }
     
-    async def _send_to_third_party_integrations(self, metric: Metric):
-        """Send metric to configured third-party integrations"""
-        for integration_name, config in self.third_party_integrations.items():
-            if not config.get("enabled"):
-                continue
-            
-            try:
-                if integration_name == "google_analytics" and config.get("tracking_id"):
-                    await self._send_to_google_analytics(metric, config)
-                elif integration_name == "mixpanel" and config.get("project_token"):
-                    await self._send_to_mixpanel(metric, config)
-                elif integration_name == "amplitude" and config.get("api_key"):
-                    await self._send_to_amplitude(metric, config)
-                elif integration_name == "datadog" and config.get("api_key"):
-                    await self._send_to_datadog(metric, config)
-                elif integration_name == "new_relic" and config.get("license_key"):
-                    await self._send_to_new_relic(metric, config)
-                    
-            except Exception as e:
-                logger.error(f"Failed to send metric to {integration_name}: {e}")
+    def _setup_metric_consumers(self):
+        """Register alert evaluation and one batching exporter per third-party integration"""
+        self.pipeline.add_consumer("alerts", self._check_alert_batch, flush_interval=0.1, max_retries=0)
+        exporters = {
+            "google_analytics": self._send_to_google_analytics,
+            "mixpanel": self._send_to_mixpanel,
+            "amplitude": self._send_to_amplitude,
+            "datadog": self._send_to_datadog,
+            "new_relic": self._send_to_new_relic,
+        }
+        for integration_name, send in exporters.items():
+            self.pipeline.add_consumer(
+                integration_name,
+                partial(self._export_batch, integration_name, send),
+                accepts=partial(self._integration_ready, integration_name)
+            )
+    
+    def _integration_ready(self, integration_name: str) -> bool:
+        config = self.third_party_integrations.get(integration_name, {})
+        return bool(config.get("enabled") and config.get(INTEGRATION_CREDENTIALS[integration_name]))
     
-    async def _send_to_google_analytics(self, metric: Metric, config: Dict[str, Any]):
-        """Send metric to Google Analytics 4"""
+    async def _export_batch(self, integration_name: str, send, metrics: List[Metric]):
+        await send(metrics, self.third_party_integrations[integration_name])
+    
+    def _client(self):
+        """Shared HTTP client for the exporters, so batches reuse connections"""
         import httpx
         
-        # Convert metric to GA4 event format
-        event_data = {
-            "client_id": metric.tags.get("user_id", "anonymous"),
-            "events": [{
-                "name": metric.name.replace(".", "_"),
-                "parameters": {
-                    "value": metric.value,
-                    **metric.tags,
-                    **metric.dimensions
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=10.0)
+        return self._http_client
+    
+    async def _send_to_google_analytics(self, metrics: List[Metric], config: Dict[str, Any]):
+        """Send metrics to Google Analytics 4"""
+        # Measurement Protocol requests carry one client id and at most 25 events
+        by_client: Dict[str, List[Metric]] = defaultdict(list)
+        for metric in metrics:
+            by_client[metric.tags.get("user_id", "anonymous")].append(metric)
+        
+        for client_id, client_metrics in by_client.items():
+            for start in range(0, len(client_metrics), 25):
+                event_data = {
+                    "client_id": client_id,
+                    "events": [{
+                        "name": metric.name.replace(".", "_"),
+                        "parameters": {
+                            "value": metric.value,
+                            **metric.tags,
+                            **metric.dimensions
+                        }
+                    } for metric in client_metrics[start:start + 25]]
                 }
-            }]
-        }
-        
-        # Send to GA4 Measurement Protocol
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"{config['measurement_protocol_endpoint']}?measurement_id={config['tracking_id']}&api_secret={config['api_key']}",
-                json=event_data
-            )
+                response = await self._client().post(
+                    f"{config['measurement_protocol_endpoint']}?measurement_id={config['tracking_id']}&api_secret={config['api_key']}",
+                    json=event_data
+                )
+                response.raise_for_status()
     
-    async def _send_to_mixpanel(self, metric: Metric, config: Dict[str, Any]):
-        """Send metric to Mixpanel"""
-        import httpx
+    async def _send_to_mixpanel(self, metrics: List[Metric], config: Dict[str, Any]):
+        """Send metrics to Mixpanel"""
         import base64
         
-        event_data = {
-            "event": metric.name,
-            "properties": {
-                "token": config["project_token"],
-                "distinct_id": metric.tags.get("user_id", "anonymous"),
-                "value": metric.value,
-                "timestamp": int(metric.timestamp.timestamp()),
-                **metric.tags,
-                **metric.dimensions
-            }
-        }
-        
-        # Encode data
-        encoded_data = base64.b64encode(json.dumps(event_data).encode()).decode()
-        
-        async with httpx.AsyncClient() as client:
-            await client.post(
+        # The track endpoint takes up to 50 events per request
+        for start in range(0, len(metrics), 50):
+            events = [{
+                "event": metric.name,
+                "properties": {
+                    "token": config["project_token"],
+                    "distinct_id": metric.tags.get("user_id", "anonymous"),
+                    "value": metric.value,
+                    "timestamp": int(metric.timestamp.timestamp()),
+                    **metric.tags,
+                    **metric.dimensions
+                }
+            } for metric in metrics[start:start + 50]]
+            
+            # Encode data
+            encoded_data = base64.b64encode(json.dumps(events).encode()).decode()
+            
+            response = await self._client().post(
                 config["api_endpoint"],
                 data={"data": encoded_data}
             )
+            response.raise_for_status()
     
-    async def _send_to_amplitude(self, metric: Metric, config: Dict[str, Any]):
-        """Send metric to Amplitude"""
-        import httpx
-        
+    async def _send_to_amplitude(self, metrics: List[Metric], config: Dict[str, Any]):
+        """Send metrics to Amplitude"""
         event_data = {
             "api_key": config["api_key"],
             "events": [{
@@ -674,40 +718,36 @@ class AdvancedAnalyticsSystem:
                     **metric.dimensions
                 },
                 "time": int(metric.timestamp.timestamp() * 1000)
-            }]
+            } for metric in metrics]
         }
         
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                config["api_endpoint"],
-                json=event_data
-            )
+        response = await self._client().post(
+            config["api_endpoint"],
+            json=event_data
+        )
+        response.raise_for_status()
     
-    async def _send_to_datadog(self, metric: Metric, config: Dict[str, Any]):
-        """Send metric to Datadog"""
-        import httpx
-        
+    async def _send_to_datadog(self, metrics: List[Metric], config: Dict[str, Any]):
+        """Send metrics to Datadog"""
         metric_data = {
             "series": [{
                 "metric": metric.name,
                 "points": [[int(metric.timestamp.timestamp()), metric.value]],
                 "tags": [f"{k}:{v}" for k, v in metric.tags.items()]
-            }]
+            } for metric in metrics]
         }
         
         headers = {"DD-API-KEY": config["api_key"]}
         
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                config["api_endpoint"],
-                json=metric_data,
-                headers=headers
-            )
+        response = await self._client().post(
+            config["api_endpoint"],
+            json=metric_data,
+            headers=headers
+        )
+        response.raise_for_status()
     
-    async def _send_to_new_relic(self, metric: Metric, config: Dict[str, Any]):
-        """Send metric to New Relic"""
-        import httpx
-        
+    async def _send_to_new_relic(self, metrics: List[Metric], config: Dict[str, Any]):
+        """Send metrics to New Relic"""
         metric_data = [{
             "metrics": [{
                 "name": metric.name,
@@ -715,17 +755,57 @@ class AdvancedAnalyticsSystem:
                 "value": metric.value,
                 "timestamp": int(metric.timestamp.timestamp() * 1000),
                 "attributes": {**metric.tags, **metric.dimensions}
-            }]
+            } for metric in metrics]
         }]
         
         headers = {"Api-Key": config["license_key"]}
         
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                config["api_endpoint"],
-                json=metric_data,
-                headers=headers
-            )
+        response = await self._client().post(
+            config["api_endpoint"],
+            json=metric_data,
+            headers=headers
+        )
+        response.raise_for_status()
+    
+    # Pipeline health
+    def _start_pipeline_reporter(self):
+        try:
+            self._pipeline_reporter = asyncio.get_running_loop().create_task(self._report_pipeline_metrics())
+        except RuntimeError:
+            pass
+    
+    async def _report_pipeline_metrics(self):
+        """
+        Publish queue depth, lag and drops of every consumer as gauges, every report interval.
+        
+        The gauges go to the pipeline only, so alert rules and exporters see them while
+        summaries and dashboards, which read ``self.metrics``, keep showing user metrics.
+        """
+        while True:
+            await asyncio.sleep(ANALYTICS_PIPELINE_REPORT_INTERVAL)
+            try:
+                # Resolves alerts whose windows emptied while no metrics arrived
+                self._evaluate_alerts()
+                for name, stats in self.pipeline.stats()["consumers"].items():
+                    tags = {"consumer": name}
+                    for key in ("queue_depth", "lag_seconds", "dropped_overflow", "dropped_failed"):
+                        self.pipeline.publish(self._build_metric(f"analytics.pipeline.{key}", stats[key], "gauge", tags))
+            except Exception as e:
+                # One bad report must not stop the reporting for the life of the process
+                logger.error(f"Pipeline metrics report failed: {e}")
+    
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        return self.pipeline.stats()
+    
+    async def close(self):
+        """Stop the reporter, drain the consumers and close the exporters' HTTP client"""
+        if self._pipeline_reporter is not None:
+            self._pipeline_reporter.cancel()
+            self._pipeline_reporter = None
+        await self.pipeline.close()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
     
     # Default Setup
     async def _setup_default_dashboards(self):
@@ -793,34 +873,59 @@ class AdvancedAnalyticsSystem:
     async def _setup_default_alerts(self):
         """Setup default alert rules"""
         # High error rate alert
-        error_alert_id = str(uuid.uuid4())
-        self.alerts[error_alert_id] = Alert(
-            id=error_alert_id,
+        await self.create_alert(
             name="High Error Rate",
             description="Alert when error rate exceeds 5%",
             metric_name="system.error",
             condition={"threshold": 0.05, "operator": "greater_than", "window": "5m"},
-            severity=AlertSeverity.HIGH,
-            is_active=True,
-            triggered_at=None,
-            resolved_at=None,
+            severity="high",
             notification_channels=["email", "slack"]
         )
         
         # Slow response time alert
-        performance_alert_id = str(uuid.uuid4())
-        self.alerts[performance_alert_id] = Alert(
-            id=performance_alert_id,
+        await self.create_alert(
             name="Slow Response Time",
             description="Alert when average response time exceeds 2 seconds",
             metric_name="performance.api_call",
             condition={"threshold": 2000, "operator": "greater_than", "window": "10m"},
-            severity=AlertSeverity.MEDIUM,
+            severity="medium",
+            notification_channels=["email"]
+        )
+    
+    async def create_alert(
+        self,
+        name: str,
+        description: str,
+        metric_name: str,
+        condition: Dict[str, Any],
+        severity: str = "medium",
+        notification_channels: List[str] = None
+    ) -> str:
+        """
+        Create an alert rule.  ``condition`` takes ``threshold``, ``operator``
+        and ``window``, and optionally ``aggregation`` (avg by default),
+        ``tags`` to match, ``resolve_threshold`` or ``hysteresis``, and
+        ``cooldown``.
+        """
+        alert_id = str(uuid.uuid4())
+        
+        # Validates the condition before the alert is stored
+        rule = AlertRule.from_condition(alert_id, metric_name, condition)
+        self.alerts[alert_id] = Alert(
+            id=alert_id,
+            name=name,
+            description=description,
+            metric_name=metric_name,
+            condition=condition,
+            severity=AlertSeverity(severity),
             is_active=True,
             triggered_at=None,
             resolved_at=None,
-            notification_channels=["email"]
+            notification_channels=notification_channels or []
         )
+        self.alert_engine.add_rule(rule)
+        
+        return alert_id
     
     async def _setup_metric_aggregation(self):
         """Setup metric aggregation and retention policies"""
@@ -842,33 +947,31 @@ class AdvancedAnalyticsSystem:
         # This would update pre-aggregated metrics for faster querying
         pass
     
-    async def _check_alerts(self, metric: Metric):
-        """Check if metric triggers any alerts"""
-        for alert in self.alerts.values():
-            if not alert.is_active:
+    async def _check_alert_batch(self, metrics: List[Metric]):
+        for metric in metrics:
+            self._observe_for_alerts(metric)
+        self._evaluate_alerts()
+    
+    def _observe_for_alerts(self, metric: Metric):
+        if isinstance(metric.value, (int, float)) and not isinstance(metric.value, bool):
+            timestamp = metric.timestamp.replace(tzinfo=timezone.utc).timestamp()
+            self.alert_engine.observe(metric.name, metric.value, metric.tags, timestamp)
+    
+    def _evaluate_alerts(self):
+        """Apply fire/resolve transitions of the rules whose windows changed to their active alerts"""
+        for transition in self.alert_engine.evaluate(time.time()):
+            alert = self.alerts.get(transition.rule.id)
+            if alert is None or not alert.is_active:
                 continue
-                
-            if metric.name == alert.metric_name:
-                # Simple threshold checking (in production, implement more sophisticated alerting)
-                threshold = alert.condition.get("threshold")
-                operator = alert.condition.get("operator")
-                
-                triggered = False
-                if operator == "greater_than" and metric.value > threshold:
-                    triggered = True
-                elif operator == "less_than" and metric.value < threshold:
-                    triggered = True
-                elif operator == "equals" and metric.value == threshold:
-                    triggered = True
-                
-                if triggered and not alert.triggered_at:
-                    alert.triggered_at = datetime.utcnow()
-                    logger.warning(f"Alert triggered: {alert.name} - Value: {metric.value}, Threshold: {threshold}")
-                    # In production, send notifications here
-                elif not triggered and alert.triggered_at:
-                    alert.resolved_at = datetime.utcnow()
-                    alert.triggered_at = None
-                    logger.info(f"Alert resolved: {alert.name}")
+            if transition.state == "fired":
+                alert.triggered_at = datetime.utcfromtimestamp(transition.at)
+                logger.warning(f"Alert triggered: {alert.name} - Value: {transition.value}, "
+                               f"Threshold: {transition.rule.threshold}")
+                # In production, send notifications here
+            else:
+                alert.resolved_at = datetime.utcfromtimestamp(transition.at)
+                alert.triggered_at = None
+                logger.info(f"Alert resolved: {alert.name}")
     
     # Public API Methods
     async def get_analytics_summary(
@@ -893,6 +996,7 @@ class AdvancedAnalyticsSystem:
                 "third_party_integrations": len([i for i in self.third_party_integrations.values() if i.get("enabled")]),
                 "user_journeys": len(self.user_journeys)
             },
+            "pipeline": self.pipeline.stats(),
             "time_range": {
                 "start": start_time.isoformat(),
                 "end": end_time.isoformat()
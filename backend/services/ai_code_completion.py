@@ -1,8 +1,12 @@
 from typing import List, Dict, Any, Optional
 import asyncio
 import json
+import os
+import re
+from collections import OrderedDict
 from datetime import datetime
 from services.ai_service import AIService
+from services.completion_pipeline import IDENTIFIER, CompletionCache, DocumentContext, UnknownDocument
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,8 +16,16 @@ class AICodeCompletion:
     
     def __init__(self):
         self.ai_service = AIService()
-        self.completion_cache = {}
+        self.completion_cache = CompletionCache(max_entries=int(os.getenv("COMPLETION_CACHE_SIZE", 2048)))
         self.user_preferences = {}
+        # Open documents per (user, document id), updated from edit deltas
+        self.documents: "OrderedDict[tuple, DocumentContext]" = OrderedDict()
+        self.max_documents = int(os.getenv("COMPLETION_MAX_DOCUMENTS", 256))
+        self.debounce_seconds = float(os.getenv("COMPLETION_DEBOUNCE_MS", 60)) / 1000
+        # Latest request per open (user, document id), debounced and superseded by newer ones
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+        self._superseded = set()
+        self.stats = {"requests": 0, "cache_hits": 0, "model_calls": 0, "superseded": 0}
         
     async def initialize(self):
         """Initialize the code completion service"""
@@ -26,30 +38,49 @@ class AICodeCompletion:
     
     async def get_code_completions(
         self, 
-        code_context: str, 
-        cursor_position: int,
+        code_context: Optional[str] = None,
+        cursor_position: int = 0,
         file_type: str = "javascript",
-        user_id: str = None
+        user_id: str = None,
+        document_id: Optional[str] = None,
+        edits: Optional[List[Dict[str, Any]]] = None,
+        base_version: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Get intelligent code completions"""
+        """Get intelligent code completions
+
+        With a ``document_id`` the file is kept open between requests: send
+        ``code_context`` once, then only ``edits`` (``{"start", "end", "text"}``
+        offsets). Raises ``UnknownDocument`` when the full text must be resent.
+        """
+        document = self._resolve_document(code_context, file_type, user_id, document_id, edits, base_version)
+        self.stats["requests"] += 1
         try:
-            # Analyze code context
-            context_analysis = await self._analyze_code_context(
-                code_context, cursor_position, file_type
-            )
-            
             # Get user preferences
             user_prefs = self.user_preferences.get(user_id, {})
             
-            # Generate completions using AI
-            completions = await self._generate_completions(
-                context_analysis, user_prefs, file_type
+            # Analyze code context; the preferences go into the prompt, so into the cache key too
+            context_analysis = await self._analyze_code_context(
+                document, cursor_position, file_type, scope=json.dumps(user_prefs, sort_keys=True, default=str)
             )
             
-            # Rank and filter completions
-            ranked_completions = await self._rank_completions(
-                completions, context_analysis, user_prefs
-            )
+            # Typing along an earlier suggestion is answered without the model
+            cached = self.completion_cache.get(context_analysis["window_key"], context_analysis["prefix"])
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return cached[:10]
+            
+            if document_id is None:
+                # Without a document id nothing says two requests are for the same file
+                ranked_completions = await self._complete(context_analysis, user_prefs, file_type)
+            else:
+                # A newer request for the same document supersedes this one
+                ranked_completions = await self._latest_only(
+                    (user_id, document_id),
+                    context_analysis,
+                    lambda: self._complete(context_analysis, user_prefs, file_type)
+                )
+                if ranked_completions is None:
+                    return []
             
             return ranked_completions[:10]  # Return top 10 suggestions
             
@@ -57,6 +88,107 @@ class AICodeCompletion:
             logger.error(f"Failed to get code completions: {e}")
             return []
     
+    def _resolve_document(
+        self,
+        code_context: Optional[str],
+        file_type: str,
+        user_id: Optional[str],
+        document_id: Optional[str],
+        edits: Optional[List[Dict[str, Any]]],
+        base_version: Optional[int]
+    ) -> DocumentContext:
+        """Open, update or look up the document a request refers to"""
+        if document_id is None:
+            if code_context is None:
+                raise UnknownDocument("code_context is required without a document_id")
+            return DocumentContext(code_context, file_type)
+        
+        key = (user_id, document_id)
+        document = self.documents.get(key)
+        if code_context is not None:
+            document = DocumentContext(code_context, file_type, version=base_version or 0)
+        elif document is None:
+            raise UnknownDocument(f"document {document_id} is not open")
+        elif base_version is not None and base_version != document.version:
+            raise UnknownDocument(f"document {document_id} is at version {document.version}, not {base_version}")
+        
+        if edits:
+            try:
+                document.apply_edits(edits)
+            except (ValueError, KeyError, TypeError) as e:
+                self.documents.pop(key, None)
+                raise UnknownDocument(f"cannot apply edits to {document_id}: {e}")
+        
+        self.documents[key] = document
+        self.documents.move_to_end(key)
+        while len(self.documents) > self.max_documents:
+            self.documents.popitem(last=False)
+        return document
+    
+    def document_version(self, user_id: Optional[str], document_id: Optional[str]) -> Optional[int]:
+        document = self.documents.get((user_id, document_id))
+        return document.version if document else None
+    
+    def close_document(self, user_id: Optional[str], document_id: str):
+        self.documents.pop((user_id, document_id), None)
+    
+    async def _latest_only(self, key: tuple, context: Dict[str, Any], make_request):
+        """Run the request unless a newer one for ``key`` arrives first; ``None`` when superseded"""
+        previous = self._pending.get(key)
+        if previous is not None and not previous["task"].done():
+            if (previous["calling"] and previous["window_key"] == context["window_key"]
+                    and context["prefix"].startswith(previous["prefix"])):
+                # Typing on along the same line: the answer already on its way probably still applies
+                await asyncio.wait({previous["task"]})
+                cached = self.completion_cache.get(context["window_key"], context["prefix"])
+                if cached is not None:
+                    self.stats["cache_hits"] += 1
+                    return cached
+            else:
+                self._superseded.add(previous["task"])
+                previous["task"].cancel()
+                self.stats["superseded"] += 1
+        
+        entry = {"window_key": context["window_key"], "prefix": context["prefix"], "calling": False}
+        task = entry["task"] = asyncio.ensure_future(self._debounced(entry, make_request))
+        self._pending[key] = entry
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task in self._superseded:
+                return None
+            # The caller went away; nobody else is waiting for this request
+            task.cancel()
+            raise
+        finally:
+            self._superseded.discard(task)
+            if self._pending.get(key) is entry:
+                del self._pending[key]
+    
+    async def _debounced(self, entry: Dict[str, Any], make_request):
+        if self.debounce_seconds > 0:
+            await asyncio.sleep(self.debounce_seconds)
+        entry["calling"] = True
+        return await make_request()
+    
+    async def _complete(
+        self,
+        context_analysis: Dict[str, Any],
+        user_prefs: Dict[str, Any],
+        file_type: str
+    ) -> List[Dict[str, Any]]:
+        # Generate completions using AI
+        completions = await self._generate_completions(
+            context_analysis, user_prefs, file_type
+        )
+        
+        # Rank and filter completions
+        ranked_completions = await self._rank_completions(
+            completions, context_analysis, user_prefs
+        )
+        self.completion_cache.put(context_analysis["window_key"], context_analysis["prefix"], ranked_completions)
+        return ranked_completions
+    
     async def get_smart_suggestions(
         self,
         code_context: str,
@@ -166,28 +298,18 @@ class AICodeCompletion:
     
     async def _analyze_code_context(
         self,
-        code: str,
+        code,
         position: int,
-        file_type: str
+        file_type: str,
+        scope: str = ""
     ) -> Dict[str, Any]:
         """Analyze code context around cursor position"""
-        # Get surrounding lines
-        lines = code.split('\n')
-        line_index = code[:position].count('\n')
-        
-        # Context window
-        start = max(0, line_index - 5)
-        end = min(len(lines), line_index + 5)
-        context_lines = lines[start:end]
+        document = code if isinstance(code, DocumentContext) else DocumentContext(code, file_type)
         
-        return {
-            "current_line": lines[line_index] if line_index < len(lines) else "",
-            "context_lines": context_lines,
-            "file_type": file_type,
-            "cursor_position": position,
-            "line_number": line_index + 1,
-            "indentation": len(lines[line_index]) - len(lines[line_index].lstrip()) if line_index < len(lines) else 0
-        }
+        # Context window of the lines around the cursor
+        context = document.window(position, radius=5, scope=scope)
+        context["identifiers"] = document.identifiers
+        return context
     
     async def _generate_completions(
         self,
@@ -200,11 +322,13 @@ class AICodeCompletion:
         Generate code completions for {file_type} based on this context:
         
         Current line: {context['current_line']}
+        Text before the cursor: {context['prefix']}
         Context:
         {chr(10).join(context['context_lines'])}
         
         User preferences: {json.dumps(user_prefs)}
         
+        Each completion's text continues the line from the cursor.
         Return JSON with completions:
         {{
             "completions": [
@@ -219,12 +343,22 @@ class AICodeCompletion:
         """
         
         try:
+            self.stats["model_calls"] += 1
             response = await self.ai_service.process_message(completion_prompt)
-            completions_data = json.loads(response)
+            completions_data = self._parse_json_response(response)
             return completions_data.get("completions", [])
-        except:
+        except asyncio.CancelledError:
+            raise
+        except Exception:
             return []
     
+    @staticmethod
+    def _parse_json_response(response) -> Dict[str, Any]:
+        """The AI service returns a dict whose ``response`` text holds the JSON, possibly fenced"""
+        text = response.get("response", "") if isinstance(response, dict) else response
+        match = re.search(r"\{.*\}", text, re.DOTALL)
+        return json.loads(match.group(0) if match else text)
+    
     async def _rank_completions(
         self,
         completions: List[Dict[str, Any]],
@@ -232,10 +366,17 @@ class AICodeCompletion:
         user_prefs: Dict[str, Any]
     ) -> List[Dict[str, Any]]:
         """Rank completions by relevance and user preferences"""
+        identifiers = context.get("identifiers") or {}
+        
+        def in_file(completion: Dict[str, Any]) -> float:
+            # Prefer completions that use names already defined in the file
+            names = IDENTIFIER.findall(completion.get("text", ""))
+            return sum(1 for name in names if identifiers.get(name, 0) > 0) / len(names) if names else 0.0
+        
         # Sort by AI confidence score and user preferences
         return sorted(
             completions,
-            key=lambda x: x.get("score", 0.0),
+            key=lambda x: x.get("score", 0.0) + 0.1 * in_file(x),
             reverse=True
         )
     
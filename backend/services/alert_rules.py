@@ -0,0 +1,313 @@
+"""
+Indexed alert rules over rolling-window metric aggregates.
+
+Rules are grouped by the rolling window they read: one window per
+(metric name, tag predicate, window length), shared by every rule with
+the same three.  ``AlertEngine.observe`` finds the windows a metric
+point feeds through an index by metric name and, for tag predicates, by
+one (tag, value) pair of the predicate, so its cost depends on the
+point's tags and the windows it feeds, not on how many rules exist.
+
+Windows keep time buckets with count, sum, min and max, so an aggregate
+(``avg``, ``sum``, ``count``, ``min``, ``max``, ``rate`` per second) is
+read without the raw points.  ``evaluate`` runs on a tick and only looks
+at rules whose window changed since the last tick, by new points or by
+old buckets expiring.
+
+A rule fires once when its aggregate breaches the threshold and stays
+fired (repeated breaches are not re-reported) until the aggregate moves
+past the resolve threshold - ``hysteresis`` (a fraction of the
+threshold) inside it unless ``resolve_threshold`` is given - and after
+resolving it does not fire again within ``cooldown`` seconds.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+WINDOW_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+# A window is kept in this many buckets (at least one second wide)
+WINDOW_BUCKETS = 60
+DEFAULT_HYSTERESIS = 0.1
+AGGREGATIONS = ("avg", "sum", "count", "min", "max", "rate")
+OPERATORS = ("greater_than", "less_than", "equals")
+
+TagPredicate = Tuple[Tuple[str, str], ...]
+
+
+def parse_window(window: Any) -> float:
+    """Seconds in a window given as seconds or as ``"30s"``, ``"5m"``, ``"1h"``, ``"1d"``"""
+    if isinstance(window, (int, float)):
+        return float(window)
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd])\s*", str(window))
+    if not match:
+        raise ValueError(f"Invalid alert window: {window!r}")
+    return float(match.group(1)) * WINDOW_UNITS[match.group(2)]
+
+
+@dataclass
+class AlertRule:
+    """A threshold on a window aggregate of one metric, optionally restricted by tags"""
+    id: str
+    metric_name: str
+    threshold: float
+    operator: str = "greater_than"
+    window: float = 300.0
+    aggregation: str = "avg"
+    tags: Dict[str, str] = field(default_factory=dict)
+    resolve_threshold: Optional[float] = None
+    hysteresis: float = DEFAULT_HYSTERESIS
+    cooldown: Optional[float] = None
+
+    firing: bool = False
+    fired_at: Optional[float] = None
+    resolved_at: Optional[float] = None
+    fire_count: int = 0
+    last_value: Optional[float] = None
+
+    def __post_init__(self):
+        if self.operator not in OPERATORS:
+            raise ValueError(f"Unknown alert operator: {self.operator}")
+        if self.aggregation not in AGGREGATIONS:
+            raise ValueError(f"Unknown alert aggregation: {self.aggregation}")
+        if self.resolve_threshold is None:
+            margin = abs(self.threshold) * self.hysteresis
+            if self.operator == "greater_than":
+                self.resolve_threshold = self.threshold - margin
+            elif self.operator == "less_than":
+                self.resolve_threshold = self.threshold + margin
+        if self.cooldown is None:
+            self.cooldown = self.window
+
+    @classmethod
+    def from_condition(cls, rule_id: str, metric_name: str, condition: Dict[str, Any]) -> "AlertRule":
+        """A rule from an analytics ``Alert.condition`` dict"""
+        return cls(
+            id=rule_id,
+            metric_name=metric_name,
+            threshold=float(condition["threshold"]),
+            operator=condition.get("operator", "greater_than"),
+            window=parse_window(condition.get("window", "5m")),
+            aggregation=condition.get("aggregation", "avg"),
+            tags={key: str(value) for key, value in (condition.get("tags") or {}).items()},
+            resolve_threshold=condition.get("resolve_threshold"),
+            hysteresis=condition.get("hysteresis", DEFAULT_HYSTERESIS),
+            cooldown=parse_window(condition["cooldown"]) if "cooldown" in condition else None,
+        )
+
+    def breached(self, value: float) -> bool:
+        if self.operator == "greater_than":
+            return value > self.threshold
+        if self.operator == "less_than":
+            return value < self.threshold
+        return value == self.threshold
+
+    def cleared(self, value: Optional[float]) -> bool:
+        if value is None:
+            return True
+        if self.operator == "greater_than":
+            return value <= self.resolve_threshold
+        if self.operator == "less_than":
+            return value >= self.resolve_threshold
+        return value != self.threshold
+
+
+@dataclass
+class AlertTransition:
+    rule: AlertRule
+    state: str  # "fired" or "resolved"
+    value: Optional[float]
+    at: float
+
+
+class RollingWindow:
+    """Count, sum, min and max of the points in the last ``width`` seconds, in time buckets"""
+
+    __slots__ = ("width", "granularity", "buckets", "count", "total", "rules")
+
+    def __init__(self, width: float):
+        self.width = width
+        self.granularity = max(1.0, width / WINDOW_BUCKETS)
+        # [bucket start, count, sum, min, max]
+        self.buckets: Deque[List[float]] = deque()
+        self.count = 0
+        self.total = 0.0
+        self.rules: List[AlertRule] = []
+
+    def add(self, ts: float, value: float):
+        buckets = self.buckets
+        if buckets and ts < buckets[-1][0] + self.granularity:
+            # Late points count towards the newest bucket
+            bucket = buckets[-1]
+            bucket[1] += 1
+            bucket[2] += value
+            if value < bucket[3]:
+                bucket[3] = value
+            if value > bucket[4]:
+                bucket[4] = value
+        else:
+            start = ts - ts % self.granularity
+            buckets.append([start, 1, value, value, value])
+        self.count += 1
+        self.total += value
+
+    def expire(self, now: float) -> bool:
+        """Drop buckets entirely before the window; True if any were dropped"""
+        buckets = self.buckets
+        horizon = now - self.width - self.granularity
+        expired = False
+        while buckets and buckets[0][0] <= horizon:
+            bucket = buckets.popleft()
+            self.count -= bucket[1]
+            self.total -= bucket[2]
+            expired = True
+        if not buckets:
+            self.count, self.total = 0, 0.0
+        return expired
+
+    def aggregate(self, aggregation: str) -> Optional[float]:
+        if aggregation == "count":
+            return float(self.count)
+        if aggregation == "rate":
+            return self.count / self.width
+        if not self.count:
+            return None
+        if aggregation == "avg":
+            return self.total / self.count
+        if aggregation == "sum":
+            return self.total
+        if aggregation == "min":
+            return min(bucket[3] for bucket in self.buckets)
+        return max(bucket[4] for bucket in self.buckets)
+
+
+class _MetricIndex:
+    """The windows one metric name feeds: unfiltered ones, and tag-filtered ones by one tag pair"""
+
+    __slots__ = ("unfiltered", "by_tag")
+
+    def __init__(self):
+        self.unfiltered: List[RollingWindow] = []
+        self.by_tag: Dict[Tuple[str, str], List[Tuple[RollingWindow, TagPredicate]]] = {}
+
+
+class AlertEngine:
+    """Alert rules indexed by metric name and tag predicate, evaluated on window aggregates"""
+
+    def __init__(self):
+        self.rules: Dict[str, AlertRule] = {}
+        self._windows: Dict[Tuple[str, TagPredicate, float], RollingWindow] = {}
+        self._rule_windows: Dict[str, Tuple[str, TagPredicate, float]] = {}
+        self._index: Dict[str, _MetricIndex] = {}
+        self._dirty: Set[RollingWindow] = set()
+        self._live: Set[RollingWindow] = set()
+        self.stats = {"observed": 0, "matched": 0, "evaluations": 0, "fired": 0, "resolved": 0}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def add_rule(self, rule: AlertRule):
+        if rule.id in self.rules:
+            self.remove_rule(rule.id)
+        predicate: TagPredicate = tuple(sorted(rule.tags.items()))
+        key = (rule.metric_name, predicate, rule.window)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = RollingWindow(rule.window)
+            index = self._index.get(rule.metric_name)
+            if index is None:
+                index = self._index[rule.metric_name] = _MetricIndex()
+            if predicate:
+                index.by_tag.setdefault(predicate[0], []).append((window, predicate[1:]))
+            else:
+                index.unfiltered.append(window)
+        window.rules.append(rule)
+        self.rules[rule.id] = rule
+        self._rule_windows[rule.id] = key
+
+    def remove_rule(self, rule_id: str) -> Optional[AlertRule]:
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return None
+        key = self._rule_windows.pop(rule_id)
+        window = self._windows[key]
+        window.rules.remove(rule)
+        if not window.rules:
+            del self._windows[key]
+            self._dirty.discard(window)
+            self._live.discard(window)
+            metric_name, predicate, _ = key
+            index = self._index[metric_name]
+            if predicate:
+                entries = index.by_tag[predicate[0]]
+                entries[:] = [entry for entry in entries if entry[0] is not window]
+                if not entries:
+                    del index.by_tag[predicate[0]]
+            else:
+                index.unfiltered.remove(window)
+            if not index.unfiltered and not index.by_tag:
+                del self._index[metric_name]
+        return rule
+
+    def observe(self, name: str, value: float, tags: Optional[Dict[str, Any]], ts: float):
+        """Add a metric point to the windows whose rules it matches"""
+        self.stats["observed"] += 1
+        index = self._index.get(name)
+        if index is None:
+            return
+        dirty = self._dirty
+        for window in index.unfiltered:
+            window.add(ts, value)
+            dirty.add(window)
+        if tags and index.by_tag:
+            for pair in tags.items():
+                entries = index.by_tag.get(pair if isinstance(pair[1], str) else (pair[0], str(pair[1])))
+                if not entries:
+                    continue
+                for window, rest in entries:
+                    if rest and any(str(tags.get(key)) != expected for key, expected in rest):
+                        continue
+                    window.add(ts, value)
+                    dirty.add(window)
+        self.stats["matched"] += 1
+
+    def value(self, rule_id: str, now: Optional[float] = None) -> Optional[float]:
+        """The current aggregate a rule is evaluated against"""
+        rule = self.rules[rule_id]
+        window = self._windows[self._rule_windows[rule_id]]
+        if now is not None:
+            window.expire(now)
+        return window.aggregate(rule.aggregation)
+
+    def evaluate(self, now: float) -> List[AlertTransition]:
+        """Re-check the rules of windows that gained or lost points; returns fire/resolve transitions"""
+        changed = self._dirty
+        self._live |= changed
+        for window in self._live:
+            if window.expire(now):
+                changed.add(window)
+        self._dirty = set()
+
+        transitions: List[AlertTransition] = []
+        for window in changed:
+            if not window.buckets:
+                self._live.discard(window)
+            for rule in window.rules:
+                self.stats["evaluations"] += 1
+                value = window.aggregate(rule.aggregation)
+                rule.last_value = value
+                if rule.firing:
+                    if rule.cleared(value):
+                        rule.firing = False
+                        rule.resolved_at = now
+                        self.stats["resolved"] += 1
+                        transitions.append(AlertTransition(rule, "resolved", value, now))
+                elif value is not None and rule.breached(value) and (
+                        rule.resolved_at is None or now - rule.resolved_at >= rule.cooldown):
+                    rule.firing = True
+                    rule.fired_at = now
+                    rule.fire_count += 1
+                    self.stats["fired"] += 1
+                    transitions.append(AlertTransition(rule, "fired", value, now))
+        return transitions
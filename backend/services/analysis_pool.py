@@ -0,0 +1,212 @@
+"""
+Process pool for CPU-bound static analysis.
+
+``ast.parse`` and regex scans over large files hold the GIL for hundreds
+of milliseconds, so running them on the event loop stalls every other
+request in the worker.  Jobs are submitted to a pool of spawned worker
+processes instead, with:
+
+- a bounded number of pending jobs (``AnalysisQueueFull`` when exceeded);
+  a job counts until it finishes, even when nobody waits for it any more
+- a per-job CPU time limit: each job runs in a child forked by the worker
+  under ``RLIMIT_CPU``, which the kernel enforces even inside a single
+  long C call such as ``ast.parse`` or a regex scan
+- cancellation of queued jobs once nobody is waiting for the result
+- an LRU result cache keyed by a hash of the file content, with identical
+  in-flight requests sharing one job
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import multiprocessing
+import os
+import pickle
+import signal
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from services import static_analysis
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisQueueFull(Exception):
+    """Raised when too many analysis jobs are already pending"""
+
+
+class AnalysisTimeout(Exception):
+    """Raised when a job exceeds its CPU time limit"""
+
+
+def _run_limited(code: str, file_type: str, cpu_seconds: float) -> List[Dict[str, Any]]:
+    """Run the analysis in a forked child whose CPU time the kernel caps"""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            limit = max(1, math.ceil(cpu_seconds))
+            # SIGXCPU at the soft limit, SIGKILL a second later; both end the child
+            resource.setrlimit(resource.RLIMIT_CPU, (limit, limit + 1))
+            resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+            outcome = (True, static_analysis.analyze(code, file_type))
+        except BaseException as e:
+            outcome = (False, f"{type(e).__name__}: {e}")
+        with os.fdopen(write_fd, "wb") as f:
+            f.write(pickle.dumps(outcome))
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as f:
+        data = f.read()
+    _, status = os.waitpid(pid, 0)
+    if os.WIFSIGNALED(status) and os.WTERMSIG(status) in (signal.SIGXCPU, signal.SIGKILL):
+        raise AnalysisTimeout(f"analysis exceeded its CPU time limit of {cpu_seconds}s")
+    if not data:
+        raise RuntimeError(f"analysis child exited with status {status}")
+    ok, value = pickle.loads(data)
+    if not ok:
+        raise RuntimeError(f"analysis failed: {value}")
+    return value
+
+
+def _run_job(code: str, file_type: str, cpu_seconds: float) -> List[Dict[str, Any]]:
+    """Worker entry point: run the analysis under a CPU time budget"""
+    if cpu_seconds > 0 and resource is not None and hasattr(os, "fork"):
+        return _run_limited(code, file_type, cpu_seconds)
+    return static_analysis.analyze(code, file_type)
+
+
+class AnalysisPool:
+    """Off-loop static analysis with a bounded queue and content-hash cache"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        cpu_time_limit: Optional[float] = None,
+        cache_size: Optional[int] = None,
+    ):
+        self.max_workers = max_workers if max_workers is not None else int(
+            os.getenv("ANALYSIS_WORKERS", min(4, os.cpu_count() or 1)))
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv("ANALYSIS_MAX_PENDING", 32))
+        self.cpu_time_limit = cpu_time_limit if cpu_time_limit is not None else float(
+            os.getenv("ANALYSIS_CPU_SECONDS", 10))
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv("ANALYSIS_CACHE_SIZE", 512))
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._jobs: Dict[str, Future] = {}
+        self._waiters: Dict[str, int] = {}
+        self.stats = {"hits": 0, "misses": 0, "rejected": 0, "cancelled": 0, "timeouts": 0}
+
+    @staticmethod
+    def content_key(code: str, file_type: str) -> str:
+        return hashlib.sha256(f"{file_type}\0{code}".encode("utf-8", "surrogatepass")).hexdigest()
+
+    @property
+    def pending(self) -> int:
+        return len(self._inflight)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            # Spawned workers only import services.static_analysis, not the app
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _get_threads(self) -> ThreadPoolExecutor:
+        """Without worker processes, jobs run one at a time on a thread"""
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+        return self._threads
+
+    async def analyze(self, code: str, file_type: str) -> List[Dict[str, Any]]:
+        """Static and pattern-based findings, computed off the event loop"""
+        key = self.content_key(code, file_type)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            return [dict(error) for error in cached]
+
+        task = self._inflight.get(key)
+        if task is None:
+            if len(self._inflight) >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise AnalysisQueueFull(f"{len(self._inflight)} analysis jobs already pending")
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(self._run(key, code, file_type))
+            # Nobody may be waiting when it fails; don't log that as an unretrieved exception
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+
+        self._waiters[key] += 1
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # The caller went away; drop the job if it was the last one waiting and it has not
+            # started.  A running job can't be stopped, so it stays pending until it finishes
+            # and its result is cached.
+            if not task.done() and self._waiters.get(key) == 1:
+                job = self._jobs.get(key)
+                if job is None:
+                    task.cancel()
+                    self.stats["cancelled"] += 1
+                elif job.cancel():
+                    self.stats["cancelled"] += 1
+            raise
+        finally:
+            if key in self._waiters:
+                self._waiters[key] -= 1
+        return [dict(error) for error in result]
+
+    async def _run(self, key: str, code: str, file_type: str) -> List[Dict[str, Any]]:
+        executor = self._get_executor()
+        # Forking a child under RLIMIT_CPU is only safe in a worker process, not on an app thread
+        cpu_seconds = self.cpu_time_limit if executor is not None else 0
+        try:
+            job = (executor or self._get_threads()).submit(_run_job, code, file_type, cpu_seconds)
+            self._jobs[key] = job
+            # Cancelling the wrapper cancels the job if it is still queued in the pool
+            result = await asyncio.wrap_future(job)
+        except AnalysisTimeout:
+            self.stats["timeouts"] += 1
+            raise
+        except BrokenProcessPool:
+            logger.error("Analysis worker died; restarting pool")
+            self._executor = None
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            self._jobs.pop(key, None)
+            self._waiters.pop(key, None)
+
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
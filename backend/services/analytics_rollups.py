@@ -0,0 +1,309 @@
+"""
+Pre-aggregated hourly and daily rollups for usage and metric analytics.
+
+Every ingested usage record or metric point is folded into one hourly and
+one daily rollup document with ``$inc`` upserts, so the cost of a query
+depends on the number of buckets in its window rather than the number of
+raw records.  A window is answered from the coarsest rollups that fit
+inside it: whole days from daily documents, the whole hours around them
+from hourly documents, and only the partial hours at either edge from raw
+records.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HOUR = "hour"
+DAY = "day"
+RAW = "raw"
+
+SPANS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+# The smallest datetime step; adding it turns an inclusive end into an exclusive one
+EPSILON = timedelta(microseconds=1)
+
+RawLoader = Callable[[datetime, datetime], Awaitable[List[Dict[str, Any]]]]
+
+
+@dataclass
+class WindowSegment:
+    source: str  # RAW, HOUR or DAY
+    start: datetime
+    end: datetime  # exclusive
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    if granularity == DAY:
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil(timestamp: datetime, granularity: str) -> datetime:
+    start = bucket_start(timestamp, granularity)
+    return start if start == timestamp else start + SPANS[granularity]
+
+
+def plan_window(start: datetime, end: datetime, coarsest: str = DAY) -> List[WindowSegment]:
+    """
+    Split ``[start, end)`` into raw edges, hourly runs and a daily middle.
+
+    ``coarsest=HOUR`` keeps daily rollups out of the plan.
+    """
+    hours_start, hours_end = _ceil(start, HOUR), bucket_start(end, HOUR)
+    if hours_start >= hours_end:
+        return [WindowSegment(RAW, start, end)] if start < end else []
+
+    segments = [WindowSegment(RAW, start, hours_start)]
+    days_start, days_end = _ceil(hours_start, DAY), bucket_start(hours_end, DAY)
+    if coarsest == DAY and days_start < days_end:
+        segments += [
+            WindowSegment(HOUR, hours_start, days_start),
+            WindowSegment(DAY, days_start, days_end),
+            WindowSegment(HOUR, days_end, hours_end),
+        ]
+    else:
+        segments.append(WindowSegment(HOUR, hours_start, hours_end))
+    segments.append(WindowSegment(RAW, hours_end, end))
+    return [segment for segment in segments if segment.start < segment.end]
+
+
+def field_key(name: Any) -> str:
+    """Make a breakdown key safe to use as a MongoDB field name"""
+    return str(name).replace(".", "．").replace("$", "＄") or "unknown"
+
+
+def fold(target: Dict[str, Any], increments: Dict[str, float]) -> None:
+    """Apply dotted-path increments to a nested dict, as ``$inc`` would"""
+    for path, amount in increments.items():
+        node = target
+        *parents, leaf = path.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = node.get(leaf, 0) + amount
+
+
+def flatten(document: Dict[str, Any], fields: Iterable[str]) -> Dict[str, float]:
+    """Numeric leaves under ``fields`` of a rollup document as dotted-path increments"""
+    increments: Dict[str, float] = {}
+    stack = [(field, document.get(field)) for field in fields]
+    while stack:
+        path, value = stack.pop()
+        if isinstance(value, dict):
+            stack.extend((f"{path}.{key}", child) for key, child in value.items())
+        elif isinstance(value, (int, float)):
+            increments[path] = value
+    return increments
+
+
+class _Rollups:
+    """Hourly and daily rollup documents in one collection, keyed by scope and bucket"""
+
+    COVERAGE_ID = "__coverage__"
+    INDEX = [("scope", 1), ("granularity", 1), ("bucket", 1)]
+
+    def __init__(self, collection):
+        self.collection = collection
+        # Rollups only hold data ingested since they were introduced; earlier
+        # windows are still answered from raw records
+        self.covered_from: Optional[datetime] = None
+
+    async def initialize(self):
+        await self.collection.create_index(self.INDEX)
+        await self.collection.update_one(
+            {"_id": self.COVERAGE_ID},
+            {"$setOnInsert": {"covered_from": _ceil(datetime.utcnow(), HOUR)}},
+            upsert=True
+        )
+        coverage = await self.collection.find_one({"_id": self.COVERAGE_ID})
+        self.covered_from = coverage["covered_from"] if coverage else None
+
+    def _plan(self, start: datetime, end: datetime, coarsest: str = DAY) -> List[WindowSegment]:
+        covered_from = self.covered_from
+        if covered_from is None:
+            return [WindowSegment(RAW, start, end)]
+        if covered_from.tzinfo is None and start.tzinfo is not None:
+            covered_from = covered_from.replace(tzinfo=start.tzinfo)
+        if covered_from <= start:
+            return plan_window(start, end, coarsest)
+        if covered_from >= end:
+            return [WindowSegment(RAW, start, end)]
+        return [WindowSegment(RAW, start, covered_from)] + plan_window(covered_from, end, coarsest)
+
+    @staticmethod
+    def rollup_id(scope: str, granularity: str, bucket: datetime) -> str:
+        return f"{scope}|{granularity}|{bucket:%Y%m%dT%H}"
+
+    async def _apply(self, scope: str, timestamp: datetime, update: Dict[str, Any],
+                     extra: Optional[Dict[str, Any]] = None):
+        writes = []
+        for granularity in (HOUR, DAY):
+            bucket = bucket_start(timestamp, granularity)
+            writes.append(self.collection.update_one(
+                {"_id": self.rollup_id(scope, granularity, bucket)},
+                {**update, "$setOnInsert": {"scope": scope, "granularity": granularity,
+                                            "bucket": bucket, **(extra or {})}},
+                upsert=True
+            ))
+        await asyncio.gather(*writes)
+
+    async def _find(self, query: Dict[str, Any], segment: WindowSegment) -> List[Dict[str, Any]]:
+        return await self.collection.find({
+            **query,
+            "granularity": segment.source,
+            "bucket": {"$gte": segment.start, "$lt": segment.end}
+        }).to_list(length=None)
+
+
+class UsageRollups(_Rollups):
+    """Per-user usage totals with breakdowns by usage type, model and endpoint"""
+
+    SUMMED = ("count", "amount", "tokens", "cost", "by_type", "by_model", "by_endpoint")
+
+    @staticmethod
+    def scope(user_id: str) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def increments(record: Dict[str, Any]) -> Dict[str, float]:
+        """The ``$inc`` paths a single usage record contributes to its rollups"""
+        metadata = record.get("metadata") or {}
+        amount = record.get("amount", 0)
+        tokens = metadata.get("tokens_used", 0) or 0
+        cost = metadata.get("cost", 0) or 0
+        usage_type = field_key(record.get("usage_type"))
+
+        increments = {
+            "count": 1, "amount": amount, "tokens": tokens, "cost": cost,
+            f"by_type.{usage_type}.count": 1,
+            f"by_type.{usage_type}.amount": amount,
+        }
+        if metadata.get("model_name"):
+            model = field_key(metadata["model_name"])
+            increments.update({
+                f"by_model.{model}.count": 1,
+                f"by_model.{model}.tokens": tokens,
+                f"by_model.{model}.cost": cost,
+            })
+        if metadata.get("endpoint"):
+            increments[f"by_endpoint.{field_key(metadata['endpoint'])}.count"] = 1
+        return increments
+
+    async def record(self, record: Dict[str, Any]):
+        await self._apply(self.scope(record["user_id"]), record["timestamp"],
+                          {"$inc": self.increments(record)})
+
+    async def summarize(self, user_id: str, start: datetime, end: datetime,
+                        load_raw: RawLoader) -> Dict[str, Any]:
+        """
+        Totals, breakdowns and per-day usage by type for ``[start, end)``.
+
+        ``load_raw(start, end)`` returns the user's raw records for a
+        partial-hour edge of the window.
+        """
+        # Flat per-day sums first; nested documents are only built once per day
+        per_day: Dict[Any, Dict[str, float]] = {}
+        query = {"scope": self.scope(user_id)}
+
+        def add(bucket: datetime, increments: Dict[str, float]):
+            sums = per_day.get(bucket.date())
+            if sums is None:
+                sums = per_day[bucket.date()] = {}
+            for path, amount in increments.items():
+                sums[path] = sums.get(path, 0) + amount
+
+        for segment in self._plan(start, end):
+            if segment.source == RAW:
+                for record in await load_raw(segment.start, segment.end):
+                    add(record["timestamp"], self.increments(record))
+            else:
+                for document in await self._find(query, segment):
+                    add(document["bucket"], flatten(document, self.SUMMED))
+
+        totals: Dict[str, Any] = {}
+        daily: Dict[str, Dict[str, Any]] = {}
+        for day, sums in per_day.items():
+            fold(totals, sums)
+            fold(daily.setdefault(f"{day:%Y-%m-%d}", {}), {
+                path: amount for path, amount in sums.items() if path.startswith("by_type.")
+            })
+
+        usage_data = [
+            {"date": date, "usage_type": usage_type,
+             "total_amount": values.get("amount", 0), "count": values.get("count", 0)}
+            for date in sorted(daily)
+            for usage_type, values in sorted(daily[date].get("by_type", {}).items())
+        ]
+        return {
+            "usage_data": usage_data,
+            "totals": {field: totals.get(field, 0) for field in ("count", "amount", "tokens", "cost")},
+            "by_model": totals.get("by_model", {}),
+            "by_endpoint": totals.get("by_endpoint", {}),
+        }
+
+
+class MetricRollups(_Rollups):
+    """Sum, count, min and max of a metric per tag set"""
+
+    INDEX = [("metric_name", 1), ("granularity", 1), ("bucket", 1)]
+
+    @staticmethod
+    def scope(metric_name: str, tags: Optional[Dict[str, Any]]) -> str:
+        tags_key = json.dumps(tags or {}, sort_keys=True, default=str)
+        return f"metric:{metric_name}:{hashlib.md5(tags_key.encode()).hexdigest()[:12]}"
+
+    async def record(self, metric_name: str, value: float, timestamp: datetime,
+                     tags: Optional[Dict[str, Any]] = None):
+        await self._apply(
+            self.scope(metric_name, tags), timestamp,
+            {"$inc": {"sum": value, "count": 1}, "$min": {"min": value}, "$max": {"max": value}},
+            extra={"metric_name": metric_name, "tags": tags or {}}
+        )
+
+    async def series(self, metric_name: str, start: datetime, end: datetime, load_raw: RawLoader,
+                     aggregation: str = "sum", tags: Optional[Dict[str, Any]] = None,
+                     resolution: str = HOUR) -> List[Dict[str, Any]]:
+        """
+        One point per ``resolution`` bucket over ``[start, end]``.
+
+        ``load_raw(start, end)`` returns the raw metric records, already
+        filtered by ``tags``, for a partial-hour edge of the window.
+        """
+        query: Dict[str, Any] = {"metric_name": metric_name}
+        for key, value in (tags or {}).items():
+            query[f"tags.{key}"] = value
+
+        buckets: Dict[datetime, List[float]] = {}
+
+        def add(bucket: datetime, total: float, count: int, low: float, high: float):
+            bucket = bucket_start(bucket, resolution)
+            current = buckets.get(bucket)
+            if current is None:
+                buckets[bucket] = [total, count, low, high]
+            else:
+                current[0] += total
+                current[1] += count
+                current[2] = min(current[2], low)
+                current[3] = max(current[3], high)
+
+        for segment in self._plan(start, end + EPSILON, coarsest=resolution):
+            if segment.source == RAW:
+                for record in await load_raw(segment.start, segment.end):
+                    value = record["value"]
+                    add(record["timestamp"], value, 1, value, value)
+            else:
+                for document in await self._find(query, segment):
+                    add(document["bucket"], document["sum"], document["count"], document["min"], document["max"])
+
+        points = []
+        for bucket in sorted(buckets):
+            total, count, low, high = buckets[bucket]
+            value = {"avg": total / count if count else 0, "min": low, "max": high}.get(aggregation, total)
+            points.append({"timestamp": bucket, "value": value, "count": count})
+        return points
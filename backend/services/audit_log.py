@@ -0,0 +1,1014 @@
+"""
+Append-only, segment-rotated audit log with a hash chain and indexes.
+
+Events are appended as JSON lines to ``segment-<n>.log`` files in the
+log directory.  Each line starts with a BLAKE2b digest of the previous
+line's digest and this line's payload, so editing, dropping or
+reordering a record breaks the chain from that point on (``verify``).
+Writes go through a buffered file and are fsynced in batches -
+``AUDIT_FSYNC_BATCH`` events or ``AUDIT_FSYNC_INTERVAL_MS`` after the
+first unsynced one, whichever comes first - instead of once per event,
+by a background thread, so ``append`` never waits on the disk.
+
+A segment is sealed, on the same thread, once it reaches
+``AUDIT_SEGMENT_BYTES``.  Its indexes - record offsets, timestamps and,
+per indexed field value, the sorted record numbers - go to a
+``segment-<n>.idx`` sidecar, and only
+the segment's time range, sparse timestamps and per-field Bloom filters
+stay in memory.  A query only opens segments whose time range overlaps
+and whose Bloom filters admit every exact filter value, narrows each to
+a record range by binary search on timestamps and intersects posting
+lists before reading any record.
+
+Timestamps never go backwards within a log (an earlier one is raised to
+the last), which is what makes the per-segment binary search valid.
+One process writes a log directory.  ``ShardedAuditLog`` (what
+``get_audit_log`` returns) lets several workers share a stream: each
+writes its own shard and queries merge all of them.
+"""
+
+import atexit
+import base64
+import fcntl
+import glob
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 32
+GENESIS = bytes(DIGEST_SIZE)
+HASH_HEX = DIGEST_SIZE * 2
+# One in this many timestamps per sealed segment is kept in memory
+TS_STRIDE = 1024
+INDEX_MAGIC = b"AEAUDIX1"
+_HEADER_LENGTH = struct.Struct("<Q")
+_SEGMENT_RE = re.compile(r"segment-(\d+)\.log$")
+_encode_payload = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str).encode
+
+DEFAULT_SEGMENT_BYTES = 128 * 1024 * 1024
+DEFAULT_INDEXED_FIELDS = ("user_id", "action", "resource")
+
+
+class AuditLogLocked(Exception):
+    """Another process is writing the audit log directory"""
+
+
+def _digest(previous: bytes, payload: bytes) -> bytes:
+    return hashlib.blake2b(previous + payload, digest_size=DIGEST_SIZE).digest()
+
+
+def _index_value(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, about 1% false positives at the sized capacity"""
+
+    HASHES = 7
+
+    def __init__(self, capacity: int = 1, bits: Optional[bytearray] = None):
+        self.bits = bits if bits is not None else bytearray(max(8, (capacity * 10 + 7) // 8))
+        self._size = len(self.bits) * 8
+
+    def _positions(self, value: str) -> Iterator[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.HASHES):
+            yield (h1 + i * h2) % self._size
+
+    def add(self, value: str):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    def encode(self) -> str:
+        return base64.b64encode(bytes(self.bits)).decode("ascii")
+
+    @classmethod
+    def decode(cls, data: str) -> "BloomFilter":
+        return cls(bits=bytearray(base64.b64decode(data)))
+
+
+def _runs(ordinals: Sequence[int]) -> Iterator[Tuple[int, int]]:
+    """Consecutive ordinals grouped as half-open ``(start, stop)`` runs"""
+    if not ordinals:
+        return
+    start = previous = ordinals[0]
+    for ordinal in ordinals[1:]:
+        if ordinal != previous + 1:
+            yield start, previous + 1
+            start = ordinal
+        previous = ordinal
+    yield start, previous + 1
+
+
+def _intersect(lists: List[Sequence[int]]) -> List[int]:
+    lists = sorted(lists, key=len)
+    result = list(lists[0])
+    for other in lists[1:]:
+        if not result:
+            break
+        members = set(other)
+        result = [ordinal for ordinal in result if ordinal in members]
+    return result
+
+
+class _Segment:
+    """What queries need from a segment, active or sealed"""
+
+    number: int
+    path: str
+    first_seq: int
+    count: int
+    min_ts: float
+    max_ts: float
+
+    def overlaps(self, start: Optional[float], end: Optional[float]) -> bool:
+        if not self.count:
+            return False
+        return (start is None or self.max_ts >= start) and (end is None or self.min_ts <= end)
+
+    def might_contain(self, field: str, value: str) -> bool:
+        raise NotImplementedError
+
+    def ordinal_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def postings(self, field: str, value: str) -> Sequence[int]:
+        raise NotImplementedError
+
+    def vocabulary(self, field: str) -> Iterable[str]:
+        raise NotImplementedError
+
+    def offsets(self, start: int, stop: int) -> Sequence[int]:
+        """Byte offsets of records ``start`` .. ``stop`` (``stop`` may be ``count``: the end of the data)"""
+        raise NotImplementedError
+
+    def read(self, start: int, stop: int) -> List[bytes]:
+        """Raw lines of records ``start`` .. ``stop - 1``"""
+        offsets = self.offsets(start, stop)
+        fd = os.open(self.path, os.O_RDONLY)
+        try:
+            data = os.pread(fd, offsets[-1] - offsets[0], offsets[0])
+        finally:
+            os.close(fd)
+        base = offsets[0]
+        return [data[offsets[i] - base:offsets[i + 1] - base] for i in range(len(offsets) - 1)]
+
+
+class _ActiveSegment(_Segment):
+    """The segment being written, indexed in memory"""
+
+    def __init__(self, number: int, path: str, first_seq: int, fields: Sequence[str]):
+        self.number = number
+        self.path = path
+        self.first_seq = first_seq
+        self.count = 0
+        self.min_ts = 0.0
+        self.max_ts = 0.0
+        self.size = 0
+        self.first_prev = GENESIS
+        self.starts = array("Q")
+        self.timestamps = array("d")
+        self.index: Dict[str, Dict[str, array]] = {field: {} for field in fields}
+
+    def add(self, ts: float, record: Dict[str, Any], length: int):
+        ordinal = self.count
+        if not ordinal:
+            self.min_ts = ts
+        self.max_ts = ts
+        self.starts.append(self.size)
+        self.timestamps.append(ts)
+        for field, postings in self.index.items():
+            value = record.get(field)
+            if value is None:
+                continue
+            key = value if isinstance(value, str) else _index_value(value)
+            ordinals = postings.get(key)
+            if ordinals is None:
+                ordinals = postings[key] = array("I")
+            ordinals.append(ordinal)
+        self.count = ordinal + 1
+        self.size += length
+
+    def might_contain(self, field: str, value: str) -> bool:
+        return value in self.index[field]
+
+    def ordinal_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self.timestamps, start)
+        hi = self.count if end is None else bisect_right(self.timestamps, end)
+        return lo, hi
+
+    def postings(self, field: str, value: str) -> Sequence[int]:
+        return self.index[field].get(value, ())
+
+    def vocabulary(self, field: str) -> Iterable[str]:
+        return list(self.index[field])
+
+    def offsets(self, start: int, stop: int) -> Sequence[int]:
+        offsets = list(self.starts[start:stop])
+        offsets.append(self.starts[stop] if stop < self.count else self.size)
+        return offsets
+
+
+class _VocabularyCache:
+    """The most recently used sealed-segment field vocabularies (value -> posting list position)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, List[int]]]" = OrderedDict()
+
+    def get(self, segment: "_SealedSegment", field: str) -> Dict[str, List[int]]:
+        key = (segment.index_path, field)
+        vocabulary = self._entries.get(key)
+        if vocabulary is not None:
+            self._entries.move_to_end(key)
+            return vocabulary
+        offset, length = segment.vocabulary_spans[field]
+        fd = os.open(segment.index_path, os.O_RDONLY)
+        try:
+            vocabulary = json.loads(os.pread(fd, length, segment.vocabulary_base + offset))
+        finally:
+            os.close(fd)
+        self._entries[key] = vocabulary
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return vocabulary
+
+
+class _SealedSegment(_Segment):
+    """
+    A full segment.  Its summary (time range, sparse timestamps, Bloom
+    filters) stays in memory; field vocabularies are read from the sidecar
+    through the log's vocabulary cache, and posting lists, offsets and
+    timestamps are read from it per query.
+    """
+
+    def __init__(self, number: int, path: str, header: Dict[str, Any], vocabulary_base: int,
+                 vocabularies: _VocabularyCache):
+        self.number = number
+        self.path = path
+        self.index_path = path[:-len(".log")] + ".idx"
+        self.first_seq = header["first_seq"]
+        self.count = header["count"]
+        self.size = header["size"]
+        self.min_ts = header["min_ts"]
+        self.max_ts = header["max_ts"]
+        self.first_prev = bytes.fromhex(header["first_prev"])
+        self.last_hash = bytes.fromhex(header["last_hash"])
+        self.sparse_ts: List[float] = header["sparse_ts"]
+        self.blooms = {field: BloomFilter.decode(data) for field, data in header["blooms"].items()}
+        self.vocabulary_base = vocabulary_base
+        self.vocabulary_spans: Dict[str, List[int]] = header["vocabularies"]
+        self._blob_base = vocabulary_base + sum(length for _, length in self.vocabulary_spans.values())
+        self._starts = header["starts"]
+        self._timestamps = header["timestamps"]
+        self._vocabularies = vocabularies
+
+    @classmethod
+    def load(cls, number: int, path: str, vocabularies: _VocabularyCache) -> "_SealedSegment":
+        with open(path[:-len(".log")] + ".idx", "rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ValueError(f"{path}: not an audit index")
+            (length,) = _HEADER_LENGTH.unpack(f.read(_HEADER_LENGTH.size))
+            header = json.loads(f.read(length))
+        return cls(number, path, header, len(INDEX_MAGIC) + _HEADER_LENGTH.size + length, vocabularies)
+
+    @staticmethod
+    def write(active: _ActiveSegment, last_hash: bytes):
+        """
+        Write the sidecar for a finished active segment: the summary header,
+        one vocabulary per field, then the raw offset, timestamp and posting
+        arrays they point into.
+        """
+        blobs: List[bytes] = []
+        position = 0
+
+        def place(values: array) -> List[int]:
+            nonlocal position
+            data = values.tobytes()
+            blobs.append(data)
+            position += len(data)
+            return [position - len(data), len(values)]
+
+        starts = place(active.starts)
+        timestamps = place(active.timestamps)
+        encoded_vocabularies: List[bytes] = []
+        spans = {}
+        blooms = {}
+        vocabulary_position = 0
+        for field, postings in active.index.items():
+            vocabulary = json.dumps({value: place(ordinals) for value, ordinals in postings.items()},
+                                    separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+            encoded_vocabularies.append(vocabulary)
+            spans[field] = [vocabulary_position, len(vocabulary)]
+            vocabulary_position += len(vocabulary)
+            bloom = BloomFilter(len(postings))
+            for value in postings:
+                bloom.add(value)
+            blooms[field] = bloom.encode()
+
+        header = {
+            "first_seq": active.first_seq,
+            "count": active.count,
+            "size": active.size,
+            "min_ts": active.min_ts,
+            "max_ts": active.max_ts,
+            "first_prev": active.first_prev.hex(),
+            "last_hash": last_hash.hex(),
+            "sparse_ts": list(active.timestamps[::TS_STRIDE]),
+            "blooms": blooms,
+            "starts": starts,
+            "timestamps": timestamps,
+            "vocabularies": spans,
+        }
+        encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        index_path = active.path[:-len(".log")] + ".idx"
+        temporary = index_path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(INDEX_MAGIC + _HEADER_LENGTH.pack(len(encoded)) + encoded)
+            for vocabulary in encoded_vocabularies:
+                f.write(vocabulary)
+            for blob in blobs:
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, index_path)
+
+    def _array(self, typecode: str, span: List[int], start: int = 0, stop: Optional[int] = None) -> array:
+        offset, count = span
+        stop = count if stop is None else min(stop, count)
+        values = array(typecode)
+        if stop <= start:
+            return values
+        fd = os.open(self.index_path, os.O_RDONLY)
+        try:
+            values.frombytes(os.pread(fd, (stop - start) * values.itemsize,
+                                      self._blob_base + offset + start * values.itemsize))
+        finally:
+            os.close(fd)
+        return values
+
+    def might_contain(self, field: str, value: str) -> bool:
+        return value in self.blooms[field]
+
+    def _locate(self, ts: float, right: bool) -> int:
+        # The sparse timestamps bound the answer to one stride, which is read from the sidecar
+        find = bisect_right if right else bisect_left
+        block = find(self.sparse_ts, ts)
+        lo = max(0, (block - 1) * TS_STRIDE)
+        hi = min(self.count, block * TS_STRIDE + 1)
+        window = self._array("d", self._timestamps, lo, hi)
+        return lo + find(window, ts)
+
+    def ordinal_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        lo = 0 if start is None or start <= self.min_ts else self._locate(start, False)
+        hi = self.count if end is None or end >= self.max_ts else self._locate(end, True)
+        return lo, hi
+
+    def postings(self, field: str, value: str) -> Sequence[int]:
+        span = self._vocabularies.get(self, field).get(value)
+        return self._array("I", span) if span else ()
+
+    def vocabulary(self, field: str) -> Iterable[str]:
+        return self._vocabularies.get(self, field).keys()
+
+    def offsets(self, start: int, stop: int) -> Sequence[int]:
+        offsets = list(self._array("Q", self._starts, start, stop))
+        offsets.append(self._array("Q", self._starts, stop, stop + 1)[0] if stop < self.count else self.size)
+        return offsets
+
+
+def _segment_numbers(directory: str) -> List[int]:
+    return sorted(
+        int(match.group(1)) for match in
+        (_SEGMENT_RE.search(path) for path in glob.glob(os.path.join(directory, "segment-*.log")))
+        if match
+    )
+
+
+class _SegmentQueries:
+    """Index-driven queries and chain verification over an ordered list of segments"""
+
+    indexed_fields: Tuple[str, ...]
+    stats: Dict[str, int]
+
+    @property
+    def segments(self) -> List[_Segment]:
+        raise NotImplementedError
+
+    def _candidates(self, segment: _Segment, lo: int, hi: int, equals: Dict[str, str],
+                    contains: Dict[str, str]) -> Optional[Sequence[int]]:
+        """Record numbers in ``lo .. hi - 1`` matching the indexed filters (None: all of them)"""
+        lists = []
+        for field, value in equals.items():
+            lists.append(segment.postings(field, value))
+        for field, fragment in contains.items():
+            merged = set()
+            for value in segment.vocabulary(field):
+                if fragment in value:
+                    merged.update(segment.postings(field, value))
+            lists.append(sorted(merged))
+        if not lists:
+            return None
+        ordinals = _intersect(lists) if len(lists) > 1 else lists[0]
+        return ordinals[bisect_left(ordinals, lo):bisect_left(ordinals, hi)]
+
+    def _plan(self, start: Optional[float], end: Optional[float], equals: Dict[str, Any],
+              contains: Dict[str, str], reverse: bool) -> Iterator[Tuple[_Segment, int, int, Optional[Sequence[int]]]]:
+        for field in (*equals, *contains):
+            if field not in self.indexed_fields:
+                raise ValueError(f"{field} is not an indexed field")
+        equals = {field: _index_value(value) for field, value in equals.items()}
+        segments = self.segments
+        for segment in reversed(segments) if reverse else segments:
+            if not segment.overlaps(start, end):
+                continue
+            if not all(segment.might_contain(field, value) for field, value in equals.items()):
+                continue
+            self.stats["segments_read"] += 1
+            lo, hi = segment.ordinal_range(start, end)
+            if lo >= hi:
+                continue
+            yield segment, lo, hi, self._candidates(segment, lo, hi, equals, contains)
+
+    def _query(self, start: Optional[float], end: Optional[float], limit: Optional[int], reverse: bool,
+               contains: Dict[str, str], where: Optional[Callable[[Dict[str, Any]], bool]],
+               equals: Dict[str, Any]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        for segment, lo, hi, ordinals in self._plan(start, end, equals, contains, reverse):
+            runs = list(_runs(ordinals)) if ordinals is not None else [(lo, hi)]
+            for run_start, run_stop in reversed(runs) if reverse else runs:
+                # Read long runs in chunks so a small limit does not read the whole range
+                chunk = 4096 if limit else run_stop - run_start
+                bounds = range(run_start, run_stop, chunk)
+                for chunk_start in reversed(bounds) if reverse else bounds:
+                    lines = segment.read(chunk_start, min(run_stop, chunk_start + chunk))
+                    for line in reversed(lines) if reverse else lines:
+                        record = json.loads(line[HASH_HEX + 1:])
+                        if where is None or where(record):
+                            results.append(record)
+                            if limit is not None and len(results) >= limit:
+                                return results
+        return results
+
+    def _count(self, start: Optional[float], end: Optional[float], equals: Dict[str, Any]) -> int:
+        total = 0
+        for _, lo, hi, ordinals in self._plan(start, end, equals, {}, False):
+            total += hi - lo if ordinals is None else len(ordinals)
+        return total
+
+    def _verify(self) -> Dict[str, Any]:
+        previous = GENESIS
+        verified = 0
+        for segment in self.segments:
+            if segment.first_prev != previous:
+                return {"valid": False, "verified_events": verified, "first_invalid_seq": segment.first_seq}
+            with open(segment.path, "rb") as f:
+                for ordinal, line in enumerate(f):
+                    if ordinal >= segment.count:
+                        break
+                    payload = line[HASH_HEX + 1:-1]
+                    expected = _digest(previous, payload)
+                    if line[:HASH_HEX] != expected.hex().encode("ascii"):
+                        return {"valid": False, "verified_events": verified,
+                                "first_invalid_seq": segment.first_seq + ordinal}
+                    previous = expected
+                    verified += 1
+            if isinstance(segment, _SealedSegment) and segment.last_hash != previous:
+                return {"valid": False, "verified_events": verified,
+                        "first_invalid_seq": segment.first_seq + segment.count - 1}
+        return {"valid": True, "verified_events": verified, "first_invalid_seq": None}
+
+
+class SegmentedAuditLog(_SegmentQueries):
+    """Hash-chained, segment-rotated audit log with time and field indexes"""
+
+    def __init__(
+        self,
+        directory: str,
+        indexed_fields: Sequence[str] = DEFAULT_INDEXED_FIELDS,
+        segment_bytes: Optional[int] = None,
+        fsync_batch: Optional[int] = None,
+        fsync_interval: Optional[float] = None,
+    ):
+        self.directory = directory
+        self.indexed_fields = tuple(indexed_fields)
+        self.segment_bytes = segment_bytes or int(os.getenv("AUDIT_SEGMENT_BYTES", str(DEFAULT_SEGMENT_BYTES)))
+        self.fsync_batch = fsync_batch or int(os.getenv("AUDIT_FSYNC_BATCH", "1000"))
+        self.fsync_interval = (
+            fsync_interval if fsync_interval is not None
+            else int(os.getenv("AUDIT_FSYNC_INTERVAL_MS", "100")) / 1000
+        )
+        self._vocabularies = _VocabularyCache(int(os.getenv("AUDIT_VOCABULARY_CACHE", "64")))
+        self.stats = {"appended": 0, "fsyncs": 0, "segments_sealed": 0, "segments_read": 0}
+
+        self._lock = threading.RLock()
+        # Signals the background thread (fsync due, segment to seal, closing) and sync() (segment sealed)
+        self._changed = threading.Condition(self._lock)
+        self._unsynced = 0
+        self._first_unsynced_at = 0.0
+        # Full segments waiting for the background thread: (segment, its file, last hash)
+        self._sealing: List[Tuple[_ActiveSegment, Any, bytes]] = []
+        self._stopping = False
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = os.open(os.path.join(directory, "LOCK"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(self._lock_fd)
+            raise AuditLogLocked(f"{directory} is written by another process")
+
+        self._sealed: List[_Segment] = []
+        self._recover()
+        self._background = threading.Thread(target=self._run_background, daemon=True,
+                                            name=f"audit-log-{os.path.basename(directory)}")
+        self._background.start()
+
+    # -------------------------------------------------------------------------
+    # Opening and recovery
+    # -------------------------------------------------------------------------
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"segment-{number:08d}.log")
+
+    def _recover(self):
+        numbers = _segment_numbers(self.directory)
+        last_hash, next_seq, last_ts = GENESIS, 0, 0.0
+        for number in numbers[:-1]:
+            path = self._segment_path(number)
+            try:
+                segment = _SealedSegment.load(number, path, self._vocabularies)
+            except (OSError, ValueError):
+                # Sealing was interrupted: index the finished segment again
+                active = self._scan(number, path, next_seq, last_hash)
+                _SealedSegment.write(active, self._last_hash)
+                segment = _SealedSegment.load(number, path, self._vocabularies)
+            self._sealed.append(segment)
+            last_hash, next_seq, last_ts = segment.last_hash, segment.first_seq + segment.count, segment.max_ts
+
+        number = numbers[-1] if numbers else 1
+        self._last_hash = last_hash
+        self._active = self._scan(number, self._segment_path(number), next_seq, last_hash)
+        self._next_seq = self._active.first_seq + self._active.count
+        self._last_ts = self._active.max_ts if self._active.count else last_ts
+        self._file = open(self._active.path, "ab", buffering=1024 * 1024)
+
+    def _scan(self, number: int, path: str, first_seq: int, previous: bytes) -> _ActiveSegment:
+        """Rebuild a segment's in-memory index from its file, dropping a torn last line"""
+        active = _ActiveSegment(number, path, first_seq, self.indexed_fields)
+        active.first_prev = previous
+        self._last_hash = previous
+        if not os.path.exists(path):
+            return active
+
+        valid_size = 0
+        broken = False
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                stored = bytes.fromhex(line[:HASH_HEX].decode("ascii"))
+                payload = line[HASH_HEX + 1:-1]
+                if not broken and _digest(self._last_hash, payload) != stored:
+                    broken = True
+                    logger.error(f"Audit log {path}: hash chain broken at record {first_seq + active.count}")
+                record = json.loads(payload)
+                if not active.count:
+                    active.first_seq = record["seq"]
+                active.add(record["ts"], record, len(line))
+                # The chain continues from what is on disk, so verify() keeps reporting the break
+                self._last_hash = stored
+                valid_size += len(line)
+
+        if valid_size != os.path.getsize(path):
+            logger.warning(f"Audit log {path}: dropping a partially written record")
+            with open(path, "r+b") as f:
+                f.truncate(valid_size)
+        return active
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    def append(self, record: Dict[str, Any], ts: Optional[float] = None) -> int:
+        """
+        Append one event; returns its sequence number.  Only a buffered write
+        happens here: fsync and sealing run on the log's background thread.
+        """
+        with self._lock:
+            if self._closed:
+                raise ValueError("audit log is closed")
+            ts = time.time() if ts is None else ts
+            if ts < self._last_ts:
+                ts = self._last_ts
+            seq = self._next_seq
+            payload = _encode_payload({**record, "seq": seq, "ts": ts}).encode("utf-8")
+            digest = hashlib.blake2b(self._last_hash + payload, digest_size=DIGEST_SIZE).digest()
+            line = digest.hex().encode("ascii") + b" " + payload + b"\n"
+            self._file.write(line)
+            self._active.add(ts, record, len(line))
+
+            self._last_hash = digest
+            self._last_ts = ts
+            self._next_seq = seq + 1
+            self.stats["appended"] += 1
+            self._unsynced += 1
+
+            if self._active.size >= self.segment_bytes:
+                self._rotate()
+            elif self._unsynced == 1:
+                self._first_unsynced_at = time.monotonic()
+                self._changed.notify_all()
+            elif self._unsynced == self.fsync_batch:
+                self._changed.notify_all()
+            return seq
+
+    def _rotate(self):
+        """Hand the full segment to the background thread and start the next one"""
+        self._file.flush()
+        self._sealing.append((self._active, self._file, self._last_hash))
+        # Sealing fsyncs the full segment, which covers everything unsynced so far
+        self._unsynced = 0
+
+        number = self._active.number + 1
+        self._active = _ActiveSegment(number, self._segment_path(number), self._next_seq, self.indexed_fields)
+        self._active.first_prev = self._last_hash
+        self._file = open(self._active.path, "ab", buffering=1024 * 1024)
+        self._changed.notify_all()
+
+    def _sync_delay(self) -> Optional[float]:
+        """Seconds until the unsynced events are due for fsync (None: there are none)"""
+        if not self._unsynced:
+            return None
+        if self._unsynced >= self.fsync_batch:
+            return 0.0
+        return max(0.0, self._first_unsynced_at + self.fsync_interval - time.monotonic())
+
+    def _run_background(self):
+        """Fsync batches and seal full segments, holding the lock only to pick up work"""
+        while True:
+            with self._lock:
+                while not self._sealing and not self._stopping:
+                    delay = self._sync_delay()
+                    if delay == 0.0:
+                        break
+                    self._changed.wait(delay)
+                if self._sealing:
+                    sealing = self._sealing[0]
+                elif self._stopping:
+                    return
+                else:
+                    sealing = None
+                    self._file.flush()
+                    # A duplicate descriptor stays valid if the segment rotates meanwhile
+                    fd = os.dup(self._file.fileno())
+                    self._unsynced = 0
+
+            if sealing is None:
+                try:
+                    os.fsync(fd)
+                    with self._lock:
+                        self.stats["fsyncs"] += 1
+                except OSError as e:
+                    logger.error(f"Audit log {self.directory}: fsync failed: {e}")
+                finally:
+                    os.close(fd)
+            else:
+                self._seal(*sealing)
+
+    def _seal(self, active: _ActiveSegment, file: Any, last_hash: bytes):
+        segment: _Segment = active
+        try:
+            os.fsync(file.fileno())
+            file.close()
+            _SealedSegment.write(active, last_hash)
+            segment = _SealedSegment.load(active.number, active.path, self._vocabularies)
+        except (OSError, ValueError) as e:
+            # The segment stays queryable from its in-memory index and is indexed again on reopen
+            logger.error(f"Audit log {active.path}: sealing failed: {e}")
+        with self._lock:
+            self._sealing.pop(0)
+            self._sealed.append(segment)
+            self.stats["fsyncs"] += 1
+            self.stats["segments_sealed"] += 1
+            self._changed.notify_all()
+
+    def sync(self):
+        """Make every appended event durable"""
+        with self._lock:
+            while self._sealing and self._background.is_alive():
+                self._changed.wait()
+            if self._closed:
+                return
+            self._file.flush()
+            fd = os.dup(self._file.fileno())
+            self._unsynced = 0
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        with self._lock:
+            self.stats["fsyncs"] += 1
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._stopping = True
+            self._changed.notify_all()
+        # The background thread seals every full segment before it exits
+        self._background.join()
+        with self._lock:
+            if self._closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._closed = True
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._next_seq - self.segments[0].first_seq
+
+    @property
+    def vocabularies(self) -> _VocabularyCache:
+        """Decoded sealed-segment vocabularies, shared with read-only views of other shards"""
+        return self._vocabularies
+
+    @property
+    def segments(self) -> List[_Segment]:
+        return [*self._sealed, *(sealing[0] for sealing in self._sealing), self._active]
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = False,
+        contains: Optional[Dict[str, str]] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        **equals: Any,
+    ) -> List[Dict[str, Any]]:
+        """
+        Events with ``start <= ts <= end`` whose indexed fields equal ``equals``
+        and contain the ``contains`` substrings, and that pass ``where``, in
+        append order (newest first with ``reverse``).
+        """
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+            return self._query(start, end, limit, reverse, contains or {}, where, equals)
+
+    def count(self, start: Optional[float] = None, end: Optional[float] = None, **equals: Any) -> int:
+        """Number of events in the time range with indexed fields equal to ``equals``, from the indexes alone"""
+        with self._lock:
+            return self._count(start, end, equals)
+
+    def verify(self) -> Dict[str, Any]:
+        """Recompute the hash chain over every segment"""
+        with self._lock:
+            if not self._closed:
+                self._file.flush()
+            return self._verify()
+
+
+class _ShardView(_SegmentQueries):
+    """
+    Read-only view of a shard another process writes.  ``refresh`` loads
+    segments sealed since the last call and indexes the lines appended to
+    unsealed ones since then; a torn last line is left for the next call.
+    When no file was added and no unsealed segment grew it only lists the
+    directory and stats the unsealed segments.
+    """
+
+    READ_CHUNK = 8 * 1024 * 1024
+
+    def __init__(self, directory: str, indexed_fields: Sequence[str], vocabularies: _VocabularyCache):
+        self.directory = directory
+        self.indexed_fields = tuple(indexed_fields)
+        self.stats = {"segments_read": 0}
+        self._vocabularies = vocabularies
+        self._sealed: List[_SealedSegment] = []
+        # Unsealed segments by number: [segment, bytes indexed, hash of the last indexed line]
+        self._tails: Dict[int, List[Any]] = {}
+        self._listing: frozenset = frozenset()
+
+    @property
+    def segments(self) -> List[_Segment]:
+        return [*self._sealed, *(self._tails[number][0] for number in sorted(self._tails))]
+
+    def __len__(self) -> int:
+        return sum(segment.count for segment in self.segments)
+
+    def _unchanged(self, listing: frozenset) -> bool:
+        if listing != self._listing:
+            return False
+        try:
+            return all(os.stat(segment.path).st_size == indexed for segment, indexed, _ in self._tails.values())
+        except FileNotFoundError:
+            return False
+
+    def refresh(self):
+        listing = frozenset(os.listdir(self.directory))
+        if self._unchanged(listing):
+            return
+        self._listing = listing
+        sealed_numbers = {segment.number for segment in self._sealed}
+        for number in _segment_numbers(self.directory):
+            if number in sealed_numbers:
+                continue
+            path = os.path.join(self.directory, f"segment-{number:08d}.log")
+            if os.path.exists(path[:-len(".log")] + ".idx"):
+                try:
+                    segment = _SealedSegment.load(number, path, self._vocabularies)
+                except (OSError, ValueError):
+                    segment = None
+                if segment is not None:
+                    self._sealed.append(segment)
+                    self._sealed.sort(key=lambda sealed: sealed.number)
+                    self._tails.pop(number, None)
+                    continue
+            self._tail(number, path)
+
+        previous = GENESIS
+        for segment in self.segments:
+            if isinstance(segment, _SealedSegment):
+                previous = segment.last_hash
+            else:
+                segment.first_prev = previous
+                previous = self._tails[segment.number][2]
+
+    def _tail(self, number: int, path: str):
+        tail = self._tails.get(number)
+        if tail is None:
+            tail = self._tails[number] = [_ActiveSegment(number, path, 0, self.indexed_fields), 0, GENESIS]
+        segment = tail[0]
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return
+        try:
+            while True:
+                data = os.pread(fd, self.READ_CHUNK, tail[1])
+                complete = data.rfind(b"\n") + 1
+                for line in data[:complete].splitlines(keepends=True):
+                    record = json.loads(line[HASH_HEX + 1:])
+                    if not segment.count:
+                        segment.first_seq = record["seq"]
+                    segment.add(record["ts"], record, len(line))
+                    tail[2] = bytes.fromhex(line[:HASH_HEX].decode("ascii"))
+                tail[1] += complete
+                if len(data) < self.READ_CHUNK or not complete:
+                    return
+        finally:
+            os.close(fd)
+
+
+class ShardedAuditLog:
+    """
+    One audit stream written by several processes.
+
+    Each process appends to the first shard it can lock - the stream
+    directory itself, then ``worker-1``, ``worker-2``, ... inside it - so
+    a restarted worker takes a shard over and continues its chain.
+    Queries, counts and verification cover every shard in the stream
+    directory: this process's own from memory, the others from disk, which
+    shows their events once they are flushed (within the fsync interval).
+    Query results are merged by timestamp.
+    """
+
+    def __init__(self, directory: str, indexed_fields: Sequence[str] = DEFAULT_INDEXED_FIELDS, **options: Any):
+        self.directory = directory
+        self.indexed_fields = tuple(indexed_fields)
+        self.writer = self._claim(options)
+        self._views: Dict[str, _ShardView] = {}
+        self._lock = threading.Lock()
+
+    def _claim(self, options: Dict[str, Any]) -> SegmentedAuditLog:
+        shard = 0
+        while True:
+            directory = self.directory if not shard else os.path.join(self.directory, f"worker-{shard}")
+            try:
+                return SegmentedAuditLog(directory, self.indexed_fields, **options)
+            except AuditLogLocked:
+                shard += 1
+
+    def _shards(self) -> List[_SegmentQueries]:
+        shards: List[_SegmentQueries] = []
+        for directory in [self.directory, *sorted(glob.glob(os.path.join(self.directory, "worker-*")))]:
+            if directory == self.writer.directory:
+                shards.append(self.writer)
+                continue
+            if not os.path.isdir(directory):
+                continue
+            view = self._views.get(directory)
+            if view is None:
+                view = self._views[directory] = _ShardView(directory, self.indexed_fields,
+                                                           self.writer.vocabularies)
+            view.refresh()
+            shards.append(view)
+        return shards
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.writer.stats
+
+    def append(self, record: Dict[str, Any], ts: Optional[float] = None) -> int:
+        """Append one event to this process's shard; returns its sequence number in the shard"""
+        return self.writer.append(record, ts)
+
+    def sync(self):
+        self.writer.sync()
+
+    def close(self):
+        self.writer.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(shard) for shard in self._shards())
+
+    def query(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        reverse: bool = False,
+        contains: Optional[Dict[str, str]] = None,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        **equals: Any,
+    ) -> List[Dict[str, Any]]:
+        """``SegmentedAuditLog.query`` over every shard, merged by timestamp"""
+        with self._lock:
+            results = [
+                shard.query(start, end, limit, reverse, contains, where, **equals)
+                if shard is self.writer else shard._query(start, end, limit, reverse, contains or {}, where, equals)
+                for shard in self._shards()
+            ]
+        if len(results) == 1:
+            return results[0]
+        merged = heapq.merge(*results, key=lambda record: record["ts"], reverse=reverse)
+        return list(itertools.islice(merged, limit))
+
+    def count(self, start: Optional[float] = None, end: Optional[float] = None, **equals: Any) -> int:
+        with self._lock:
+            return sum(
+                shard.count(start, end, **equals) if shard is self.writer else shard._count(start, end, equals)
+                for shard in self._shards()
+            )
+
+    def verify(self) -> Dict[str, Any]:
+        """Verify each shard's chain; ``shard`` names the first broken one"""
+        with self._lock:
+            verified = 0
+            for shard in self._shards():
+                result = shard.verify() if shard is self.writer else shard._verify()
+                verified += result["verified_events"]
+                if not result["valid"]:
+                    return {**result, "verified_events": verified,
+                            "shard": os.path.relpath(shard.directory, self.directory)}
+            return {"valid": True, "verified_events": verified, "first_invalid_seq": None, "shard": None}
+
+
+# Global audit logs, one per stream
+_audit_logs: Dict[str, ShardedAuditLog] = {}
+_audit_logs_lock = threading.Lock()
+
+
+def default_audit_log_dir() -> str:
+    return os.getenv("AUDIT_LOG_DIR") or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "audit_log")
+
+
+def get_audit_log(stream: str, indexed_fields: Sequence[str] = DEFAULT_INDEXED_FIELDS) -> ShardedAuditLog:
+    """The process-wide audit log for ``stream``, opened on first use"""
+    with _audit_logs_lock:
+        audit_log = _audit_logs.get(stream)
+        if audit_log is None:
+            audit_log = ShardedAuditLog(os.path.join(default_audit_log_dir(), stream), indexed_fields)
+            atexit.register(audit_log.close)
+            _audit_logs[stream] = audit_log
+        return audit_log
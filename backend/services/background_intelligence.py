@@ -10,6 +10,8 @@ from enum import Enum
 import json
 from collections import defaultdict, Counter
 
+from services.intent_classifier import get_intent_classifier
+
 logger = logging.getLogger(__name__)
 
 class ConversationPattern(Enum):
@@ -59,6 +61,9 @@ class BackgroundArchitecturalAnalyzer:
         self.conversation_database = {}  # conversation_id -> messages
         self.user_profiles = {}  # user_id -> UserArchitecturalProfile
         self.pattern_detection_rules = self._initialize_pattern_rules()
+        self.pattern_classifier = get_intent_classifier(
+            "conversation_patterns", {pattern.value: rules for pattern, rules in self.pattern_detection_rules.items()}
+        )
         self.knowledge_base = defaultdict(list)
         self.learning_enabled = True
         
@@ -221,17 +226,10 @@ class BackgroundArchitecturalAnalyzer:
             return []
         
         combined_text = " ".join([msg.get("content", "") for msg in messages]).lower()
-        detected_patterns = []
-        
-        for pattern, rules in self.pattern_detection_rules.items():
-            score = 0
-            for keyword in rules["keywords"]:
-                score += combined_text.count(keyword) * rules["weight"]
-            
-            if score >= rules["threshold"]:
-                detected_patterns.append(pattern)
-        
-        return detected_patterns
+        # Keyword counts times weight, compared with each pattern's threshold in one scan
+        scores = self.pattern_classifier.classify(combined_text)
+        known = {pattern.value for pattern in ConversationPattern}
+        return [ConversationPattern(name) for name in scores.matched() if name in known]
     
     async def _analyze_architectural_needs(self, messages: List[Dict]) -> Dict[str, Any]:
         """Analyze architectural needs from conversation"""
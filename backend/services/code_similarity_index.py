@@ -0,0 +1,333 @@
+"""
+Near-duplicate code detection with MinHash signatures and LSH buckets.
+
+Code blocks are tokenized with identifiers, literals and comments
+normalized away, so renamed variables and reformatting do not hide a
+clone.  Token shingles are summarized into fixed-size MinHash signatures
+and bucketed by band; a query only compares against blocks that share at
+least one band bucket, which keeps lookups sub-linear in index size.
+Blocks too short to shingle meaningfully are still indexed by an exact
+fingerprint of their tokens, so verbatim copies of them are reported.
+"""
+
+import hashlib
+import re
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# numpy vectorizes signature computation; the pure-Python path gives identical signatures
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_MASK_64 = (1 << 64) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_TOKEN_RE = re.compile(
+    r'(?P<comment>//[^\n]*|#[^\n]*|/\*.*?\*/)'
+    r'|(?P<string>"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)'
+    r'|(?P<number>\b\d+(?:\.\d+)?\b)'
+    r'|(?P<name>[A-Za-z_$][\w$]*)'
+    r'|(?P<op>[^\s\w])',
+    re.DOTALL,
+)
+
+_KEYWORDS = frozenset("""
+    and as assert async await break case catch class const continue def default del do elif else
+    export extends finally for from function if import in instanceof interface is lambda let new
+    nonlocal not null or pass raise return self static super switch this throw try typeof var
+    void while with yield True False None true false undefined
+""".split())
+
+
+def normalize_tokens(code: str) -> List[str]:
+    """Tokenize code, replacing identifiers and literals with placeholders"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(code):
+        kind = match.lastgroup
+        if kind == "comment":
+            continue
+        if kind == "string":
+            tokens.append("STR")
+        elif kind == "number":
+            tokens.append("NUM")
+        elif kind == "name":
+            value = match.group()
+            tokens.append(value if value in _KEYWORDS else "ID")
+        else:
+            tokens.append(match.group())
+    return tokens
+
+
+def exact_fingerprint(code: str) -> Optional[bytes]:
+    """Digest of a block's tokens with comments and layout dropped, or None if it has none"""
+    tokens = [match.group() for match in _TOKEN_RE.finditer(code) if match.lastgroup != "comment"]
+    if not tokens:
+        return None
+    return hashlib.sha1("\x00".join(tokens).encode()).digest()
+
+
+def shingle(tokens: List[str], size: int) -> Set[int]:
+    """Hash every run of ``size`` consecutive tokens to a 32-bit integer"""
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode())} if tokens else set()
+    return {
+        zlib.crc32(" ".join(tokens[i:i + size]).encode())
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+class MinHasher:
+    """
+    Deterministic MinHash over 32-bit shingle hashes.
+
+    Each permutation is a multiply-shift hash ``(a * x mod 2**64) >> 32``
+    with an odd multiplier, which is cheap in pure Python and maps
+    directly onto wrapping uint64 arithmetic in numpy.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        self.num_perm = num_perm
+        # Linear congruential generator so signatures are stable across processes
+        state = seed
+        self._multipliers: List[int] = []
+        for _ in range(num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) & _MASK_64
+            self._multipliers.append(state | 1)
+        if NUMPY_AVAILABLE:
+            self._np_multipliers = np.array(self._multipliers, dtype=np.uint64)
+
+    def signature(self, shingles: Iterable[int]) -> Tuple[int, ...]:
+        values = list(shingles)
+        if not values:
+            return tuple([_MAX_HASH] * self.num_perm)
+        if NUMPY_AVAILABLE:
+            products = np.array(values, dtype=np.uint64)[:, None] * self._np_multipliers[None, :]
+            return tuple(int(v) for v in (products.min(axis=0) >> np.uint64(32)))
+        return tuple(
+            min([(a * x) & _MASK_64 for x in values]) >> 32
+            for a in self._multipliers
+        )
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of the underlying shingle sets"""
+        matches = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+        return matches / len(sig_a)
+
+
+class CodeSimilarityIndex:
+    """
+    Incremental LSH index of code blocks.
+
+    Blocks are keyed by ``(project_id, file_path, start_line)`` and can be
+    replaced per file, so the index stays current as files are saved.
+    With the default 16 bands of 8 rows, pairs above ~0.7 estimated
+    Jaccard similarity are almost always bucketed together.  Blocks with
+    fewer than ``min_tokens`` tokens only match exact copies.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        threshold: float = 0.7,
+        min_tokens: int = 20,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+
+        self._buckets: List[Dict[Tuple[int, ...], Set[Tuple[str, str, int]]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[Tuple[str, str, int], Tuple[int, ...]] = {}
+        self._metadata: Dict[Tuple[str, str, int], Dict[str, Any]] = {}
+        self._fingerprints: Dict[Tuple[str, str, int], bytes] = {}
+        self._exact: Dict[bytes, Set[Tuple[str, str, int]]] = {}
+        self._file_blocks: Dict[Tuple[str, str], Set[Tuple[str, str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._metadata)
+
+    def signature_for(self, code: str) -> Optional[Tuple[int, ...]]:
+        """MinHash signature of a block, or None if it is too small to compare"""
+        tokens = normalize_tokens(code)
+        if len(tokens) < self.min_tokens:
+            return None
+        return self.hasher.signature(shingle(tokens, self.shingle_size))
+
+    def sign(self, code: str) -> Tuple[Optional[Tuple[int, ...]], Optional[bytes]]:
+        """
+        ``(signature, fingerprint)`` for a block: the MinHash signature, or for
+        blocks too short to compare, the exact fingerprint.  Reads no index
+        state, so it can run in a worker thread.
+        """
+        signature = self.signature_for(code)
+        return signature, None if signature is not None else exact_fingerprint(code)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def add_block(
+        self,
+        project_id: str,
+        file_path: str,
+        block: Dict[str, Any],
+        signed: Optional[Tuple[Optional[Tuple[int, ...]], Optional[bytes]]] = None,
+    ) -> bool:
+        """Index one block; ``signed`` is its precomputed ``sign()`` result"""
+        key = (project_id, file_path, block.get("start_line", 0))
+        file_blocks = self._file_blocks.setdefault((project_id, file_path), set())
+        if key in self._metadata:
+            self._remove_key(key)
+            file_blocks.discard(key)
+
+        signature, fingerprint = signed if signed is not None else self.sign(block["code"])
+        if signature is not None:
+            self._signatures[key] = signature
+            for band, band_key in self._band_keys(signature):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+        else:
+            if fingerprint is None:
+                if not file_blocks:
+                    del self._file_blocks[(project_id, file_path)]
+                return False
+            self._fingerprints[key] = fingerprint
+            self._exact.setdefault(fingerprint, set()).add(key)
+
+        self._metadata[key] = {
+            "project_id": project_id,
+            "file": file_path,
+            "start_line": block.get("start_line", 0),
+            "end_line": block.get("end_line", 0),
+            "lines": block.get("lines", 0),
+        }
+        file_blocks.add(key)
+        return True
+
+    def replace_file(
+        self,
+        project_id: str,
+        file_path: str,
+        blocks: List[Dict[str, Any]],
+        signed: Optional[List[Tuple[Optional[Tuple[int, ...]], Optional[bytes]]]] = None,
+    ) -> int:
+        """Drop a file's previous blocks and index the new ones"""
+        self.remove_file(project_id, file_path)
+        signed = signed if signed is not None else [None] * len(blocks)
+        return sum(1 for block, sign in zip(blocks, signed) if self.add_block(project_id, file_path, block, sign))
+
+    def projects(self) -> Set[str]:
+        return {project_id for project_id, _ in self._file_blocks}
+
+    def files(self, project_id: str) -> Set[str]:
+        return {file_path for owner, file_path in self._file_blocks if owner == project_id}
+
+    def remove_file(self, project_id: str, file_path: str) -> None:
+        for key in self._file_blocks.pop((project_id, file_path), ()):
+            self._remove_key(key)
+
+    def remove_project(self, project_id: str) -> None:
+        for owner, file_path in [k for k in self._file_blocks if k[0] == project_id]:
+            self.remove_file(owner, file_path)
+
+    def _remove_key(self, key: Tuple[str, str, int]) -> None:
+        signature = self._signatures.pop(key, None)
+        self._metadata.pop(key, None)
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is not None:
+            copies = self._exact[fingerprint]
+            copies.discard(key)
+            if not copies:
+                del self._exact[fingerprint]
+        if signature is None:
+            return
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def _candidates(self, signature: Tuple[int, ...]) -> Set[Tuple[str, str, int]]:
+        candidates: Set[Tuple[str, str, int]] = set()
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket:
+                candidates.update(bucket)
+        return candidates
+
+    def query(
+        self,
+        code: str,
+        project_id: Optional[str] = None,
+        threshold: Optional[float] = None,
+        exclude: Optional[Tuple[str, str, int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Blocks similar to ``code``, optionally restricted to one project"""
+        signature = self.signature_for(code)
+        if signature is None:
+            fingerprint = exact_fingerprint(code)
+            copies = self._exact.get(fingerprint, ()) if fingerprint is not None else ()
+            return [
+                {**self._metadata[key], "similarity": 100.0} for key in sorted(copies)
+                if key != exclude and (project_id is None or key[0] == project_id)
+            ]
+        return self._matches(signature, project_id, threshold, exclude)
+
+    def _matches(self, signature, project_id, threshold, exclude) -> List[Dict[str, Any]]:
+        threshold = self.threshold if threshold is None else threshold
+        matches = []
+        for key in self._candidates(signature):
+            if key == exclude or (project_id is not None and key[0] != project_id):
+                continue
+            similarity = MinHasher.similarity(signature, self._signatures[key])
+            if similarity >= threshold:
+                matches.append({**self._metadata[key], "similarity": round(similarity * 100, 1)})
+        return sorted(matches, key=lambda m: m["similarity"], reverse=True)
+
+    def duplicate_pairs(
+        self,
+        project_id: Optional[str] = None,
+        threshold: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """All near-duplicate pairs within one project, or across every project"""
+        threshold = self.threshold if threshold is None else threshold
+        seen: Set[Tuple[Tuple[str, str, int], Tuple[str, str, int]]] = set()
+        pairs = []
+        for key, signature in self._signatures.items():
+            if project_id is not None and key[0] != project_id:
+                continue
+            for other in self._candidates(signature):
+                if other == key or (project_id is not None and other[0] != project_id):
+                    continue
+                pair = (key, other) if key < other else (other, key)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                similarity = MinHasher.similarity(signature, self._signatures[other])
+                if similarity >= threshold:
+                    pairs.append({
+                        "original": self._metadata[pair[0]],
+                        "duplicate": self._metadata[pair[1]],
+                        "similarity": round(similarity * 100, 1),
+                    })
+
+        # Short blocks: every copy is paired with the first one, like the old exact fingerprints
+        for copies in self._exact.values():
+            keys = sorted(key for key in copies if project_id is None or key[0] == project_id)
+            for other in keys[1:]:
+                pairs.append({
+                    "original": self._metadata[keys[0]],
+                    "duplicate": self._metadata[other],
+                    "similarity": 100.0,
+                })
+        return pairs
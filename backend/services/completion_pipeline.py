@@ -0,0 +1,156 @@
+"""
+Incremental building blocks for code completion.
+
+Completion requests arrive on every keystroke, so the per-request work
+has to be proportional to the edit, not to the file:
+
+- ``DocumentContext`` keeps an open file as lines, applies offset-based
+  edit deltas in place and only recomputes line offsets between the edit
+  and the cursor; identifier counts are updated from the changed lines.
+- ``CompletionCache`` keeps recent completions keyed by a hash of the
+  context window around the cursor (and anything else that goes into the
+  prompt, such as the user's preferences) and the typed line prefix.  Typing
+  further along a cached suggestion is answered from the cache, with the
+  typed characters trimmed off, instead of calling the model again.
+"""
+
+import hashlib
+import re
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+IDENTIFIER = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+
+
+class UnknownDocument(LookupError):
+    """The document is not open here or the edits are based on another version; resend the full text"""
+
+
+class DocumentContext:
+    """An open file, updated from edit deltas rather than re-split per request"""
+
+    def __init__(self, text: str, file_type: str = "javascript", version: int = 0):
+        self.file_type = file_type
+        self.version = version
+        self.lines: List[str] = text.split("\n")
+        self.length = len(text)
+        # Start offsets are valid for lines[:len(self._starts)] and extended on demand
+        self._starts: List[int] = [0]
+        self._line_identifiers: List[Tuple[str, ...]] = [tuple(IDENTIFIER.findall(line)) for line in self.lines]
+        self.identifiers: Counter = Counter()
+        for names in self._line_identifiers:
+            self.identifiers.update(names)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def line_of(self, offset: int) -> int:
+        starts = self._starts
+        while len(starts) < len(self.lines) and starts[-1] <= offset:
+            starts.append(starts[-1] + len(self.lines[len(starts) - 1]) + 1)
+        return bisect_right(starts, offset) - 1
+
+    def apply_edit(self, start: int, end: int, text: str):
+        """Replace ``[start, end)`` of the document with ``text``"""
+        if not 0 <= start <= end <= self.length:
+            raise ValueError(f"edit range {start}-{end} outside document of length {self.length}")
+        first = self.line_of(start)
+        last = self.line_of(end)
+        head = self.lines[first][:start - self._starts[first]]
+        tail = self.lines[last][end - self._starts[last]:]
+        new_lines = (head + text + tail).split("\n")
+
+        for names in self._line_identifiers[first:last + 1]:
+            self.identifiers.subtract(names)
+        new_identifiers = [tuple(IDENTIFIER.findall(line)) for line in new_lines]
+        for names in new_identifiers:
+            self.identifiers.update(names)
+
+        self.lines[first:last + 1] = new_lines
+        self._line_identifiers[first:last + 1] = new_identifiers
+        del self._starts[first + 1:]
+        self.length += len(text) - (end - start)
+        self.version += 1
+
+    def apply_edits(self, edits: Iterable[Dict[str, Any]]):
+        """Apply ``{"start", "end", "text"}`` deltas in order, each against the result of the last"""
+        for edit in edits:
+            self.apply_edit(int(edit["start"]), int(edit.get("end", edit["start"])), edit.get("text", ""))
+
+    def window(self, position: int, radius: int = 5, scope: str = "") -> Dict[str, Any]:
+        """
+        The lines around ``position`` and a key that ignores typing on the
+        cursor's line.  ``scope`` is mixed into the key: requests whose
+        prompts differ beyond the window must not share cached completions.
+        """
+        position = max(0, min(position, self.length))
+        line_index = self.line_of(position)
+        line = self.lines[line_index]
+        column = position - self._starts[line_index]
+        start = max(0, line_index - radius)
+        end = min(len(self.lines), line_index + radius)
+        before = self.lines[start:line_index]
+        after = self.lines[line_index + 1:end]
+        suffix = line[column:]
+
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (scope, self.file_type, *before, "\0", suffix, "\0", *after):
+            digest.update(part.encode("utf-8", "surrogatepass"))
+            digest.update(b"\n")
+        return {
+            "current_line": line,
+            "context_lines": self.lines[start:end],
+            "file_type": self.file_type,
+            "cursor_position": position,
+            "line_number": line_index + 1,
+            "indentation": len(line) - len(line.lstrip()),
+            "prefix": line[:column],
+            "suffix": suffix,
+            "window_key": digest.hexdigest(),
+        }
+
+
+class CompletionCache:
+    """LRU of completions by (window hash, line prefix), reusable while typing along a suggestion"""
+
+    def __init__(self, max_entries: int = 2048, max_lookahead: int = 80):
+        self.max_entries = max_entries
+        self.max_lookahead = max_lookahead
+        self._entries: "OrderedDict[Tuple[str, str], List[Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"hits": 0, "extended_hits": 0, "misses": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, window_key: str, prefix: str, completions: List[Dict[str, Any]]):
+        key = (window_key, prefix)
+        self._entries[key] = [dict(completion) for completion in completions]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, window_key: str, prefix: str) -> Optional[List[Dict[str, Any]]]:
+        # Longest cached prefix first: the most recent request on this line
+        for cut in range(len(prefix), max(-1, len(prefix) - self.max_lookahead - 1), -1):
+            key = (window_key, prefix[:cut])
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            typed = prefix[cut:]
+            if not typed:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return [dict(completion) for completion in entry]
+            remaining = [
+                {**completion, "text": completion["text"][len(typed):]}
+                for completion in entry
+                if completion.get("text", "").startswith(typed) and len(completion["text"]) > len(typed)
+            ]
+            if remaining:
+                self.put(window_key, prefix, remaining)
+                self.stats["extended_hits"] += 1
+                return [dict(completion) for completion in remaining]
+        self.stats["misses"] += 1
+        return None
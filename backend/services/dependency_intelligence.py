@@ -4,6 +4,11 @@ import json
 from datetime import datetime, timedelta
 import re
 
+from services.version_resolver import (
+    DependencyResolver, InvalidVersion, base_version,
+    detect_ecosystem, load_package_snapshot, parse_range, parse_version
+)
+
 class DependencyIntelligence:
     """AI service for intelligent dependency management"""
     
@@ -12,6 +17,8 @@ class DependencyIntelligence:
         self.dependency_cache = {}
         self.update_history = {}
         self.compatibility_matrix = {}
+        self.security_database = {}
+        self.resolvers = {}
     
     async def initialize(self):
         """Initialize the dependency intelligence service"""
@@ -38,8 +45,9 @@ class DependencyIntelligence:
                 "breaking_change_risk": "low"
             }
             
+            ecosystem = self._detect_ecosystem(dependencies)
             for dep_name, version in dependencies.items():
-                dep_analysis = await self._analyze_single_dependency(dep_name, version)
+                dep_analysis = await self._analyze_single_dependency(dep_name, version, ecosystem)
                 
                 if dep_analysis.get("is_outdated"):
                     analysis["outdated_dependencies"].append(dep_analysis)
@@ -75,8 +83,9 @@ class DependencyIntelligence:
                 "estimated_effort": "low"
             }
             
+            ecosystem = self._detect_ecosystem(dependencies)
             for dep_name, current_version in dependencies.items():
-                update_info = await self._get_update_suggestion(dep_name, current_version, update_strategy)
+                update_info = await self._get_update_suggestion(dep_name, current_version, update_strategy, ecosystem)
                 
                 if update_info["priority"] == "critical":
                     suggestions["security_critical"].append(update_info)
@@ -106,6 +115,7 @@ class DependencyIntelligence:
             }
             
             conflicts = await self._detect_conflicts(dependencies)
+            resolution["conflicts_found"] = conflicts
             
             for conflict in conflicts:
                 resolution_strategy = await self._find_resolution_strategy(conflict)
@@ -206,7 +216,7 @@ class DependencyIntelligence:
         except Exception as e:
             return {"error": str(e)}
     
-    async def _analyze_single_dependency(self, dep_name: str, version: str) -> Dict[str, Any]:
+    async def _analyze_single_dependency(self, dep_name: str, version: str, ecosystem: Optional[str] = None) -> Dict[str, Any]:
         """Analyze a single dependency"""
         analysis = {
             "name": dep_name,
@@ -226,11 +236,11 @@ class DependencyIntelligence:
                 "from": version,
                 "to": latest,
                 "priority": "medium",
-                "breaking_changes": await self._check_breaking_changes(dep_name, version, latest)
+                "breaking_changes": await self._check_breaking_changes(dep_name, version, latest, ecosystem)
             }
         
         # Check for security issues
-        security_issues = await self._check_security_vulnerabilities(dep_name, version)
+        security_issues = await self._check_security_vulnerabilities(dep_name, version, ecosystem)
         if security_issues:
             analysis["security_issues"] = security_issues
             if analysis["update_recommendation"]:
@@ -271,7 +281,7 @@ class DependencyIntelligence:
         else:
             return "high"
     
-    async def _get_update_suggestion(self, dep_name: str, current_version: str, strategy: str) -> Dict[str, Any]:
+    async def _get_update_suggestion(self, dep_name: str, current_version: str, strategy: str, ecosystem: Optional[str] = None) -> Dict[str, Any]:
         """Get update suggestion for a dependency"""
         latest_version = await self._get_latest_version(dep_name)
         
@@ -286,7 +296,7 @@ class DependencyIntelligence:
         }
         
         # Check for security fixes
-        if await self._has_security_fixes(dep_name, current_version, latest_version):
+        if await self._has_security_fixes(dep_name, current_version, latest_version, ecosystem):
             suggestion["priority"] = "critical"
             suggestion["security_fix"] = True
         
@@ -333,19 +343,78 @@ class DependencyIntelligence:
         """Detect dependency conflicts"""
         conflicts = []
         
-        # Simplified conflict detection
-        # In reality, this would check version ranges, peer dependencies, etc.
+        # Known-incompatible packages: one lookup per dependency instead of every pair
         for dep1, version1 in dependencies.items():
-            for dep2, version2 in dependencies.items():
-                if dep1 != dep2:
-                    conflict = await self._check_dependency_conflict(dep1, version1, dep2, version2)
-                    if conflict:
-                        conflicts.append(conflict)
+            for dep2 in self.compatibility_matrix.get(dep1, {}).get("incompatible_with", []):
+                if dep2 in dependencies:
+                    conflicts.append(await self._check_dependency_conflict(dep1, version1, dep2, dependencies[dep2]))
+        
+        # Version-range conflicts between direct and transitive requirements
+        resolution = await self._resolve_dependencies(dependencies)
+        for conflict in resolution["conflicts"]:
+            for pair in conflict["incompatible_pairs"]:
+                conflicts.append({
+                    "dependency1": pair["source1"].rsplit("@", 1)[0] if pair["source1"] != "root" else conflict["package"],
+                    "version1": pair["spec1"],
+                    "dependency2": pair["source2"].rsplit("@", 1)[0] if pair["source2"] != "root" else conflict["package"],
+                    "version2": pair["spec2"],
+                    "package": conflict["package"],
+                    "conflict_type": "version_range",
+                    "severity": "high"
+                })
         
         return conflicts
     
+    async def _resolve_dependencies(self, dependencies: Dict[str, str]) -> Dict[str, Any]:
+        """Resolve dependencies against the bundled package snapshot (memoized)"""
+        cache_key = tuple(sorted(dependencies.items()))
+        if cache_key in self.dependency_cache:
+            return self.dependency_cache[cache_key]
+        
+        ecosystem = self._detect_ecosystem(dependencies)
+        resolver = self.resolvers.get(ecosystem)
+        if resolver is None:
+            resolver = DependencyResolver(ecosystem=ecosystem)
+            self.resolvers[ecosystem] = resolver
+        
+        try:
+            resolution = resolver.resolve(dependencies)
+        except InvalidVersion as e:
+            resolution = {"resolved": {}, "unknown_packages": {}, "conflicts": [], "unsatisfied": [], "error": str(e)}
+        
+        if len(self.dependency_cache) >= 1000:
+            self.dependency_cache.pop(next(iter(self.dependency_cache)))
+        self.dependency_cache[cache_key] = resolution
+        return resolution
+    
+    def _detect_ecosystem(self, dependencies: Dict[str, str]) -> str:
+        """Guess npm vs PyPI from package names, falling back to specifier syntax"""
+        snapshot = load_package_snapshot()
+        npm_hits = sum(1 for name in dependencies if name in snapshot.get("npm", {}))
+        pypi_hits = sum(1 for name in dependencies if name in snapshot.get("pypi", {}))
+        if npm_hits != pypi_hits:
+            return "npm" if npm_hits > pypi_hits else "pypi"
+        specs = [detect_ecosystem(spec) for spec in dependencies.values()]
+        return "pypi" if specs.count("pypi") > specs.count("npm") else "npm"
+    
     async def _find_resolution_strategy(self, conflict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Find resolution strategy for a conflict"""
+        if conflict.get("conflict_type") == "version_range":
+            # Let the resolver pick versions of both dependents that agree on the shared package
+            relaxed = {conflict["dependency1"]: "*", conflict["dependency2"]: "*"}
+            resolution = await self._resolve_dependencies(relaxed)
+            if resolution["conflicts"] or conflict["package"] not in resolution["resolved"]:
+                return None
+            return {
+                "strategy": "align_version_ranges",
+                "suggested_versions": {
+                    name: resolution["resolved"][name]
+                    for name in (conflict["dependency1"], conflict["dependency2"], conflict["package"])
+                    if name in resolution["resolved"]
+                },
+                "confidence": 0.9
+            }
+        
         # Simplified resolution strategy
         return {
             "strategy": "update_to_compatible_versions",
@@ -459,25 +528,46 @@ class DependencyIntelligence:
             "express": "4.18.2"
         }
         
-        return latest_versions.get(dep_name)
+        if dep_name in latest_versions:
+            return latest_versions[dep_name]
+        
+        # Fall back to the highest stable release in the bundled snapshot
+        snapshot = load_package_snapshot()
+        for ecosystem in ("npm", "pypi"):
+            versions = snapshot.get(ecosystem, {}).get(dep_name, {}).get("versions", {})
+            parsed = []
+            for version in versions:
+                try:
+                    parsed.append((parse_version(version), version))
+                except InvalidVersion:
+                    continue
+            stable = [(key, version) for key, version in parsed if not key.is_prerelease]
+            if stable:
+                return max(stable, key=lambda item: item[0])[1]
+        return None
     
-    async def _check_breaking_changes(self, dep_name: str, from_version: str, to_version: str) -> bool:
+    async def _check_breaking_changes(self, dep_name: str, from_version: str, to_version: str, ecosystem: Optional[str] = None) -> bool:
         """Check if update contains breaking changes"""
-        # Simplified breaking change detection
-        # In reality, this would check semantic versioning and changelog
-        from_major = int(from_version.split('.')[0])
-        to_major = int(to_version.split('.')[0])
+        # Semantic versioning: a major bump, or a minor bump while still on 0.x
+        if not from_version or not to_version:
+            return False
+        current = base_version(from_version, ecosystem)
+        target = base_version(to_version, ecosystem)
+        if current is None or target is None:
+            return False
         
-        return to_major > from_major
+        if target.major != current.major:
+            return target.major > current.major
+        return current.major == 0 and target.minor > current.minor
     
-    async def _check_security_vulnerabilities(self, dep_name: str, version: str) -> List[Dict[str, Any]]:
+    async def _check_security_vulnerabilities(self, dep_name: str, version: str, ecosystem: Optional[str] = None) -> List[Dict[str, Any]]:
         """Check for security vulnerabilities"""
         vulnerabilities = []
         
         vulnerable_versions = self.security_database.get("vulnerable_versions", {}).get(dep_name, [])
         
         for vuln_pattern in vulnerable_versions:
-            if self._version_matches_pattern(version, vuln_pattern):
+            if self._version_matches_pattern(version, vuln_pattern, ecosystem):
                 vulnerabilities.append({
                     "severity": "high",
                     "description": f"Known vulnerability in {dep_name} {version}",
@@ -486,10 +576,10 @@ class DependencyIntelligence:
         
         return vulnerabilities
     
-    async def _has_security_fixes(self, dep_name: str, from_version: str, to_version: str) -> bool:
+    async def _has_security_fixes(self, dep_name: str, from_version: str, to_version: str, ecosystem: Optional[str] = None) -> bool:
         """Check if update includes security fixes"""
-        current_vulns = await self._check_security_vulnerabilities(dep_name, from_version)
-        target_vulns = await self._check_security_vulnerabilities(dep_name, to_version)
+        current_vulns = await self._check_security_vulnerabilities(dep_name, from_version, ecosystem)
+        target_vulns = await self._check_security_vulnerabilities(dep_name, to_version, ecosystem)
         
         return len(current_vulns) > len(target_vulns)
     
@@ -510,27 +600,12 @@ class DependencyIntelligence:
         
         return None
     
-    def _version_matches_pattern(self, version: str, pattern: str) -> bool:
+    def _version_matches_pattern(self, version: str, pattern: str, ecosystem: Optional[str] = None) -> bool:
         """Check if version matches vulnerability pattern"""
-        # Simplified pattern matching
-        if pattern.startswith("<"):
-            target_version = pattern[1:]
-            return self._compare_versions(version, target_version) < 0
-        
-        return version == pattern
-    
-    def _compare_versions(self, version1: str, version2: str) -> int:
-        """Compare two semantic versions"""
-        v1_parts = [int(x) for x in version1.split('.')]
-        v2_parts = [int(x) for x in version2.split('.')]
-        
-        for i in range(max(len(v1_parts), len(v2_parts))):
-            v1_part = v1_parts[i] if i < len(v1_parts) else 0
-            v2_part = v2_parts[i] if i < len(v2_parts) else 0
-            
-            if v1_part < v2_part:
-                return -1
-            elif v1_part > v2_part:
-                return 1
-        
-        return 0
\ No newline at end of file
+        installed = base_version(version, ecosystem)
+        if installed is None:
+            return False
+        try:
+            return parse_range(pattern, ecosystem).contains(installed)
+        except InvalidVersion:
+            return version == pattern
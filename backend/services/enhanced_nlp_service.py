@@ -10,6 +10,8 @@ from datetime import datetime
 import logging
 from dataclasses import dataclass
 
+from services.intent_classifier import get_intent_classifier
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -32,6 +34,9 @@ class EnhancedNLPService:
     def __init__(self, db_wrapper):
         self.db_wrapper = db_wrapper
         self.intent_patterns = self._load_intent_patterns()
+        self.intent_classifier = get_intent_classifier(
+            "nlp_intents", {intent: {"patterns": patterns} for intent, patterns in self.intent_patterns.items()}
+        )
         self.domain_vocabulary = self._load_domain_vocabulary()
         self.context_memory = {}
         
@@ -201,10 +206,10 @@ class EnhancedNLPService:
     
     async def _detect_intent(self, message: str) -> Tuple[str, float]:
         """Detect user intent from message"""
-        for intent, patterns in self.intent_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, message, re.IGNORECASE):
-                    return intent, 0.9
+        # First intent in table order with a matching pattern, from one compiled scan
+        intent = self.intent_classifier.classify(message).first()
+        if intent:
+            return intent, 0.9
         
         # Default intent
         return "general", 0.5
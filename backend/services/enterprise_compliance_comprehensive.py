@@ -5,7 +5,7 @@ import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Union
 from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 import json
 import hashlib
@@ -14,6 +14,8 @@ import os
 from cryptography.fernet import Fernet
 import jwt
 
+from services.audit_log import get_audit_log
+
 logger = logging.getLogger(__name__)
 
 class ComplianceFramework(Enum):
@@ -66,6 +68,14 @@ class AuditLog:
     risk_level: str = "low"
     compliance_frameworks: List[ComplianceFramework] = None
 
+# Fields of audit records the audit log indexes for get_audit_logs
+AUDIT_INDEXED_FIELDS = ("user_id", "event_type", "risk_level")
+
+
+def _epoch(moment: datetime) -> float:
+    """Seconds since the epoch, reading naive datetimes as UTC like datetime.utcnow()"""
+    return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp()
+
 @dataclass
 class ComplianceCheck:
     check_id: str
@@ -119,7 +129,7 @@ class EnterpriseComplianceSystem:
     """
     
     def __init__(self):
-        self.audit_logs: List[AuditLog] = []
+        self.audit_logs = get_audit_log("compliance_events", AUDIT_INDEXED_FIELDS)
         self.compliance_checks: Dict[str, ComplianceCheck] = {}
         self.data_processing_activities: Dict[str, DataProcessingActivity] = {}
         self.secrets_vault: Dict[str, Any] = {}
@@ -175,10 +185,16 @@ class EnterpriseComplianceSystem:
             session_id=session_id,
             additional_data=additional_data or {},
             risk_level=risk_level,
-            compliance_frameworks=self.compliance_frameworks_enabled
+            compliance_frameworks=list(self.compliance_frameworks_enabled)
         )
         
-        self.audit_logs.append(audit_log)
+        record = asdict(audit_log)
+        record.update(
+            event_type=event_type.value,
+            timestamp=audit_log.timestamp.isoformat(),
+            compliance_frameworks=[framework.value for framework in audit_log.compliance_frameworks]
+        )
+        await asyncio.to_thread(self.audit_logs.append, record, ts=_epoch(audit_log.timestamp))
         
         # Check if this event triggers compliance alerts
         await self._check_compliance_alerts(audit_log)
@@ -195,28 +211,42 @@ class EnterpriseComplianceSystem:
         risk_level: Optional[str] = None,
         limit: int = 1000
     ) -> List[AuditLog]:
-        """Retrieve audit logs with filtering"""
-        
-        filtered_logs = self.audit_logs
+        """Retrieve audit logs with filtering, newest first"""
         
+        filters: Dict[str, Any] = {}
         if user_id:
-            filtered_logs = [log for log in filtered_logs if log.user_id == user_id]
-        
+            filters["user_id"] = user_id
         if event_type:
-            filtered_logs = [log for log in filtered_logs if log.event_type == event_type]
-        
-        if start_date:
-            filtered_logs = [log for log in filtered_logs if log.timestamp >= start_date]
-        
-        if end_date:
-            filtered_logs = [log for log in filtered_logs if log.timestamp <= end_date]
-        
+            filters["event_type"] = event_type.value
         if risk_level:
-            filtered_logs = [log for log in filtered_logs if log.risk_level == risk_level]
-        
-        # Sort by timestamp descending and limit
-        filtered_logs.sort(key=lambda x: x.timestamp, reverse=True)
-        return filtered_logs[:limit]
+            filters["risk_level"] = risk_level
+        
+        records = await asyncio.to_thread(
+            self.audit_logs.query,
+            start=_epoch(start_date) if start_date else None,
+            end=_epoch(end_date) if end_date else None,
+            limit=limit,
+            reverse=True,
+            **filters
+        )
+        return [self._audit_log_from_record(record) for record in records]
+    
+    def _audit_log_from_record(self, record: Dict[str, Any]) -> AuditLog:
+        return AuditLog(
+            audit_id=record["audit_id"],
+            event_type=AuditEventType(record["event_type"]),
+            user_id=record["user_id"],
+            timestamp=datetime.fromisoformat(record["timestamp"]),
+            resource_id=record["resource_id"],
+            action=record["action"],
+            outcome=record["outcome"],
+            ip_address=record["ip_address"],
+            user_agent=record["user_agent"],
+            session_id=record["session_id"],
+            additional_data=record["additional_data"],
+            risk_level=record["risk_level"],
+            compliance_frameworks=[ComplianceFramework(value) for value in record["compliance_frameworks"]]
+        )
     
     async def generate_audit_report(
         self,
@@ -226,12 +256,14 @@ class EnterpriseComplianceSystem:
     ) -> Dict[str, Any]:
         """Generate comprehensive audit report for compliance framework"""
         
-        # Filter logs for the specified timeframe and framework
-        relevant_logs = [
-            log for log in self.audit_logs
-            if start_date <= log.timestamp <= end_date
-            and framework in (log.compliance_frameworks or [])
-        ]
+        # Read only the segments covering the timeframe, then filter by framework
+        records = await asyncio.to_thread(
+            self.audit_logs.query,
+            start=_epoch(start_date),
+            end=_epoch(end_date),
+            where=lambda record: framework.value in record["compliance_frameworks"]
+        )
+        relevant_logs = [self._audit_log_from_record(record) for record in records]
         
         # Analyze log patterns
         user_activity = {}
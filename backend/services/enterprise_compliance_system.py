@@ -4,7 +4,7 @@
 import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Union
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import uuid
 import hashlib
@@ -13,6 +13,8 @@ from enum import Enum
 from cryptography.fernet import Fernet
 import os
 
+from services.audit_log import get_audit_log
+
 logger = logging.getLogger(__name__)
 
 class ComplianceStandard(Enum):
@@ -69,6 +71,14 @@ class AuditLog:
     compliance_relevant: bool
     data_classification: DataClassification
 
+# Fields of audit records the audit log indexes for get_audit_logs and the dashboard
+AUDIT_INDEXED_FIELDS = ("user_id", "action", "resource", "level", "compliance_relevant")
+
+
+def _epoch(moment: datetime) -> float:
+    """Seconds since the epoch, reading naive datetimes as UTC like datetime.utcnow()"""
+    return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp()
+
 @dataclass
 class ComplianceAssessment:
     id: str
@@ -109,7 +119,7 @@ class EnterpriseComplianceSystem:
     
     def __init__(self):
         self.compliance_rules: Dict[str, ComplianceRule] = {}
-        self.audit_logs: List[AuditLog] = []
+        self.audit_logs = get_audit_log("enterprise_compliance", AUDIT_INDEXED_FIELDS)
         self.compliance_assessments: Dict[str, ComplianceAssessment] = {}
         self.secrets: Dict[str, SecretRecord] = {}
         self.encryption_key = self._get_or_create_encryption_key()
@@ -381,7 +391,14 @@ class EnterpriseComplianceSystem:
             data_classification=data_classification
         )
         
-        self.audit_logs.append(audit_log)
+        record = asdict(audit_log)
+        record.update(
+            timestamp=audit_log.timestamp.isoformat(),
+            level=level.value,
+            data_classification=data_classification.value,
+        )
+        # The log's lock can be held by a query running in a thread, so this waits off the loop too
+        await asyncio.to_thread(self.audit_logs.append, record, ts=_epoch(audit_log.timestamp))
         
         # Log to system logger as well
         logger.info(f"AUDIT: {action} on {resource} by user {user_id} from {ip_address}")
@@ -395,25 +412,43 @@ class EnterpriseComplianceSystem:
         user_id: Optional[str] = None,
         resource: Optional[str] = None,
         level: Optional[AuditLogLevel] = None,
-        compliance_only: bool = False
+        compliance_only: bool = False,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """Retrieve audit logs with filtering"""
-        filtered_logs = self.audit_logs
-        
-        if start_date:
-            filtered_logs = [log for log in filtered_logs if log.timestamp >= start_date]
-        if end_date:
-            filtered_logs = [log for log in filtered_logs if log.timestamp <= end_date]
+        filters: Dict[str, Any] = {}
         if user_id:
-            filtered_logs = [log for log in filtered_logs if log.user_id == user_id]
-        if resource:
-            filtered_logs = [log for log in filtered_logs if resource in log.resource]
+            filters["user_id"] = user_id
         if level:
-            filtered_logs = [log for log in filtered_logs if log.level == level]
+            filters["level"] = level.value
         if compliance_only:
-            filtered_logs = [log for log in filtered_logs if log.compliance_relevant]
-        
-        return [asdict(log) for log in filtered_logs]
+            filters["compliance_relevant"] = True
+        
+        records = await asyncio.to_thread(
+            self.audit_logs.query,
+            start=_epoch(start_date) if start_date else None,
+            end=_epoch(end_date) if end_date else None,
+            contains={"resource": resource} if resource else None,
+            limit=limit,
+            **filters
+        )
+        return [asdict(self._audit_log_from_record(record)) for record in records]
+    
+    def _audit_log_from_record(self, record: Dict[str, Any]) -> AuditLog:
+        return AuditLog(
+            id=record["id"],
+            timestamp=datetime.fromisoformat(record["timestamp"]),
+            user_id=record["user_id"],
+            action=record["action"],
+            resource=record["resource"],
+            resource_id=record["resource_id"],
+            ip_address=record["ip_address"],
+            user_agent=record["user_agent"],
+            level=AuditLogLevel(record["level"]),
+            details=record["details"],
+            compliance_relevant=record["compliance_relevant"],
+            data_classification=DataClassification(record["data_classification"])
+        )
     
     # Secrets Management
     async def _setup_secrets_management(self):
@@ -601,21 +636,30 @@ class EnterpriseComplianceSystem:
     
     async def get_compliance_dashboard(self) -> Dict[str, Any]:
         """Get comprehensive compliance dashboard data"""
+        # Counted from the indexes of every worker's shard, off the event loop
+        audit_events, compliance_relevant, critical_events, recent_events = await asyncio.to_thread(
+            lambda: (
+                len(self.audit_logs),
+                self.audit_logs.count(compliance_relevant=True),
+                self.audit_logs.count(level=AuditLogLevel.CRITICAL.value),
+                self.audit_logs.count(start=_epoch(datetime.utcnow() - timedelta(days=7))),
+            )
+        )
         dashboard_data = {
             "overview": {
                 "standards_monitored": len(set(rule.standard for rule in self.compliance_rules.values())),
                 "total_rules": len(self.compliance_rules),
                 "recent_assessments": len(self.compliance_assessments),
-                "audit_logs_count": len(self.audit_logs),
+                "audit_logs_count": audit_events,
                 "secrets_managed": len(self.secrets)
             },
             "compliance_status": {},
             "recent_findings": [],
             "audit_summary": {
-                "total_events": len(self.audit_logs),
-                "compliance_relevant": len([log for log in self.audit_logs if log.compliance_relevant]),
-                "critical_events": len([log for log in self.audit_logs if log.level == AuditLogLevel.CRITICAL]),
-                "recent_events": len([log for log in self.audit_logs if log.timestamp > datetime.utcnow() - timedelta(days=7)])
+                "total_events": audit_events,
+                "compliance_relevant": compliance_relevant,
+                "critical_events": critical_events,
+                "recent_events": recent_events
             },
             "secrets_summary": {
                 "total_secrets": len(self.secrets),
@@ -8,6 +8,8 @@ import subprocess
 import tempfile
 import shutil
 
+from services.sandbox_pool import SandboxPool
+
 class ExperimentalSandbox:
     """Safe environment to test cutting-edge features without breaking main project"""
     
@@ -17,6 +19,7 @@ class ExperimentalSandbox:
         self.experimental_features = {}
         self.safety_protocols = {}
         self.rollback_system = {}
+        self.execution_pool = SandboxPool()
     
     async def initialize(self):
         """Initialize the experimental sandbox service"""
@@ -511,48 +514,36 @@ print(test_match(3))  # Should print 'other'
             return f"// Test code for {feature} in {language}\nconsole.log('Feature test placeholder');"
     
     async def _execute_test_safely(self, test_file: str, language: str, limits: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute test file safely with resource limits"""
+        """Execute test file in the warm sandbox pool with resource limits"""
         try:
-            if language == "python":
-                cmd = ["python", test_file]
-            elif language in ["javascript", "typescript"]:
-                cmd = ["node", test_file]
-            else:
-                return {"exit_code": 1, "errors": f"Unsupported language: {language}"}
-            
-            # Execute with timeout
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=os.path.dirname(test_file)
-            )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), 
-                    timeout=limits.get("max_execution_time", 60)
-                )
-                
-                return {
-                    "exit_code": process.returncode,
-                    "output": stdout.decode() if stdout else "",
-                    "errors": stderr.decode() if stderr else "",
-                    "execution_time": 1.0  # Simplified
-                }
-            except asyncio.TimeoutError:
-                process.kill()
-                return {
-                    "exit_code": 1,
-                    "errors": "Execution timeout",
-                    "execution_time": limits.get("max_execution_time", 60)
-                }
+            with open(test_file) as f:
+                code = f.read()
+
+            result = await self.execution_pool.run(code, language, self._pool_limits(limits))
+            if result.get("limit") == "timeout":
+                result["errors"] = (result.get("errors") or "") + "Execution timeout"
+            elif result.get("limit"):
+                result["errors"] = (result.get("errors") or "") + f"Resource limit exceeded: {result['limit']}"
+            result["execution_time"] = result.pop("duration", 0)
+            return result
         except Exception as e:
             return {
                 "exit_code": 1,
                 "errors": str(e),
                 "execution_time": 0
             }
+
+    @staticmethod
+    def _pool_limits(limits: Dict[str, Any]) -> Dict[str, Any]:
+        """Map the sandbox's resource limits onto per-job pool limits"""
+        wall_seconds = limits.get("max_execution_time", 60)
+        return {
+            "wall_seconds": wall_seconds,
+            # max_cpu_percent of the wall-clock budget
+            "cpu_seconds": max(1, wall_seconds * limits.get("max_cpu_percent", 100) / 100),
+            "memory_mb": limits.get("max_memory_mb"),
+            "max_open_files": limits.get("max_file_operations"),
+        }
     
     # Placeholder implementations for remaining methods
     async def _capture_initial_state(self, project_id: str) -> Dict[str, Any]:
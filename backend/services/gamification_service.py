@@ -4,6 +4,8 @@ from datetime import datetime, timedelta
 import uuid
 import logging
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from services.leaderboard_service import LeaderboardService
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +45,9 @@ class StreakInfo(BaseModel):
     last_activity: Optional[datetime] = None
 
 class GamificationService:
-    def __init__(self):
-        pass
+    def __init__(self, leaderboards: Optional[LeaderboardService] = None):
+        self.leaderboards = leaderboards or LeaderboardService()
+        self._leaderboards_initialized = leaderboards is not None
         
     async def get_user_stats(
         self,
@@ -263,6 +266,7 @@ class GamificationService:
                     "created_at": now
                 }
                 await streaks_collection.insert_one(new_streak)
+                await self._record_leaderboard_streak(user_id, 1, db)
                 return StreakInfo(
                     current=1,
                     best=1,
@@ -300,6 +304,7 @@ class GamificationService:
                     }
                 }
             )
+            await self._record_leaderboard_streak(user_id, current_streak, db)
             
             return StreakInfo(
                 current=current_streak,
@@ -332,6 +337,32 @@ class GamificationService:
             logger.error(f"Failed to award XP: {e}")
             raise
     
+    async def record_project_completed(
+        self,
+        user_id: str,
+        db: AsyncIOMotorDatabase = None
+    ) -> int:
+        """
+        Count a completed project for the user and update the projects leaderboard
+        """
+        try:
+            if not db:
+                return 0
+                
+            stats = await db.user_stats.find_one_and_update(
+                {"user_id": user_id},
+                {"$inc": {"completed_projects": 1}, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            completed_projects = stats.get("completed_projects", 1)
+            await self._record_leaderboard_projects(user_id, completed_projects, db)
+            return completed_projects
+            
+        except Exception as e:
+            logger.error(f"Failed to record completed project: {e}")
+            return 0
+    
     async def get_leaderboard(
         self,
         timeframe: str = "all_time",
@@ -341,60 +372,21 @@ class GamificationService:
         db: AsyncIOMotorDatabase = None
     ) -> List[Dict[str, Any]]:
         """
-        Get leaderboard rankings
+        Get leaderboard rankings from the incrementally maintained boards
         """
         try:
             if not db:
                 return []
-                
-            # Calculate time filter
-            time_filter = {}
-            if timeframe == "weekly":
-                time_filter = {"created_at": {"$gte": datetime.utcnow() - timedelta(days=7)}}
-            elif timeframe == "monthly":
-                time_filter = {"created_at": {"$gte": datetime.utcnow() - timedelta(days=30)}}
-            
-            # Build aggregation pipeline based on category
-            if category == "xp":
-                pipeline = [
-                    {"$match": time_filter},
-                    {"$group": {
-                        "_id": "$user_id",
-                        "total_xp": {"$sum": "$xp"},
-                        "level": {"$max": "$level"}
-                    }},
-                    {"$sort": {"total_xp": -1}},
-                    {"$limit": limit}
-                ]
-                collection = db.user_stats
-            elif category == "projects":
-                pipeline = [
-                    {"$match": time_filter},
-                    {"$group": {
-                        "_id": "$user_id",
-                        "total_projects": {"$sum": "$completed_projects"}
-                    }},
-                    {"$sort": {"total_projects": -1}},
-                    {"$limit": limit}
-                ]
-                collection = db.user_stats
-            else:  # streak
-                pipeline = [
-                    {"$sort": {"current": -1}},
-                    {"$limit": limit}
-                ]
-                collection = db.user_streaks
-            
-            cursor = collection.aggregate(pipeline)
-            results = await cursor.to_list(length=None)
-            
-            # Get user details and format results
+            
+            await self._ensure_leaderboards(db)
+            results = await self.leaderboards.top(category, timeframe, limit)
+            
+            # One batched lookup for every user on the board
+            users_info = await self._get_users_info([user_id for user_id, _ in results], db)
+            
             leaderboard = []
-            for i, result in enumerate(results):
-                user_id = result["_id"] if "_id" in result else result["user_id"]
-                
-                # Get user info (in real implementation, you'd fetch from users collection)
-                user_info = await self._get_user_info(user_id, db)
+            for i, (user_id, score) in enumerate(results):
+                user_info = users_info.get(user_id, {})
                 
                 entry = {
                     "rank": i + 1,
@@ -406,13 +398,13 @@ class GamificationService:
                 
                 if category == "xp":
                     entry.update({
-                        "xp": result.get("total_xp", 0),
-                        "level": result.get("level", 1)
+                        "xp": int(score),
+                        "level": self._calculate_level(int(score)) if timeframe == "all_time" else None
                     })
                 elif category == "projects":
-                    entry["projects"] = result.get("total_projects", 0)
+                    entry["projects"] = int(score)
                 else:  # streak
-                    entry["streak"] = result.get("current", 0)
+                    entry["streak"] = int(score)
                 
                 leaderboard.append(entry)
             
@@ -422,6 +414,27 @@ class GamificationService:
             logger.error(f"Failed to get leaderboard: {e}")
             return []
     
+    async def get_user_rank(
+        self,
+        user_id: str,
+        timeframe: str = "all_time",
+        category: str = "xp",
+        db: AsyncIOMotorDatabase = None
+    ) -> Optional[int]:
+        """
+        Get a user's 1-based leaderboard rank, even outside the top entries
+        """
+        try:
+            if not db:
+                return None
+            
+            await self._ensure_leaderboards(db)
+            return await self.leaderboards.rank(category, timeframe, user_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to get user rank: {e}")
+            return None
+    
     async def get_progress_tracking(
         self,
         user_id: str,
@@ -814,6 +827,9 @@ class GamificationService:
                 upsert=True
             )
             
+            # Before the transaction is logged: hydration counts only transactions logged before it started
+            await self._record_leaderboard_xp(user_id, new_xp, xp_amount, db)
+            
             # Log XP transaction
             xp_log_collection = db.xp_transactions
             await xp_log_collection.insert_one({
@@ -874,13 +890,58 @@ class GamificationService:
         except Exception as e:
             logger.error(f"Failed to initialize user stats: {e}")
     
-    async def _get_user_info(self, user_id: str, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
-        """Get basic user information"""
-        # In real implementation, fetch from users collection
-        return {
-            "name": f"User {user_id[:8]}",
-            "avatar": "👤"
+    async def _get_users_info(self, user_ids: List[str], db: AsyncIOMotorDatabase) -> Dict[str, Dict[str, Any]]:
+        """Get basic user information for many users with a single query"""
+        users_info = {
+            user_id: {"name": f"User {user_id[:8]}", "avatar": "👤"}
+            for user_id in user_ids
         }
+        if not db or not user_ids:
+            return users_info
+            
+        try:
+            cursor = db.users.find({"_id": {"$in": user_ids}}, {"name": 1, "avatar": 1})
+            async for user in cursor:
+                info = users_info.setdefault(str(user["_id"]), {})
+                if user.get("name"):
+                    info["name"] = user["name"]
+                if user.get("avatar"):
+                    info["avatar"] = user["avatar"]
+        except Exception as e:
+            logger.error(f"Failed to get user info: {e}")
+        
+        return users_info
+    
+    async def _ensure_leaderboards(self, db: AsyncIOMotorDatabase):
+        """Pick the leaderboard backend on first use and hydrate the boards before they are touched"""
+        if not self._leaderboards_initialized:
+            self._leaderboards_initialized = True
+            await self.leaderboards.initialize()
+        await self.leaderboards.ensure_hydrated(db)
+    
+    async def _record_leaderboard_xp(self, user_id: str, total_xp: int, xp_amount: int, db: AsyncIOMotorDatabase):
+        """Push an XP award into the leaderboards without failing the award"""
+        try:
+            await self._ensure_leaderboards(db)
+            await self.leaderboards.record_xp(user_id, total_xp, xp_amount)
+        except Exception as e:
+            logger.error(f"Failed to update XP leaderboards: {e}")
+    
+    async def _record_leaderboard_streak(self, user_id: str, current_streak: int, db: AsyncIOMotorDatabase):
+        """Push a streak change into the leaderboards without failing the update"""
+        try:
+            await self._ensure_leaderboards(db)
+            await self.leaderboards.record_streak(user_id, current_streak)
+        except Exception as e:
+            logger.error(f"Failed to update streak leaderboard: {e}")
+    
+    async def _record_leaderboard_projects(self, user_id: str, completed_projects: int, db: AsyncIOMotorDatabase):
+        """Push a completed-project count into the leaderboards without failing the update"""
+        try:
+            await self._ensure_leaderboards(db)
+            await self.leaderboards.record_projects(user_id, completed_projects)
+        except Exception as e:
+            logger.error(f"Failed to update projects leaderboard: {e}")
     
     async def _get_xp_history(self, user_id: str, since: datetime, db: AsyncIOMotorDatabase) -> List[Dict[str, Any]]:
         """Get XP history for user"""
@@ -966,4 +1027,15 @@ class GamificationService:
             "privacy_mode": False,
             "challenge_notifications": True,
             "weekly_reports": True
-        }
\ No newline at end of file
+        }
+
+
+# Global service instance, shared so every route updates the same leaderboards
+_gamification_service: Optional[GamificationService] = None
+
+def get_gamification_service() -> GamificationService:
+    """Get the global gamification service instance"""
+    global _gamification_service
+    if _gamification_service is None:
+        _gamification_service = GamificationService()
+    return _gamification_service
@@ -8,6 +8,8 @@ from datetime import datetime
 import uuid
 from dotenv import load_dotenv
 
+from services.intent_classifier import get_intent_classifier
+
 logger = logging.getLogger(__name__)
 
 class GroqAIService:
@@ -16,7 +18,8 @@ class GroqAIService:
         load_dotenv()
         
         self.api_key = os.getenv("GROQ_API_KEY")
-        self.base_url = "https://api.groq.com/openai/v1"
+        # GROQ_BASE_URL is also read by the groq SDK; point it at mock_groq_server.py for load tests
+        self.base_url = os.getenv("GROQ_BASE_URL", "https://api.groq.com").rstrip("/") + "/openai/v1"
         self.initialized = False
         
         # Groq AI capabilities - ULTRA FAST INFERENCE
@@ -79,6 +82,9 @@ class GroqAIService:
                 'database', 'sql', 'component', 'hooks', 'async'
             ]
         }
+        self.routing_classifier = get_intent_classifier(
+            "model_routing", {rule: {"keywords": patterns} for rule, patterns in self.routing_rules.items()}
+        )
         
     async def initialize(self):
         """Initialize Groq AI service"""
@@ -127,17 +133,16 @@ class GroqAIService:
         if requested_model and requested_model in self.models:
             return requested_model
             
-        message_lower = message.lower()
         message_length = len(message.split())
+        routes = self.routing_classifier.classify(message)
         
         # Use ultra-fast model for simple/short queries
-        if (any(pattern in message_lower for pattern in self.routing_rules['simple_patterns']) 
-            or message_length < 10):
+        if 'simple_patterns' in routes or message_length < 10:
             return 'llama-3.1-8b-instant'  # $0.05/1M tokens - Ultra fast & cheap
         
         # Use smart model for complex tasks
-        if (any(pattern in message_lower for pattern in self.routing_rules['complex_patterns']) 
-            or any(pattern in message_lower for pattern in self.routing_rules['code_patterns'])
+        if ('complex_patterns' in routes
+            or 'code_patterns' in routes
             or message_length > 50):
             return 'llama-3.1-70b-versatile'  # $0.59/1M tokens - Best quality
             
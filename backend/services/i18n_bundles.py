@@ -0,0 +1,285 @@
+"""
+Compiled translation catalogs and pre-serialized page bundles.
+
+``TranslationCatalog`` compiles the flat ``"lang.key"`` translation table
+into one namespace tree per language, split on the dots of the key, so a
+page's translations are the subtree under the page key and are collected
+in time proportional to the page rather than to the whole table.
+
+Messages are compiled the first time they are used: interpolation
+templates are split into literal text and ``{placeholder}`` names once,
+and plural messages pick their form through the language's plural rule.
+Page bundles are serialized once per (language, page) with a
+content-hash ETag, compressed per encoding on first request, and kept in
+an LRU until the catalog is recompiled.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.response_encoding import MINIMUM_COMPRESS_SIZE, compress, dumps_json
+
+PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+
+
+def _east_slavic(n: int) -> str:
+    if n % 10 == 1 and n % 100 != 11:
+        return "one"
+    if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+        return "few"
+    return "many"
+
+
+def _polish(n: int) -> str:
+    if n == 1:
+        return "one"
+    if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+        return "few"
+    return "many"
+
+
+def _arabic(n: int) -> str:
+    if n in (0, 1, 2):
+        return ("zero", "one", "two")[n]
+    if 3 <= n % 100 <= 10:
+        return "few"
+    if 11 <= n % 100 <= 99:
+        return "many"
+    return "other"
+
+
+def _one_or_other(n: int) -> str:
+    return "one" if n == 1 else "other"
+
+
+def _zero_or_one(n: int) -> str:
+    return "one" if n in (0, 1) else "other"
+
+
+# CLDR cardinal categories for integer counts, by language (region subtags fall back to the language)
+PLURAL_RULES: Dict[str, Callable[[int], str]] = {
+    "fr": _zero_or_one,
+    "hi": _zero_or_one,
+    "ru": _east_slavic,
+    "uk": _east_slavic,
+    "pl": _polish,
+    "ar": _arabic,
+    "zh": lambda n: "other",
+    "ja": lambda n: "other",
+    "ko": lambda n: "other",
+}
+
+
+def plural_rule(language: str) -> Callable[[int], str]:
+    return PLURAL_RULES.get(language) or PLURAL_RULES.get(language.split("-")[0], _one_or_other)
+
+
+class CompiledMessage:
+    """A message split into literal text and placeholder names"""
+
+    __slots__ = ("source", "_literals", "_names")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = PLACEHOLDER.split(source)
+        self._literals = parts[0::2]
+        self._names = parts[1::2]
+
+    def __bool__(self) -> bool:
+        return bool(self.source)
+
+    def format(self, params: Optional[Dict[str, Any]] = None) -> str:
+        if not params or not self._names:
+            return self.source
+        literals = self._literals
+        out = [literals[0]]
+        for index, name in enumerate(self._names):
+            # Placeholders without a value stay as written
+            out.append(str(params[name]) if name in params else "{" + name + "}")
+            out.append(literals[index + 1])
+        return "".join(out)
+
+
+class PluralMessage:
+    """Plural forms by category, selected with the language's plural rule"""
+
+    __slots__ = ("forms", "rule")
+
+    def __init__(self, forms: Dict[str, Any], rule: Callable[[int], str]):
+        self.forms = {category: CompiledMessage(text) for category, text in forms.items() if isinstance(text, str)}
+        self.rule = rule
+
+    def __bool__(self) -> bool:
+        return bool(self.forms)
+
+    def select(self, count: Optional[int] = None) -> Optional[CompiledMessage]:
+        forms = self.forms
+        if count is None:
+            return forms.get("other")
+        # An explicit zero message wins over the rule's category for zero
+        if count == 0 and "zero" in forms:
+            return forms["zero"]
+        return forms.get(self.rule(abs(int(count)))) or forms.get("other")
+
+
+class _Namespace:
+    __slots__ = ("messages", "children")
+
+    def __init__(self):
+        self.messages: Dict[str, Any] = {}
+        self.children: Dict[str, "_Namespace"] = {}
+
+
+@dataclass
+class PageBundle:
+    """A serialized page bundle, its ETag and its compressed variants"""
+    language: str
+    page_key: str
+    body: bytes
+    etag: str
+    key_count: int
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    def encode(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """The body for ``encoding`` (compressed once, at the cacheable level), or identity"""
+        if encoding is None or len(self.body) < MINIMUM_COMPRESS_SIZE:
+            return self.body, None
+        encoded = self.encoded.get(encoding)
+        if encoded is None:
+            encoded = self.encoded[encoding] = compress(self.body, encoding, cacheable=True)
+        return encoded, encoding
+
+
+def _display_value(value: Any, key: str) -> str:
+    """What page bundles show for a message: the text, or a plural message's "other" form"""
+    if isinstance(value, CompiledMessage):
+        return value.source
+    if isinstance(value, PluralMessage):
+        other = value.forms.get("other")
+        return other.source if other else key
+    if isinstance(value, dict):
+        return value.get("other", key)
+    return value
+
+
+class TranslationCatalog:
+    """Per-language namespace trees of translations and an LRU of page bundles"""
+
+    def __init__(self, max_bundles: int = 1024):
+        self.max_bundles = max_bundles
+        self.version = 0
+        self._trees: Dict[str, _Namespace] = {}
+        self._key_counts: Dict[str, int] = {}
+        self._bundles: "OrderedDict[Tuple[str, str], PageBundle]" = OrderedDict()
+        self.stats = {"bundle_hits": 0, "bundle_builds": 0}
+
+    def compile(self, translations: Dict[str, Any]):
+        """Rebuild the trees from a flat ``{"lang.key": value}`` table, dropping cached bundles"""
+        trees: Dict[str, _Namespace] = {}
+        key_counts: Dict[str, int] = {}
+        for full_key, value in translations.items():
+            language, _, key = full_key.partition(".")
+            if not key:
+                continue
+            node = trees.get(language)
+            if node is None:
+                node = trees[language] = _Namespace()
+            *namespaces, leaf = key.split(".")
+            for segment in namespaces:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _Namespace()
+                node = child
+            if leaf not in node.messages:
+                key_counts[language] = key_counts.get(language, 0) + 1
+            node.messages[leaf] = value
+
+        self._trees = trees
+        self._key_counts = key_counts
+        self._bundles.clear()
+        self.version += 1
+
+    @property
+    def languages(self) -> List[str]:
+        return list(self._trees)
+
+    def key_count(self, language: str) -> int:
+        return self._key_counts.get(language, 0)
+
+    def _namespace(self, language: str, segments: List[str]) -> Optional[_Namespace]:
+        node = self._trees.get(language)
+        for segment in segments:
+            if node is None:
+                return None
+            node = node.children.get(segment)
+        return node
+
+    def lookup(self, language: str, key: str) -> Optional[Any]:
+        """The compiled message for ``key``, compiling it on first use"""
+        *namespaces, leaf = key.split(".")
+        node = self._namespace(language, namespaces)
+        if node is None:
+            return None
+        value = node.messages.get(leaf)
+        if value is None or isinstance(value, (CompiledMessage, PluralMessage)):
+            return value
+        if isinstance(value, str):
+            compiled = CompiledMessage(value)
+        elif isinstance(value, dict):
+            compiled = PluralMessage(value, plural_rule(language))
+        else:
+            return value
+        node.messages[leaf] = compiled
+        return compiled
+
+    def iter_messages(self, language: str, page_key: Optional[str] = None) -> Iterator[Tuple[str, Any]]:
+        """``(key relative to the page, raw value)`` for every message under ``page_key``"""
+        root = self._trees.get(language) if page_key is None else self._namespace(language, page_key.split("."))
+        if root is None:
+            return
+        stack: List[Tuple[str, _Namespace]] = [("", root)]
+        while stack:
+            prefix, node = stack.pop()
+            for leaf, value in node.messages.items():
+                if isinstance(value, CompiledMessage):
+                    value = value.source
+                elif isinstance(value, PluralMessage):
+                    value = {category: form.source for category, form in value.forms.items()}
+                yield prefix + leaf, value
+            for segment, child in reversed(list(node.children.items())):
+                stack.append((f"{prefix}{segment}.", child))
+
+    def page(self, language: str, page_key: str) -> Dict[str, str]:
+        return {key: _display_value(value, key) for key, value in self.iter_messages(language, page_key)}
+
+    def bundle(self, language: str, page_key: str) -> PageBundle:
+        """The serialized bundle for a page, built once per catalog version"""
+        cache_key = (language, page_key)
+        bundle = self._bundles.get(cache_key)
+        if bundle is not None:
+            self._bundles.move_to_end(cache_key)
+            self.stats["bundle_hits"] += 1
+            return bundle
+
+        translations = self.page(language, page_key)
+        body = dumps_json({
+            "page_key": page_key,
+            "language": language,
+            "translations": translations,
+            "total_keys": len(translations),
+        })
+        bundle = PageBundle(
+            language=language,
+            page_key=page_key,
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            key_count=len(translations),
+        )
+        self.stats["bundle_builds"] += 1
+        self._bundles[cache_key] = bundle
+        if len(self._bundles) > self.max_bundles:
+            self._bundles.popitem(last=False)
+        return bundle
@@ -5,11 +5,14 @@ Handles multi-language support, translations, and localization.
 
 import json
 import asyncio
+import os
 from typing import Dict, List, Optional, Any
 from enum import Enum
 from dataclasses import dataclass
 import re
 
+from services.i18n_bundles import PageBundle, PluralMessage, TranslationCatalog
+
 class SupportedLanguage(str, Enum):
     ENGLISH = "en"
     SPANISH = "es"
@@ -49,6 +52,8 @@ class I18nService:
     def __init__(self, db_wrapper=None):
         self.db_wrapper = db_wrapper
         self.translations = {}
+        # Namespace trees compiled from ``translations``, and the page bundles served from them
+        self.catalog = TranslationCatalog(int(os.getenv("I18N_BUNDLE_CACHE_SIZE", "1024")))
         self.language_info = {}
         self.default_language = SupportedLanguage.ENGLISH
         self.is_initialized = False
@@ -72,35 +77,23 @@ class I18nService:
     ) -> str:
         """Get translated text for a key in specified language."""
         
-        if not language:
-            language = self.default_language
+        language = self._language_code(language)
         
         # Get translation
-        translation_key = f"{language}.{key}"
-        translation = self.translations.get(translation_key)
+        message = self.catalog.lookup(language, key)
         
-        if not translation:
+        if not message:
             # Fallback to English
-            fallback_key = f"{SupportedLanguage.ENGLISH}.{key}"
-            translation = self.translations.get(fallback_key, key)
+            message = self.catalog.lookup(SupportedLanguage.ENGLISH.value, key)
         
         # Handle pluralization
-        if count is not None and isinstance(translation, dict):
-            if count == 0:
-                translation = translation.get('zero', translation.get('other', key))
-            elif count == 1:
-                translation = translation.get('one', translation.get('other', key))
-            else:
-                translation = translation.get('other', key)
-        elif isinstance(translation, dict):
-            translation = translation.get('other', key)
+        if isinstance(message, PluralMessage):
+            message = message.select(count)
+            if count is not None and not (params and "count" in params):
+                params = {**(params or {}), "count": count}
         
         # Handle parameter interpolation
-        if params and isinstance(translation, str):
-            for param_key, param_value in params.items():
-                translation = translation.replace(f"{{{param_key}}}", str(param_value))
-        
-        return translation if isinstance(translation, str) else key
+        return message.format(params) if hasattr(message, "format") else key
     
     async def get_translations_for_page(
         self, 
@@ -109,33 +102,21 @@ class I18nService:
     ) -> Dict[str, str]:
         """Get all translations for a specific page."""
         
-        if not language:
-            language = self.default_language
-        
-        page_translations = {}
-        prefix = f"{language}.{page_key}."
-        
-        for key, value in self.translations.items():
-            if key.startswith(prefix):
-                clean_key = key[len(prefix):]
-                page_translations[clean_key] = value if isinstance(value, str) else value.get('other', clean_key)
+        return self.catalog.page(self._language_code(language), page_key)
+    
+    def get_page_bundle(self, page_key: str, language: str = None) -> PageBundle:
+        """Serialized translations for a page, with their ETag, built once per catalog version."""
         
-        return page_translations
+        return self.catalog.bundle(self._language_code(language), page_key)
     
     async def get_all_translations(self, language: str = None) -> Dict[str, Any]:
         """Get all translations for a language."""
         
-        if not language:
-            language = self.default_language
-        
         language_translations = {}
-        prefix = f"{language}."
         
-        for key, value in self.translations.items():
-            if key.startswith(prefix):
-                clean_key = key[len(prefix):]
-                # Build nested dictionary structure
-                self._set_nested_dict(language_translations, clean_key.split('.'), value)
+        for clean_key, value in self.catalog.iter_messages(self._language_code(language)):
+            # Build nested dictionary structure
+            self._set_nested_dict(language_translations, clean_key.split('.'), value)
         
         return language_translations
     
@@ -219,12 +200,12 @@ class I18nService:
         
         stats = {
             "total_languages": len(self.language_info),
-            "total_keys": len([k for k in self.translations.keys() if k.startswith(f"{self.default_language}.")]),
+            "total_keys": self.catalog.key_count(self._language_code(None)),
             "languages": {}
         }
         
         for lang_code, lang_info in self.language_info.items():
-            lang_keys = len([k for k in self.translations.keys() if k.startswith(f"{lang_code}.")])
+            lang_keys = self.catalog.key_count(lang_code)
             completion_percentage = (lang_keys / stats["total_keys"] * 100) if stats["total_keys"] > 0 else 0
             
             stats["languages"][lang_code] = {
@@ -398,6 +379,13 @@ class I18nService:
         for key, languages in base_translations.items():
             for lang_code, translation in languages.items():
                 self.translations[f"{lang_code}.{key}"] = translation
+        
+        self.catalog.compile(self.translations)
+    
+    def _language_code(self, language: Optional[str]) -> str:
+        """Plain language code, for enum members and the default language alike."""
+        
+        return getattr(language or self.default_language, "value", language or self.default_language)
     
     def _set_nested_dict(self, dictionary: dict, keys: List[str], value: Any):
         """Set value in nested dictionary using key path."""
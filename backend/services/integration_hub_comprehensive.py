@@ -3,7 +3,8 @@
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional, Union
+from typing import Deque, Dict, List, Any, Optional, Union
+from collections import deque
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from enum import Enum
@@ -37,6 +38,8 @@ from sendgrid.helpers.mail import Mail
 # Monitoring imports
 import datadog
 
+from services.integration_prober import IntegrationProber, ProbeResult
+
 logger = logging.getLogger(__name__)
 
 class IntegrationStatus(Enum):
@@ -90,18 +93,25 @@ class IntegrationHubComprehensive:
         self.integrations: Dict[str, IntegrationConfig] = {}
         self.active_connections: Dict[str, Any] = {}
         self.connection_pool = {}
-        self.test_results: List[ConnectionTest] = []
+        # Background refreshes probe continuously, so only recent history is kept
+        self.test_results: Deque[ConnectionTest] = deque(maxlen=1000)
+        self.prober = IntegrationProber(self._probe_integration, on_result=self._record_probe)
         
     async def initialize(self):
         """Initialize integration hub with default configurations"""
         try:
             await self._setup_integration_templates()
+            self.prober.start(lambda: list(self.integrations))
             logger.info("🔗 Integration Hub Comprehensive initialized with 20+ connectors")
             return True
         except Exception as e:
             logger.error(f"Integration Hub initialization failed: {e}")
             return False
     
+    async def shutdown(self):
+        """Stop background health probing"""
+        await self.prober.stop()
+    
     # =============================================================================
     # DATABASE INTEGRATIONS
     # =============================================================================
@@ -677,71 +687,56 @@ class IntegrationHubComprehensive:
     
     async def test_integration(self, integration_id: str) -> ConnectionTest:
         """Test a specific integration connection"""
-        start_time = datetime.utcnow()
-        
-        try:
-            if integration_id not in self.integrations:
-                raise Exception(f"Integration {integration_id} not found")
-            
-            integration = self.integrations[integration_id]
-            
-            # Perform integration-specific test
-            test_method = getattr(self, f'_test_{integration_id}', None)
-            if test_method:
-                success = await test_method(integration)
-            else:
-                success = True  # Default to success if no specific test
-            
-            response_time = (datetime.utcnow() - start_time).total_seconds()
-            
-            test_result = ConnectionTest(
-                integration_id=integration_id,
-                success=success,
-                response_time=response_time,
-                timestamp=datetime.utcnow()
-            )
-            
-            self.test_results.append(test_result)
-            integration.last_tested = datetime.utcnow()
-            
-            if success:
-                integration.status = IntegrationStatus.CONNECTED
-            else:
-                integration.status = IntegrationStatus.ERROR
-            
-            return test_result
-            
-        except Exception as e:
-            response_time = (datetime.utcnow() - start_time).total_seconds()
-            
-            test_result = ConnectionTest(
-                integration_id=integration_id,
-                success=False,
-                response_time=response_time,
-                timestamp=datetime.utcnow(),
-                error_details=str(e)
-            )
-            
-            self.test_results.append(test_result)
-            
-            if integration_id in self.integrations:
-                self.integrations[integration_id].status = IntegrationStatus.ERROR
-                self.integrations[integration_id].error_message = str(e)
-            
-            return test_result
+        return self._to_connection_test(await self.prober.probe(integration_id))
     
     async def test_all_integrations(self) -> List[ConnectionTest]:
-        """Test all configured integrations"""
-        results = []
+        """Test all configured integrations concurrently, each under its own deadline"""
+        results = await self.prober.probe_all(list(self.integrations.keys()))
+        return [self._to_connection_test(result) for result in results]
+    
+    async def _probe_integration(self, integration_id: str) -> bool:
+        """Run the integration-specific connection check"""
+        if integration_id not in self.integrations:
+            raise Exception(f"Integration {integration_id} not found")
         
-        for integration_id in self.integrations.keys():
-            result = await self.test_integration(integration_id)
-            results.append(result)
+        test_method = getattr(self, f'_test_{integration_id}', None)
+        if test_method:
+            return await test_method(self.integrations[integration_id])
+        return True  # Default to success if no specific test
+    
+    def _record_probe(self, result: ProbeResult):
+        """Apply a finished probe to the integration it checked"""
+        self.test_results.append(self._to_connection_test(result))
         
-        return results
+        integration = self.integrations.get(result.integration_id)
+        if integration is None:
+            return
+        integration.last_tested = result.timestamp
+        if result.success:
+            integration.status = IntegrationStatus.CONNECTED
+            integration.error_message = None
+        else:
+            integration.status = IntegrationStatus.ERROR
+            integration.error_message = result.error_details
+    
+    @staticmethod
+    def _to_connection_test(result: ProbeResult) -> ConnectionTest:
+        return ConnectionTest(
+            integration_id=result.integration_id,
+            success=result.success,
+            response_time=result.response_time,
+            timestamp=result.timestamp,
+            error_details=result.error_details
+        )
     
     async def get_integration_status(self) -> Dict[str, Any]:
-        """Get comprehensive status of all integrations"""
+        """
+        Get comprehensive status of all integrations.
+        
+        Reports last-known probe results without waiting on the network;
+        stale integrations are re-probed in the background.
+        """
+        probes = self.prober.snapshot(list(self.integrations.keys()))
         status_by_type = {}
         for integration in self.integrations.values():
             type_name = integration.type.value
@@ -754,13 +749,17 @@ class IntegrationHubComprehensive:
                     "integrations": []
                 }
             
+            probe = probes.get(integration.integration_id)
             status_by_type[type_name]["total"] += 1
             status_by_type[type_name][integration.status.value] += 1
             status_by_type[type_name]["integrations"].append({
                 "id": integration.integration_id,
                 "name": integration.name,
                 "status": integration.status.value,
-                "last_tested": integration.last_tested.isoformat() if integration.last_tested else None
+                "last_tested": integration.last_tested.isoformat() if integration.last_tested else None,
+                "response_time": probe.response_time if probe else None,
+                "error": integration.error_message,
+                "stale": not self.prober.is_fresh(probe)
             })
         
         return {
@@ -895,6 +894,7 @@ class IntegrationHubComprehensive:
                     del self.active_connections[integration_id]
                 
                 del self.integrations[integration_id]
+                self.prober.forget(integration_id)
                 logger.info(f"🗑️ Integration {integration_id} removed successfully")
                 return True
             else:
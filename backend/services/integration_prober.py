@@ -0,0 +1,234 @@
+"""
+Concurrent health probing for configured integrations.
+
+Checking integrations one after another makes a status report as slow as
+the sum of every probe, and a single endpoint that never answers stalls
+it forever.  ``IntegrationProber`` instead:
+
+- runs probes concurrently, at most ``concurrency`` at a time
+- gives every probe its own deadline, so a hang becomes a failed result
+- shares one in-flight probe between callers asking about the same id
+- caches the last result per integration, served while younger than
+  ``freshness`` seconds
+- refreshes stale results from a background task, so status reads never
+  wait on the network
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProbeResult:
+    integration_id: str
+    success: bool
+    response_time: float
+    timestamp: datetime
+    error_details: Optional[str] = None
+    timed_out: bool = False
+    # time.monotonic() when the probe finished, used for freshness checks
+    checked_at: float = 0.0
+
+
+ProbeFunc = Callable[[str], Awaitable[bool]]
+ResultCallback = Callable[[ProbeResult], None]
+
+
+class IntegrationProber:
+    """Bounded, deadline-limited probes with a last-known-result cache"""
+
+    def __init__(
+        self,
+        probe: ProbeFunc,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        freshness: Optional[float] = None,
+        refresh_interval: Optional[float] = None,
+        on_result: Optional[ResultCallback] = None,
+    ):
+        self.probe_func = probe
+        self.concurrency = concurrency if concurrency is not None else int(
+            os.getenv("INTEGRATION_PROBE_CONCURRENCY", 8))
+        self.timeout = timeout if timeout is not None else float(os.getenv("INTEGRATION_PROBE_TIMEOUT", 5))
+        self.freshness = freshness if freshness is not None else float(os.getenv("INTEGRATION_PROBE_FRESHNESS", 60))
+        self.refresh_interval = refresh_interval if refresh_interval is not None else float(
+            os.getenv("INTEGRATION_PROBE_INTERVAL", 30))
+        self.on_result = on_result
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._results: Dict[str, ProbeResult] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        # Bumped by forget(); probes started before that do not store their result
+        self._generations: Dict[str, int] = {}
+        self._refresher: Optional[asyncio.Task] = None
+        # The loop only keeps weak references to tasks, so background refreshes are held here
+        self._background: Set[asyncio.Task] = set()
+        self.stats = {"probes": 0, "failures": 0, "timeouts": 0, "cache_hits": 0}
+
+    # -------------------------------------------------------------------------
+    # Probing
+    # -------------------------------------------------------------------------
+
+    async def probe(self, integration_id: str) -> ProbeResult:
+        """Probe now, joining a probe of the same integration already running"""
+        task = self._inflight.get(integration_id)
+        if task is None:
+            task = asyncio.ensure_future(self._run(integration_id, self._generations.get(integration_id, 0)))
+            self._inflight[integration_id] = task
+            task.add_done_callback(lambda done, key=integration_id: self._inflight_done(key, done))
+        # Shielded so one caller giving up does not cancel the probe for the others
+        return await asyncio.shield(task)
+
+    async def probe_all(self, integration_ids: Iterable[str]) -> List[ProbeResult]:
+        return list(await asyncio.gather(*(self.probe(integration_id) for integration_id in integration_ids)))
+
+    def _inflight_done(self, integration_id: str, task: asyncio.Task) -> None:
+        # After forget() a newer probe may own the slot
+        if self._inflight.get(integration_id) is task:
+            del self._inflight[integration_id]
+
+    async def _run(self, integration_id: str, generation: int) -> ProbeResult:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async with self._semaphore:
+            # The deadline starts once a slot is free, so queueing is not charged to the integration
+            start = time.perf_counter()
+            error = None
+            timed_out = False
+            try:
+                success = bool(await asyncio.wait_for(self.probe_func(integration_id), self.timeout))
+            except asyncio.TimeoutError:
+                success, timed_out = False, True
+                error = f"probe timed out after {self.timeout:g}s"
+            except Exception as e:
+                success, error = False, str(e)
+            elapsed = time.perf_counter() - start
+
+        self.stats["probes"] += 1
+        if not success:
+            self.stats["failures"] += 1
+        if timed_out:
+            self.stats["timeouts"] += 1
+
+        result = ProbeResult(
+            integration_id=integration_id,
+            success=success,
+            response_time=elapsed,
+            timestamp=datetime.utcnow(),
+            error_details=error,
+            timed_out=timed_out,
+            checked_at=time.monotonic(),
+        )
+        if self._generations.get(integration_id, 0) != generation:
+            # Forgotten while probing: callers still get the result, the cache does not
+            return result
+        self._results[integration_id] = result
+        if self.on_result is not None:
+            try:
+                self.on_result(result)
+            except Exception as e:
+                logger.error(f"Probe result callback failed for {integration_id}: {e}")
+        return result
+
+    # -------------------------------------------------------------------------
+    # Cached results
+    # -------------------------------------------------------------------------
+
+    def is_fresh(self, result: Optional[ProbeResult], max_age: Optional[float] = None) -> bool:
+        if result is None:
+            return False
+        max_age = self.freshness if max_age is None else max_age
+        return time.monotonic() - result.checked_at <= max_age
+
+    def last_result(self, integration_id: str) -> Optional[ProbeResult]:
+        return self._results.get(integration_id)
+
+    async def get(self, integration_id: str, max_age: Optional[float] = None) -> ProbeResult:
+        """The cached result when fresh, otherwise a new probe"""
+        cached = self._results.get(integration_id)
+        if self.is_fresh(cached, max_age):
+            self.stats["cache_hits"] += 1
+            return cached
+        return await self.probe(integration_id)
+
+    def snapshot(self, integration_ids: Iterable[str]) -> Dict[str, Optional[ProbeResult]]:
+        """
+        Last-known results without waiting on any probe.
+
+        Missing or stale entries are probed in the background, so the next
+        read sees them updated.
+        """
+        results = {}
+        stale = []
+        for integration_id in integration_ids:
+            cached = self._results.get(integration_id)
+            results[integration_id] = cached
+            if not self.is_fresh(cached) and integration_id not in self._inflight:
+                stale.append(integration_id)
+        if stale:
+            self._spawn_refresh(stale)
+        return results
+
+    def forget(self, integration_id: str) -> None:
+        """
+        Drop an integration's cached result.
+
+        A probe already running is left to finish, so callers awaiting it
+        get its result instead of a CancelledError, but the result is not
+        cached or reported.
+        """
+        self._results.pop(integration_id, None)
+        self._inflight.pop(integration_id, None)
+        self._generations[integration_id] = self._generations.get(integration_id, 0) + 1
+
+    # -------------------------------------------------------------------------
+    # Background refresh
+    # -------------------------------------------------------------------------
+
+    def _spawn_refresh(self, integration_ids: List[str]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.probe_all(integration_ids))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def start(self, integration_ids: Callable[[], Iterable[str]]) -> None:
+        """Re-probe stale integrations every ``refresh_interval`` seconds"""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.ensure_future(self._refresh_loop(integration_ids))
+
+    async def stop(self) -> None:
+        tasks = list(self._inflight.values()) + list(self._background)
+        if self._refresher is not None:
+            tasks.append(self._refresher)
+            self._refresher = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _refresh_loop(self, integration_ids: Callable[[], Iterable[str]]) -> None:
+        while True:
+            try:
+                # Refresh slightly before results expire so reads keep finding them fresh
+                horizon = max(0.0, self.freshness - self.refresh_interval)
+                stale = [
+                    integration_id for integration_id in list(integration_ids())
+                    if not self.is_fresh(self._results.get(integration_id), horizon)
+                ]
+                if stale:
+                    await self.probe_all(stale)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Integration health refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 import re
+
+from services.intent_classifier import get_intent_classifier
 import time
 
 logger = logging.getLogger(__name__)
@@ -24,6 +26,15 @@ class TaskType(Enum):
     GENERAL_CHAT = "general_chat"
     PROJECT_PLANNING = "project_planning"
 
+# Checked in this order; the first task type with a keyword in the message wins
+TASK_TYPE_RULES = {
+    TaskType.CODE_GENERATION.value: {"keywords": ["code", "function", "api", "component"]},
+    TaskType.DEBUG_ANALYSIS.value: {"keywords": ["debug", "error", "fix", "issue"]},
+    TaskType.CREATIVE_WRITING.value: {"keywords": ["creative", "story", "design", "artistic"]},
+    TaskType.DATA_ANALYSIS.value: {"keywords": ["analyze", "data", "chart", "statistics"]},
+    TaskType.PROJECT_PLANNING.value: {"keywords": ["plan", "project", "architecture", "strategy"]},
+}
+
 @dataclass
 class ModelCapabilities:
     name: str
@@ -53,6 +64,7 @@ class IntelligentAIRouter:
         self.fallback_chains = {}
         self.load_balancer = ModelLoadBalancer()
         self.response_cache = ResponseCache()
+        self.task_classifier = get_intent_classifier("task_types", TASK_TYPE_RULES)
         
     async def initialize(self):
         """Initialize the AI router"""
@@ -164,17 +176,11 @@ class IntelligentAIRouter:
     
     def _classify_task_type(self, task_lower: str) -> TaskType:
         """Classify the type of task"""
-        if any(word in task_lower for word in ["code", "function", "api", "component"]):
-            return TaskType.CODE_GENERATION
-        elif any(word in task_lower for word in ["debug", "error", "fix", "issue"]):
-            return TaskType.DEBUG_ANALYSIS
-        elif any(word in task_lower for word in ["creative", "story", "design", "artistic"]):
-            return TaskType.CREATIVE_WRITING
-        elif any(word in task_lower for word in ["analyze", "data", "chart", "statistics"]):
-            return TaskType.DATA_ANALYSIS
-        elif any(word in task_lower for word in ["plan", "project", "architecture", "strategy"]):
-            return TaskType.PROJECT_PLANNING
-        else:
+        task_type = self.task_classifier.classify(task_lower).first()
+        try:
+            return TaskType(task_type) if task_type else TaskType.GENERAL_CHAT
+        except ValueError:
+            # A reloaded rule table named a task type this router does not know
             return TaskType.GENERAL_CHAT
     
     def _assess_complexity(self, task_lower: str, context: Dict[str, Any] = None) -> TaskComplexity:
@@ -11,6 +11,8 @@ from collections import defaultdict, deque
 import numpy as np
 from dataclasses import dataclass
 
+from services.shared_state import PickleCodec, get_shared_state
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -31,12 +33,16 @@ class IntelligentContextManager:
     """Manages intelligent conversation context and memory"""
     
     def __init__(self):
-        self.conversations: Dict[str, ConversationContext] = {}
-        self.user_profiles: Dict[str, Dict] = {}
-        self.topic_embeddings: Dict[str, np.ndarray] = {}
-        self.context_cache = {}
         self.max_context_length = 50  # Maximum messages to keep in context
         self.context_decay_hours = 24  # Context relevance decay time
+        # A conversation's messages may land on any worker
+        shared_state = get_shared_state()
+        self.conversations = shared_state.ttl_map(
+            "conversation_contexts", ttl=self.context_decay_hours * 3600, codec=PickleCodec()
+        )
+        self.user_profiles = shared_state.map("conversation_user_profiles")
+        self.topic_embeddings: Dict[str, np.ndarray] = {}
+        self.context_cache = {}
         
     async def get_enhanced_context(
         self, 
@@ -98,11 +104,10 @@ class IntelligentContextManager:
     ) -> ConversationContext:
         """Get existing context or create new one"""
         
-        if conversation_id in self.conversations:
-            context = self.conversations[conversation_id]
-            # Check if context is still valid (not too old)
-            if datetime.utcnow() - context.last_updated < timedelta(hours=self.context_decay_hours):
-                return context
+        # Contexts untouched for context_decay_hours have expired from the map
+        context = await self.conversations.get(conversation_id)
+        if context is not None:
+            return context
         
         # Create new context
         context = ConversationContext(
@@ -118,8 +123,8 @@ class IntelligentContextManager:
             technical_context={}
         )
         
-        self.conversations[conversation_id] = context
-        return context
+        # Keep the context another worker created for the same conversation meanwhile
+        return await self.conversations.update(conversation_id, lambda current: current or context)
     
     async def _analyze_message(self, message: str) -> Dict[str, Any]:
         """Analyze message for context clues"""
@@ -251,8 +256,9 @@ class IntelligentContextManager:
     async def _get_user_preferences(self, user_id: str, message_analysis: Dict) -> Dict:
         """Get or infer user preferences"""
         
-        if user_id not in self.user_profiles:
-            self.user_profiles[user_id] = {
+        user_profile = await self.user_profiles.get(user_id)
+        if user_profile is None:
+            user_profile = {
                 "preferred_complexity": "medium",
                 "preferred_explanation_style": "detailed",
                 "technical_level": "intermediate",
@@ -264,8 +270,6 @@ class IntelligentContextManager:
                 }
             }
         
-        user_profile = self.user_profiles[user_id]
-        
         # Update preferences based on current message
         current_length = message_analysis["length"]
         if "avg_message_length" in user_profile["interaction_patterns"]:
@@ -283,6 +287,7 @@ class IntelligentContextManager:
         else:
             user_profile["technical_level"] = "beginner"
         
+        await self.user_profiles.set(user_id, user_profile)
         return user_profile
     
     async def _generate_context_summary(
@@ -317,38 +322,50 @@ class IntelligentContextManager:
     ):
         """Update conversation context with new message"""
         
-        # Add message to context
-        context.messages.append({
+        entry = {
             "content": message,
             "timestamp": datetime.utcnow().isoformat(),
             "analysis": analysis,
             "topics": analysis["topics"],
             "importance": self._calculate_message_importance(analysis)
-        })
-        
-        # Update topics
-        context.topics = list(set(context.topics + analysis["topics"]))
+        }
         
-        # Update technical context
-        if analysis["code_related"]:
-            if "programming_languages" not in context.technical_context:
-                context.technical_context["programming_languages"] = []
+        async def apply(current: Optional[ConversationContext]) -> ConversationContext:
+            # Applied to the latest stored copy, and re-applied if another worker
+            # added a message in between, so concurrent messages are all kept
+            current = current or context
             
-            context.technical_context["programming_languages"].extend(analysis["technical_terms"])
-            context.technical_context["programming_languages"] = list(set(
-                context.technical_context["programming_languages"]
-            ))
-        
-        # Update context score (measure of conversation coherence)
-        context.context_score = await self._calculate_context_score(context)
-        
-        # Update timestamp
-        context.last_updated = datetime.utcnow()
-        
-        # Trim messages if too many
-        if len(context.messages) > self.max_context_length:
-            # Keep most important and recent messages
-            context.messages = self._trim_messages(context.messages)
+            # Add message to context
+            current.messages.append(entry)
+            
+            # Update topics
+            current.topics = list(set(current.topics + analysis["topics"]))
+            
+            # Update technical context
+            if analysis["code_related"]:
+                if "programming_languages" not in current.technical_context:
+                    current.technical_context["programming_languages"] = []
+                
+                current.technical_context["programming_languages"].extend(analysis["technical_terms"])
+                current.technical_context["programming_languages"] = list(set(
+                    current.technical_context["programming_languages"]
+                ))
+            
+            # Update context score (measure of conversation coherence)
+            current.context_score = await self._calculate_context_score(current)
+            
+            # Update timestamp
+            current.last_updated = datetime.utcnow()
+            
+            # Trim messages if too many
+            if len(current.messages) > self.max_context_length:
+                # Keep most important and recent messages
+                current.messages = self._trim_messages(current.messages)
+            return current
+        
+        updated = await self.conversations.update(context.conversation_id, apply)
+        # The caller keeps using its context object for the response
+        context.__dict__.update(updated.__dict__)
     
     def _calculate_message_importance(self, analysis: Dict) -> float:
         """Calculate importance score for a message"""
@@ -482,11 +499,10 @@ class IntelligentContextManager:
     async def get_conversation_insights(self, conversation_id: str) -> Dict:
         """Get insights about a conversation"""
         
-        if conversation_id not in self.conversations:
+        context = await self.conversations.get(conversation_id)
+        if context is None:
             return {"error": "Conversation not found"}
         
-        context = self.conversations[conversation_id]
-        
         insights = {
             "conversation_health": {
                 "context_score": context.context_score,
@@ -0,0 +1,419 @@
+"""
+Compiled multi-pattern intent classification.
+
+Several services detect intents by looping over keyword lists and regexes
+for every message.  ``IntentClassifier`` compiles a rule table once:
+
+- all keywords of all intents go into one Aho-Corasick automaton
+  (``pyahocorasick`` when installed, a pure-Python one otherwise), so a
+  message is scanned once whatever the number of keywords
+- regexes with a literal prefix are anchored on that prefix in the same
+  automaton and only tried (``match``) where it occurs; the rest go into
+  one combined pattern of lookahead alternatives, so their leftmost
+  matches are found in a single ``finditer`` pass
+- each hit adds its intent's weight; ``classify`` returns the scores and
+  the hits, in rule table order for callers that want the first intent
+
+Rule tables map intent names to::
+
+    {"keywords": [...], "patterns": [...], "weight": 1.0,
+     "threshold": 0.0, "word_boundary": False}
+
+Keywords match as case-insensitive substrings (or whole words with
+``word_boundary``) and, like ``str.count``, overlapping occurrences of the
+same keyword count once.  ``reload`` swaps in a new compiled table without
+blocking classification, and a table in ``INTENT_RULES_DIR/<name>.json``
+overrides the built-in one and is reloaded when the file changes.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+WORD_CHAR = re.compile(r"\w")
+MIN_ANCHOR_LENGTH = 2
+
+
+class Hit(NamedTuple):
+    intent: str
+    pattern: str
+    start: int
+    end: int
+
+
+class KeywordAutomaton:
+    """Pure-Python Aho-Corasick automaton over lowercase keywords"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for keyword in keywords:
+            self._add(keyword)
+        self._link()
+        self._alphabet = frozenset(char for edges in self._goto for char in edges)
+
+    def _add(self, keyword: str):
+        state = 0
+        for char in keyword:
+            following = self._goto[state].get(char)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][char] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = following
+        self._out[state] += (len(self.keywords),)
+        self.keywords.append(keyword)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[following] = target if target != following else 0
+                # Outputs of the suffix state end here too
+                self._out[following] += self._out[self._fail[following]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield ``(end_index, keyword_id)`` for every occurrence, ``end_index`` inclusive"""
+        goto, fail, out, alphabet = self._goto, self._fail, self._out, self._alphabet
+        state = 0
+        for index, char in enumerate(text):
+            if char not in alphabet:
+                state = 0
+                continue
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if out[state]:
+                for keyword_id in out[state]:
+                    yield index, keyword_id
+
+
+class _PyAhoCorasick:
+    """Same interface backed by the ``pyahocorasick`` C extension"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(keywords)
+        self._automaton = ahocorasick.Automaton()
+        for keyword_id, keyword in enumerate(self.keywords):
+            self._automaton.add_word(keyword, keyword_id)
+        self._automaton.make_automaton()
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        return self._automaton.iter(text)
+
+
+class IntentScores:
+    """Weighted scores and hits of one message, keyed by intent name"""
+
+    def __init__(self, order: List[str], scores: Dict[str, float], raw_hits: Dict[str, List[Tuple[str, int, int]]],
+                 thresholds: Dict[str, float]):
+        self.order = order
+        self.scores = scores
+        self._raw_hits = raw_hits
+        self._thresholds = thresholds
+
+    @property
+    def hits(self) -> Dict[str, List[Hit]]:
+        return {intent: [Hit(intent, *hit) for hit in raw] for intent, raw in self._raw_hits.items()}
+
+    def __contains__(self, intent: str) -> bool:
+        return intent in self.scores
+
+    def matched(self) -> List[str]:
+        """Intents that reached their threshold, in rule table order"""
+        return [intent for intent in self.order
+                if intent in self.scores and self.scores[intent] >= self._thresholds.get(intent, 0.0)]
+
+    def first(self, default: Optional[str] = None) -> Optional[str]:
+        """The earliest intent in the rule table that matched at all"""
+        matched = self.matched()
+        return matched[0] if matched else default
+
+    def best(self, default: Optional[str] = None) -> Optional[str]:
+        """The highest scoring intent; ties go to the earlier one in the table"""
+        matched = self.matched()
+        return max(matched, key=lambda intent: (self.scores[intent], -self.order.index(intent))) if matched else default
+
+    def first_hit(self, intent: str) -> Optional[Hit]:
+        raw = self._raw_hits.get(intent)
+        return Hit(intent, *min(raw, key=lambda hit: (hit[1], -hit[2]))) if raw else None
+
+
+class CompiledRules:
+    """One immutable compiled rule table; replaced wholesale on reload"""
+
+    def __init__(self, rules: Dict[str, Dict[str, Any]]):
+        self.order: List[str] = []
+        self.weights: Dict[str, float] = {}
+        self.thresholds: Dict[str, float] = {}
+        # string -> ([(intent, word_boundary)], [anchored regex index]), so shared strings are matched once
+        targets: Dict[str, Tuple[List[Tuple[str, bool]], List[int]]] = {}
+        regex_rules: List[Tuple[str, str]] = []
+
+        for intent, rule in rules.items():
+            intent = str(intent)
+            self.order.append(intent)
+            self.weights[intent] = float(rule.get("weight", 1.0))
+            self.thresholds[intent] = float(rule.get("threshold", 0.0))
+            word_boundary = bool(rule.get("word_boundary", False))
+            for keyword in rule.get("keywords", ()):
+                keyword = keyword.lower()
+                if keyword:
+                    targets.setdefault(keyword, ([], []))[0].append((intent, word_boundary))
+            for pattern in rule.get("patterns", ()):
+                re.compile(pattern)  # fail early with the offending pattern
+                regex_rules.append((intent, pattern))
+
+        self.keyword_count = sum(1 for intents, _ in targets.values() if intents)
+        self.pattern_count = len(regex_rules)
+        self._regex_rules = regex_rules
+        self._regexes = [re.compile(pattern, re.IGNORECASE) for _, pattern in regex_rules]
+
+        # A regex starting with a literal is only tried where the automaton finds that literal
+        unanchored = []
+        for index, (_, pattern) in enumerate(regex_rules):
+            prefix = _literal_prefix(pattern)
+            if len(prefix) >= MIN_ANCHOR_LENGTH:
+                targets.setdefault(prefix, ([], []))[1].append(index)
+            else:
+                unanchored.append(index)
+
+        self._targets = list(targets.values())
+        automaton_class = _PyAhoCorasick if AHOCORASICK_AVAILABLE else KeywordAutomaton
+        self._automaton = automaton_class(targets) if targets else None
+
+        # The rest share one pattern of lookahead alternatives; being zero-width, no match hides another
+        self._unanchored = unanchored
+        self._combined = None
+        if unanchored and all(_combinable(regex_rules[index][1]) for index in unanchored):
+            self._combined = re.compile(
+                "(?=" + "|".join(f"(?P<r{index}>{regex_rules[index][1]})" for index in unanchored) + ")",
+                re.IGNORECASE,
+            )
+
+    def scan(self, text: str) -> IntentScores:
+        lowered = text.lower()
+        weights = self.weights
+        scores: Dict[str, float] = {}
+        hits: Dict[str, List[Tuple[str, int, int]]] = {}
+
+        found: Dict[int, Tuple[int, int]] = {}
+        if self._automaton is not None:
+            strings = self._automaton.keywords
+            counted_until: Dict[int, int] = {}
+            for end_index, string_id in self._automaton.iter(lowered):
+                string = strings[string_id]
+                start = end_index - len(string) + 1
+                intents, anchored = self._targets[string_id]
+                # str.count semantics: occurrences of one keyword do not overlap
+                if intents and start >= counted_until.get(string_id, 0):
+                    for intent, word_boundary in intents:
+                        if word_boundary and not _at_word_boundary(lowered, start, end_index + 1):
+                            continue
+                        counted_until[string_id] = end_index + 1
+                        if intent in scores:
+                            scores[intent] += weights[intent]
+                            hits[intent].append((string, start, end_index + 1))
+                        else:
+                            scores[intent] = weights[intent]
+                            hits[intent] = [(string, start, end_index + 1)]
+                for index in anchored:
+                    # Anchors arrive in order of position, so the first match is the leftmost
+                    if index not in found:
+                        match = self._regexes[index].match(lowered, start)
+                        if match:
+                            found[index] = (start, match.end())
+
+        self._unanchored_hits(lowered, found)
+        for index, (start, end) in found.items():
+            intent, pattern = self._regex_rules[index]
+            scores[intent] = scores.get(intent, 0.0) + weights[intent]
+            hits.setdefault(intent, []).append((pattern, start, end))
+
+        return IntentScores(self.order, scores, hits, self.thresholds)
+
+    def _unanchored_hits(self, text: str, found: Dict[int, Tuple[int, int]]):
+        """Leftmost match of every regex without a literal prefix"""
+        if self._combined is None:
+            for index in self._unanchored:
+                match = self._regexes[index].search(text)
+                if match:
+                    found[index] = (match.start(), match.end())
+            return
+
+        remaining = len(self._unanchored)
+        for match in self._combined.finditer(text):
+            position = match.start()
+            first = int(match.lastgroup[1:])
+            # The combined match only reports the first alternative matching here
+            for index in self._unanchored[self._unanchored.index(first):]:
+                if index in found:
+                    continue
+                rule_match = match if index == first else self._regexes[index].match(text, position)
+                if rule_match:
+                    found[index] = (position, rule_match.end(f"r{index}") if index == first else rule_match.end())
+                    remaining -= 1
+            if not remaining:
+                return
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Characters every match must start with, or "" when that is not obvious"""
+    depth = 0
+    escaped = in_class = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return ""
+
+    prefix = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            following = pattern[index + 1:index + 2]
+            if not following or following.isalnum():
+                break
+            literal, step = following, 2
+        elif char in ".^$*+?{}[]()|":
+            break
+        else:
+            literal, step = char, 1
+        quantifier = pattern[index + step:index + step + 1]
+        if quantifier and quantifier in "*?{":
+            # Optional or repeated: this character may be absent
+            break
+        prefix.append(literal)
+        if quantifier == "+":
+            break
+        index += step
+    return "".join(prefix).lower()
+
+
+def _combinable(pattern: str) -> bool:
+    """Named groups and numbered back-references do not survive being combined"""
+    return "(?P" not in pattern and not re.search(r"\\[1-9]", pattern)
+
+
+def _at_word_boundary(text: str, start: int, end: int) -> bool:
+    return ((start == 0 or not WORD_CHAR.match(text[start - 1]))
+            and (end >= len(text) or not WORD_CHAR.match(text[end])))
+
+
+class IntentClassifier:
+    """Scores messages against a rule table that can be swapped at runtime"""
+
+    def __init__(self, name: str, rules: Dict[str, Dict[str, Any]], rules_path: Optional[str] = None,
+                 check_interval: Optional[float] = None):
+        self.name = name
+        self.default_rules = rules
+        self.rules_path = rules_path
+        self.check_interval = check_interval if check_interval is not None else float(
+            os.getenv("INTENT_RULES_CHECK_SECONDS", 5))
+        self._lock = threading.Lock()
+        self._loaded_mtime: Optional[float] = None
+        self._next_check = 0.0
+        self.stats = {"classified": 0, "reloads": 0, "reload_errors": 0}
+        self._compiled = CompiledRules(rules)
+        self._maybe_reload_file(force=True)
+
+    @property
+    def rules(self) -> CompiledRules:
+        return self._compiled
+
+    def reload(self, rules: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Compile ``rules`` (or the built-in table) and swap it in; in-flight scans keep the old one"""
+        compiled = CompiledRules(rules if rules is not None else self.default_rules)
+        with self._lock:
+            self._compiled = compiled
+            self.stats["reloads"] += 1
+        logger.info(f"Intent rules '{self.name}' loaded: {compiled.keyword_count} keywords, "
+                    f"{compiled.pattern_count} patterns")
+
+    def _maybe_reload_file(self, force: bool = False):
+        if not self.rules_path:
+            return
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            mtime = os.stat(self.rules_path).st_mtime
+        except OSError:
+            if self._loaded_mtime is not None:
+                # Override removed: back to the built-in table
+                self._loaded_mtime = None
+                self.reload()
+            return
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            with open(self.rules_path, encoding="utf-8") as handle:
+                self.reload(json.load(handle))
+        except (OSError, ValueError, re.error, AttributeError, TypeError) as e:
+            # Keep serving the previous table rather than failing requests
+            self.stats["reload_errors"] += 1
+            logger.error(f"Invalid intent rules in {self.rules_path}: {e}")
+        self._loaded_mtime = mtime
+
+    def classify(self, text: str) -> IntentScores:
+        self._maybe_reload_file()
+        self.stats["classified"] += 1
+        return self._compiled.scan(text)
+
+
+_classifiers: Dict[str, IntentClassifier] = {}
+
+
+def get_intent_classifier(name: str, default_rules: Dict[str, Dict[str, Any]]) -> IntentClassifier:
+    """Shared classifier for ``name``, overridable by ``INTENT_RULES_DIR/<name>.json``"""
+    classifier = _classifiers.get(name)
+    if classifier is None:
+        rules_dir = os.getenv("INTENT_RULES_DIR")
+        rules_path = os.path.join(rules_dir, f"{name}.json") if rules_dir else None
+        classifier = _classifiers[name] = IntentClassifier(name, default_rules, rules_path)
+    return classifier
+
+
+def reload_intent_rules(name: Optional[str] = None):
+    """Recompile one shared classifier (or all) from its file or built-in table"""
+    for classifier_name, classifier in list(_classifiers.items()):
+        if name is None or classifier_name == name:
+            if classifier.rules_path and os.path.exists(classifier.rules_path):
+                classifier._maybe_reload_file(force=True)
+            else:
+                classifier.reload()
@@ -0,0 +1,302 @@
+"""
+Incrementally maintained leaderboards for the gamification system.
+
+Scores are kept in a sorted structure that is updated as XP, streaks and
+project completions are recorded, so leaderboard reads never aggregate the
+``user_stats`` collection.  Two interchangeable backends are provided:
+
+* ``InMemoryLeaderboardBackend`` - an indexable skiplist per board
+  (O(log n) updates and rank lookups, O(log n + k) top-k reads)
+* ``RedisLeaderboardBackend`` - Redis sorted sets (ZADD / ZREVRANGE / ZREVRANK)
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from services.skiplist import SkipList
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryLeaderboardBackend:
+    """Per-process leaderboards backed by one skiplist per board"""
+
+    def __init__(self):
+        self._boards: Dict[str, Tuple[SkipList, Dict[str, float]]] = {}
+
+    def _board(self, board: str) -> Tuple[SkipList, Dict[str, float]]:
+        if board not in self._boards:
+            self._boards[board] = (SkipList(), {})
+        return self._boards[board]
+
+    async def set_score(self, board: str, member: str, score: float) -> None:
+        skiplist, scores = self._board(board)
+        previous = scores.get(member)
+        if previous is not None:
+            if previous == score:
+                return
+            skiplist.remove(previous, member)
+        skiplist.insert(score, member)
+        scores[member] = score
+
+    async def incr_score(self, board: str, member: str, delta: float) -> float:
+        _, scores = self._board(board)
+        new_score = scores.get(member, 0) + delta
+        await self.set_score(board, member, new_score)
+        return new_score
+
+    async def add_scores(self, board: str, deltas: Dict[str, float]) -> None:
+        for member, delta in deltas.items():
+            await self.incr_score(board, member, delta)
+
+    async def set_missing_scores(self, board: str, scores: Dict[str, float]) -> None:
+        _, current = self._board(board)
+        for member, score in scores.items():
+            if member not in current:
+                await self.set_score(board, member, score)
+
+    async def top(self, board: str, limit: int) -> List[Tuple[str, float]]:
+        skiplist, _ = self._board(board)
+        size = len(skiplist)
+        items = skiplist.range_by_index(size - limit, size)
+        items.reverse()
+        return items
+
+    async def rank(self, board: str, member: str) -> Optional[int]:
+        """0-based descending rank"""
+        skiplist, scores = self._board(board)
+        score = scores.get(member)
+        if score is None:
+            return None
+        ascending = skiplist.rank(score, member)
+        return None if ascending is None else len(skiplist) - 1 - ascending
+
+    async def score(self, board: str, member: str) -> Optional[float]:
+        _, scores = self._board(board)
+        return scores.get(member)
+
+    async def size(self, board: str) -> int:
+        return len(self._board(board)[0])
+
+    async def drop(self, board: str) -> None:
+        self._boards.pop(board, None)
+
+    async def boards(self) -> List[str]:
+        return list(self._boards.keys())
+
+    async def claim_hydration(self, board: str) -> bool:
+        """Boards live in this process only, so the process always hydrates them"""
+        return True
+
+    async def release_hydration(self, board: str) -> None:
+        pass
+
+
+class RedisLeaderboardBackend:
+    """Leaderboards stored as Redis sorted sets, shared by all workers"""
+
+    PERIOD_TTL_SECONDS = 40 * 24 * 3600
+
+    def __init__(self, client):
+        self.client = client
+
+    async def set_score(self, board: str, member: str, score: float) -> None:
+        await self.client.zadd(board, {member: score})
+
+    async def incr_score(self, board: str, member: str, delta: float) -> float:
+        new_score = await self.client.zincrby(board, delta, member)
+        if ":weekly:" in board or ":monthly:" in board:
+            await self.client.expire(board, self.PERIOD_TTL_SECONDS)
+        return float(new_score)
+
+    async def add_scores(self, board: str, deltas: Dict[str, float]) -> None:
+        """Add every delta in one MULTI, so a failed hydration leaves nothing behind"""
+        if not deltas:
+            return
+        async with self.client.pipeline(transaction=True) as pipe:
+            for member, delta in deltas.items():
+                pipe.zincrby(board, delta, member)
+            if ":weekly:" in board or ":monthly:" in board:
+                pipe.expire(board, self.PERIOD_TTL_SECONDS)
+            await pipe.execute()
+
+    async def set_missing_scores(self, board: str, scores: Dict[str, float]) -> None:
+        if scores:
+            await self.client.zadd(board, scores, nx=True)
+
+    async def top(self, board: str, limit: int) -> List[Tuple[str, float]]:
+        if limit <= 0:
+            return []
+        items = await self.client.zrevrange(board, 0, limit - 1, withscores=True)
+        return [(member, float(score)) for member, score in items]
+
+    async def rank(self, board: str, member: str) -> Optional[int]:
+        return await self.client.zrevrank(board, member)
+
+    async def score(self, board: str, member: str) -> Optional[float]:
+        value = await self.client.zscore(board, member)
+        return None if value is None else float(value)
+
+    async def size(self, board: str) -> int:
+        return await self.client.zcard(board)
+
+    async def drop(self, board: str) -> None:
+        await self.client.delete(board)
+
+    async def boards(self) -> List[str]:
+        return [key async for key in self.client.scan_iter(match="leaderboard:*")]
+
+    async def claim_hydration(self, board: str) -> bool:
+        """True for the one worker that hydrates a board; the marker outlives restarts"""
+        ttl = self.PERIOD_TTL_SECONDS if ":weekly:" in board or ":monthly:" in board else None
+        return bool(await self.client.set(f"leaderboard-hydrated:{board}", 1, nx=True, ex=ttl))
+
+    async def release_hydration(self, board: str) -> None:
+        await self.client.delete(f"leaderboard-hydrated:{board}")
+
+
+class LeaderboardService:
+    """
+    Maintains xp, projects and streak leaderboards incrementally.
+
+    All-time boards store absolute values; weekly and monthly XP boards
+    accumulate the XP awarded in the current ISO week / calendar month.
+    Every board is hydrated from MongoDB once per process (once per board
+    for Redis) before the first read or incremental write, and is only
+    updated incrementally afterwards.  A period board that starts while
+    the process runs begins empty and is complete by construction.
+    """
+
+    CATEGORIES = ("xp", "projects", "streak")
+    TIMEFRAMES = ("all_time", "weekly", "monthly")
+    BOARDS = (("xp", "all_time"), ("xp", "weekly"), ("xp", "monthly"),
+              ("projects", "all_time"), ("streak", "all_time"))
+
+    def __init__(self, backend=None):
+        self.backend = backend or InMemoryLeaderboardBackend()
+        self._hydrated = False
+        self._hydration_lock = asyncio.Lock()
+
+    async def initialize(self):
+        """Switch to the Redis backend when LEADERBOARD_BACKEND=redis and Redis is reachable"""
+        if os.getenv("LEADERBOARD_BACKEND", "memory").lower() != "redis":
+            return
+        if not REDIS_AVAILABLE:
+            logger.warning("redis package not installed, using in-memory leaderboards")
+            return
+        try:
+            redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
+            client = redis.from_url(redis_url, decode_responses=True)
+            await client.ping()
+            self.backend = RedisLeaderboardBackend(client)
+            logger.info("Leaderboards using Redis sorted sets")
+        except Exception as e:
+            logger.warning(f"Redis unavailable, using in-memory leaderboards: {e}")
+
+    def board_key(self, category: str, timeframe: str = "all_time", now: Optional[datetime] = None) -> str:
+        """Board name; only XP has period boards, other categories are all-time"""
+        if category not in self.CATEGORIES:
+            category = "streak"
+        if category != "xp" or timeframe not in ("weekly", "monthly"):
+            return f"leaderboard:{category}:all_time"
+
+        now = now or datetime.utcnow()
+        if timeframe == "weekly":
+            year, week, _ = now.isocalendar()
+            return f"leaderboard:xp:weekly:{year}-W{week:02d}"
+        return f"leaderboard:xp:monthly:{now.year}-{now.month:02d}"
+
+    async def record_xp(self, user_id: str, total_xp: int, xp_delta: int, now: Optional[datetime] = None):
+        """Update the all-time board and the current period boards after an XP award"""
+        now = now or datetime.utcnow()
+        await self.backend.set_score(self.board_key("xp"), user_id, total_xp)
+        for timeframe in ("weekly", "monthly"):
+            board = self.board_key("xp", timeframe, now)
+            await self._expire_stale_periods(board)
+            await self.backend.incr_score(board, user_id, xp_delta)
+
+    async def record_streak(self, user_id: str, current_streak: int):
+        await self.backend.set_score(self.board_key("streak"), user_id, current_streak)
+
+    async def record_projects(self, user_id: str, completed_projects: int):
+        await self.backend.set_score(self.board_key("projects"), user_id, completed_projects)
+
+    async def top(self, category: str, timeframe: str, limit: int) -> List[Tuple[str, float]]:
+        return await self.backend.top(self.board_key(category, timeframe), limit)
+
+    async def rank(self, category: str, timeframe: str, user_id: str) -> Optional[int]:
+        """1-based rank of the user, or None if the user is not on the board"""
+        rank = await self.backend.rank(self.board_key(category, timeframe), user_id)
+        return None if rank is None else rank + 1
+
+    async def ensure_hydrated(self, db) -> None:
+        """
+        Load every current board from MongoDB; awaited before any read or write.
+
+        Writes in this process wait here while hydration runs; with Redis,
+        other workers keep incrementing a board while one worker hydrates
+        it.  A period board is therefore hydrated from the transactions
+        logged before hydration started, added on top of the board rather
+        than overwriting it: awards made since then are the increments.
+        All-time boards only fill in members nobody has written since, as
+        a live write is at least as new as the snapshot being loaded.
+        """
+        if self._hydrated or db is None:
+            return
+
+        async with self._hydration_lock:
+            if self._hydrated:
+                return
+            now = datetime.utcnow()
+            for category, timeframe in self.BOARDS:
+                board = self.board_key(category, timeframe, now)
+                if await self.backend.claim_hydration(board):
+                    if not await self._hydrate(board, category, timeframe, db, now):
+                        await self.backend.release_hydration(board)
+            self._hydrated = True
+
+    async def _hydrate(self, board: str, category: str, timeframe: str, db, now: datetime) -> bool:
+        try:
+            if category == "xp" and timeframe in ("weekly", "monthly"):
+                if timeframe == "weekly":
+                    weekday = now.isoweekday()
+                    since = datetime(now.year, now.month, now.day) - timedelta(days=weekday - 1)
+                else:
+                    since = datetime(now.year, now.month, 1)
+                cursor = db.xp_transactions.aggregate([
+                    {"$match": {"timestamp": {"$gte": since, "$lt": now}}},
+                    {"$group": {"_id": "$user_id", "xp": {"$sum": "$xp_amount"}}}
+                ])
+                await self.backend.add_scores(board, {doc["_id"]: doc.get("xp", 0) async for doc in cursor})
+            elif category == "streak":
+                cursor = db.user_streaks.find({}, {"user_id": 1, "current": 1})
+                await self.backend.set_missing_scores(
+                    board, {doc["user_id"]: doc.get("current", 0) async for doc in cursor})
+            else:
+                field = "xp" if category == "xp" else "completed_projects"
+                cursor = db.user_stats.find({}, {"user_id": 1, field: 1})
+                await self.backend.set_missing_scores(
+                    board, {doc["user_id"]: doc.get(field, 0) async for doc in cursor})
+            logger.info(f"Hydrated {board} with {await self.backend.size(board)} entries")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to hydrate leaderboard {board}: {e}")
+            return False
+
+    async def _expire_stale_periods(self, current_board: str) -> None:
+        """Drop period boards that belong to a previous week or month (in-memory backend only)"""
+        if not isinstance(self.backend, InMemoryLeaderboardBackend):
+            return
+        prefix = current_board.rsplit(":", 1)[0] + ":"
+        for board in await self.backend.boards():
+            if board.startswith(prefix) and board != current_board:
+                await self.backend.drop(board)
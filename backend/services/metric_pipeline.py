@@ -0,0 +1,201 @@
+"""
+Non-blocking metric fan-out to batching consumers.
+
+``MetricPipeline.publish`` is what a request path pays for a metric: one
+bounded-deque append per consumer that wants it, no awaiting.  Each
+consumer (a third-party exporter, alert evaluation) drains its own queue
+in a background task, in batches of up to ``batch_size`` or whatever
+arrived within ``flush_interval``, so a slow or failing consumer only
+delays itself.
+
+A failed batch is retried with exponential backoff and jitter up to
+``max_retries`` times and then dropped.  When a queue is full the oldest
+metric is dropped to make room, so a stalled exporter keeps the freshest
+data.  Both kinds of loss are counted; ``stats()`` reports them with queue
+depth and lag (age of the oldest queued metric) per consumer.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = int(os.getenv("ANALYTICS_EXPORT_QUEUE_SIZE", "10000"))
+DEFAULT_BATCH_SIZE = int(os.getenv("ANALYTICS_EXPORT_BATCH_SIZE", "100"))
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("ANALYTICS_EXPORT_FLUSH_INTERVAL", "1.0"))
+DEFAULT_MAX_RETRIES = int(os.getenv("ANALYTICS_EXPORT_MAX_RETRIES", "5"))
+
+BatchHandler = Callable[[List[Any]], Awaitable[None]]
+
+
+class BatchingConsumer:
+    """A bounded queue of items drained in batches by one background task"""
+
+    def __init__(
+        self,
+        name: str,
+        handler: BatchHandler,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        accepts: Optional[Callable[[], bool]] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Checked on publish, so a disabled exporter costs nothing and queues nothing
+        self.accepts = accepts or (lambda: True)
+
+        self._queue: Deque[Tuple[float, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.counters = {
+            "enqueued": 0,
+            "exported": 0,
+            "batches": 0,
+            "retries": 0,
+            "dropped_overflow": 0,
+            "dropped_failed": 0,
+        }
+        self.last_error: Optional[str] = None
+
+    def offer(self, item: Any):
+        if len(self._queue) >= self.queue_size:
+            self._queue.popleft()
+            self.counters["dropped_overflow"] += 1
+        self._queue.append((time.monotonic(), item))
+        self.counters["enqueued"] += 1
+        if self._task is None:
+            self.start()
+        # Wake the consumer once a full batch is waiting; otherwise it flushes on its interval
+        if len(self._queue) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run(), name=f"metric-consumer-{self.name}")
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def lag(self) -> float:
+        """Seconds the oldest queued item has waited"""
+        return time.monotonic() - self._queue[0][0] if self._queue else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "queue_depth": self.depth,
+            "queue_size": self.queue_size,
+            "lag_seconds": round(self.lag, 3),
+            "running": self._task is not None and not self._task.done(),
+            "last_error": self.last_error,
+        }
+
+    async def _run(self):
+        while True:
+            if len(self._queue) < self.batch_size and not self._closing:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            if not self._queue:
+                if self._closing:
+                    return
+                continue
+            batch = [self._queue.popleft()[1] for _ in range(min(self.batch_size, len(self._queue)))]
+            await self._deliver(batch)
+
+    async def _deliver(self, batch: List[Any]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.handler(batch)
+                self.counters["exported"] += len(batch)
+                self.counters["batches"] += 1
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if attempt == self.max_retries:
+                    break
+                self.counters["retries"] += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        self.counters["dropped_failed"] += len(batch)
+        logger.error(f"Dropped {len(batch)} metrics for {self.name}: {self.last_error}")
+
+    async def close(self, timeout: float = 5.0):
+        """Deliver what is queued (within ``timeout``) and stop the task"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            self.counters["dropped_failed"] += len(self._queue)
+            self._queue.clear()
+        self._task = None
+        self._closing = False
+
+
+class MetricPipeline:
+    """Publishes each metric to every consumer that currently accepts it"""
+
+    def __init__(self):
+        self.consumers: Dict[str, BatchingConsumer] = {}
+        self.published = 0
+
+    def add_consumer(self, name: str, handler: BatchHandler, **options: Any) -> BatchingConsumer:
+        consumer = BatchingConsumer(name, handler, **options)
+        self.consumers[name] = consumer
+        return consumer
+
+    async def remove_consumer(self, name: str):
+        consumer = self.consumers.pop(name, None)
+        if consumer is not None:
+            await consumer.close()
+
+    def publish(self, item: Any):
+        self.published += 1
+        for consumer in self.consumers.values():
+            if consumer.accepts():
+                consumer.offer(item)
+
+    def stats(self) -> Dict[str, Any]:
+        consumers = {name: consumer.stats() for name, consumer in self.consumers.items()}
+        return {
+            "published": self.published,
+            "queue_depth": sum(stats["queue_depth"] for stats in consumers.values()),
+            "max_lag_seconds": max((stats["lag_seconds"] for stats in consumers.values()), default=0.0),
+            "dropped": sum(stats["dropped_overflow"] + stats["dropped_failed"] for stats in consumers.values()),
+            "consumers": consumers,
+        }
+
+    async def close(self, timeout: float = 5.0):
+        await asyncio.gather(*(consumer.close(timeout) for consumer in self.consumers.values()))
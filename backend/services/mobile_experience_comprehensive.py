@@ -13,6 +13,9 @@ import httpx
 from fastapi import WebSocket
 from fastapi.responses import JSONResponse
 
+from services.offline_sync import OfflineSyncService
+from services.shared_state import PickleCodec, get_shared_state
+
 logger = logging.getLogger(__name__)
 
 class DeviceType(Enum):
@@ -52,18 +55,6 @@ class MobileSession:
     offline_capable: bool = False
     push_enabled: bool = False
 
-@dataclass
-class OfflineData:
-    data_id: str
-    user_id: str
-    data_type: str
-    payload: Dict[str, Any]
-    created_offline: datetime
-    sync_status: OfflineSyncStatus
-    sync_attempts: int = 0
-    last_sync_attempt: Optional[datetime] = None
-    error_message: Optional[str] = None
-
 @dataclass
 class PushNotification:
     notification_id: str
@@ -99,10 +90,11 @@ class MobileExperienceComprehensive:
     """
     
     def __init__(self):
-        self.mobile_sessions: Dict[str, MobileSession] = {}
-        self.offline_data_queue: List[OfflineData] = []
-        self.push_notifications: List[PushNotification] = []
-        self.accessibility_audits: List[AccessibilityAudit] = []
+        shared_state = get_shared_state()
+        self.mobile_sessions = shared_state.ttl_map("mobile_sessions", ttl=24 * 3600, codec=PickleCodec())
+        self.offline_sync = OfflineSyncService()
+        self.push_notifications = shared_state.list("push_notifications", maxlen=10000, codec=PickleCodec())
+        self.accessibility_audits = shared_state.map("accessibility_audits", codec=PickleCodec())
         self.websocket_connections: Dict[str, WebSocket] = {}
         
     async def initialize(self):
@@ -153,7 +145,7 @@ class MobileExperienceComprehensive:
             push_enabled=False
         )
         
-        self.mobile_sessions[session_id] = session
+        await self.mobile_sessions.set(session_id, session)
         
         logger.info(f"📱 Mobile session created: {device_type.value} on {platform.value}")
         return session_id
@@ -165,17 +157,15 @@ class MobileExperienceComprehensive:
     ) -> Dict[str, Any]:
         """Optimize API response for mobile device"""
         
-        session = self.mobile_sessions.get(session_id)
+        session = await self.mobile_sessions.get(session_id)
         if not session:
             return original_response
         
         optimized_response = original_response.copy()
         
-        # Mobile-specific optimizations
+        # Mobile-specific optimizations. Bytes on the wire are saved by response
+        # encoding negotiation (MessagePack, brotli/zstd/gzip), not by dropping fields
         if session.device_type == DeviceType.MOBILE:
-            # Reduce payload size
-            optimized_response = await self._reduce_payload_size(optimized_response)
-            
             # Optimize images
             if 'images' in optimized_response:
                 optimized_response['images'] = await self._optimize_images_for_mobile(
@@ -203,97 +193,61 @@ class MobileExperienceComprehensive:
         self,
         user_id: str,
         data_type: str,
-        payload: Dict[str, Any]
+        payload: Dict[str, Any],
+        device_id: str = "server",
+        idempotency_key: Optional[str] = None
     ) -> str:
         """Store data for offline synchronization"""
         
-        data_id = str(uuid.uuid4())
-        
-        offline_data = OfflineData(
-            data_id=data_id,
-            user_id=user_id,
-            data_type=data_type,
-            payload=payload,
-            created_offline=datetime.utcnow(),
-            sync_status=OfflineSyncStatus.PENDING
-        )
-        
-        self.offline_data_queue.append(offline_data)
+        result = await self.offline_sync.push(user_id, device_id, [{
+            "data_type": data_type,
+            "payload": payload,
+            "idempotency_key": idempotency_key
+        }])
+        data_id = result["results"][0]["entity_id"]
         
         logger.info(f"💾 Offline data stored: {data_type} for user {user_id}")
         return data_id
     
-    async def sync_offline_data(self, user_id: Optional[str] = None) -> Dict[str, Any]:
-        """Synchronize offline data with server"""
+    async def sync_offline_data(
+        self,
+        user_id: str,
+        device_id: Optional[str] = None,
+        changes: Optional[List[Dict[str, Any]]] = None,
+        since_token: int = 0,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Push a batch of offline edits and pull the changes made since
+        ``since_token`` in one round trip. Conflicting edits are returned
+        with the server version for the client to resolve and resend.
+        """
+        
+        pushed = await self.offline_sync.push(user_id, device_id or "server", changes or [])
+        pulled = await self.offline_sync.pull(user_id, since_token, limit, exclude_device=device_id)
         
         sync_results = {
-            "synced": 0,
-            "failed": 0,
-            "errors": []
+            "synced": pushed["applied"],
+            "failed": pushed["conflicts"],
+            "errors": [],
+            "results": pushed["results"],
+            "changes": pulled["changes"],
+            "sync_token": pulled["sync_token"],
+            "has_more": pulled["has_more"]
         }
         
-        # Filter data for specific user or all pending data
-        data_to_sync = [
-            data for data in self.offline_data_queue
-            if data.sync_status == OfflineSyncStatus.PENDING
-            and (user_id is None or data.user_id == user_id)
-        ]
+        if pushed["applied"]:
+            await self._notify_sync_success(user_id, device_id, pushed["sync_token"])
         
-        for data in data_to_sync:
-            try:
-                # Simulate API call to sync data
-                success = await self._sync_data_item(data)
-                
-                if success:
-                    data.sync_status = OfflineSyncStatus.SYNCED
-                    data.last_sync_attempt = datetime.utcnow()
-                    sync_results["synced"] += 1
-                    
-                    # Notify connected clients via WebSocket
-                    await self._notify_sync_success(data)
-                else:
-                    data.sync_status = OfflineSyncStatus.FAILED
-                    data.sync_attempts += 1
-                    data.last_sync_attempt = datetime.utcnow()
-                    sync_results["failed"] += 1
-                    
-            except Exception as e:
-                data.sync_status = OfflineSyncStatus.FAILED
-                data.sync_attempts += 1
-                data.last_sync_attempt = datetime.utcnow()
-                data.error_message = str(e)
-                sync_results["failed"] += 1
-                sync_results["errors"].append(str(e))
-                
-                logger.error(f"Offline sync failed for {data.data_id}: {e}")
-        
-        logger.info(f"📡 Offline sync completed: {sync_results['synced']} synced, {sync_results['failed']} failed")
+        logger.info(
+            f"📡 Offline sync completed: {sync_results['synced']} synced, "
+            f"{sync_results['failed']} conflicts, {len(pulled['changes'])} pulled"
+        )
         return sync_results
     
     async def get_offline_data_status(self, user_id: str) -> Dict[str, Any]:
         """Get offline data synchronization status"""
-        
-        user_data = [data for data in self.offline_data_queue if data.user_id == user_id]
-        
-        status_summary = {
-            "total": len(user_data),
-            "synced": len([d for d in user_data if d.sync_status == OfflineSyncStatus.SYNCED]),
-            "pending": len([d for d in user_data if d.sync_status == OfflineSyncStatus.PENDING]),
-            "failed": len([d for d in user_data if d.sync_status == OfflineSyncStatus.FAILED]),
-            "last_sync": None
-        }
-        
-        # Find most recent sync attempt
-        recent_synced = [
-            d for d in user_data
-            if d.last_sync_attempt and d.sync_status == OfflineSyncStatus.SYNCED
-        ]
-        
-        if recent_synced:
-            recent_synced.sort(key=lambda x: x.last_sync_attempt, reverse=True)
-            status_summary["last_sync"] = recent_synced[0].last_sync_attempt.isoformat()
-        
-        return status_summary
+        return await self.offline_sync.status(user_id)
     
     # =============================================================================
     # PUSH NOTIFICATIONS
@@ -302,11 +256,12 @@ class MobileExperienceComprehensive:
     async def enable_push_notifications(self, session_id: str, push_token: str) -> bool:
         """Enable push notifications for mobile session"""
         
-        session = self.mobile_sessions.get(session_id)
+        session = await self.mobile_sessions.get(session_id)
         if not session:
             return False
         
         session.push_enabled = True
+        await self.mobile_sessions.set(session_id, session)
         
         # Store push token (in production, would store in database)
         # For demo, we'll just mark as enabled
@@ -339,7 +294,7 @@ class MobileExperienceComprehensive:
         # Simulate sending notification
         notification.sent_at = datetime.utcnow()
         
-        self.push_notifications.append(notification)
+        await self.push_notifications.append(notification)
         
         # Send via WebSocket if user is online
         await self._send_websocket_notification(user_id, notification)
@@ -368,7 +323,7 @@ class MobileExperienceComprehensive:
             scheduled_at=scheduled_at
         )
         
-        self.push_notifications.append(notification)
+        await self.push_notifications.append(notification)
         
         logger.info(f"📅 Push notification scheduled for {scheduled_at.isoformat()}")
         return notification_id
@@ -550,7 +505,7 @@ self.addEventListener('push', (event) => {{
             recommendations=recommendations
         )
         
-        self.accessibility_audits.append(audit)
+        await self.accessibility_audits.set(audit_id, audit)
         
         logger.info(f"♿ Accessibility audit completed for {page_url}: Score {score}/100")
         return audit_id
@@ -558,10 +513,7 @@ self.addEventListener('push', (event) => {{
     async def get_accessibility_report(self, audit_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed accessibility audit report"""
         
-        audit = next(
-            (a for a in self.accessibility_audits if a.audit_id == audit_id),
-            None
-        )
+        audit = await self.accessibility_audits.get(audit_id)
         
         if not audit:
             return None
@@ -589,10 +541,7 @@ self.addEventListener('push', (event) => {{
     ) -> bool:
         """Mark accessibility violation as fixed"""
         
-        audit = next(
-            (a for a in self.accessibility_audits if a.audit_id == audit_id),
-            None
-        )
+        audit = await self.accessibility_audits.get(audit_id)
         
         if not audit:
             return False
@@ -603,6 +552,7 @@ self.addEventListener('push', (event) => {{
                 violation["fixed"] = fix_implemented
                 violation["fix_notes"] = notes
                 violation["fix_timestamp"] = datetime.utcnow().isoformat()
+                await self.accessibility_audits.set(audit_id, audit)
                 
                 logger.info(f"♿ Accessibility violation {violation_id} marked as {'fixed' if fix_implemented else 'unfixed'}")
                 return True
@@ -685,24 +635,6 @@ self.addEventListener('push', (event) => {{
         else:
             return PlatformType.WEB
     
-    async def _reduce_payload_size(self, response: Dict[str, Any]) -> Dict[str, Any]:
-        """Reduce API response payload for mobile"""
-        # Remove unnecessary fields for mobile
-        mobile_optimized = {}
-        
-        # Keep only essential fields
-        essential_fields = ["id", "title", "content", "status", "created_at"]
-        for field in essential_fields:
-            if field in response:
-                mobile_optimized[field] = response[field]
-        
-        # Truncate long text fields
-        if "content" in mobile_optimized and len(str(mobile_optimized["content"])) > 500:
-            mobile_optimized["content"] = str(mobile_optimized["content"])[:500] + "..."
-            mobile_optimized["content_truncated"] = True
-        
-        return mobile_optimized
-    
     async def _optimize_images_for_mobile(self, images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Optimize images for mobile viewing"""
         optimized_images = []
@@ -740,33 +672,15 @@ self.addEventListener('push', (event) => {{
         
         return limited_response
     
-    async def _sync_data_item(self, data: OfflineData) -> bool:
-        """Synchronize individual offline data item"""
-        try:
-            # Simulate API call to sync data
-            # In production, would make actual HTTP request
-            
-            # Simulate some failures for demonstration
-            import random
-            if random.random() < 0.1:  # 10% failure rate
-                return False
-            
-            # Mark as synced
-            return True
-            
-        except Exception as e:
-            logger.error(f"Data sync failed: {e}")
-            return False
-    
-    async def _notify_sync_success(self, data: OfflineData):
-        """Notify client of successful sync via WebSocket"""
-        if data.user_id in self.websocket_connections:
-            websocket = self.websocket_connections[data.user_id]
+    async def _notify_sync_success(self, user_id: str, device_id: Optional[str], sync_token: int):
+        """Tell the user's connected client that new changes are available"""
+        if user_id in self.websocket_connections:
+            websocket = self.websocket_connections[user_id]
             try:
                 await websocket.send_json({
-                    "type": "sync_success",
-                    "data_id": data.data_id,
-                    "data_type": data.data_type,
+                    "type": "sync_available",
+                    "sync_token": sync_token,
+                    "source_device": device_id,
                     "timestamp": datetime.utcnow().isoformat()
                 })
             except Exception as e:
@@ -0,0 +1,280 @@
+"""
+Delta-based offline synchronization for mobile clients.
+
+Every accepted change is appended to a per-user change log under a
+monotonic sync token.  A reconnecting client pushes its offline edits in
+batches and pulls only the changes made since the last token it saw,
+with superseded versions of the same entity collapsed to the latest.
+
+Each pushed change carries an idempotency key, so a batch retried after
+a dropped connection is answered from the recorded outcome instead of
+being applied twice.  Conflicts are detected with version vectors: a
+change names the version it was based on, and is rejected as a conflict
+when the server holds a version the client had not seen.  The client
+resolves it and pushes again based on the returned server version.
+
+Change logs and the token sequence live in shared state, so every
+worker hands out tokens from one sequence and sees the same logs.
+"""
+
+import json
+import logging
+import os
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+import uuid
+
+from services.shared_state import PickleCodec, SharedState, get_shared_state
+
+logger = logging.getLogger(__name__)
+
+VersionVector = Dict[str, int]
+
+APPLIED = "applied"
+CONFLICT = "conflict"
+
+# Upper bound on changes accepted or returned in one round trip
+MAX_BATCH_SIZE = int(os.getenv("OFFLINE_SYNC_MAX_BATCH", "500"))
+
+# Outcomes remembered per user for answering retried pushes
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("OFFLINE_SYNC_IDEMPOTENCY_CACHE", "10000"))
+
+
+def descends(version: VersionVector, other: VersionVector) -> bool:
+    """True when ``version`` has seen every update in ``other``"""
+    return all(version.get(device, 0) >= counter for device, counter in other.items())
+
+
+def compare_versions(version: VersionVector, other: VersionVector) -> str:
+    """``equal``, ``descendant``, ``ancestor`` or ``concurrent``"""
+    forward, backward = descends(version, other), descends(other, version)
+    if forward and backward:
+        return "equal"
+    if forward:
+        return "descendant"
+    if backward:
+        return "ancestor"
+    return "concurrent"
+
+
+def merge_versions(*versions: VersionVector) -> VersionVector:
+    merged: VersionVector = {}
+    for version in versions:
+        for device, counter in version.items():
+            if counter > merged.get(device, 0):
+                merged[device] = counter
+    return merged
+
+
+@dataclass
+class ChangeRecord:
+    sync_token: int
+    entity_id: str
+    data_type: str
+    payload: Optional[Dict[str, Any]]
+    version: VersionVector
+    device_id: str
+    timestamp: datetime
+    deleted: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = asdict(self)
+        record["timestamp"] = self.timestamp.isoformat()
+        return record
+
+
+@dataclass
+class UserChangeLog:
+    """
+    Append-only changes for one user, ordered by sync token.
+
+    Records are kept as the JSON that pulls return, so writing the log
+    back to shared state after a push does not re-encode every record.
+    """
+    records: List[str] = field(default_factory=list)
+    tokens: List[int] = field(default_factory=list)
+    # Entity id -> sync token of its latest record
+    latest: Dict[str, int] = field(default_factory=dict)
+    outcomes: "OrderedDict[str, Dict[str, Any]]" = field(default_factory=OrderedDict)
+    conflicts: int = 0
+    last_sync: Optional[datetime] = None
+
+    def record(self, sync_token: int) -> Dict[str, Any]:
+        return json.loads(self.records[bisect_left(self.tokens, sync_token)])
+
+    def current(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        sync_token = self.latest.get(entity_id)
+        return None if sync_token is None else self.record(sync_token)
+
+
+class OfflineSyncService:
+    """Per-user change logs with token-based delta push/pull"""
+
+    def __init__(self, max_batch_size: int = MAX_BATCH_SIZE, idempotency_cache_size: int = IDEMPOTENCY_CACHE_SIZE,
+                 state: Optional[SharedState] = None):
+        self.max_batch_size = max_batch_size
+        self.idempotency_cache_size = idempotency_cache_size
+        state = state or get_shared_state()
+        self._logs = state.map("offline_sync_logs", codec=PickleCodec())
+        # One token sequence for all users keeps tokens unique across logs
+        self._tokens = state.counter("offline_sync_tokens")
+
+    @staticmethod
+    def _last_token(log: Optional[UserChangeLog]) -> int:
+        return log.tokens[-1] if log and log.tokens else 0
+
+    async def current_token(self, user_id: str) -> int:
+        return self._last_token(await self._logs.get(user_id))
+
+    async def push(self, user_id: str, device_id: str, changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply a batch of client changes.
+
+        Each change has ``entity_id``, ``data_type``, ``payload`` (or
+        ``deleted``), ``base_version`` (the version vector the edit was made
+        on, empty for new entities) and ``idempotency_key``.  Returns one
+        result per change, in order, plus the latest sync token.
+        """
+        if len(changes) > self.max_batch_size:
+            raise ValueError(f"Batch of {len(changes)} changes exceeds the limit of {self.max_batch_size}")
+
+        results: List[Dict[str, Any]] = []
+
+        async def apply_batch(log: Optional[UserChangeLog]) -> UserChangeLog:
+            # Re-run on the newer log when another worker pushed in between.
+            # Tokens are drawn after reading the log, so they are above every
+            # token in it and the log stays ordered; unused ones are skipped.
+            log = log or UserChangeLog()
+            results.clear()
+            last = await self._tokens.incr(delta=len(changes)) if changes else 0
+            tokens = iter(range(last - len(changes) + 1, last + 1))
+            for change in changes:
+                key = change.get("idempotency_key")
+                if key and key in log.outcomes:
+                    log.outcomes.move_to_end(key)
+                    results.append({**log.outcomes[key], "duplicate": True})
+                    continue
+
+                outcome = self._apply(log, device_id, change, tokens)
+                if key:
+                    log.outcomes[key] = outcome
+                    if len(log.outcomes) > self.idempotency_cache_size:
+                        log.outcomes.popitem(last=False)
+                results.append(outcome)
+
+            log.last_sync = datetime.utcnow()
+            return log
+
+        log = await self._logs.update(user_id, apply_batch)
+        return {
+            "results": results,
+            "applied": sum(1 for r in results if r["status"] == APPLIED and not r.get("duplicate")),
+            "conflicts": sum(1 for r in results if r["status"] == CONFLICT),
+            "sync_token": self._last_token(log),
+        }
+
+    def _apply(self, log: UserChangeLog, device_id: str, change: Dict[str, Any],
+               tokens: Iterator[int]) -> Dict[str, Any]:
+        entity_id = change.get("entity_id") or str(uuid.uuid4())
+        base_version = change.get("base_version") or {}
+        current = log.current(entity_id)
+
+        if current is not None and not descends(base_version, current["version"]):
+            # The server holds an update this edit was not based on
+            log.conflicts += 1
+            return {
+                "entity_id": entity_id,
+                "status": CONFLICT,
+                "server": current,
+            }
+
+        version = merge_versions(base_version, current["version"] if current else {})
+        version[device_id] = version.get(device_id, 0) + 1
+        record = ChangeRecord(
+            sync_token=next(tokens),
+            entity_id=entity_id,
+            data_type=change.get("data_type") or (current["data_type"] if current else "unknown"),
+            payload=None if change.get("deleted") else change.get("payload"),
+            version=version,
+            device_id=device_id,
+            timestamp=datetime.utcnow(),
+            deleted=bool(change.get("deleted")),
+        )
+        log.records.append(json.dumps(record.to_dict(), separators=(",", ":")))
+        log.tokens.append(record.sync_token)
+        log.latest[entity_id] = record.sync_token
+        self._maybe_compact(log)
+        return {
+            "entity_id": entity_id,
+            "status": APPLIED,
+            "version": version,
+            "sync_token": record.sync_token,
+        }
+
+    async def pull(
+        self,
+        user_id: str,
+        since_token: int = 0,
+        limit: Optional[int] = None,
+        exclude_device: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Changes after ``since_token``, latest version per entity only.
+
+        ``sync_token`` in the result is where the next pull should resume;
+        ``has_more`` is set when the page was cut short by ``limit``.
+        ``exclude_device`` leaves out that device's own writes, except on a
+        full resync from token 0, where the device has nothing locally.
+        """
+        limit = min(limit or self.max_batch_size, self.max_batch_size)
+        log = await self._logs.get(user_id)
+        if log is None:
+            return {"changes": [], "sync_token": since_token, "has_more": False}
+
+        changes = []
+        resume_token = since_token
+        position = bisect_right(log.tokens, since_token)
+        while position < len(log.records) and len(changes) < limit:
+            record = json.loads(log.records[position])
+            resume_token = log.tokens[position]
+            position += 1
+            if log.latest.get(record["entity_id"]) != resume_token:
+                continue  # superseded later in the log
+            if since_token > 0 and exclude_device is not None and record["device_id"] == exclude_device:
+                continue  # the client already has its own writes
+            changes.append(record)
+
+        if position == len(log.records):
+            resume_token = max(resume_token, self._last_token(log))
+        return {
+            "changes": changes,
+            "sync_token": resume_token,
+            "has_more": position < len(log.records),
+        }
+
+    def _maybe_compact(self, log: UserChangeLog):
+        """Drop superseded records once they outnumber the live ones"""
+        superseded = len(log.records) - len(log.latest)
+        if superseded <= max(1024, len(log.latest)):
+            return
+        # The latest record of every entity is kept, so a pull from any older
+        # token still returns the current state of everything changed since
+        live = set(log.latest.values())
+        kept = [(token, record) for token, record in zip(log.tokens, log.records) if token in live]
+        log.tokens = [token for token, _ in kept]
+        log.records = [record for _, record in kept]
+
+    async def status(self, user_id: str) -> Dict[str, Any]:
+        log = await self._logs.get(user_id)
+        if log is None:
+            return {"entities": 0, "deleted": 0, "conflicts": 0, "sync_token": 0, "last_sync": None}
+        return {
+            "entities": len(log.latest),
+            "deleted": sum(1 for token in log.latest.values() if log.record(token)["deleted"]),
+            "conflicts": log.conflicts,
+            "sync_token": self._last_token(log),
+            "last_sync": log.last_sync.isoformat() if log.last_sync else None,
+        }
@@ -2,17 +2,27 @@ from typing import Dict, List, Optional, Any
 import asyncio
 import json
 from datetime import datetime
-import hashlib
 import difflib
+import itertools
+
+from services.code_similarity_index import CodeSimilarityIndex
 
 class PatternIntelligence:
     """AI service for cross-project pattern recognition and code reuse"""
     
     def __init__(self, db_wrapper):
         self.db = db_wrapper
+        self.similarity_threshold = 0.8
+        self.min_block_size = 5  # Minimum lines for code block
         self.pattern_cache = {}
         self.code_fingerprints = {}
         self.reuse_opportunities = {}
+        self.similarity_index = CodeSimilarityIndex()
+        # Latest save or delete of each indexed file; older in-flight index updates are dropped
+        self._index_versions: Dict[tuple, int] = {}
+        self._index_clock = itertools.count(1)
+        self._index_synced_at: Optional[datetime] = None
+        self._index_sync_lock = asyncio.Lock()
     
     async def initialize(self):
         """Initialize the pattern intelligence service"""
@@ -230,27 +240,96 @@ class PatternIntelligence:
         return sorted(components, key=lambda x: x["reusability_score"], reverse=True)
     
     async def _detect_code_duplication(self, codebase: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Detect duplicated code across files"""
+        """Detect exact and near-duplicate code across files"""
         duplicates = []
         
-        # Create fingerprints for code blocks
-        fingerprints = {}
+        # Index this codebase on its own so results are scoped to it
+        index = CodeSimilarityIndex(threshold=self.similarity_threshold)
+        blocks_by_key = {}
         for file_path, code in codebase.items():
             blocks = await self._extract_code_blocks(code)
             for block in blocks:
-                fingerprint = self._create_code_fingerprint(block["code"])
-                if fingerprint in fingerprints:
-                    duplicates.append({
-                        "original": fingerprints[fingerprint],
-                        "duplicate": {"file": file_path, "block": block},
-                        "similarity": block.get("similarity", 100),
-                        "lines": block.get("lines", 0)
-                    })
-                else:
-                    fingerprints[fingerprint] = {"file": file_path, "block": block}
+                blocks_by_key[(file_path, block["start_line"])] = block
+            index.replace_file("", file_path, blocks)
+        
+        for pair in index.duplicate_pairs():
+            original, duplicate = pair["original"], pair["duplicate"]
+            duplicate_block = blocks_by_key[(duplicate["file"], duplicate["start_line"])]
+            duplicates.append({
+                "original": {
+                    "file": original["file"],
+                    "block": blocks_by_key[(original["file"], original["start_line"])]
+                },
+                "duplicate": {"file": duplicate["file"], "block": duplicate_block},
+                "similarity": pair["similarity"],
+                "lines": duplicate_block.get("lines", 0)
+            })
         
         return duplicates
     
+    async def index_file(self, project_id: str, file_path: str, code: str) -> int:
+        """Update the cross-project near-duplicate index after a file is saved"""
+        version = next(self._index_clock)
+        self._index_versions[(project_id, file_path)] = version
+        blocks = await self._extract_code_blocks(code)
+        # MinHash signing is the expensive part; keep it off the event loop
+        signed = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: [self.similarity_index.sign(block["code"]) for block in blocks]
+        )
+        if self._index_versions.get((project_id, file_path)) != version:
+            # Saved again or deleted while this version was being signed
+            return 0
+        return self.similarity_index.replace_file(project_id, file_path, blocks, signed)
+    
+    async def remove_indexed_file(self, project_id: str, file_path: str):
+        """Drop a deleted file from the near-duplicate index"""
+        self._index_versions.pop((project_id, file_path), None)
+        self.similarity_index.remove_file(project_id, file_path)
+    
+    async def remove_indexed_project(self, project_id: str):
+        """Drop every file of a deleted project from the near-duplicate index"""
+        for key in [key for key in self._index_versions if key[0] == project_id]:
+            del self._index_versions[key]
+        self.similarity_index.remove_project(project_id)
+    
+    async def sync_index(self, db) -> int:
+        """
+        Bring this process's index up to date with the stored project files.
+        
+        The first call indexes every project; later calls re-index files saved
+        since the previous sync (by any worker) and drop deleted files and
+        projects.  Returns the number of files indexed.
+        """
+        async with self._index_sync_lock:
+            since = self._index_synced_at
+            started = datetime.utcnow()
+            query = {} if since is None else {"updated_at": {"$gte": since}}
+            indexed = 0
+            async for project in db.projects.find(query, {"files": 1}):
+                project_id = str(project["_id"])
+                files = project.get("files", [])
+                for file_path in self.similarity_index.files(project_id) - {f["path"] for f in files}:
+                    await self.remove_indexed_file(project_id, file_path)
+                for file_data in files:
+                    updated_at = file_data.get("updated_at")
+                    if since is None or updated_at is None or updated_at >= since:
+                        await self.index_file(project_id, file_data["path"], file_data.get("content", ""))
+                        indexed += 1
+            if since is not None:
+                stored = {str(project["_id"]) async for project in db.projects.find({}, {"_id": 1})}
+                for project_id in self.similarity_index.projects() - stored:
+                    await self.remove_indexed_project(project_id)
+            self._index_synced_at = started
+            return indexed
+    
+    async def find_similar_code(self, code: str, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Find indexed blocks similar to a snippet, in one project or across all projects"""
+        return self.similarity_index.query(code, project_id=project_id, threshold=self.similarity_threshold)
+    
+    async def find_near_duplicates(self, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Near-duplicate block pairs from the incremental index"""
+        return self.similarity_index.duplicate_pairs(project_id=project_id, threshold=self.similarity_threshold)
+    
     async def _detect_architectural_patterns(self, codebase: Dict[str, str]) -> List[Dict[str, Any]]:
         """Detect architectural patterns like MVC, Repository, etc."""
         patterns = []
@@ -395,22 +474,6 @@ class PatternIntelligence:
         self.similarity_threshold = 0.8
         self.min_block_size = 5  # Minimum lines for code block
     
-    def _create_code_fingerprint(self, code: str) -> str:
-        """Create fingerprint for code block"""
-        # Normalize code by removing whitespace and comments
-        normalized = self._normalize_code(code)
-        return hashlib.md5(normalized.encode()).hexdigest()
-    
-    def _normalize_code(self, code: str) -> str:
-        """Normalize code for comparison"""
-        # Remove comments, normalize whitespace
-        lines = []
-        for line in code.split('\n'):
-            stripped = line.strip()
-            if stripped and not stripped.startswith('//') and not stripped.startswith('#'):
-                lines.append(stripped)
-        return '\n'.join(lines)
-    
     def _is_component_file(self, file_path: str) -> bool:
         """Check if file is likely a component"""
         component_indicators = ['.component.', '.jsx', '.tsx', '.vue']
@@ -581,7 +644,7 @@ class PatternIntelligence:
     
     async def _find_duplicate_code_blocks(self, codebase: Dict[str, str]) -> List[Dict[str, Any]]:
         """Find duplicate code blocks across files"""
-        return []
+        return await self._detect_code_duplication(codebase)
     
     async def _group_duplicates_by_similarity(self, duplicates: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
         """Group duplicates by similarity"""
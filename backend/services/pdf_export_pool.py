@@ -0,0 +1,163 @@
+"""
+Process pool for rendering presentation PDFs.
+
+Laying out and compressing a 100-slide deck takes long enough to stall
+every other request on the event loop, so renders run in spawned worker
+processes.  Workers write the PDF straight to the on-disk cache and only
+the file size comes back across the process boundary.
+
+- a bounded number of pending renders (``PdfExportQueueFull`` when exceeded)
+- identical in-flight exports share one render
+- output is cached on disk under a hash of the deck content and theme,
+  evicting the least recently used files beyond ``cache_size``; ``open``
+  hands out a file handle, so eviction cannot break a streaming download
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, BinaryIO, Dict, Optional
+
+from services import pdf_renderer
+
+logger = logging.getLogger(__name__)
+
+
+class PdfExportQueueFull(Exception):
+    """Raised when too many PDF renders are already pending"""
+
+
+def _render_job(deck: Dict[str, Any], path: str) -> int:
+    """Worker entry point: render to a temporary file, then move it into place"""
+    partial = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(partial, "wb") as out:
+            size = pdf_renderer.render_deck(deck, out)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return size
+
+
+class PdfExportPool:
+    """Off-loop PDF rendering with a bounded queue and content-hash file cache"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_size: Optional[int] = None,
+    ):
+        self.max_workers = max_workers if max_workers is not None else int(
+            os.getenv("PDF_EXPORT_WORKERS", min(2, os.cpu_count() or 1)))
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv("PDF_EXPORT_MAX_PENDING", 16))
+        self.cache_dir = cache_dir or os.getenv(
+            "PDF_EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "aether_presentation_pdfs"))
+        self.cache_size = cache_size if cache_size is not None else int(os.getenv("PDF_EXPORT_CACHE_SIZE", 256))
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "rejected": 0}
+
+    @staticmethod
+    def content_key(deck: Dict[str, Any]) -> str:
+        canonical = json.dumps(deck, sort_keys=True, default=str, separators=(",", ":"))
+        return hashlib.sha256(f"{pdf_renderer.RENDERER_VERSION}\0{canonical}".encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    @property
+    def pending(self) -> int:
+        return len(self._inflight)
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        if self._executor is None:
+            # Spawned workers only import services.pdf_renderer, not the app
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def render(self, deck: Dict[str, Any]) -> str:
+        """Path of the rendered PDF for ``deck``, rendering it off the event loop if needed"""
+        key = self.content_key(deck)
+        path = self.path_for(key)
+        if key not in self._inflight and os.path.exists(path):
+            # Files left by an earlier process are reused as well
+            self._remember(key, path)
+            self.stats["hits"] += 1
+            return path
+
+        task = self._inflight.get(key)
+        if task is None:
+            if len(self._inflight) >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise PdfExportQueueFull(f"{len(self._inflight)} PDF exports already pending")
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(self._run(key, deck, path))
+            self._inflight[key] = task
+        # A client disconnecting mid-export does not cancel a render others may share
+        return await asyncio.shield(task)
+
+    async def open(self, deck: Dict[str, Any], attempts: int = 3) -> BinaryIO:
+        """
+        The rendered PDF for ``deck``, opened for reading.
+
+        The file is opened without yielding to the event loop, so a later
+        eviction only unlinks it and the handle keeps reading the content.
+        """
+        for attempt in range(attempts):
+            path = await self.render(deck)
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                # Another render finished and evicted it before this waiter resumed
+                if attempt == attempts - 1:
+                    raise
+
+    async def _run(self, key: str, deck: Dict[str, Any], path: str) -> str:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        try:
+            size = await loop.run_in_executor(self._get_executor(), _render_job, deck, path)
+        except BrokenProcessPool:
+            logger.error("PDF export worker died; restarting pool")
+            self._executor = None
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        logger.info(f"📄 Rendered {len(deck.get('slides', []))}-slide PDF ({size / 1024:.0f}KB)")
+        self._remember(key, path)
+        return path
+
+    def _remember(self, key: str, path: str):
+        self._cache[key] = path
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            _, evicted = self._cache.popitem(last=False)
+            try:
+                # Responses already streaming keep their open handle
+                os.remove(evicted)
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,268 @@
+"""
+Pure-Python PDF rendering of presentation decks.
+
+Writes a PDF 1.4 document with one landscape page per slide using the
+standard Helvetica fonts, so no font files or native libraries are
+needed.  Pages are written to the output as they are laid out and their
+content streams are Flate-compressed, so memory stays proportional to
+one slide rather than the whole deck.
+
+Decks are plain dicts (see ``deck_from_presentation``) so they can be
+sent to worker processes.
+"""
+
+import zlib
+from datetime import datetime
+from io import BytesIO
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+# Bump when the layout changes so cached exports are re-rendered
+RENDERER_VERSION = "1"
+
+PAGE_WIDTH = 960
+PAGE_HEIGHT = 540
+MARGIN = 60
+
+TITLE_SIZE = 32
+BODY_SIZE = 18
+FOOTER_SIZE = 10
+LINE_GAP = 1.35
+
+# (background, accent, text) per presentation theme, as RGB in 0..1
+THEMES = {
+    "professional": ((1, 1, 1), (0.15, 0.33, 0.62), (0.13, 0.16, 0.2)),
+    "modern": ((0.97, 0.98, 1), (0.39, 0.4, 0.95), (0.12, 0.14, 0.22)),
+    "creative": ((1, 0.98, 0.95), (0.93, 0.35, 0.45), (0.2, 0.15, 0.2)),
+    "minimalist": ((1, 1, 1), (0.2, 0.2, 0.2), (0.1, 0.1, 0.1)),
+    "corporate": ((0.96, 0.97, 0.98), (0.05, 0.25, 0.45), (0.1, 0.12, 0.16)),
+    "startup": ((0.09, 0.1, 0.16), (0.2, 0.83, 0.6), (0.95, 0.96, 0.98)),
+}
+
+# Advance widths (1/1000 em) of printable ASCII in the standard Helvetica AFMs
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_FONTS = {"F1": ("Helvetica", _HELVETICA), "F2": ("Helvetica-Bold", _HELVETICA_BOLD)}
+
+# Content keys that only make sense in the web viewer
+_SKIPPED_KEYS = {"logo", "icon"}
+
+
+def deck_from_presentation(presentation) -> Dict[str, Any]:
+    """The parts of a ``GeneratedPresentation`` the PDF depends on"""
+    return {
+        "title": presentation.title,
+        "theme": getattr(presentation.theme, "value", presentation.theme),
+        "presenter_name": presentation.presenter_name,
+        "client_name": presentation.client_name,
+        "slides": [
+            {"title": slide.title, "type": slide.type, "content": slide.content, "order": slide.order}
+            for slide in sorted(presentation.slides, key=lambda slide: slide.order)
+        ],
+    }
+
+
+def _encode(text: str) -> bytes:
+    """WinAnsi bytes for a standard font; characters it cannot show are dropped"""
+    return text.encode("cp1252", errors="ignore")
+
+
+def _text_width(data: bytes, font: str, size: float) -> float:
+    widths = _FONTS[font][1]
+    total = 0
+    for byte in data:
+        total += widths[byte - 32] if 32 <= byte <= 126 else 556
+    return total * size / 1000
+
+
+def _wrap(text: str, font: str, size: float, width: float) -> List[bytes]:
+    lines, current = [], b""
+    for word in _encode(text).split():
+        candidate = current + b" " + word if current else word
+        if current and _text_width(candidate, font, size) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _label(key: str) -> str:
+    return key.replace("_", " ").strip().capitalize()
+
+
+def _item_text(item: Any) -> str:
+    if isinstance(item, dict):
+        return " — ".join(str(value) for key, value in item.items() if key not in _SKIPPED_KEYS and value)
+    return str(item)
+
+
+def slide_lines(content: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """Slide content flattened to ``(style, text)`` lines: heading, text or bullet"""
+    lines = []
+    for key, value in content.items():
+        if key in _SKIPPED_KEYS or value in (None, "", [], {}):
+            continue
+        if isinstance(value, list):
+            lines.append(("heading", _label(key)))
+            lines.extend(("bullet", _item_text(item)) for item in value)
+        elif isinstance(value, dict):
+            lines.append(("heading", _label(key)))
+            lines.extend(("bullet", f"{_label(k)}: {_item_text(v)}") for k, v in value.items() if k not in _SKIPPED_KEYS)
+        else:
+            lines.append(("text", f"{_label(key)}: {value}"))
+    return lines
+
+
+def _color(rgb, stroke: bool = False) -> bytes:
+    return b"%.3f %.3f %.3f %s" % (*rgb, b"RG" if stroke else b"rg")
+
+
+def _escape(data: bytes) -> bytes:
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _text(font: str, size: float, x: float, y: float, data: bytes) -> bytes:
+    return b"BT /%s %.1f Tf %.2f %.2f Td (%s) Tj ET" % (font.encode(), size, x, y, _escape(data))
+
+
+def _slide_stream(deck: Dict[str, Any], slide: Dict[str, Any], number: int, total: int) -> bytes:
+    background, accent, text = THEMES.get(deck.get("theme"), THEMES["professional"])
+    body_width = PAGE_WIDTH - 2 * MARGIN
+    ops = [
+        _color(background), b"0 0 %d %d re f" % (PAGE_WIDTH, PAGE_HEIGHT),
+        _color(accent), b"0 %d %d 10 re f" % (PAGE_HEIGHT - 10, PAGE_WIDTH),
+    ]
+
+    y = PAGE_HEIGHT - MARGIN - TITLE_SIZE
+    ops.append(_color(accent))
+    for line in _wrap(slide.get("title", ""), "F2", TITLE_SIZE, body_width)[:2]:
+        ops.append(_text("F2", TITLE_SIZE, MARGIN, y, line))
+        y -= TITLE_SIZE * LINE_GAP
+    y -= BODY_SIZE * 0.5
+
+    ops.append(_color(text))
+    bottom = MARGIN + FOOTER_SIZE * 2
+    for style, content in slide_lines(slide.get("content", {})):
+        font, indent = ("F2", 0) if style == "heading" else ("F1", 24 if style == "bullet" else 0)
+        wrapped = _wrap(content, font, BODY_SIZE, body_width - indent)
+        for index, line in enumerate(wrapped):
+            if y < bottom:
+                ops.append(_text("F1", BODY_SIZE, MARGIN + indent, y, b"\x85"))
+                break
+            if style == "bullet" and index == 0:
+                ops.append(_text("F1", BODY_SIZE, MARGIN + 6, y, b"\x95"))
+            ops.append(_text(font, BODY_SIZE, MARGIN + indent, y, line))
+            y -= BODY_SIZE * LINE_GAP
+        if y < bottom:
+            break
+
+    footer = " · ".join(part for part in (deck.get("title"), deck.get("presenter_name")) if part)
+    page_label = _encode(f"{number} / {total}")
+    ops += [
+        _color(text),
+        _text("F1", FOOTER_SIZE, MARGIN, MARGIN / 2, _encode(footer)),
+        _text("F1", FOOTER_SIZE, PAGE_WIDTH - MARGIN - _text_width(page_label, "F1", FOOTER_SIZE), MARGIN / 2, page_label),
+    ]
+    return b"\n".join(ops)
+
+
+class _PdfWriter:
+    """Writes numbered objects straight to ``out`` and remembers their offsets"""
+
+    def __init__(self, out: BinaryIO):
+        self.out = out
+        self.position = 0
+        self.offsets: Dict[int, int] = {}
+        self.next_number = 1
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data: bytes):
+        self.out.write(data)
+        self.position += len(data)
+
+    def reserve(self) -> int:
+        number = self.next_number
+        self.next_number += 1
+        return number
+
+    def add(self, body: bytes, number: int = None) -> int:
+        number = number or self.reserve()
+        self.offsets[number] = self.position
+        self._write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        return number
+
+    def add_stream(self, data: bytes) -> int:
+        compressed = zlib.compress(data, 6)
+        return self.add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(compressed), compressed))
+
+    def finish(self, root: int, info: int):
+        xref = self.position
+        count = self.next_number
+        entries = [b"0000000000 65535 f \n"] + [b"%010d 00000 n \n" % self.offsets[n] for n in range(1, count)]
+        self._write(b"xref\n0 %d\n%s" % (count, b"".join(entries)))
+        self._write(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, root, info, xref))
+
+
+def _literal(text: str) -> bytes:
+    return b"(" + _escape(_encode(text)) + b")"
+
+
+def render_deck(deck: Dict[str, Any], out: BinaryIO) -> int:
+    """Write the deck as a PDF to ``out``; returns the number of bytes written"""
+    writer = _PdfWriter(out)
+    catalog, pages = writer.reserve(), writer.reserve()
+    fonts = {
+        name: writer.add(b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % base.encode())
+        for name, (base, _) in _FONTS.items()
+    }
+    resources = b"<< /Font << %s >> >>" % b" ".join(b"/%s %d 0 R" % (name.encode(), number) for name, number in fonts.items())
+
+    slides = deck.get("slides", [])
+    kids = []
+    for number, slide in enumerate(slides, start=1):
+        contents = writer.add_stream(_slide_stream(deck, slide, number, len(slides)))
+        kids.append(writer.add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>"
+            % (pages, PAGE_WIDTH, PAGE_HEIGHT, resources, contents)
+        ))
+
+    writer.add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)), pages)
+    writer.add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages, catalog)
+    info = writer.add(b"<< /Title %s /Author %s /Producer (Aether AI) /CreationDate (D:%s) >>" % (
+        _literal(deck.get("title", "")), _literal(deck.get("presenter_name") or ""),
+        datetime.utcnow().strftime("%Y%m%d%H%M%SZ").encode(),
+    ))
+    writer.finish(catalog, info)
+    return writer.position
+
+
+def render_deck_bytes(deck: Dict[str, Any]) -> bytes:
+    out = BytesIO()
+    render_deck(deck, out)
+    return out.getvalue()
+
+
+def iter_handle(handle: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Read an already opened PDF in chunks, closing it when done"""
+    with handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
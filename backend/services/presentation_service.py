@@ -5,11 +5,15 @@ Handles automated client presentation generation and demo creation.
 
 import json
 import uuid
-from typing import Dict, List, Optional, Any
+from typing import BinaryIO, Dict, List, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from services.pdf_export_pool import PdfExportPool
+from services.pdf_renderer import deck_from_presentation
+from services.shared_state import PickleCodec, get_shared_state
+
 class PresentationTheme(str, Enum):
     PROFESSIONAL = "professional"
     MODERN = "modern"
@@ -62,6 +66,7 @@ class GeneratedPresentation:
     presentation_url: str
     pdf_url: str
     video_url: Optional[str]
+    theme: PresentationTheme = PresentationTheme.PROFESSIONAL
 
 class PresentationService:
     """Service for generating automated client presentations and demos."""
@@ -69,7 +74,8 @@ class PresentationService:
     def __init__(self, db_wrapper=None):
         self.db_wrapper = db_wrapper
         self.templates = {}
-        self.presentations = {}
+        self.presentations = get_shared_state().map("presentations", codec=PickleCodec())
+        self.pdf_exports = PdfExportPool()
         self.is_initialized = False
     
     async def initialize(self):
@@ -115,15 +121,16 @@ class PresentationService:
             client_name=client_name,
             presentation_url=f"/presentations/{presentation_id}/view",
             pdf_url=f"/presentations/{presentation_id}/pdf",
-            video_url=f"/presentations/{presentation_id}/video" if presentation_type == PresentationType.PRODUCT_SHOWCASE else None
+            video_url=f"/presentations/{presentation_id}/video" if presentation_type == PresentationType.PRODUCT_SHOWCASE else None,
+            theme=theme
         )
         
-        self.presentations[presentation_id] = presentation
+        await self.presentations.set(presentation_id, presentation)
         return presentation
     
     async def get_presentation(self, presentation_id: str) -> Optional[GeneratedPresentation]:
         """Get a generated presentation by ID."""
-        return self.presentations.get(presentation_id)
+        return await self.presentations.get(presentation_id)
     
     async def list_templates(
         self,
@@ -199,13 +206,30 @@ class PresentationService:
     async def export_presentation_to_pdf(self, presentation_id: str) -> str:
         """Export presentation to PDF format."""
         
-        presentation = self.presentations.get(presentation_id)
+        await self.render_presentation_pdf(presentation_id)
+        return f"/api/presentations/presentations/{presentation_id}/download/pdf"
+    
+    async def render_presentation_pdf(self, presentation_id: str) -> str:
+        """Render the presentation in the PDF worker pool and return the cached file path."""
+        
+        presentation = await self.presentations.get(presentation_id)
         if not presentation:
             raise ValueError("Presentation not found")
         
-        # In a real implementation, this would generate an actual PDF
-        # For now, return a placeholder URL
-        return f"/api/presentations/{presentation_id}/download/pdf"
+        return await self.pdf_exports.render(deck_from_presentation(presentation))
+    
+    async def open_presentation_pdf(self, presentation_id: str) -> BinaryIO:
+        """Render the presentation if needed and return the cached PDF opened for streaming."""
+        
+        presentation = await self.presentations.get(presentation_id)
+        if not presentation:
+            raise ValueError("Presentation not found")
+        
+        return await self.pdf_exports.open(deck_from_presentation(presentation))
+    
+    def shutdown(self):
+        """Stop the PDF worker processes."""
+        self.pdf_exports.shutdown()
     
     async def create_video_walkthrough(
         self,
@@ -214,7 +238,7 @@ class PresentationService:
     ) -> str:
         """Create an automated video walkthrough of the presentation."""
         
-        presentation = self.presentations.get(presentation_id)
+        presentation = await self.presentations.get(presentation_id)
         if not presentation:
             raise ValueError("Presentation not found")
         
@@ -225,7 +249,7 @@ class PresentationService:
     async def get_presentation_analytics(self, presentation_id: str) -> Dict[str, Any]:
         """Get analytics for a presentation."""
         
-        presentation = self.presentations.get(presentation_id)
+        presentation = await self.presentations.get(presentation_id)
         if not presentation:
             return {"error": "Presentation not found"}
         
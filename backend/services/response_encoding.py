@@ -0,0 +1,196 @@
+"""
+Serialization and compression negotiation for API responses.
+
+Responses are encoded with orjson by default, or as MessagePack when the
+client's ``Accept`` header prefers it, and compressed with brotli, zstd
+or gzip (in that order of preference, among what the client accepts and
+what is installed) once they exceed a size threshold.  Responses marked
+immutable are compressed once at a higher level and served from an LRU
+of pre-compressed bodies afterwards.
+
+orjson, msgpack, brotli and zstandard are optional: without them the
+stdlib json encoder and gzip are used, and MessagePack is not offered.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ALIASES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+# Bodies smaller than this gain less from compression than it costs
+MINIMUM_COMPRESS_SIZE = 1024
+
+# Preference order when the client accepts several encodings equally
+_ENCODING_PREFERENCE = ("br", "zstd", "gzip")
+
+# Compression levels for per-request bodies and for bodies compressed once and cached
+_LEVELS = {
+    "br": (4, 11),
+    "zstd": (3, 19),
+    "gzip": (5, 9),
+}
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/msgpack", "application/x-msgpack", "application/vnd.msgpack",
+    "application/javascript", "application/xml", "text/",
+)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    installed = {"gzip": True, "br": BROTLI_AVAILABLE, "zstd": ZSTD_AVAILABLE}
+    return tuple(encoding for encoding in _ENCODING_PREFERENCE if installed[encoding])
+
+
+def _default(value: Any) -> Any:
+    """Types the fast encoders do not handle natively"""
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "dict"):
+        return value.dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def dumps_json(content: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_msgpack(content: Any) -> bytes:
+    return msgpack.packb(content, default=_default, datetime=False, use_bin_type=True)
+
+
+def _parse_quality(header: str) -> Dict[str, float]:
+    """``{token: q}`` for a comma separated header with optional ``;q=`` weights"""
+    weights = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[token] = max(quality, weights.get(token, 0.0))
+    return weights
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """MessagePack when the client prefers it over JSON, JSON otherwise"""
+    if not accept or not MSGPACK_AVAILABLE:
+        return JSON_MEDIA_TYPE
+    weights = _parse_quality(accept)
+    msgpack_quality = max((weights.get(alias, 0.0) for alias in _MSGPACK_ALIASES), default=0.0)
+    json_quality = max(weights.get(JSON_MEDIA_TYPE, 0.0), weights.get("application/*", 0.0), weights.get("*/*", 0.0))
+    return MSGPACK_MEDIA_TYPE if msgpack_quality > json_quality else JSON_MEDIA_TYPE
+
+
+def encode_body(content: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return dumps_msgpack(content)
+    return dumps_json(content)
+
+
+def negotiate_content_encoding(accept_encoding: Optional[str],
+                               encodings: Optional[Iterable[str]] = None) -> Optional[str]:
+    """The best of ``encodings`` (default: every installed one) the client accepts, or None for identity"""
+    if not accept_encoding:
+        return None
+    weights = _parse_quality(accept_encoding)
+    wildcard = weights.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available_encodings() if encodings is None else encodings:
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.lower().startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, cacheable: bool = False) -> bytes:
+    level = _LEVELS[encoding][1 if cacheable else 0]
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class PrecompressedCache:
+    """LRU of compressed bodies for immutable responses, keyed by content hash"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_or_compress(self, body: bytes, encoding: str) -> bytes:
+        # Hashing costs a small fraction of max-level compression, and unlike an
+        # ETag cannot collide between different resources
+        key = (hashlib.sha1(body).hexdigest(), encoding)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return cached
+        self.stats["misses"] += 1
+        compressed = compress(body, encoding, cacheable=True)
+        self._entries[key] = compressed
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return compressed
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,326 @@
+"""
+Warm process pool for sandboxed code execution.
+
+Spawning an interpreter per run makes start-up the bulk of every short
+experiment, and a bare subprocess is only bounded by a wall-clock
+timeout.  The pool keeps pre-imported ``services/sandbox_worker.py``
+processes running and hands each job to an idle one, with:
+
+- per-job hard limits on wall time, CPU seconds, memory, processes,
+  open files, written file size and output bytes (``SandboxLimits``)
+- a private temporary directory per job, removed afterwards
+- stdout/stderr streamed as they are produced (``stream``) or collected
+  (``run``), cut off at the output cap
+- workers recycled after ``max_jobs_per_worker`` jobs and after any job
+  that hit a limit, with a replacement started in the background
+- a bounded number of waiting jobs (``SandboxQueueFull`` when exceeded)
+
+When the backend runs as root, jobs drop to ``nobody`` unless
+``SANDBOX_UID`` says otherwise; the kernel does not apply the process
+limit to root, and it is counted across all jobs running as that uid.
+"""
+
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import sys
+import tempfile
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+# Chunks are 16KB before JSON escaping
+STREAM_LIMIT = 1024 * 1024
+
+
+class SandboxQueueFull(Exception):
+    """Raised when too many executions are already waiting for a worker"""
+
+
+class SandboxWorkerError(Exception):
+    """Raised when a worker process dies or cannot be started"""
+
+
+@dataclass
+class SandboxLimits:
+    """Per-job resource limits; memory is on top of the warm interpreter"""
+
+    wall_seconds: float = 10.0
+    cpu_seconds: float = 5.0
+    memory_mb: int = 256
+    max_processes: int = 32
+    max_open_files: int = 64
+    max_output_bytes: int = 64 * 1024
+    max_file_bytes: int = 16 * 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> "SandboxLimits":
+        defaults = cls()
+        values = {}
+        for field in dataclasses.fields(cls):
+            raw = os.getenv(f"SANDBOX_{field.name.upper()}")
+            values[field.name] = type(getattr(defaults, field.name))(raw) if raw else getattr(defaults, field.name)
+        return cls(**values)
+
+    def merged(self, overrides: Optional[Union["SandboxLimits", Dict[str, Any]]]) -> "SandboxLimits":
+        if overrides is None:
+            return self
+        if isinstance(overrides, SandboxLimits):
+            return overrides
+        known = {field.name for field in dataclasses.fields(self)}
+        return dataclasses.replace(self, **{k: v for k, v in overrides.items() if k in known and v is not None})
+
+
+def _default_uid() -> Optional[int]:
+    configured = os.getenv("SANDBOX_UID")
+    if configured:
+        return int(configured)
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        import pwd
+        try:
+            return pwd.getpwnam("nobody").pw_uid
+        except KeyError:
+            logger.warning("Sandbox jobs run as root: no 'nobody' user and SANDBOX_UID is not set")
+    return None
+
+
+class _Worker:
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.jobs = 0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    async def send(self, message: Dict[str, Any]):
+        self.process.stdin.write((json.dumps(message) + "\n").encode())
+        await self.process.stdin.drain()
+
+    async def receive(self) -> Dict[str, Any]:
+        line = await self.process.stdout.readline()
+        if not line:
+            raise SandboxWorkerError(f"sandbox worker {self.pid} exited")
+        return json.loads(line)
+
+    async def stop(self, timeout: float = 2.0):
+        if self.process.returncode is not None:
+            return
+        try:
+            # The worker exits when its stdin closes
+            self.process.stdin.close()
+            await asyncio.wait_for(self.process.wait(), timeout)
+        except (asyncio.TimeoutError, OSError):
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+            await self.process.wait()
+
+
+class SandboxPool:
+    """Pre-forked interpreters that run untrusted snippets under rlimits"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_jobs_per_worker: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        limits: Optional[SandboxLimits] = None,
+        root: Optional[str] = None,
+        uid: Optional[int] = -1,
+    ):
+        self.workers = workers if workers is not None else int(os.getenv("SANDBOX_WORKERS", min(4, os.cpu_count() or 1)))
+        self.max_jobs_per_worker = max_jobs_per_worker if max_jobs_per_worker is not None else int(
+            os.getenv("SANDBOX_MAX_JOBS_PER_WORKER", 200))
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv("SANDBOX_MAX_PENDING", 64))
+        self.limits = limits or SandboxLimits.from_env()
+        self.root = root or os.getenv("SANDBOX_ROOT") or tempfile.gettempdir()
+        # -1 picks the default; None runs jobs as the current user
+        self.uid = _default_uid() if uid == -1 else uid
+
+        self._idle: Optional[asyncio.Queue] = None
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._background = set()
+        self.stats = {"executions": 0, "limit_breaches": 0, "recycled": 0, "worker_failures": 0, "rejected": 0}
+
+    async def start(self):
+        """Warm every worker up front rather than on the first executions"""
+        self._queue()
+        missing = self.workers - self._size
+        self._size += missing
+        results = await asyncio.gather(*(self._spawn() for _ in range(missing)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                self._size -= 1
+                logger.error(f"Sandbox worker failed to start: {result}")
+            else:
+                self._idle.put_nowait(result)
+
+    def _queue(self) -> asyncio.Queue:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+        return self._idle
+
+    async def _spawn(self) -> _Worker:
+        args = [sys.executable, WORKER_SCRIPT, "--root", self.root]
+        if self.uid is not None:
+            args += ["--uid", str(self.uid)]
+        process = await asyncio.create_subprocess_exec(
+            *args, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, limit=STREAM_LIMIT,
+        )
+        worker = _Worker(process)
+        try:
+            ready = await asyncio.wait_for(worker.receive(), 30)
+        except (asyncio.TimeoutError, SandboxWorkerError, ValueError) as e:
+            await worker.stop(0)
+            raise SandboxWorkerError(f"sandbox worker did not start: {e}")
+        if not ready.get("subreaper"):
+            logger.debug("Sandbox worker cannot adopt orphaned job processes on this platform")
+        return worker
+
+    async def _acquire(self) -> _Worker:
+        if self._closed:
+            raise SandboxWorkerError("sandbox pool is shut down")
+        idle = self._queue()
+        if idle.empty() and self._size < self.workers:
+            self._size += 1
+            try:
+                return await self._spawn()
+            except BaseException:
+                self._size -= 1
+                raise
+        if self._waiting >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise SandboxQueueFull(f"{self._waiting} sandbox executions already waiting")
+        self._waiting += 1
+        try:
+            return await idle.get()
+        finally:
+            self._waiting -= 1
+
+    def _release(self, worker: _Worker, recycle: bool):
+        if not recycle and not self._closed and worker.process.returncode is None:
+            self._idle.put_nowait(worker)
+            return
+        self.stats["recycled"] += 1
+        self._background_task(self._replace(worker))
+
+    def _background_task(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _replace(self, worker: _Worker):
+        await worker.stop()
+        if self._closed:
+            self._size -= 1
+            return
+        try:
+            self._idle.put_nowait(await self._spawn())
+        except Exception as e:
+            # The next acquire spawns inline while the pool is below size
+            self._size -= 1
+            logger.error(f"Could not replace sandbox worker: {e}")
+
+    async def _drain_cancelled(self, worker: _Worker, job_id: str):
+        """Stop an abandoned job and keep the worker if it acknowledges in time"""
+        try:
+            await worker.send({"cancel": job_id})
+            while True:
+                event = await asyncio.wait_for(worker.receive(), 5)
+                if event.get("done") and event.get("id") == job_id:
+                    break
+        except Exception:
+            self.stats["worker_failures"] += 1
+            self._release(worker, recycle=True)
+            return
+        self._release(worker, recycle=False)
+
+    async def stream(
+        self,
+        code: str,
+        language: str = "python",
+        limits: Optional[Union[SandboxLimits, Dict[str, Any]]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield ``{"stream", "data"}`` chunks as the job writes them, then the ``done`` summary"""
+        job_limits = self.limits.merged(limits)
+        worker = await self._acquire()
+        job_id = uuid.uuid4().hex
+        finished = False
+        try:
+            await worker.send({"id": job_id, "language": language, "code": code,
+                               "limits": dataclasses.asdict(job_limits)})
+            while True:
+                event = await worker.receive()
+                if event.get("id") != job_id:
+                    continue
+                if event.get("done"):
+                    finished = True
+                    worker.jobs += 1
+                    self.stats["executions"] += 1
+                    breached = event.get("limit") is not None
+                    if breached:
+                        self.stats["limit_breaches"] += 1
+                    self._release(worker, recycle=breached or worker.jobs >= self.max_jobs_per_worker)
+                    event.pop("id", None)
+                    yield event
+                    return
+                yield {"stream": event["stream"], "data": event["data"]}
+        except (SandboxWorkerError, OSError, ValueError) as e:
+            finished = True
+            self.stats["worker_failures"] += 1
+            self._release(worker, recycle=True)
+            raise SandboxWorkerError(str(e)) from e
+        finally:
+            if not finished:
+                self._background_task(self._drain_cancelled(worker, job_id))
+
+    async def run(
+        self,
+        code: str,
+        language: str = "python",
+        limits: Optional[Union[SandboxLimits, Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """Run to completion and return the summary with ``output`` and ``errors`` collected"""
+        chunks = {"stdout": [], "stderr": []}
+        result: Dict[str, Any] = {}
+        async for event in self.stream(code, language, limits):
+            if event.get("done"):
+                result = event
+            else:
+                chunks[event["stream"]].append(event["data"])
+        result.pop("done", None)
+        result["output"] = "".join(chunks["stdout"])
+        errors = "".join(chunks["stderr"])
+        if result.get("error"):
+            errors += result.pop("error")
+        result["errors"] = errors
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "workers": self._size,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "waiting": self._waiting,
+            "uid": self.uid,
+            "limits": dataclasses.asdict(self.limits),
+            **self.stats,
+        }
+
+    async def shutdown(self):
+        self._closed = True
+        if self._idle is not None:
+            while not self._idle.empty():
+                worker = self._idle.get_nowait()
+                self._size -= 1
+                await worker.stop()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
@@ -0,0 +1,428 @@
+"""
+Warm interpreter for the sandbox execution pool.
+
+Started by ``services.sandbox_pool`` as a plain script (it imports nothing
+from the application) and kept alive between jobs.  Interpreter start-up
+and the common standard library imports are paid once; every job then
+runs in a child forked from this process, which
+
+- becomes its own session, so the whole job can be killed as a group
+- gets a fresh private temporary directory as its working directory
+- applies hard ``setrlimit`` limits for CPU seconds, address space,
+  processes, open files, written file size and core dumps
+- optionally drops to an unprivileged uid (``--uid``), without which
+  the process limit is not enforced for root
+
+Python snippets are executed in the forked child directly; other
+languages ``exec`` their runtime from it.  Output is streamed back while
+the job runs and cut off at a byte cap.  This process is registered as a
+child subreaper, so anything a job leaves behind is re-parented here and
+killed before the next job starts.
+
+Protocol: one JSON document per line.  Jobs arrive on stdin as
+``{"id", "language", "code", "limits"}`` and ``{"cancel": id}``; stdout
+carries ``{"ready": pid}`` once, then ``{"id", "stream", "data"}`` chunks
+and a final ``{"id", "done": true, ...}`` per job.
+"""
+
+import argparse
+import builtins
+import codecs
+import ctypes
+import io
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+# Imported up front so snippets using them start instantly in the forked child
+PRELOAD = (
+    "asyncio", "base64", "bisect", "collections", "contextlib", "copy", "csv", "dataclasses", "datetime",
+    "decimal", "enum", "fractions", "functools", "hashlib", "heapq", "itertools", "json", "math",
+    "operator", "random", "re", "statistics", "string", "textwrap", "typing", "unittest", "uuid",
+)
+
+RUNTIMES = {
+    "javascript": (["node", "main.js"], "main.js"),
+    "typescript": (["node", "main.ts"], "main.ts"),
+}
+
+EXIT_MEMORY = 120
+EXIT_SETUP = 121
+CHUNK_SIZE = 16 * 1024
+PR_SET_CHILD_SUBREAPER = 36
+
+
+def _set_subreaper() -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def _resident_bytes() -> int:
+    """Current address space size, so the memory limit is on top of the warm interpreter"""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class Channel:
+    """Line-delimited JSON over raw file descriptors, readable without blocking"""
+
+    def __init__(self, fd_in: int = 0, fd_out: int = 1):
+        self.fd_in = fd_in
+        self.fd_out = fd_out
+        self._buffer = b""
+        self.closed = False
+
+    def send(self, message: dict):
+        data = (json.dumps(message) + "\n").encode()
+        while data:
+            data = data[os.write(self.fd_out, data):]
+
+    def _read(self) -> bool:
+        chunk = os.read(self.fd_in, 65536)
+        if not chunk:
+            self.closed = True
+            return False
+        self._buffer += chunk
+        return True
+
+    def _pop(self):
+        line, sep, rest = self._buffer.partition(b"\n")
+        if not sep:
+            return None
+        self._buffer = rest
+        return json.loads(line)
+
+    def receive(self):
+        """Block for the next message; ``None`` once the pool closes stdin"""
+        while True:
+            message = self._pop()
+            if message is not None:
+                return message
+            if not self._read():
+                return None
+
+    def pending(self):
+        """Messages that arrived while a job is running"""
+        messages = []
+        if self._read():
+            message = self._pop()
+            while message is not None:
+                messages.append(message)
+                message = self._pop()
+        return messages
+
+
+def _apply_limits(limits: dict, exec_runtime: bool):
+    def hard(name, value):
+        resource.setrlimit(name, (value, value))
+
+    cpu = max(1, int(limits["cpu_seconds"] + 0.999))
+    # SIGXCPU at the soft limit, SIGKILL a second later if it is handled
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    memory = int(limits["memory_mb"]) * 1024 * 1024
+    if exec_runtime:
+        # JIT runtimes reserve far more address space than they use; cap the data segment instead
+        hard(resource.RLIMIT_DATA, memory)
+    else:
+        hard(resource.RLIMIT_AS, _resident_bytes() + memory)
+    hard(resource.RLIMIT_NOFILE, int(limits["max_open_files"]))
+    hard(resource.RLIMIT_FSIZE, int(limits["max_file_bytes"]))
+    hard(resource.RLIMIT_CORE, 0)
+    if hasattr(resource, "RLIMIT_NPROC"):
+        hard(resource.RLIMIT_NPROC, int(limits["max_processes"]))
+
+
+def _child(job: dict, workdir: str, out_w: int, err_w: int, uid):
+    """Runs in the forked job process and never returns"""
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(out_w, 1)
+    os.dup2(err_w, 2)
+    # Drops the pool's pipes and anything else inherited from the worker
+    os.closerange(3, resource.getrlimit(resource.RLIMIT_NOFILE)[0])
+    os.chdir(workdir)
+
+    # CPython ignores these; jobs should die of them like any other process
+    for sig in (signal.SIGPIPE, signal.SIGXFSZ):
+        signal.signal(sig, signal.SIG_DFL)
+
+    language = job.get("language", "python")
+    runtime = RUNTIMES.get(language)
+    env = {"PATH": os.environ.get("PATH", "/usr/bin:/bin"), "HOME": workdir, "TMPDIR": workdir, "LANG": "C.UTF-8"}
+
+    if runtime is not None:
+        argv, filename = runtime
+        with open(filename, "w", encoding="utf-8") as handle:
+            handle.write(job["code"])
+
+    _apply_limits(job["limits"], exec_runtime=runtime is not None)
+    if uid is not None:
+        os.setgroups([])
+        os.setgid(uid)
+        os.setuid(uid)
+
+    if runtime is not None:
+        os.execvpe(argv[0], argv, env)
+
+    os.environ.clear()
+    os.environ.update(env)
+    sys.stdin = open(os.devnull)
+    sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False), encoding="utf-8", line_buffering=True)
+    sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False), encoding="utf-8", line_buffering=True)
+    sys.argv = ["main.py"]
+    tempfile.tempdir = workdir
+    status = 0
+    try:
+        namespace = {"__name__": "__main__", "__builtins__": builtins, "__file__": "main.py"}
+        exec(compile(job["code"], "main.py", "exec"), namespace)
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except MemoryError:
+        sys.stderr.write("MemoryError: sandbox memory limit exceeded\n")
+        status = EXIT_MEMORY
+    except BaseException as e:
+        # Skip this frame so the traceback starts at the snippet
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        status = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(status)
+
+
+def _descendants(pgid: int):
+    """Processes still in the job's group or re-parented to this worker"""
+    me = os.getpid()
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        # fields[0] is the state, then ppid and pgrp
+        if fields[0] != "Z" and (int(fields[1]) == me or int(fields[2]) == pgid):
+            found.append(int(entry))
+    return found
+
+
+def _reap():
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def _kill_strays(pgid: int) -> int:
+    """Kill whatever the job left running; returns how many processes were found"""
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+        alive = True
+    except (ProcessLookupError, PermissionError):
+        alive = False
+    if not alive:
+        try:
+            # With the subreaper set, escaped descendants are our children
+            if os.waitpid(-1, os.WNOHANG) == (0, 0):
+                alive = True
+        except ChildProcessError:
+            pass
+    if not alive or not os.path.isdir("/proc"):
+        _reap()
+        return 0
+
+    killed = set()
+    for _ in range(100):
+        strays = _descendants(pgid)
+        if not strays:
+            break
+        for pid in strays:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            killed.add(pid)
+        _reap()
+        time.sleep(0.005)
+    _reap()
+    return max(len(killed), 1)
+
+
+def run_job(channel: Channel, job: dict, root: str, uid) -> dict:
+    job_id = job["id"]
+    limits = job["limits"]
+    if job.get("language", "python") != "python" and job.get("language") not in RUNTIMES:
+        return {"id": job_id, "done": True, "exit_code": 1, "limit": None, "truncated": False,
+                "duration": 0.0, "cpu_time": 0.0, "error": f"Unsupported language: {job.get('language')}"}
+
+    workdir = tempfile.mkdtemp(prefix="job_", dir=root)
+    os.chmod(workdir, 0o700)
+    if uid is not None:
+        os.chown(workdir, uid, uid)
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    started = time.perf_counter()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _child(job, workdir, out_w, err_w, uid)
+        except BaseException:
+            try:
+                traceback.print_exc()
+            finally:
+                os._exit(EXIT_SETUP)
+    os.close(out_w)
+    os.close(err_w)
+
+    streams = {
+        out_r: ("stdout", codecs.getincrementaldecoder("utf-8")("replace")),
+        err_r: ("stderr", codecs.getincrementaldecoder("utf-8")("replace")),
+    }
+    deadline = started + float(limits["wall_seconds"])
+    budget = int(limits["max_output_bytes"])
+    sent = 0
+    limit = None
+    status = None
+    usage = None
+
+    def kill():
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    while streams and limit is None:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            limit = "timeout"
+            break
+        watched = list(streams) + ([] if channel.closed else [channel.fd_in])
+        ready, _, _ = select.select(watched, [], [], min(remaining, 0.25))
+        if channel.fd_in in ready:
+            if any(message.get("cancel") == job_id for message in channel.pending()) or channel.closed:
+                limit = "cancelled"
+                break
+        for fd in ready:
+            if fd not in streams:
+                continue
+            data = os.read(fd, CHUNK_SIZE)
+            name, decoder = streams[fd]
+            if not data:
+                tail = decoder.decode(b"", final=True)
+                if tail:
+                    channel.send({"id": job_id, "stream": name, "data": tail})
+                os.close(fd)
+                del streams[fd]
+                continue
+            if sent + len(data) > budget:
+                data = data[:budget - sent]
+                limit = "output"
+            sent += len(data)
+            text = decoder.decode(data, final=limit is not None)
+            if text:
+                channel.send({"id": job_id, "stream": name, "data": text})
+            if limit:
+                break
+        if streams and status is None and not ready:
+            # The job may have exited while a background process holds the pipes open
+            waited, raw, rusage = os.wait4(pid, os.WNOHANG)
+            if waited:
+                status, usage = raw, rusage
+                break
+
+    if limit is not None or status is None:
+        kill()
+    if status is None:
+        _, status, usage = os.wait4(pid, 0)
+    for fd in streams:
+        os.close(fd)
+    duration = time.perf_counter() - started
+    strays = _kill_strays(pid)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    cpu_time = usage.ru_utime + usage.ru_stime
+    if os.WIFSIGNALED(status):
+        exit_code = -os.WTERMSIG(status)
+        signum = os.WTERMSIG(status)
+        if limit is None:
+            if signum == signal.SIGXCPU or (signum == signal.SIGKILL and cpu_time >= limits["cpu_seconds"]):
+                limit = "cpu"
+            elif signum == signal.SIGXFSZ:
+                limit = "file_size"
+    else:
+        exit_code = os.WEXITSTATUS(status)
+        if limit is None and exit_code == EXIT_MEMORY and job.get("language", "python") == "python":
+            limit = "memory"
+    if limit is None and strays:
+        limit = "processes"
+
+    return {
+        "id": job_id,
+        "done": True,
+        "exit_code": exit_code,
+        "limit": limit,
+        "truncated": limit == "output",
+        "duration": round(duration, 6),
+        "cpu_time": round(cpu_time, 6),
+        "max_rss_kb": usage.ru_maxrss,
+        "output_bytes": sent,
+        "strays": strays,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Sandbox pool worker")
+    parser.add_argument("--root", default=None, help="parent directory for job directories")
+    parser.add_argument("--uid", type=int, default=None, help="run jobs as this uid")
+    args = parser.parse_args(argv)
+
+    for name in PRELOAD:
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+    # Jobs are killed by the worker, not by a terminal
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    subreaper = _set_subreaper()
+
+    channel = Channel()
+    channel.send({"ready": os.getpid(), "subreaper": subreaper})
+    while True:
+        job = channel.receive()
+        if job is None:
+            return 0
+        if "cancel" in job:
+            continue
+        try:
+            result = run_job(channel, job, args.root, args.uid)
+        except Exception as e:
+            result = {"id": job.get("id"), "done": True, "exit_code": 1, "limit": None, "truncated": False,
+                      "duration": 0.0, "cpu_time": 0.0, "error": f"{type(e).__name__}: {e}"}
+        channel.send(result)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,21 @@ Handles SEO meta tags, structured data, sitemap generation, and search optimizat
 
 import json
 import asyncio
-from typing import Dict, List, Optional, Any
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass
+from xml.sax.saxutils import escape
 import re
 
+# sitemaps.org limit per file; larger sitemaps are split behind a sitemap index
+SITEMAP_URL_LIMIT = 50_000
+# <url> elements rendered per yielded chunk
+SITEMAP_CHUNK_SIZE = 1_000
+META_TAG_CACHE_SIZE = 1_024
+
 @dataclass
 class SEOData:
     title: str
@@ -35,6 +45,15 @@ class SitemapEntry:
     change_frequency: str
     priority: float
 
+@dataclass
+class SitemapDocument:
+    """A sitemap file's validators, plus its gzip bytes once a client asked for them"""
+    name: str
+    etag: str
+    last_modified: datetime
+    url_count: int
+    body: Optional[bytes] = None
+
 class SEOService:
     """Service for managing SEO optimization across the platform."""
     
@@ -44,6 +63,13 @@ class SEOService:
         self.page_seo_data = {}
         self.sitemap_entries = []
         
+        # Rendered output caches, invalidated when the underlying data changes
+        self._meta_tag_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._sitemap_documents: Dict[str, SitemapDocument] = {}
+        self._sitemap_builds: Dict[tuple, asyncio.Task] = {}
+        self._sitemap_generation = 0
+        self.sitemap_updated_at = datetime.utcnow()
+        
         # Default SEO configuration
         self.default_config = {
             "site_name": "AI Tempo Platform",
@@ -78,10 +104,34 @@ class SEOService:
         
         return base_seo
     
+    def set_page_seo(self, page_path: str, seo_data: SEOData):
+        """Replace a page's SEO data and drop its cached meta tags."""
+        
+        self.page_seo_data[page_path] = seo_data
+        self._meta_tag_cache.pop(page_path, None)
+    
     async def generate_meta_tags(self, page_path: str, dynamic_data: Optional[Dict[str, Any]] = None) -> str:
         """Generate HTML meta tags for a page."""
         
+        # Static fragments are cached per path; dynamic data is rendered fresh
+        if not dynamic_data:
+            cached = self._meta_tag_cache.get(page_path)
+            if cached is not None:
+                self._meta_tag_cache.move_to_end(page_path)
+                return cached
+        
         seo_data = await self.get_page_seo(page_path, dynamic_data)
+        meta_tags = self._render_meta_tags(seo_data)
+        
+        if not dynamic_data:
+            self._meta_tag_cache[page_path] = meta_tags
+            if len(self._meta_tag_cache) > META_TAG_CACHE_SIZE:
+                self._meta_tag_cache.popitem(last=False)
+        
+        return meta_tags
+    
+    def _render_meta_tags(self, seo_data: SEOData) -> str:
+        """Render the HTML head fragment for resolved SEO data."""
         
         meta_tags = f"""
     <!-- Primary Meta Tags -->
@@ -127,21 +177,171 @@ class SEOService:
         return meta_tags
     
     async def generate_sitemap_xml(self) -> str:
-        """Generate XML sitemap for the website."""
+        """Generate the XML served at /sitemap.xml (a sitemap index once sharded)."""
         
-        sitemap_xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-        sitemap_xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        return "".join(self.iter_sitemap_xml())
+    
+    # =============================================================================
+    # SITEMAP STREAMING & SHARDING
+    # =============================================================================
+    
+    def set_sitemap_entries(self, entries: Iterable[SitemapEntry]):
+        """Replace all sitemap entries and drop cached sitemap files."""
+        
+        self.sitemap_entries = list(entries)
+        self._invalidate_sitemap()
+    
+    def add_sitemap_entries(self, entries: Iterable[SitemapEntry]):
+        """Append sitemap entries and drop cached sitemap files."""
+        
+        # A new list rather than extend(): sitemap builds in worker threads
+        # keep iterating the list they started with
+        self.sitemap_entries = self.sitemap_entries + list(entries)
+        self._invalidate_sitemap()
+    
+    def _invalidate_sitemap(self):
+        self._sitemap_documents.clear()
+        self._sitemap_builds.clear()
+        self._sitemap_generation += 1
+        self.sitemap_updated_at = datetime.utcnow()
+    
+    @property
+    def sitemap_shard_count(self) -> int:
+        return _shard_count(self.sitemap_entries)
+    
+    def _shard_entries(self, shard: int) -> List[SitemapEntry]:
+        return _shard_slice(self.sitemap_entries, shard)
+    
+    def sitemap_shard_url(self, shard: int) -> str:
+        return f"{self.default_config['site_url']}/api/seo/sitemap-{shard + 1}.xml"
+    
+    def iter_sitemap_xml(self, shard: Optional[int] = None) -> Iterator[str]:
+        """
+        Stream /sitemap.xml, or one shard of it, in chunks.
         
-        for entry in self.sitemap_entries:
-            sitemap_xml += '  <url>\n'
-            sitemap_xml += f'    <loc>{entry.url}</loc>\n'
-            sitemap_xml += f'    <lastmod>{entry.last_modified.strftime("%Y-%m-%d")}</lastmod>\n'
-            sitemap_xml += f'    <changefreq>{entry.change_frequency}</changefreq>\n'
-            sitemap_xml += f'    <priority>{entry.priority}</priority>\n'
-            sitemap_xml += '  </url>\n'
+        With more than ``SITEMAP_URL_LIMIT`` entries the root document is a
+        sitemap index and ``shard`` (0-based) selects a urlset file.
+        """
         
-        sitemap_xml += '</urlset>'
-        return sitemap_xml
+        return self._iter_sitemap_xml(self.sitemap_entries, shard)
+    
+    def _iter_sitemap_xml(self, all_entries: List[SitemapEntry], shard: Optional[int]) -> Iterator[str]:
+        if shard is None and _shard_count(all_entries) > 1:
+            yield from self._iter_sitemap_index(all_entries)
+            return
+        
+        entries = _shard_slice(all_entries, shard or 0)
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for start in range(0, len(entries), SITEMAP_CHUNK_SIZE):
+            yield "".join([
+                f'  <url>\n'
+                f'    <loc>{escape(entry.url)}</loc>\n'
+                f'    <lastmod>{entry.last_modified.strftime("%Y-%m-%d")}</lastmod>\n'
+                f'    <changefreq>{entry.change_frequency}</changefreq>\n'
+                f'    <priority>{entry.priority}</priority>\n'
+                f'  </url>\n'
+                for entry in entries[start:start + SITEMAP_CHUNK_SIZE]
+            ])
+        yield '</urlset>'
+    
+    def _iter_sitemap_index(self, all_entries: List[SitemapEntry]) -> Iterator[str]:
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for shard in range(_shard_count(all_entries)):
+            entries = _shard_slice(all_entries, shard)
+            last_modified = max(entry.last_modified for entry in entries)
+            yield (
+                f'  <sitemap>\n'
+                f'    <loc>{escape(self.sitemap_shard_url(shard))}</loc>\n'
+                f'    <lastmod>{last_modified.strftime("%Y-%m-%d")}</lastmod>\n'
+                f'  </sitemap>\n'
+            )
+        yield '</sitemapindex>'
+    
+    def get_sitemap_document(self, shard: Optional[int] = None,
+                             compressed: bool = True) -> Optional[SitemapDocument]:
+        """
+        Sitemap file with its validators, built once per change to the entries.
+        
+        The gzip body is only built when ``compressed`` is set.  This renders
+        (and compresses) the whole file on the calling thread; request
+        handlers use ``load_sitemap_document`` instead.  Returns None for a
+        shard that does not exist.
+        """
+        
+        if shard is not None and not 0 <= shard < self.sitemap_shard_count:
+            return None
+        name = _document_name(shard)
+        document = self._sitemap_documents.get(name)
+        if document is None or (compressed and document.body is None):
+            document = self._build_sitemap_document(self.sitemap_entries, shard, compressed, document)
+            self._sitemap_documents[name] = document
+        return document
+    
+    async def load_sitemap_document(self, shard: Optional[int] = None,
+                                    compressed: bool = True) -> Optional[SitemapDocument]:
+        """
+        ``get_sitemap_document`` with the rendering done in a worker thread.
+        
+        Concurrent requests for the same file share one build, and a build
+        that finishes after the entries changed is returned but not cached.
+        """
+        
+        if shard is not None and not 0 <= shard < self.sitemap_shard_count:
+            return None
+        name = _document_name(shard)
+        document = self._sitemap_documents.get(name)
+        if document is not None and (document.body is not None or not compressed):
+            return document
+        
+        key = (name, compressed)
+        build = self._sitemap_builds.get(key)
+        if build is None:
+            build = asyncio.ensure_future(self._build_in_thread(
+                self.sitemap_entries, self._sitemap_generation, shard, compressed, document))
+            self._sitemap_builds[key] = build
+        return await asyncio.shield(build)
+    
+    async def _build_in_thread(self, entries: List[SitemapEntry], generation: int, shard: Optional[int],
+                               compressed: bool, existing: Optional[SitemapDocument]) -> SitemapDocument:
+        name = _document_name(shard)
+        try:
+            document = await asyncio.to_thread(self._build_sitemap_document, entries, shard, compressed, existing)
+        finally:
+            if self._sitemap_generation == generation:
+                self._sitemap_builds.pop((name, compressed), None)
+        if self._sitemap_generation == generation:
+            cached = self._sitemap_documents.get(name)
+            # Keep a gzip body another build stored meanwhile
+            if cached is None or cached.body is None or document.body is not None:
+                self._sitemap_documents[name] = document
+        return document
+    
+    def _build_sitemap_document(self, entries: List[SitemapEntry], shard: Optional[int], compressed: bool,
+                                existing: Optional[SitemapDocument] = None) -> SitemapDocument:
+        # The ETag hashes the uncompressed XML, so both encodings share it and
+        # identity clients never pay for compression
+        digest = None if existing is not None else hashlib.sha1()
+        # Compress chunk by chunk so the uncompressed XML is never held in full
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compressed else None
+        parts = []
+        for chunk in self._iter_sitemap_xml(entries, shard):
+            data = chunk.encode("utf-8")
+            if digest is not None:
+                digest.update(data)
+            if compressor is not None:
+                parts.append(compressor.compress(data))
+        if compressor is not None:
+            parts.append(compressor.flush())
+        
+        return SitemapDocument(
+            name=_document_name(shard),
+            etag=existing.etag if existing is not None else f'"{digest.hexdigest()}"',
+            last_modified=existing.last_modified if existing is not None else self.sitemap_updated_at,
+            url_count=len(entries) if shard is None else len(_shard_slice(entries, shard)),
+            body=b"".join(parts) if compressed else None
+        )
     
     async def generate_robots_txt(self) -> str:
         """Generate robots.txt file."""
@@ -321,6 +521,7 @@ Crawl-delay: 1"""
             }
         }
         
+        self._meta_tag_cache.clear()
         for path, config in pages.items():
             seo_data = SEOData(
                 title=config["title"],
@@ -350,6 +551,8 @@ Crawl-delay: 1"""
     async def _generate_sitemap(self):
         """Generate sitemap entries."""
         
+        entries = []
+        
         # Main pages
         main_pages = [
             ("/", "daily", 1.0),
@@ -361,12 +564,14 @@ Crawl-delay: 1"""
         ]
         
         for path, change_freq, priority in main_pages:
-            self.sitemap_entries.append(SitemapEntry(
+            entries.append(SitemapEntry(
                 url=f"{self.default_config['site_url']}{path}",
                 last_modified=datetime.utcnow(),
                 change_frequency=change_freq,
                 priority=priority
             ))
+        
+        self.set_sitemap_entries(entries)
     
     def _get_default_seo(self, page_path: str) -> SEOData:
         """Get default SEO data for unknown pages."""
@@ -437,6 +642,15 @@ Crawl-delay: 1"""
 # Global service instance
 seo_service = None
 
+def _shard_count(entries: List[SitemapEntry]) -> int:
+    return max(1, -(-len(entries) // SITEMAP_URL_LIMIT))
+
+def _shard_slice(entries: List[SitemapEntry], shard: int) -> List[SitemapEntry]:
+    return entries[shard * SITEMAP_URL_LIMIT:(shard + 1) * SITEMAP_URL_LIMIT]
+
+def _document_name(shard: Optional[int]) -> str:
+    return "sitemap.xml" if shard is None else f"sitemap-{shard + 1}.xml"
+
 def get_seo_service():
     """Get the global SEO service instance."""
     return seo_service
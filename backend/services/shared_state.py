@@ -0,0 +1,732 @@
+"""
+Shared state for services that must agree across uvicorn workers.
+
+Services keep live state (sessions, executions, contexts, baselines) in
+typed structures obtained from ``get_shared_state()``:
+
+* ``SharedMap`` - keyed values
+* ``SharedTTLMap`` - keyed values that expire
+* ``SharedCounter`` - atomic integer counters, optionally expiring
+* ``SharedList`` - bounded append-only list, oldest entries dropped
+
+Values are encoded on every write (JSON by default, ``PickleCodec`` for
+dataclasses), so objects read back are copies and must be written back
+after they are changed - on every backend, so code that forgets behaves
+the same in tests as in production.  A get-change-set sequence can lose
+another worker's write in between; values that several workers change
+go through ``SharedMap.update``, which retries a compare-and-set until
+the change applies to the latest value.  Three interchangeable backends are
+provided and picked by ``SHARED_STATE_BACKEND``:
+
+* ``memory`` - ``InProcessStateBackend``, the single-worker default
+* ``mmap`` - ``MmapStateBackend``, an append-only log in a memory-mapped
+  file shared by every worker on one host (``SHARED_STATE_PATH``)
+* ``redis`` - ``RedisStateBackend``, for workers on several hosts
+"""
+
+import asyncio
+import base64
+import fcntl
+import inspect
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Generic, List, Optional, Tuple, TypeVar, Union
+
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+class SharedStateFull(Exception):
+    """The mmap store cannot hold its live entries even after compaction"""
+
+
+class SharedStateConflict(Exception):
+    """An update kept losing its compare-and-set to concurrent writers"""
+
+
+# =============================================================================
+# CODECS
+# =============================================================================
+
+class JsonCodec:
+    def encode(self, value: Any) -> str:
+        return json.dumps(value, separators=(",", ":"))
+
+    def decode(self, data: str) -> Any:
+        return json.loads(data)
+
+
+class PickleCodec:
+    """For dataclasses, enums and datetimes; only use with stores you trust"""
+
+    def encode(self, value: Any) -> str:
+        return base64.b64encode(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).decode("ascii")
+
+    def decode(self, data: str) -> Any:
+        return pickle.loads(base64.b64decode(data))
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class _StateView:
+    """
+    The data every backend but Redis holds: namespaced entries with an
+    optional absolute expiry, and bounded lists.  Mutations are expressed
+    as deterministic operations so the mmap backend can log and replay them.
+    """
+
+    def __init__(self, clock: Callable[[], float]):
+        self.clock = clock
+        self.maps: Dict[str, Dict[str, Tuple[Any, Optional[float]]]] = {}
+        self.lists: Dict[str, Deque[str]] = {}
+
+    def get(self, ns: str, field: str) -> Any:
+        entry = self.maps.get(ns, {}).get(field)
+        if entry is None or (entry[1] is not None and entry[1] <= self.clock()):
+            return None
+        return entry[0]
+
+    def items(self, ns: str) -> List[Tuple[str, Any]]:
+        now = self.clock()
+        return [(field, value) for field, (value, expires) in self.maps.get(ns, {}).items()
+                if expires is None or expires > now]
+
+    def expires_at(self, ttl: Optional[float]) -> Optional[float]:
+        return None if ttl is None else self.clock() + ttl
+
+    def incremented(self, ns: str, field: str, delta: int, ttl: Optional[float]) -> list:
+        """The ``set`` operation an increment resolves to; computed once so replay is exact"""
+        entry = self.maps.get(ns, {}).get(field)
+        if entry is None or (entry[1] is not None and entry[1] <= self.clock()):
+            return ["set", ns, field, delta, self.expires_at(ttl)]
+        return ["set", ns, field, entry[0] + delta, entry[1]]
+
+    def apply(self, op: list):
+        kind, ns = op[0], op[1]
+        if kind == "set":
+            self.maps.setdefault(ns, {})[op[2]] = (op[3], op[4])
+        elif kind == "del":
+            self.maps.get(ns, {}).pop(op[2], None)
+        elif kind == "clear":
+            self.maps.pop(ns, None)
+        elif kind == "push":
+            entries = self.lists.get(ns)
+            if entries is None or entries.maxlen != op[3]:
+                entries = self.lists[ns] = deque(entries or (), maxlen=op[3])
+            entries.append(op[2])
+        elif kind == "lclear":
+            self.lists.pop(ns, None)
+
+    def snapshot(self) -> List[list]:
+        """Operations that rebuild the live (unexpired) state"""
+        now = self.clock()
+        ops = [["set", ns, field, value, expires]
+               for ns, entries in self.maps.items()
+               for field, (value, expires) in entries.items()
+               if expires is None or expires > now]
+        ops.extend(["push", ns, value, entries.maxlen]
+                   for ns, entries in self.lists.items() for value in entries)
+        return ops
+
+    def sweep(self):
+        now = self.clock()
+        for entries in self.maps.values():
+            for field in [f for f, (_, expires) in entries.items() if expires is not None and expires <= now]:
+                del entries[field]
+
+
+class InProcessStateBackend:
+    """State held by this process only - correct with a single worker"""
+
+    name = "memory"
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._view = _StateView(clock)
+        self._writes = 0
+
+    def _write(self, op: list):
+        self._view.apply(op)
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            self._view.sweep()
+
+    async def get(self, ns: str, field: str) -> Optional[str]:
+        return self._view.get(ns, field)
+
+    async def set(self, ns: str, field: str, value: str, ttl: Optional[float] = None):
+        self._write(["set", ns, field, value, self._view.expires_at(ttl)])
+
+    async def compare_and_set(self, ns: str, field: str, expected: Optional[str], value: str,
+                              ttl: Optional[float] = None) -> bool:
+        """Write ``value`` only if the field still holds ``expected`` (None: absent)"""
+        if self._view.get(ns, field) != expected:
+            return False
+        self._write(["set", ns, field, value, self._view.expires_at(ttl)])
+        return True
+
+    async def delete(self, ns: str, field: str) -> bool:
+        existed = self._view.get(ns, field) is not None
+        self._write(["del", ns, field])
+        return existed
+
+    async def items(self, ns: str) -> List[Tuple[str, str]]:
+        return self._view.items(ns)
+
+    async def size(self, ns: str) -> int:
+        return len(self._view.items(ns))
+
+    async def clear(self, ns: str):
+        self._write(["clear", ns])
+
+    async def incr(self, ns: str, field: str, delta: int = 1, ttl: Optional[float] = None) -> int:
+        op = self._view.incremented(ns, field, delta, ttl)
+        self._write(op)
+        return op[3]
+
+    async def counter(self, ns: str, field: str) -> int:
+        return self._view.get(ns, field) or 0
+
+    async def push(self, ns: str, value: str, maxlen: int) -> int:
+        self._write(["push", ns, value, maxlen])
+        return len(self._view.lists[ns])
+
+    async def range(self, ns: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        return list(self._view.lists.get(ns, ()))[start:stop]
+
+    async def length(self, ns: str) -> int:
+        return len(self._view.lists.get(ns, ()))
+
+    async def clear_list(self, ns: str):
+        self._write(["lclear", ns])
+
+    async def close(self):
+        pass
+
+
+class MmapStateBackend(InProcessStateBackend):
+    """
+    State shared by every process on the host through a memory-mapped log.
+
+    The file holds a header (magic, generation, end offset) followed by
+    length-prefixed JSON operations.  Each process keeps a local view and,
+    under ``flock``, replays the operations other processes appended since
+    its last call before answering - shared lock for reads, exclusive for
+    writes, so increments and bounded pushes are atomic across workers.
+    When the log is full the writer replaces it with a snapshot of the live
+    entries and bumps the generation, which makes readers rebuild.
+    """
+
+    name = "mmap"
+    MAGIC = b"AESTATE1"
+    HEADER = struct.Struct("<8sQQ")
+    RECORD = struct.Struct("<I")
+    # Back-off while another worker holds the lock, in seconds
+    LOCK_RETRY_DELAY = 0.0002
+    LOCK_RETRY_MAX_DELAY = 0.005
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 64 * 1024 * 1024,
+                 clock: Callable[[], float] = time.time):
+        super().__init__(clock)
+        self.path = path or default_mmap_path()
+        self._thread_lock = threading.Lock()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            size = os.fstat(self._fd).st_size
+            if size < self.HEADER.size or os.pread(self._fd, 8, 0) != self.MAGIC:
+                size = max(capacity, self.HEADER.size + 4096)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self.HEADER.pack(self.MAGIC, 1, self.HEADER.size), 0)
+            self._mmap = mmap.mmap(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._generation = 0
+        self._offset = self.HEADER.size
+        self.compactions = 0
+
+    def _header(self) -> Tuple[int, int]:
+        _, generation, end = self.HEADER.unpack_from(self._mmap, 0)
+        return generation, end
+
+    def _catch_up(self):
+        generation, end = self._header()
+        if generation != self._generation:
+            self._view = _StateView(self._view.clock)
+            self._generation, self._offset = generation, self.HEADER.size
+        while self._offset < end:
+            (length,) = self.RECORD.unpack_from(self._mmap, self._offset)
+            start = self._offset + self.RECORD.size
+            self._view.apply(json.loads(self._mmap[start:start + length]))
+            self._offset = start + length
+
+    @asynccontextmanager
+    async def _locked(self, exclusive: bool):
+        # Neither lock is waited for with a blocking call: another worker
+        # holding the file lock would otherwise stall this worker's event loop
+        delay = self.LOCK_RETRY_DELAY
+        while True:
+            if self._thread_lock.acquire(blocking=False):
+                try:
+                    fcntl.flock(self._fd, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    self._thread_lock.release()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.LOCK_RETRY_MAX_DELAY)
+        try:
+            self._catch_up()
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._thread_lock.release()
+
+    def _append(self, ops: List[list], start: int) -> Optional[int]:
+        """Write records from ``start``; the new end, or None if they do not fit"""
+        offset = start
+        for op in ops:
+            data = json.dumps(op, separators=(",", ":")).encode("utf-8")
+            if offset + self.RECORD.size + len(data) > len(self._mmap):
+                return None
+            self.RECORD.pack_into(self._mmap, offset, len(data))
+            self._mmap[offset + self.RECORD.size:offset + self.RECORD.size + len(data)] = data
+            offset += self.RECORD.size + len(data)
+        return offset
+
+    def _write(self, op: list):
+        """Append ``op`` (caller holds the exclusive lock), compacting when full"""
+        _, end = self._header()
+        new_end = self._append([op], end)
+        if new_end is None:
+            self._view.apply(op)
+            new_end = self._append(self._view.snapshot(), self.HEADER.size)
+            if new_end is None:
+                raise SharedStateFull(f"{self.path} cannot hold the live shared state ({len(self._mmap)} bytes)")
+            self._generation += 1
+            self.compactions += 1
+            self.HEADER.pack_into(self._mmap, 0, self.MAGIC, self._generation, new_end)
+        else:
+            self._view.apply(op)
+            self.HEADER.pack_into(self._mmap, 0, self.MAGIC, self._generation, new_end)
+        self._offset = new_end
+
+    async def get(self, ns: str, field: str) -> Optional[str]:
+        async with self._locked(False):
+            return self._view.get(ns, field)
+
+    async def set(self, ns: str, field: str, value: str, ttl: Optional[float] = None):
+        async with self._locked(True):
+            self._write(["set", ns, field, value, self._view.expires_at(ttl)])
+
+    async def compare_and_set(self, ns: str, field: str, expected: Optional[str], value: str,
+                              ttl: Optional[float] = None) -> bool:
+        async with self._locked(True):
+            if self._view.get(ns, field) != expected:
+                return False
+            self._write(["set", ns, field, value, self._view.expires_at(ttl)])
+            return True
+
+    async def delete(self, ns: str, field: str) -> bool:
+        async with self._locked(True):
+            if self._view.get(ns, field) is None:
+                return False
+            self._write(["del", ns, field])
+            return True
+
+    async def items(self, ns: str) -> List[Tuple[str, str]]:
+        async with self._locked(False):
+            return self._view.items(ns)
+
+    async def size(self, ns: str) -> int:
+        async with self._locked(False):
+            return len(self._view.items(ns))
+
+    async def clear(self, ns: str):
+        async with self._locked(True):
+            self._write(["clear", ns])
+
+    async def incr(self, ns: str, field: str, delta: int = 1, ttl: Optional[float] = None) -> int:
+        async with self._locked(True):
+            op = self._view.incremented(ns, field, delta, ttl)
+            self._write(op)
+            return op[3]
+
+    async def counter(self, ns: str, field: str) -> int:
+        async with self._locked(False):
+            return self._view.get(ns, field) or 0
+
+    async def push(self, ns: str, value: str, maxlen: int) -> int:
+        async with self._locked(True):
+            self._write(["push", ns, value, maxlen])
+            return len(self._view.lists[ns])
+
+    async def range(self, ns: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        async with self._locked(False):
+            return list(self._view.lists.get(ns, ()))[start:stop]
+
+    async def length(self, ns: str) -> int:
+        async with self._locked(False):
+            return len(self._view.lists.get(ns, ()))
+
+    async def clear_list(self, ns: str):
+        async with self._locked(True):
+            self._write(["lclear", ns])
+
+    async def close(self):
+        self._mmap.close()
+        os.close(self._fd)
+
+
+class RedisStateBackend:
+    """
+    State in Redis.  Maps are hashes with a sorted set of expiry times for
+    entries written with a TTL (expired fields are treated as missing and
+    swept on writes and listings), counters are ``INCRBY`` keys with
+    ``EXPIRE``, lists are ``RPUSH`` + ``LTRIM``.
+    """
+
+    name = "redis"
+
+    # KEYS: map, expiry. ARGV: field, has_expected, expected, value, now, ttl ("" for none)
+    COMPARE_AND_SET = """
+local current = redis.call('HGET', KEYS[1], ARGV[1])
+if current then
+    local expires = redis.call('ZSCORE', KEYS[2], ARGV[1])
+    if expires and tonumber(expires) <= tonumber(ARGV[5]) then
+        current = false
+    end
+end
+if ARGV[2] == '1' then
+    if current ~= ARGV[3] then
+        return 0
+    end
+elseif current then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[4])
+if ARGV[6] == '' then
+    redis.call('ZREM', KEYS[2], ARGV[1])
+else
+    redis.call('ZADD', KEYS[2], tonumber(ARGV[5]) + tonumber(ARGV[6]), ARGV[1])
+end
+return 1
+"""
+
+    # KEYS: counter. ARGV: delta, ttl. The TTL is set only when the counter
+    # has none, so it runs from when the counter was created
+    INCR_WITH_TTL = """
+local value = redis.call('INCRBY', KEYS[1], ARGV[1])
+if redis.call('TTL', KEYS[1]) == -1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return value
+"""
+
+    def __init__(self, client, prefix: str = "aether:state:", clock: Callable[[], float] = time.time):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+        self._compare_and_set = None
+        self._incr_with_ttl = None
+
+    def _key(self, kind: str, ns: str, field: str = "") -> str:
+        return f"{self.prefix}{kind}:{ns}" + (f":{field}" if field else "")
+
+    async def _sweep(self, ns: str, limit: Optional[int] = None):
+        expiry = self._key("expiry", ns)
+        if limit is None:
+            expired = await self.client.zrangebyscore(expiry, "-inf", self.clock())
+        else:
+            expired = await self.client.zrangebyscore(expiry, "-inf", self.clock(), start=0, num=limit)
+        if expired:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.hdel(self._key("map", ns), *expired)
+                pipe.zrem(expiry, *expired)
+                await pipe.execute()
+
+    async def get(self, ns: str, field: str) -> Optional[str]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hget(self._key("map", ns), field)
+            pipe.zscore(self._key("expiry", ns), field)
+            value, expires = await pipe.execute()
+        if expires is not None and expires <= self.clock():
+            return None
+        return value
+
+    async def set(self, ns: str, field: str, value: str, ttl: Optional[float] = None):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key("map", ns), field, value)
+            if ttl is None:
+                pipe.zrem(self._key("expiry", ns), field)
+            else:
+                pipe.zadd(self._key("expiry", ns), {field: self.clock() + ttl})
+            await pipe.execute()
+        if ttl is not None:
+            await self._sweep(ns, limit=100)
+
+    async def compare_and_set(self, ns: str, field: str, expected: Optional[str], value: str,
+                              ttl: Optional[float] = None) -> bool:
+        # One Lua script, so the comparison and the write are atomic on the server
+        if self._compare_and_set is None:
+            self._compare_and_set = self.client.register_script(self.COMPARE_AND_SET)
+        applied = await self._compare_and_set(
+            keys=[self._key("map", ns), self._key("expiry", ns)],
+            args=[field, "0" if expected is None else "1", expected or "", value, self.clock(),
+                  "" if ttl is None else ttl],
+        )
+        return bool(applied)
+
+    async def delete(self, ns: str, field: str) -> bool:
+        present = await self.get(ns, field) is not None
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hdel(self._key("map", ns), field)
+            pipe.zrem(self._key("expiry", ns), field)
+            await pipe.execute()
+        return present
+
+    async def items(self, ns: str) -> List[Tuple[str, str]]:
+        await self._sweep(ns)
+        return list((await self.client.hgetall(self._key("map", ns))).items())
+
+    async def size(self, ns: str) -> int:
+        await self._sweep(ns)
+        return await self.client.hlen(self._key("map", ns))
+
+    async def clear(self, ns: str):
+        await self.client.delete(self._key("map", ns), self._key("expiry", ns))
+
+    async def incr(self, ns: str, field: str, delta: int = 1, ttl: Optional[float] = None) -> int:
+        key = self._key("counter", ns, field)
+        if ttl is None:
+            return int(await self.client.incrby(key, delta))
+        # A script rather than EXPIRE NX, which needs Redis 7
+        if self._incr_with_ttl is None:
+            self._incr_with_ttl = self.client.register_script(self.INCR_WITH_TTL)
+        return int(await self._incr_with_ttl(keys=[key], args=[delta, max(1, int(ttl))]))
+
+    async def counter(self, ns: str, field: str) -> int:
+        value = await self.client.get(self._key("counter", ns, field))
+        return int(value) if value is not None else 0
+
+    async def push(self, ns: str, value: str, maxlen: int) -> int:
+        key = self._key("list", ns)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, value)
+            pipe.ltrim(key, -maxlen, -1)
+            length, _ = await pipe.execute()
+        return min(length, maxlen)
+
+    async def range(self, ns: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        if stop == 0:
+            return []
+        return await self.client.lrange(self._key("list", ns), start, -1 if stop is None else stop - 1)
+
+    async def length(self, ns: str) -> int:
+        return await self.client.llen(self._key("list", ns))
+
+    async def clear_list(self, ns: str):
+        await self.client.delete(self._key("list", ns))
+
+    async def close(self):
+        await self.client.close()
+
+
+def default_mmap_path() -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "aether-shared-state")
+
+
+# =============================================================================
+# TYPED STRUCTURES
+# =============================================================================
+
+class SharedMap(Generic[V]):
+    def __init__(self, state: "SharedState", name: str, codec=None):
+        self.state = state
+        self.name = name
+        self.codec = codec or JsonCodec()
+
+    async def get(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        data = await self.state.backend.get(self.name, key)
+        return default if data is None else self.codec.decode(data)
+
+    async def set(self, key: str, value: V):
+        await self.state.backend.set(self.name, key, self.codec.encode(value))
+
+    async def update(self, key: str, change: Callable[[Optional[V]], Union[V, Awaitable[V]]],
+                     attempts: int = 20) -> V:
+        """
+        Apply ``change`` to the current value (None when missing) and store
+        what it returns, atomically with respect to other writers.
+
+        ``change`` may be a coroutine function and may run several times:
+        when another worker wrote the key in between, it is re-run on the
+        newer value.  Raises ``SharedStateConflict`` after ``attempts``.
+        """
+        for attempt in range(attempts):
+            data = await self.state.backend.get(self.name, key)
+            value = change(None if data is None else self.codec.decode(data))
+            if inspect.isawaitable(value):
+                value = await value
+            if await self.state.backend.compare_and_set(self.name, key, data, self.codec.encode(value),
+                                                         self._ttl()):
+                return value
+            # Let the writer that won finish before re-reading
+            await asyncio.sleep(0.001 * attempt)
+        raise SharedStateConflict(f"Update of {self.name}[{key!r}] lost {attempts} times to concurrent writers")
+
+    def _ttl(self) -> Optional[float]:
+        return None
+
+    async def contains(self, key: str) -> bool:
+        return await self.state.backend.get(self.name, key) is not None
+
+    async def delete(self, key: str) -> bool:
+        return await self.state.backend.delete(self.name, key)
+
+    async def items(self) -> List[Tuple[str, V]]:
+        return [(key, self.codec.decode(data)) for key, data in await self.state.backend.items(self.name)]
+
+    async def values(self) -> List[V]:
+        return [value for _, value in await self.items()]
+
+    async def keys(self) -> List[str]:
+        return [key for key, _ in await self.state.backend.items(self.name)]
+
+    async def size(self) -> int:
+        return await self.state.backend.size(self.name)
+
+    async def clear(self):
+        await self.state.backend.clear(self.name)
+
+
+class SharedTTLMap(SharedMap[V]):
+    """Entries disappear ``ttl`` seconds after they were last written"""
+
+    def __init__(self, state: "SharedState", name: str, ttl: float, codec=None):
+        super().__init__(state, name, codec)
+        self.ttl = ttl
+
+    async def set(self, key: str, value: V, ttl: Optional[float] = None):
+        await self.state.backend.set(self.name, key, self.codec.encode(value), ttl or self.ttl)
+
+    def _ttl(self) -> Optional[float]:
+        return self.ttl
+
+
+class SharedCounter:
+    """Named integer counters; with ``ttl`` a counter restarts from zero that long after it was created"""
+
+    def __init__(self, state: "SharedState", name: str, ttl: Optional[float] = None):
+        self.state = state
+        self.name = name
+        self.ttl = ttl
+
+    async def incr(self, key: str = "value", delta: int = 1) -> int:
+        return await self.state.backend.incr(self.name, key, delta, self.ttl)
+
+    async def get(self, key: str = "value") -> int:
+        return await self.state.backend.counter(self.name, key)
+
+
+class SharedList(Generic[V]):
+    """Append-only list keeping the newest ``maxlen`` entries"""
+
+    def __init__(self, state: "SharedState", name: str, maxlen: int, codec=None):
+        self.state = state
+        self.name = name
+        self.maxlen = maxlen
+        self.codec = codec or JsonCodec()
+
+    async def append(self, value: V) -> int:
+        return await self.state.backend.push(self.name, self.codec.encode(value), self.maxlen)
+
+    async def items(self, start: int = 0, stop: Optional[int] = None) -> List[V]:
+        return [self.codec.decode(data) for data in await self.state.backend.range(self.name, start, stop)]
+
+    async def size(self) -> int:
+        return await self.state.backend.length(self.name)
+
+    async def clear(self):
+        await self.state.backend.clear_list(self.name)
+
+
+# =============================================================================
+# SHARED STATE
+# =============================================================================
+
+class SharedState:
+    """Factory for the typed structures; the backend can be swapped until first use"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or InProcessStateBackend()
+        self.structures: Dict[str, str] = {}
+
+    def _register(self, name: str, kind: str):
+        registered = self.structures.setdefault(name, kind)
+        if registered != kind:
+            raise ValueError(f"Shared state '{name}' is already a {registered}")
+
+    def map(self, name: str, codec=None) -> SharedMap:
+        self._register(name, "map")
+        return SharedMap(self, name, codec)
+
+    def ttl_map(self, name: str, ttl: float, codec=None) -> SharedTTLMap:
+        self._register(name, "map")
+        return SharedTTLMap(self, name, ttl, codec)
+
+    def counter(self, name: str, ttl: Optional[float] = None) -> SharedCounter:
+        self._register(name, "counter")
+        return SharedCounter(self, name, ttl)
+
+    def list(self, name: str, maxlen: int, codec=None) -> SharedList:
+        self._register(name, "list")
+        return SharedList(self, name, maxlen, codec)
+
+    async def initialize(self):
+        """Pick the backend from SHARED_STATE_BACKEND, falling back to in-process state"""
+        choice = os.getenv("SHARED_STATE_BACKEND", "memory").lower()
+        try:
+            if choice == "mmap":
+                size_mb = int(os.getenv("SHARED_STATE_SIZE_MB", "64"))
+                self.backend = MmapStateBackend(os.getenv("SHARED_STATE_PATH"), size_mb * 1024 * 1024)
+                logger.info(f"Shared state in memory-mapped log {self.backend.path}")
+            elif choice == "redis":
+                if not REDIS_AVAILABLE:
+                    raise RuntimeError("redis package not installed")
+                client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"), decode_responses=True)
+                await client.ping()
+                self.backend = RedisStateBackend(client)
+                logger.info("Shared state in Redis")
+        except Exception as e:
+            logger.warning(f"Shared state backend '{choice}' unavailable, state is per-worker: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {"backend": self.backend.name, "structures": dict(self.structures)}
+
+
+_shared_state: Optional[SharedState] = None
+
+
+def get_shared_state() -> SharedState:
+    global _shared_state
+    if _shared_state is None:
+        _shared_state = SharedState()
+    return _shared_state
@@ -0,0 +1,167 @@
+"""
+Indexable skiplist ordered by ``(score, member)``.
+
+Shared by the leaderboards and the template marketplace search index.
+"""
+
+import random
+from typing import Iterator, List, Optional, Tuple
+
+
+class _SkipNode:
+    __slots__ = ("score", "member", "forward", "span")
+
+    def __init__(self, score: float, member: str, level: int):
+        self.score = score
+        self.member = member
+        self.forward: List[Optional["_SkipNode"]] = [None] * level
+        self.span: List[int] = [0] * level
+
+
+class SkipList:
+    """
+    Indexable skiplist ordered by ``(score, member)`` ascending.
+
+    Every forward link records how many nodes it skips, which makes
+    rank lookups and positional access O(log n) - the same layout Redis
+    uses for its sorted sets.
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self._head = _SkipNode(float("-inf"), "", self.MAX_LEVEL)
+        self._level = 1
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _random_level(self) -> int:
+        level = 1
+        while random.random() < self.P and level < self.MAX_LEVEL:
+            level += 1
+        return level
+
+    @staticmethod
+    def _before(node: _SkipNode, score: float, member: str) -> bool:
+        return node.score < score or (node.score == score and node.member < member)
+
+    def insert(self, score: float, member: str) -> None:
+        update: List[_SkipNode] = [self._head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            # _before inlined: this loop dominates insert cost
+            nxt = node.forward[i]
+            while nxt is not None and (nxt.score < score or (nxt.score == score and nxt.member < member)):
+                rank[i] += node.span[i]
+                node = nxt
+                nxt = node.forward[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                update[i].span[i] = self._length
+            self._level = level
+
+        new_node = _SkipNode(score, member, level)
+        for i in range(level):
+            new_node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = new_node
+            new_node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = (rank[0] - rank[i]) + 1
+
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+
+        self._length += 1
+
+    def remove(self, score: float, member: str) -> bool:
+        update: List[_SkipNode] = [self._head] * self.MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            nxt = node.forward[i]
+            while nxt is not None and (nxt.score < score or (nxt.score == score and nxt.member < member)):
+                node = nxt
+                nxt = node.forward[i]
+            update[i] = node
+
+        target = node.forward[0]
+        if target is None or target.score != score or target.member != member:
+            return False
+
+        for i in range(self._level):
+            if update[i].forward[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].span[i] -= 1
+
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        self._length -= 1
+        return True
+
+    def rank(self, score: float, member: str) -> Optional[int]:
+        """0-based ascending rank of ``(score, member)`` or None if absent"""
+        traversed = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and (
+                self._before(node.forward[i], score, member)
+                or (node.forward[i].score == score and node.forward[i].member == member)
+            ):
+                traversed += node.span[i]
+                node = node.forward[i]
+            if node is not self._head and node.score == score and node.member == member:
+                return traversed - 1
+        return None
+
+    def _node_at(self, index: int) -> Optional[_SkipNode]:
+        """Node at 0-based ascending position"""
+        if index < 0 or index >= self._length:
+            return None
+        traversed = 0
+        node = self._head
+        target = index + 1
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and traversed + node.span[i] <= target:
+                traversed += node.span[i]
+                node = node.forward[i]
+            if traversed == target:
+                return node
+        return None
+
+    def range_by_index(self, start: int, stop: int) -> List[Tuple[str, float]]:
+        """Members at ascending positions ``[start, stop)``"""
+        start = max(0, start)
+        stop = min(stop, self._length)
+        items: List[Tuple[str, float]] = []
+        node = self._node_at(start)
+        while node is not None and len(items) < stop - start:
+            items.append((node.member, node.score))
+            node = node.forward[0]
+        return items
+
+    def count_at_most(self, score: float) -> int:
+        """Number of members whose score is <= ``score``"""
+        traversed = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and node.forward[i].score <= score:
+                traversed += node.span[i]
+                node = node.forward[i]
+        return traversed
+
+    def iter_from(self, index: int = 0) -> Iterator[Tuple[str, float]]:
+        """Lazily walk members in ascending order starting at ``index``"""
+        node = self._node_at(max(0, index))
+        while node is not None:
+            yield node.member, node.score
+            node = node.forward[0]
@@ -1,9 +1,9 @@
 from typing import List, Dict, Any, Optional
-import ast
-import re
 import json
 from datetime import datetime
 from services.ai_service import AIService
+from services.analysis_pool import AnalysisPool, AnalysisQueueFull, AnalysisTimeout
+from services import static_analysis
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,8 +11,9 @@ logger = logging.getLogger(__name__)
 class SmartErrorPrevention:
     """Proactive error detection and prevention service"""
     
-    def __init__(self):
+    def __init__(self, analysis_pool: Optional[AnalysisPool] = None):
         self.ai_service = AIService()
+        self.analysis_pool = analysis_pool or AnalysisPool()
         self.common_patterns = {}
         self.user_error_history = {}
         
@@ -36,13 +37,8 @@ class SmartErrorPrevention:
         try:
             errors = []
             
-            # Static analysis
-            static_errors = await self._static_analysis(code, file_type)
-            errors.extend(static_errors)
-            
-            # Pattern-based detection
-            pattern_errors = await self._pattern_based_detection(code, file_type)
-            errors.extend(pattern_errors)
+            # Static analysis and pattern-based detection run in the worker pool
+            errors.extend(await self.analysis_pool.analyze(code, file_type))
             
             # AI-powered analysis
             ai_errors = await self._ai_error_analysis(code, file_type, user_id)
@@ -53,6 +49,9 @@ class SmartErrorPrevention:
             
             return ranked_errors
             
+        except (AnalysisQueueFull, AnalysisTimeout):
+            # Not "no errors": the caller has to tell the client the analysis did not run
+            raise
         except Exception as e:
             logger.error(f"Failed to analyze code for errors: {e}")
             return []
@@ -172,66 +171,11 @@ class SmartErrorPrevention:
     
     async def _static_analysis(self, code: str, file_type: str) -> List[Dict[str, Any]]:
         """Perform static code analysis"""
-        errors = []
-        
-        if file_type == "python":
-            try:
-                ast.parse(code)
-            except SyntaxError as e:
-                errors.append({
-                    "type": "syntax_error",
-                    "severity": "high",
-                    "message": str(e),
-                    "line": e.lineno,
-                    "column": e.offset
-                })
-        
-        elif file_type in ["javascript", "typescript"]:
-            # Basic JS/TS pattern checks
-            if "var " in code:
-                errors.append({
-                    "type": "best_practice",
-                    "severity": "medium",
-                    "message": "Use 'const' or 'let' instead of 'var'",
-                    "line": code.find("var ") + 1
-                })
-        
-        return errors
+        return static_analysis.static_analysis(code, file_type)
     
     async def _pattern_based_detection(self, code: str, file_type: str) -> List[Dict[str, Any]]:
         """Detect errors based on common patterns"""
-        errors = []
-        
-        # Common mistake patterns
-        patterns = {
-            r'if\s*\([^)]*=\s*[^=]': {
-                "message": "Assignment in if condition, did you mean '=='?",
-                "severity": "high",
-                "type": "logic_error"
-            },
-            r'console\.log\(': {
-                "message": "Remove console.log before production",
-                "severity": "low",
-                "type": "cleanup"
-            },
-            r'debugger;': {
-                "message": "Remove debugger statement before production",
-                "severity": "medium",
-                "type": "cleanup"
-            }
-        }
-        
-        for pattern, error_info in patterns.items():
-            matches = re.finditer(pattern, code, re.IGNORECASE)
-            for match in matches:
-                line_num = code[:match.start()].count('\n') + 1
-                errors.append({
-                    **error_info,
-                    "line": line_num,
-                    "column": match.start() - code.rfind('\n', 0, match.start())
-                })
-        
-        return errors
+        return static_analysis.pattern_based_detection(code, file_type)
     
     async def _ai_error_analysis(
         self,
@@ -286,13 +230,15 @@ class SmartErrorPrevention:
             # Check for unmatched brackets
             brackets = {"(": ")", "[": "]", "{": "}"}
             stack = []
+            lines = None
             
             for i, char in enumerate(code):
                 if char in brackets:
                     stack.append((char, i))
                 elif char in brackets.values():
                     if not stack or brackets[stack[-1][0]] != char:
-                        line_num = code[:i].count('\n') + 1
+                        lines = lines or static_analysis.LineIndex(code)
+                        line_num = lines.locate(i)[0]
                         warnings.append({
                             "type": "syntax_warning",
                             "severity": "medium",
@@ -0,0 +1,198 @@
+"""
+Uniform-grid spatial index for diagram element relationships.
+
+Two diagram elements are related when their positions are closer than
+``CONNECTION_DISTANCE``.  Checking every pair is quadratic, so
+``DiagramLayout`` buckets positions into a grid of square cells with that
+side: an element's neighbours can only be in its own cell or the eight
+around it.  Building the relationships for ``n`` elements is then close to
+linear, and moving an element only re-checks the cells around its old and
+new positions.  Relationship ids, ordering and strengths are the same as
+the pairwise scan produced.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+CONNECTION_DISTANCE = 150.0
+# Strength falls off linearly to its floor at this distance
+STRENGTH_FALLOFF = 300.0
+MIN_STRENGTH = 0.1
+
+Cell = Tuple[int, int]
+
+
+def element_distance(pos1: Dict[str, float], pos2: Dict[str, float]) -> float:
+    return ((pos1["x"] - pos2["x"]) ** 2 + (pos1["y"] - pos2["y"]) ** 2) ** 0.5
+
+
+def connection_strength(distance: float) -> float:
+    return max(MIN_STRENGTH, 1.0 - (distance / STRENGTH_FALLOFF))
+
+
+class SpatialGrid:
+    """Points bucketed into square cells of side ``cell_size``"""
+
+    def __init__(self, cell_size: float):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Set[Any]] = defaultdict(set)
+        self._points: Dict[Any, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, key) -> bool:
+        return key in self._points
+
+    def _cell(self, x: float, y: float) -> Cell:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, key, x: float, y: float):
+        if key in self._points:
+            self.move(key, x, y)
+            return
+        self._points[key] = (x, y)
+        self._cells[self._cell(x, y)].add(key)
+
+    def remove(self, key):
+        x, y = self._points.pop(key)
+        cell = self._cell(x, y)
+        bucket = self._cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self._cells[cell]
+
+    def move(self, key, x: float, y: float):
+        old_cell = self._cell(*self._points[key])
+        new_cell = self._cell(x, y)
+        self._points[key] = (x, y)
+        if old_cell != new_cell:
+            bucket = self._cells[old_cell]
+            bucket.discard(key)
+            if not bucket:
+                del self._cells[old_cell]
+            self._cells[new_cell].add(key)
+
+    def candidates(self, x: float, y: float, radius: float) -> Iterator[Any]:
+        """Keys in every cell overlapping the square of half-side ``radius`` around (x, y)"""
+        size = self.cell_size
+        cells = self._cells
+        for cx in range(int((x - radius) // size), int((x + radius) // size) + 1):
+            for cy in range(int((y - radius) // size), int((y + radius) // size) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
+
+    def cell_pairs(self) -> Iterator[Tuple[Set[Any], Set[Any]]]:
+        """Every cell paired with itself and with each adjacent cell, each adjacent pair once"""
+        cells = self._cells
+        for (cx, cy), bucket in cells.items():
+            yield bucket, bucket
+            for dx, dy in ((1, -1), (1, 0), (1, 1), (0, 1)):
+                other = cells.get((cx + dx, cy + dy))
+                if other:
+                    yield bucket, other
+
+
+class DiagramLayout:
+    """A diagram's elements, their grid and the relationships between nearby elements"""
+
+    def __init__(self, elements: List[Dict[str, Any]], threshold: float = CONNECTION_DISTANCE):
+        self.threshold = threshold
+        self.elements: List[Dict[str, Any]] = []
+        self.grid = SpatialGrid(threshold)
+        self._index_of: Dict[Any, int] = {}
+        self._neighbours: Dict[int, Set[int]] = defaultdict(set)
+        self._relationships: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._ordered: Optional[List[Dict[str, Any]]] = None
+
+        for element in elements:
+            self._place(element)
+        self._connect_all()
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def __contains__(self, element_id) -> bool:
+        return element_id in self._index_of
+
+    def _place(self, element: Dict[str, Any]) -> int:
+        index = len(self.elements)
+        self.elements.append(element)
+        # Later duplicates of an id shadow earlier ones for moves, as a dict lookup would
+        self._index_of[element.get("id")] = index
+        position = element.get("position", {"x": 0, "y": 0})
+        self.grid.insert(index, position["x"], position["y"])
+        return index
+
+    def _connect_all(self):
+        # Cells are as wide as the threshold, so only same or adjacent cells can hold related elements
+        positions = [element.get("position", {"x": 0, "y": 0}) for element in self.elements]
+        threshold = self.threshold
+        for bucket, other_bucket in self.grid.cell_pairs():
+            same = bucket is other_bucket
+            for a in bucket:
+                position = positions[a]
+                for b in other_bucket:
+                    if same and b <= a:
+                        continue
+                    distance = element_distance(position, positions[b])
+                    if distance < threshold:
+                        self._relate(a, b, distance)
+
+    def _connect(self, index: int):
+        elements = self.elements
+        threshold = self.threshold
+        position = elements[index].get("position", {"x": 0, "y": 0})
+        x, y = position["x"], position["y"]
+        for other in self.grid.candidates(x, y, threshold):
+            if other == index:
+                continue
+            distance = element_distance(position, elements[other].get("position", {"x": 0, "y": 0}))
+            if distance < threshold:
+                self._relate(index, other, distance)
+
+    def _relate(self, a: int, b: int, distance: float):
+        i, j = (a, b) if a < b else (b, a)
+        self._neighbours[i].add(j)
+        self._neighbours[j].add(i)
+        self._relationships[(i, j)] = {
+            "id": f"rel_{i}_{j}",
+            "source": self.elements[i]["id"],
+            "target": self.elements[j]["id"],
+            "type": "connection",
+            "strength": connection_strength(distance),
+        }
+        self._ordered = None
+
+    def _disconnect(self, index: int):
+        for other in self._neighbours.pop(index, ()):
+            self._neighbours[other].discard(index)
+            self._relationships.pop((index, other) if index < other else (other, index), None)
+        self._ordered = None
+
+    def relationships(self) -> List[Dict[str, Any]]:
+        """Relationships in the pairwise scan's (source index, target index) order"""
+        if self._ordered is None:
+            self._ordered = [self._relationships[pair] for pair in sorted(self._relationships)]
+        return self._ordered
+
+    def neighbours(self, element_id) -> List[Dict[str, Any]]:
+        index = self._index_of[element_id]
+        return [self.elements[other] for other in sorted(self._neighbours.get(index, ()))]
+
+    def move(self, element_id, position: Dict[str, float]) -> int:
+        """Move one element and re-relate it; returns its new number of relationships"""
+        index = self._index_of[element_id]
+        self._disconnect(index)
+        self.elements[index]["position"] = {"x": position["x"], "y": position["y"]}
+        self.grid.move(index, position["x"], position["y"])
+        self._connect(index)
+        return len(self._neighbours.get(index, ()))
+
+    def add(self, element: Dict[str, Any]) -> int:
+        index = self._place(element)
+        self._connect(index)
+        return index
@@ -0,0 +1,209 @@
+"""
+Synchronous static checks used by smart error prevention.
+
+Nothing in this module touches the database or AI services, so it can be
+imported cheaply inside analysis worker processes.  Pattern rules are
+compiled once at import into groups of rules whose matches cannot
+overlap; each group scans a file in a single pass and match offsets are
+mapped to lines through a newline offset table, so total cost is linear
+in file size plus match count.
+"""
+
+import ast
+import re
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Common mistake patterns
+PATTERN_RULES = {
+    r'if\s*\([^)]*=\s*[^=]': {
+        "message": "Assignment in if condition, did you mean '=='?",
+        "severity": "high",
+        "type": "logic_error"
+    },
+    r'console\.log\(': {
+        "message": "Remove console.log before production",
+        "severity": "low",
+        "type": "cleanup"
+    },
+    r'debugger;': {
+        "message": "Remove debugger statement before production",
+        "severity": "medium",
+        "type": "cleanup"
+    }
+}
+
+
+class Rule(NamedTuple):
+    pattern: str
+    message: str
+    severity: str
+    type: str
+
+
+class LineIndex:
+    """
+    Offsets of every newline in a file, built in one pass.
+
+    ``locate`` maps a character offset to a 1-based (line, column) pair by
+    binary search, instead of counting newlines in the prefix each time.
+    """
+
+    __slots__ = ("_newlines",)
+
+    def __init__(self, code: str):
+        newlines = []
+        position = code.find("\n")
+        while position != -1:
+            newlines.append(position)
+            position = code.find("\n", position + 1)
+        self._newlines = newlines
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        line = bisect_right(self._newlines, offset - 1)
+        line_start = self._newlines[line - 1] if line else -1
+        return line + 1, offset - line_start
+
+
+class RuleGroup:
+    """
+    Rules compiled into one alternation and matched in a single scan.
+
+    Matches within a group do not overlap, so a group should only hold
+    rules whose matches cannot overlap each other; ``compile_rules`` keeps
+    rules that could in separate groups.
+    """
+
+    def __init__(self, name: str, rules: List[Rule], flags: int = re.IGNORECASE):
+        self.name = name
+        self.rules = {f"r{i}": rule for i, rule in enumerate(rules)}
+        self.matcher = re.compile(
+            "|".join(f"(?P<{group}>{rule.pattern})" for group, rule in self.rules.items()),
+            flags,
+        )
+
+    def scan(self, code: str, lines: "LineIndex") -> Iterator[Dict[str, Any]]:
+        for match in self.matcher.finditer(code):
+            rule = self.rules[match.lastgroup]
+            line, column = lines.locate(match.start())
+            yield {
+                "message": rule.message,
+                "severity": rule.severity,
+                "type": rule.type,
+                "line": line,
+                "column": column
+            }
+
+
+_REGEX_METACHARACTERS = set(".^$*+?{}[]|()")
+
+
+def literal_text(pattern: str) -> Optional[str]:
+    """The text a pattern matches if it is a plain (possibly escaped) literal, else None"""
+    text = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            # \d, \s, \b and friends are classes or assertions, not literals
+            if char.isalnum():
+                return None
+            text.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in _REGEX_METACHARACTERS:
+            return None
+        else:
+            text.append(char)
+    return None if escaped or not text else "".join(text)
+
+
+def literals_overlap(first: str, second: str) -> bool:
+    """Whether a match of one literal can share characters with a match of the other"""
+    if first in second or second in first:
+        return True
+    return any(first.endswith(second[:size]) or second.endswith(first[:size])
+               for size in range(1, min(len(first), len(second))))
+
+
+def compile_rules(rules: Dict[str, Dict[str, str]], flags: int = re.IGNORECASE) -> List[RuleGroup]:
+    """
+    Group rules so that no two rules in a group can match overlapping text,
+    and compile each group once.
+
+    Overlap is only decided for literal patterns, which share a group with
+    other literals of the same error type when neither can run into the
+    other.  Any other pattern gets a group of its own, since an
+    alternation would hide its matches behind an earlier rule's.
+    """
+    fold = str.lower if flags & re.IGNORECASE else str
+    grouped: "OrderedDict[str, List[Tuple[List[Rule], List[str]]]]" = OrderedDict()
+    for pattern, info in rules.items():
+        rule = Rule(pattern, info["message"], info["severity"], info["type"])
+        buckets = grouped.setdefault(rule.type, [])
+        literal = literal_text(pattern)
+        if literal is not None:
+            literal = fold(literal)
+            for members, literals in buckets:
+                if literals and not any(literals_overlap(literal, other) for other in literals):
+                    members.append(rule)
+                    literals.append(literal)
+                    break
+            else:
+                buckets.append(([rule], [literal]))
+        else:
+            buckets.append(([rule], []))
+
+    groups = []
+    for name, buckets in grouped.items():
+        for number, (members, _) in enumerate(buckets):
+            groups.append(RuleGroup(name if number == 0 else f"{name}:{number}", members, flags))
+    return groups
+
+
+# Compiled once per process, at import
+RULE_GROUPS = compile_rules(PATTERN_RULES)
+
+
+def static_analysis(code: str, file_type: str) -> List[Dict[str, Any]]:
+    """Perform static code analysis"""
+    errors = []
+
+    if file_type == "python":
+        try:
+            ast.parse(code)
+        except SyntaxError as e:
+            errors.append({
+                "type": "syntax_error",
+                "severity": "high",
+                "message": str(e),
+                "line": e.lineno,
+                "column": e.offset
+            })
+
+    elif file_type in ["javascript", "typescript"]:
+        # Basic JS/TS pattern checks
+        if "var " in code:
+            errors.append({
+                "type": "best_practice",
+                "severity": "medium",
+                "message": "Use 'const' or 'let' instead of 'var'",
+                "line": code.count("\n", 0, code.find("var ")) + 1
+            })
+
+    return errors
+
+
+def pattern_based_detection(code: str, file_type: str) -> List[Dict[str, Any]]:
+    """Detect errors based on common patterns"""
+    lines = LineIndex(code)
+    errors = []
+    for group in RULE_GROUPS:
+        errors.extend(group.scan(code, lines))
+    return errors
+
+
+def analyze(code: str, file_type: str) -> List[Dict[str, Any]]:
+    """Static and pattern-based findings for one file"""
+    return static_analysis(code, file_type) + pattern_based_detection(code, file_type)
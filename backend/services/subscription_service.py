@@ -11,16 +11,21 @@ from models.subscription import (
     is_usage_exceeded
 )
 from models.database import get_database
+from services.analytics_rollups import UsageRollups
+from services.usage_retention import usage_partitions
 
 logger = logging.getLogger(__name__)
 
 class SubscriptionService:
     def __init__(self):
         self.db = None
+        self.usage_rollups = None
     
     async def initialize(self):
         """Initialize the subscription service"""
         self.db = await get_database()
+        self.usage_rollups = UsageRollups(self.db.usage_rollups)
+        await self.usage_rollups.initialize()
         logger.info("✅ Subscription service initialized")
     
     async def create_subscription(self, user_id: str, plan: SubscriptionPlan, 
@@ -211,7 +216,10 @@ class SubscriptionService:
                 "metadata": metadata or {}
             }
             
-            await self.db.usage_records.insert_one(usage_data)
+            # Written to the day's partition so retention can drop whole partitions
+            partition = await usage_partitions.collection_for(self.db, usage_data["timestamp"])
+            await partition.insert_one(usage_data)
+            await self.usage_rollups.record(usage_data)
             
             # Update subscription current usage
             if subscription:
@@ -12,6 +12,8 @@ import uuid
 import hashlib
 from collections import defaultdict
 
+from services.template_search_index import TemplateSearchIndex
+
 logger = logging.getLogger(__name__)
 
 class TemplateCategory(Enum):
@@ -135,6 +137,7 @@ class TemplateMarketplaceComprehensive:
         self.template_collections: Dict[str, TemplateCollection] = {}
         self.user_preferences: Dict[str, Dict[str, Any]] = {}
         self.trending_templates: List[str] = []
+        self.search_index = TemplateSearchIndex()
         
     async def initialize(self):
         """Initialize template marketplace with sample data"""
@@ -198,6 +201,7 @@ class TemplateMarketplaceComprehensive:
         )
         
         self.templates[template_id] = template
+        self.search_index.upsert(template)
         
         logger.info(f"📝 Template submitted: {name} by {author_name}")
         return template_id
@@ -211,6 +215,7 @@ class TemplateMarketplaceComprehensive:
         template = self.templates[template_id]
         template.status = TemplateStatus.PUBLISHED
         template.updated_at = datetime.utcnow()
+        self.search_index.upsert(template)
         
         logger.info(f"✅ Template approved: {template.name}")
         return True
@@ -224,6 +229,7 @@ class TemplateMarketplaceComprehensive:
         template = self.templates[template_id]
         template.status = TemplateStatus.FEATURED
         template.updated_at = datetime.utcnow()
+        self.search_index.upsert(template)
         
         logger.info(f"⭐ Template featured: {template.name}")
         return True
@@ -239,6 +245,7 @@ class TemplateMarketplaceComprehensive:
         # Update download metrics
         template.metrics.downloads += 1
         template.metrics.last_updated = datetime.utcnow()
+        self.search_index.upsert(template)
         
         # Track user preferences for recommendations
         await self._update_user_preferences(user_id, template)
@@ -385,6 +392,7 @@ class TemplateMarketplaceComprehensive:
         )
         
         self.templates[template_id] = template
+        self.search_index.upsert(template)
         self.ai_generated_templates[template_id] = ai_template
         
         logger.info(f"🤖 AI template generated: {template.name}")
@@ -452,62 +460,31 @@ class TemplateMarketplaceComprehensive:
     ) -> Dict[str, Any]:
         """Advanced template search with filtering"""
         
-        # Start with all published templates
-        filtered_templates = [
-            template for template in self.templates.values()
-            if template.status in [TemplateStatus.PUBLISHED, TemplateStatus.FEATURED]
-        ]
-        
-        # Apply filters
-        if query:
-            query_lower = query.lower()
-            filtered_templates = [
-                t for t in filtered_templates
-                if query_lower in t.name.lower() or 
-                query_lower in t.description.lower() or
-                any(query_lower in tag.lower() for tag in t.tags)
-            ]
-        
+        # Facet posting sets are intersected smallest-first; the page is read from a pre-sorted ordering
+        facets = {
+            "status": [TemplateStatus.FEATURED.value] if featured_only
+            else [TemplateStatus.PUBLISHED.value, TemplateStatus.FEATURED.value]
+        }
         if category:
-            filtered_templates = [t for t in filtered_templates if t.category == category]
-        
+            facets["category"] = [category.value]
         if tech_stack:
-            filtered_templates = [t for t in filtered_templates if t.tech_stack == tech_stack]
-        
+            facets["tech_stack"] = [tech_stack.value]
         if difficulty:
-            filtered_templates = [t for t in filtered_templates if t.difficulty == difficulty]
-        
+            facets["difficulty"] = [difficulty.value]
         if tags:
-            filtered_templates = [
-                t for t in filtered_templates
-                if any(tag in t.tags for tag in tags)
-            ]
-        
-        if min_rating:
-            filtered_templates = [
-                t for t in filtered_templates
-                if t.metrics.average_rating >= min_rating
-            ]
-        
+            facets["tag"] = tags
         if free_only:
-            filtered_templates = [t for t in filtered_templates if t.price == 0]
-        
-        if featured_only:
-            filtered_templates = [t for t in filtered_templates if t.status == TemplateStatus.FEATURED]
-        
-        # Sort templates
-        if sort_by == "popularity":
-            filtered_templates.sort(key=lambda x: x.metrics.downloads, reverse=True)
-        elif sort_by == "newest":
-            filtered_templates.sort(key=lambda x: x.created_at, reverse=True)
-        elif sort_by == "rating":
-            filtered_templates.sort(key=lambda x: x.metrics.average_rating, reverse=True)
-        elif sort_by == "name":
-            filtered_templates.sort(key=lambda x: x.name.lower())
-        
-        # Apply pagination
-        total_count = len(filtered_templates)
-        paginated_templates = filtered_templates[offset:offset + limit]
+            facets["price_tier"] = ["free"]
+        
+        page_ids, total_count = self.search_index.search(
+            facets,
+            query=query,
+            min_rating=min_rating,
+            sort_by=sort_by,
+            offset=offset,
+            limit=limit
+        )
+        paginated_templates = [self.templates[template_id] for template_id in page_ids]
         
         return {
             "templates": [asdict(template) for template in paginated_templates],
@@ -844,6 +821,7 @@ class TemplateMarketplaceComprehensive:
         total_rating = sum(r.rating for r in template_reviews)
         template.metrics.ratings_count = len(template_reviews)
         template.metrics.average_rating = total_rating / len(template_reviews)
+        self.search_index.upsert(template)
     
     async def _update_user_preferences(self, user_id: str, template: Template):
         """Update user preferences based on template interaction"""
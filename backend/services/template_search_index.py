@@ -0,0 +1,264 @@
+"""
+Faceted in-memory search index for the template marketplace.
+
+Each facet value (category, tech stack, difficulty, tag, status, price
+tier) keeps a posting set of template ids; a search intersects the sets
+smallest-first.  Query words are looked up in a token index where each
+word matches the start of words in a template's name, description or
+tags.  Popularity, rating, newest and name orderings are kept in
+skiplists updated as templates change, so a page is read by walking the
+ordering (or heap-selecting a small result set) instead of sorting every
+match.
+"""
+
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.skiplist import SkipList
+
+_WORD_RE = re.compile(r"\w+")
+_EMPTY: frozenset = frozenset()
+
+ORDERINGS = ("popularity", "newest", "rating", "name")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _value(field) -> str:
+    return getattr(field, "value", field)
+
+
+class TemplateSearchIndex:
+    """Posting sets per facet value, a prefix-searchable token index and sorted orderings"""
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, Set[str]]] = defaultdict(dict)
+        self._tokens: Dict[str, Set[str]] = {}
+        self._vocabulary: List[str] = []
+        self._orderings: Dict[str, SkipList] = {name: SkipList() for name in ORDERINGS}
+        # Unions of multi-value facet filters, dropped when that facet's postings change
+        self._facet_versions: Dict[str, int] = defaultdict(int)
+        self._union_cache: Dict[Tuple[str, Tuple[str, ...]], Tuple[int, Set[str]]] = {}
+
+        # What is currently indexed per template, so updates only touch what changed
+        self._facets_of: Dict[str, Dict[str, Set[str]]] = {}
+        self._tokens_of: Dict[str, Set[str]] = {}
+        self._keys_of: Dict[str, Dict[str, Tuple[float, str]]] = {}
+        self._ratings: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._facets_of)
+
+    # -------------------------------------------------------------------------
+    # Maintenance
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _facets(template) -> Dict[str, Set[str]]:
+        return {
+            "category": {_value(template.category)},
+            "tech_stack": {_value(template.tech_stack)},
+            "difficulty": {_value(template.difficulty)},
+            "status": {_value(template.status)},
+            "price_tier": {"free" if template.price == 0 else "paid"},
+            "tag": set(template.tags),
+        }
+
+    @staticmethod
+    def _ordering_keys(template) -> Dict[str, Tuple[float, str]]:
+        # Skiplists are ascending, so descending orders use negated scores
+        template_id = template.template_id
+        return {
+            "popularity": (-template.metrics.downloads, template_id),
+            "newest": (-template.created_at.timestamp(), template_id),
+            "rating": (-template.metrics.average_rating, template_id),
+            "name": (0.0, f"{template.name.lower()}\0{template_id}"),
+        }
+
+    def upsert(self, template) -> None:
+        """Index a new template or re-index one whose fields changed"""
+        template_id = template.template_id
+
+        old_facets = self._facets_of.get(template_id, {})
+        new_facets = self._facets(template)
+        for facet, values in new_facets.items():
+            previous = old_facets.get(facet, set())
+            if previous == values:
+                continue
+            self._facet_versions[facet] += 1
+            for value in previous - values:
+                self._discard_posting(self._postings[facet], value, template_id)
+            for value in values - previous:
+                self._postings[facet].setdefault(value, set()).add(template_id)
+        self._facets_of[template_id] = new_facets
+
+        old_tokens = self._tokens_of.get(template_id, set())
+        new_tokens = set(tokenize(template.name)) | set(tokenize(template.description))
+        for tag in template.tags:
+            new_tokens.update(tokenize(tag))
+        for token in old_tokens - new_tokens:
+            self._discard_token(token, template_id)
+        for token in new_tokens - old_tokens:
+            postings = self._tokens.get(token)
+            if postings is None:
+                postings = self._tokens[token] = set()
+                insort(self._vocabulary, token)
+            postings.add(template_id)
+        self._tokens_of[template_id] = new_tokens
+
+        old_keys = self._keys_of.get(template_id, {})
+        new_keys = self._ordering_keys(template)
+        for name, key in new_keys.items():
+            if old_keys.get(name) != key:
+                if name in old_keys:
+                    self._orderings[name].remove(*old_keys[name])
+                self._orderings[name].insert(*key)
+        self._keys_of[template_id] = new_keys
+        self._ratings[template_id] = template.metrics.average_rating
+
+    def remove(self, template_id: str) -> None:
+        for facet, values in self._facets_of.pop(template_id, {}).items():
+            self._facet_versions[facet] += 1
+            for value in values:
+                self._discard_posting(self._postings[facet], value, template_id)
+        for token in self._tokens_of.pop(template_id, set()):
+            self._discard_token(token, template_id)
+        for name, key in self._keys_of.pop(template_id, {}).items():
+            self._orderings[name].remove(*key)
+        self._ratings.pop(template_id, None)
+
+    @staticmethod
+    def _discard_posting(postings: Dict[str, Set[str]], value: str, template_id: str) -> None:
+        members = postings.get(value)
+        if members is not None:
+            members.discard(template_id)
+            if not members:
+                del postings[value]
+
+    def _discard_token(self, token: str, template_id: str) -> None:
+        postings = self._tokens.get(token)
+        if postings is None:
+            return
+        postings.discard(template_id)
+        if not postings:
+            del self._tokens[token]
+            del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    # -------------------------------------------------------------------------
+    # Search
+    # -------------------------------------------------------------------------
+
+    def _facet_postings(self, facet: str, values: Iterable[str]) -> Set[str]:
+        """Templates matching any of ``values``; unions are cached per facet version"""
+        postings = self._postings.get(facet, {})
+        values = tuple(sorted(values))
+        if len(values) == 1:
+            return postings.get(values[0], _EMPTY)
+        version = self._facet_versions[facet]
+        cached = self._union_cache.get((facet, values))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        union = set().union(*(postings.get(value, _EMPTY) for value in values))
+        self._union_cache[(facet, values)] = (version, union)
+        return union
+
+    def _prefix_postings(self, word: str) -> Set[str]:
+        """Templates containing a word that starts with ``word``"""
+        start = bisect_left(self._vocabulary, word)
+        matched: List[Set[str]] = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(word):
+                break
+            matched.append(self._tokens[token])
+        if len(matched) == 1:
+            return matched[0]
+        return set().union(*matched) if matched else _EMPTY
+
+    def search(
+        self,
+        facets: Dict[str, Iterable[str]],
+        query: Optional[str] = None,
+        min_rating: Optional[float] = None,
+        sort_by: str = "popularity",
+        offset: int = 0,
+        limit: int = 20,
+    ) -> Tuple[List[str], int]:
+        """
+        Template ids for one page and the total match count.
+
+        ``facets`` maps a facet name to accepted values; a template must
+        match at least one value of every facet given.
+        """
+        sets = [self._facet_postings(facet, values) for facet, values in facets.items()]
+        if query:
+            sets.extend(self._prefix_postings(word) for word in tokenize(query))
+
+        if sets:
+            sets.sort(key=len)
+            # Posting sets are only read from here on, so a lone filter needs no copy
+            matches = sets[0] if len(sets) == 1 else sets[0].intersection(sets[1])
+            for postings in sets[2:]:
+                if not matches:
+                    break
+                matches.intersection_update(postings)
+        else:
+            matches = set(self._facets_of)
+
+        if min_rating and matches:
+            matches = self._filter_min_rating(matches, min_rating)
+
+        return self._page(matches, sort_by, offset, limit), len(matches)
+
+    def _filter_min_rating(self, matches: Set[str], min_rating: float) -> Set[str]:
+        ordering = self._orderings["rating"]
+        rated = ordering.count_at_most(-min_rating)
+        if rated < len(matches):
+            # Fewer templates clear the bar than matched: walk that prefix of the rating order
+            above = set()
+            for member, _ in ordering.iter_from(0):
+                if len(above) == rated:
+                    break
+                above.add(member)
+            return matches & above
+        ratings = self._ratings
+        return {template_id for template_id in matches if ratings[template_id] >= min_rating}
+
+    def _page(self, matches: Set[str], sort_by: str, offset: int, limit: int) -> List[str]:
+        ordering = self._orderings.get(sort_by)
+        needed = offset + limit
+        if not matches or limit <= 0:
+            return []
+        if ordering is None:
+            return list(matches)[offset:needed]
+
+        # Walking the ordering reads ~needed * N / |matches| entries; heap-selecting reads |matches|
+        if needed * len(ordering) <= len(matches) * len(matches):
+            page: List[str] = []
+            skipped = 0
+            for member, _ in ordering.iter_from(0):
+                template_id = member.rsplit("\0", 1)[-1]
+                if template_id not in matches:
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                page.append(template_id)
+                if len(page) == limit:
+                    break
+            return page
+
+        keys = self._keys_of
+        selected = heapq.nsmallest(needed, matches, key=lambda template_id: keys[template_id][sort_by])
+        return selected[offset:]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "templates": len(self),
+            "tokens": len(self._tokens),
+            "facet_values": {facet: len(values) for facet, values in self._postings.items()},
+        }
@@ -0,0 +1,164 @@
+"""
+Retention for usage records.
+
+Usage records are written to one collection per day (or per week), so
+enforcing retention is a matter of dropping whole partitions that have
+aged out: a metadata operation, independent of how many records they
+hold.  Records in the original unpartitioned ``usage_records``
+collection are removed by ``chunked_delete``, which deletes one ``_id``
+range at a time and pauses between batches instead of issuing a single
+unbounded ``delete_many`` that saturates the primary and its
+replication stream.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+USAGE_COLLECTION = "usage_records"
+
+_PARTITION_RE = re.compile(rf"^{USAGE_COLLECTION}_([dw])(\d{{8}})$")
+_SPANS = {"d": timedelta(days=1), "w": timedelta(weeks=1)}
+
+
+@dataclass
+class CleanupProgress:
+    deleted: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+    last_id: Any = None
+    done: bool = False
+
+
+ProgressCallback = Callable[[CleanupProgress], Union[None, Awaitable[None]]]
+
+
+class UsagePartitions:
+    """Maps timestamps to per-day or per-week usage record collections"""
+
+    def __init__(self, granularity: Optional[str] = None):
+        granularity = granularity or os.getenv("USAGE_PARTITION_GRANULARITY", "day")
+        if granularity not in ("day", "week"):
+            raise ValueError(f"Unknown usage partition granularity: {granularity}")
+        self.granularity = granularity
+        self._code = granularity[0]
+        self._indexed: Set[str] = set()
+
+    def partition_start(self, timestamp: datetime) -> datetime:
+        start = datetime(timestamp.year, timestamp.month, timestamp.day)
+        if self._code == "w":
+            start -= timedelta(days=start.weekday())
+        return start
+
+    def partition_name(self, timestamp: datetime) -> str:
+        return f"{USAGE_COLLECTION}_{self._code}{self.partition_start(timestamp):%Y%m%d}"
+
+    @staticmethod
+    def parse_partition(name: str) -> Optional[Tuple[datetime, datetime]]:
+        """Start and end of the period held by a partition collection, or None"""
+        match = _PARTITION_RE.match(name)
+        if not match:
+            return None
+        start = datetime.strptime(match.group(2), "%Y%m%d")
+        return start, start + _SPANS[match.group(1)]
+
+    def partitions_between(self, start: datetime, end: datetime) -> List[str]:
+        """Partition names covering ``[start, end]``, oldest first"""
+        names = []
+        current = self.partition_start(start)
+        step = _SPANS[self._code]
+        while current <= end:
+            names.append(f"{USAGE_COLLECTION}_{self._code}{current:%Y%m%d}")
+            current += step
+        return names
+
+    async def collection_for(self, db, timestamp: datetime):
+        """The partition collection for ``timestamp``, indexed on first use"""
+        name = self.partition_name(timestamp)
+        collection = db[name]
+        if name not in self._indexed:
+            await collection.create_index([("user_id", 1), ("timestamp", -1)])
+            self._indexed.add(name)
+        return collection
+
+    async def drop_expired(self, db, cutoff: datetime) -> Dict[str, int]:
+        """
+        Drop partitions whose whole period ends at or before ``cutoff``.
+
+        Returns the approximate record count of each dropped partition,
+        read from collection metadata rather than by counting.
+        """
+        dropped = {}
+        for name in sorted(await db.list_collection_names()):
+            bounds = self.parse_partition(name)
+            if bounds is None or bounds[1] > cutoff:
+                continue
+            dropped[name] = await db[name].estimated_document_count()
+            await db.drop_collection(name)
+            self._indexed.discard(name)
+            logger.info(f"Dropped usage partition {name} ({dropped[name]} records)")
+        return dropped
+
+
+async def chunked_delete(
+    collection,
+    query_filter: Dict[str, Any],
+    batch_size: int = 5000,
+    pause: float = 0.05,
+    progress: Optional[ProgressCallback] = None,
+    max_batches: Optional[int] = None,
+) -> CleanupProgress:
+    """
+    Delete documents matching ``query_filter`` in ``_id`` order, one
+    range of at most ``batch_size`` documents per ``delete_many``.
+
+    Each batch boundary is found by skipping ``batch_size - 1`` matches
+    along the ``_id`` index, and ``pause`` seconds are slept between
+    batches so foreground traffic and secondaries can keep up.
+    ``progress`` is called (and awaited, if it returns an awaitable)
+    after every batch.
+    """
+    state = CleanupProgress()
+    start = time.perf_counter()
+
+    while max_batches is None or state.batches < max_batches:
+        id_range: Dict[str, Any] = {} if state.last_id is None else {"$gt": state.last_id}
+        boundary = await collection.find_one(
+            {**query_filter, "_id": id_range} if id_range else query_filter,
+            projection={"_id": 1},
+            sort=[("_id", 1)],
+            skip=batch_size - 1,
+        )
+        if boundary is not None:
+            id_range = {**id_range, "$lte": boundary["_id"]}
+        batch_filter = {**query_filter, "_id": id_range} if id_range else query_filter
+
+        result = await collection.delete_many(batch_filter)
+        state.deleted += result.deleted_count
+        state.batches += 1
+        state.elapsed = time.perf_counter() - start
+        state.done = boundary is None
+        if boundary is not None:
+            state.last_id = boundary["_id"]
+
+        if progress is not None:
+            outcome = progress(state)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+        if state.done:
+            break
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    return state
+
+
+# Shared partition layout for writers and readers of usage records
+usage_partitions = UsagePartitions()
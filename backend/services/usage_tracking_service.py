@@ -6,6 +6,7 @@ import logging
 
 from models.database import get_database
 from services.subscription_service import get_subscription_service
+from services.usage_retention import USAGE_COLLECTION, ProgressCallback, chunked_delete, usage_partitions
 
 logger = logging.getLogger(__name__)
 
@@ -201,17 +202,33 @@ class UsageTrackingService:
             logger.error(f"Failed to get usage warnings: {e}")
             return []
     
-    async def cleanup_old_usage_records(self, days_to_keep: int = 90):
-        """Clean up old usage records to save storage"""
+    async def cleanup_old_usage_records(self, days_to_keep: int = 90, batch_size: int = 5000,
+                                        pause: float = 0.05, progress: Optional[ProgressCallback] = None):
+        """
+        Clean up old usage records to save storage.
+        
+        Expired daily/weekly partitions are dropped outright; records still in
+        the unpartitioned collection are deleted in throttled ``_id`` ranges.
+        """
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
             
-            result = await self.db.usage_records.delete_many({
-                "timestamp": {"$lt": cutoff_date}
-            })
+            dropped = await usage_partitions.drop_expired(self.db, cutoff_date)
             
-            logger.info(f"Cleaned up {result.deleted_count} old usage records")
-            return result.deleted_count
+            legacy = await chunked_delete(
+                self.db.usage_records,
+                {"timestamp": {"$lt": cutoff_date}},
+                batch_size=batch_size,
+                pause=pause,
+                progress=progress
+            )
+            
+            deleted = sum(dropped.values()) + legacy.deleted
+            logger.info(
+                f"Cleaned up {deleted} old usage records "
+                f"({len(dropped)} partitions dropped, {legacy.deleted} deleted in {legacy.batches} batches)"
+            )
+            return deleted
         except Exception as e:
             logger.error(f"Failed to cleanup old usage records: {e}")
             return 0
@@ -219,39 +236,14 @@ class UsageTrackingService:
     async def get_usage_analytics(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """Get usage analytics for a user"""
         try:
-            start_date = datetime.utcnow() - timedelta(days=days)
+            now = datetime.utcnow()
+            start_date = now - timedelta(days=days)
             
-            # Aggregate usage by type and day
-            pipeline = [
-                {
-                    "$match": {
-                        "user_id": user_id,
-                        "timestamp": {"$gte": start_date}
-                    }
-                },
-                {
-                    "$group": {
-                        "_id": {
-                            "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
-                            "usage_type": "$usage_type"
-                        },
-                        "total_amount": {"$sum": "$amount"},
-                        "count": {"$sum": 1}
-                    }
-                },
-                {
-                    "$sort": {"_id.date": 1}
-                }
-            ]
-            
-            results = []
-            async for doc in self.db.usage_records.aggregate(pipeline):
-                results.append({
-                    "date": doc["_id"]["date"],
-                    "usage_type": doc["_id"]["usage_type"],
-                    "total_amount": doc["total_amount"],
-                    "count": doc["count"]
-                })
+            # Whole days and hours come from rollups; raw records are only read
+            # for the partial hours at the edges of the window
+            summary = await self.subscription_service.usage_rollups.summarize(
+                user_id, start_date, now, lambda start, end: self._load_raw_usage(user_id, start, end)
+            )
             
             # Get current subscription info
             subscription = await self.subscription_service.get_user_subscription(user_id)
@@ -261,12 +253,24 @@ class UsageTrackingService:
             
             return {
                 "period": f"Last {days} days",
-                "usage_data": results,
+                "usage_data": summary["usage_data"],
+                "totals": summary["totals"],
+                "by_model": summary["by_model"],
+                "by_endpoint": summary["by_endpoint"],
                 "subscription_info": subscription_info.dict() if subscription_info else None
             }
         except Exception as e:
             logger.error(f"Failed to get usage analytics: {e}")
             return {}
+    
+    async def _load_raw_usage(self, user_id: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """Raw usage records of one user in ``[start, end)``, from every collection that may hold them"""
+        query = {"user_id": user_id, "timestamp": {"$gte": start, "$lt": end}}
+        names = [USAGE_COLLECTION] + usage_partitions.partitions_between(start, end)
+        records = []
+        for name in names:
+            records.extend(await self.db[name].find(query).to_list(length=None))
+        return records
 
 # Singleton instance
 usage_tracking_service = UsageTrackingService()
@@ -0,0 +1,783 @@
+"""
+Version parsing, range matching and dependency resolution.
+
+Understands semver as used by npm (pre-release identifiers, build
+metadata, caret/tilde/X-ranges, hyphen ranges, ``||`` unions) and
+PEP 440 versions and specifiers (epochs, a/b/rc, post and dev releases,
+``~=``, ``==1.4.*``, ``!=``).  Ranges are normalized to sorted interval
+sets so intersection and emptiness checks are cheap, and constraints are
+indexed by package so conflict detection only compares constraints on
+the same package.
+"""
+
+import json
+import os
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "package_snapshot.json")
+
+_SEMVER_RE = re.compile(
+    r"^v?(?P<release>\d+(?:\.\d+)*)"
+    r"(?:-(?P<pre>[0-9A-Za-z.-]+))?"
+    r"(?:\+(?P<build>[0-9A-Za-z.-]+))?$"
+)
+_PEP440_RE = re.compile(
+    r"^v?(?:(?P<epoch>\d+)!)?(?P<release>\d+(?:\.\d+)*)"
+    r"(?:[-_.]?(?P<pre_l>a|b|c|rc|alpha|beta|pre|preview)[-_.]?(?P<pre_n>\d*))?"
+    r"(?:-(?P<post_n1>\d+)|[-_.]?(?P<post_l>post|rev|r)[-_.]?(?P<post_n2>\d*))?"
+    r"(?:[-_.]?(?P<dev_l>dev)[-_.]?(?P<dev_n>\d*))?"
+    r"(?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?$",
+    re.IGNORECASE,
+)
+_PEP440_PRE_ALIASES = {"alpha": "a", "beta": "b", "c": "rc", "pre": "rc", "preview": "rc"}
+
+
+class InvalidVersion(ValueError):
+    """Raised when a version string cannot be parsed"""
+
+
+class Version:
+    """
+    A comparable version.
+
+    The sort key is ``(epoch, release, pre, post, dev)`` with trailing
+    zero release components dropped, so ``1.0`` == ``1.0.0`` and both
+    semver pre-releases and PEP 440 a/b/rc/dev releases sort before the
+    final release.  Build metadata / local labels do not affect ordering.
+    """
+
+    __slots__ = ("text", "epoch", "release", "pre", "post", "dev", "_key")
+
+    def __init__(self, text: str):
+        self.text = text.strip()
+        match = _SEMVER_RE.match(self.text)
+        if match:
+            self.epoch = 0
+            self.release = tuple(int(p) for p in match.group("release").split("."))
+            self.pre = _prerelease_identifiers(match.group("pre")) if match.group("pre") else None
+            self.post = None
+            self.dev = None
+        else:
+            match = _PEP440_RE.match(self.text)
+            if not match:
+                raise InvalidVersion(f"Invalid version: {text!r}")
+            self.epoch = int(match.group("epoch") or 0)
+            self.release = tuple(int(p) for p in match.group("release").split("."))
+            pre_l = match.group("pre_l")
+            if pre_l:
+                letter = _PEP440_PRE_ALIASES.get(pre_l.lower(), pre_l.lower())
+                self.pre = ((1, letter), (0, int(match.group("pre_n") or 0)))
+            else:
+                self.pre = None
+            if match.group("post_n1"):
+                self.post = int(match.group("post_n1"))
+            elif match.group("post_l"):
+                self.post = int(match.group("post_n2") or 0)
+            else:
+                self.post = None
+            self.dev = int(match.group("dev_n") or 0) if match.group("dev_l") else None
+
+        release = list(self.release)
+        while len(release) > 1 and release[-1] == 0:
+            release.pop()
+        if self.pre is None and self.post is None and self.dev is not None:
+            pre_key = (0, ())
+        elif self.pre is None:
+            pre_key = (2, ())
+        else:
+            pre_key = (1, self.pre)
+        post_key = -1 if self.post is None else self.post
+        dev_key = (1, 0) if self.dev is None else (0, self.dev)
+        self._key = (self.epoch, tuple(release), pre_key, post_key, dev_key)
+
+    @property
+    def major(self) -> int:
+        return self.release[0]
+
+    @property
+    def minor(self) -> int:
+        return self.release[1] if len(self.release) > 1 else 0
+
+    @property
+    def patch(self) -> int:
+        return self.release[2] if len(self.release) > 2 else 0
+
+    @property
+    def is_prerelease(self) -> bool:
+        return self.pre is not None or self.dev is not None
+
+    def __eq__(self, other):
+        return isinstance(other, Version) and self._key == other._key
+
+    def __lt__(self, other):
+        return self._key < other._key
+
+    def __le__(self, other):
+        return self._key <= other._key
+
+    def __gt__(self, other):
+        return self._key > other._key
+
+    def __ge__(self, other):
+        return self._key >= other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return f"Version({self.text!r})"
+
+    def __str__(self):
+        return self.text
+
+
+def _prerelease_identifiers(pre: str) -> Tuple[Tuple[int, Any], ...]:
+    """Semver precedence: numeric identifiers sort numerically and before alphanumerics"""
+    return tuple((0, int(part)) if part.isdigit() else (1, part) for part in pre.split("."))
+
+
+@lru_cache(maxsize=65536)
+def parse_version(text: str) -> Version:
+    return Version(text)
+
+
+def compare_versions(version1: str, version2: str) -> int:
+    """-1, 0 or 1 comparing two version strings"""
+    v1, v2 = parse_version(version1), parse_version(version2)
+    return (v1 > v2) - (v1 < v2)
+
+
+# ---------------------------------------------------------------------------
+# Interval sets
+# ---------------------------------------------------------------------------
+
+_Bound = Optional[Tuple[Version, bool]]  # (version, inclusive); None is unbounded
+
+
+class VersionRange:
+    """
+    A union of disjoint version intervals, kept sorted.
+
+    ``prerelease_bases`` records the release tuples whose pre-releases an
+    npm range explicitly opts into; npm only matches a pre-release when a
+    comparator with the same ``major.minor.patch`` carries a pre-release tag.
+    """
+
+    __slots__ = ("_spec", "intervals", "ecosystem", "prerelease_bases")
+
+    def __init__(self, intervals: List[Tuple[_Bound, _Bound]], spec: Optional[str] = None, ecosystem: str = "npm",
+                 prerelease_bases: frozenset = frozenset(), normalized: bool = False):
+        self._spec = spec
+        self.ecosystem = ecosystem
+        self.intervals = intervals if normalized else _normalize(intervals)
+        self.prerelease_bases = prerelease_bases
+
+    @property
+    def spec(self) -> str:
+        """The original specifier, or a canonical rendering for derived ranges"""
+        if self._spec is None:
+            self._spec = " || ".join(_describe(interval) for interval in self.intervals) or "<empty>"
+        return self._spec
+
+    @property
+    def key(self) -> Tuple:
+        """Hashable identity of the matched set, independent of how it was spelled"""
+        return (
+            tuple((_lower_key(lower), _lower_key(upper)) for lower, upper in self.intervals),
+            tuple(sorted(map(str, self.prerelease_bases))),
+        )
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.intervals
+
+    def contains(self, version: Version) -> bool:
+        if version.is_prerelease:
+            if self.ecosystem == "npm" and (version.major, version.minor, version.patch) not in self.prerelease_bases:
+                return False
+            if self.ecosystem == "pypi" and not self.prerelease_bases:
+                return False
+        return any(_in_interval(version, interval) for interval in self.intervals)
+
+    def intersect(self, other: "VersionRange") -> "VersionRange":
+        if other.intervals == _ANY and other.prerelease_bases <= self.prerelease_bases:
+            return self
+        if self.intervals == _ANY and self.prerelease_bases <= other.prerelease_bases:
+            return other
+        result = []
+        i = j = 0
+        a, b = self.intervals, other.intervals
+        while i < len(a) and j < len(b):
+            lower = _max_lower(a[i][0], b[j][0])
+            upper = _min_upper(a[i][1], b[j][1])
+            if _non_empty(lower, upper):
+                result.append((lower, upper))
+            if _upper_lt(a[i][1], b[j][1]):
+                i += 1
+            else:
+                j += 1
+        # Intersecting two sorted, disjoint interval lists yields a sorted, disjoint list
+        return VersionRange(
+            result,
+            None,
+            self.ecosystem,
+            self.prerelease_bases | other.prerelease_bases,
+            normalized=True,
+        )
+
+    def union(self, other: "VersionRange") -> "VersionRange":
+        return VersionRange(
+            self.intervals + other.intervals,
+            None,
+            self.ecosystem,
+            self.prerelease_bases | other.prerelease_bases,
+        )
+
+    def __repr__(self):
+        return f"VersionRange({self.spec!r})"
+
+
+def _describe(interval) -> str:
+    lower, upper = interval
+    if lower is not None and upper is not None and lower == upper:
+        return f"={lower[0]}"
+    parts = []
+    if lower is not None:
+        parts.append((">=" if lower[1] else ">") + str(lower[0]))
+    if upper is not None:
+        parts.append(("<=" if upper[1] else "<") + str(upper[0]))
+    return " ".join(parts) or "*"
+
+
+def _in_interval(version: Version, interval) -> bool:
+    lower, upper = interval
+    if lower is not None:
+        bound, inclusive = lower
+        if version < bound or (version == bound and not inclusive):
+            return False
+    if upper is not None:
+        bound, inclusive = upper
+        if version > bound or (version == bound and not inclusive):
+            return False
+    return True
+
+
+def _lower_key(bound: _Bound):
+    if bound is None:
+        return (0,)
+    version, inclusive = bound
+    return (1, version._key, 0 if inclusive else 1)
+
+
+def _upper_lt(a: _Bound, b: _Bound) -> bool:
+    """True if upper bound ``a`` ends before upper bound ``b``"""
+    if a is None:
+        return False
+    if b is None:
+        return True
+    if a[0] != b[0]:
+        return a[0] < b[0]
+    return not a[1] and b[1]
+
+
+def _max_lower(a: _Bound, b: _Bound) -> _Bound:
+    return a if _lower_key(a) >= _lower_key(b) else b
+
+
+def _min_upper(a: _Bound, b: _Bound) -> _Bound:
+    return a if _upper_lt(a, b) or a == b else b
+
+
+def _non_empty(lower: _Bound, upper: _Bound) -> bool:
+    if lower is None or upper is None:
+        return True
+    if lower[0] < upper[0]:
+        return True
+    return lower[0] == upper[0] and lower[1] and upper[1]
+
+
+def _normalize(intervals) -> List[Tuple[_Bound, _Bound]]:
+    """Sort intervals and merge overlapping ones"""
+    intervals = [iv for iv in intervals if _non_empty(*iv)]
+    intervals.sort(key=lambda iv: _lower_key(iv[0]))
+    merged: List[Tuple[_Bound, _Bound]] = []
+    for lower, upper in intervals:
+        if merged:
+            prev_lower, prev_upper = merged[-1]
+            touches = prev_upper is None or lower is None or prev_upper[0] > lower[0] or (
+                prev_upper[0] == lower[0] and (prev_upper[1] or lower[1])
+            )
+            if touches:
+                merged[-1] = (prev_lower, prev_upper if _upper_lt(upper, prev_upper) or prev_upper == upper else upper)
+                continue
+        merged.append((lower, upper))
+    return merged
+
+
+# ---------------------------------------------------------------------------
+# Range parsing
+# ---------------------------------------------------------------------------
+
+_ANY = [(None, None)]
+_NPM_COMPARATOR_RE = re.compile(r"^(\^|~>?|>=|<=|>|<|=)?\s*v?([0-9xX*]+(?:\.[0-9xX*]+){0,2}(?:-[0-9A-Za-z.-]+)?(?:\+[0-9A-Za-z.-]+)?)$")
+
+
+def _partial(text: str) -> Tuple[List[Optional[int]], Optional[str]]:
+    """Split an npm partial version into numeric parts (None for x/*/missing) and pre-release"""
+    text = text.split("+", 1)[0]
+    pre = None
+    if "-" in text:
+        text, pre = text.split("-", 1)
+    parts: List[Optional[int]] = []
+    for part in text.split("."):
+        if part in ("x", "X", "*"):
+            parts.append(None)
+        elif part.isdigit():
+            parts.append(int(part))
+        else:
+            raise InvalidVersion(f"Invalid npm version: {text!r}")
+    if len(parts) > 3:
+        raise InvalidVersion(f"Invalid npm version: {text!r}")
+    while len(parts) < 3:
+        parts.append(None)
+    # Anything after a wildcard is a wildcard too
+    for i, part in enumerate(parts):
+        if part is None:
+            parts[i + 1:] = [None] * (2 - i)
+            break
+    return parts, pre
+
+
+def _v(major: int, minor: int, patch: int, pre: Optional[str] = None) -> Version:
+    return parse_version(f"{major}.{minor}.{patch}" + (f"-{pre}" if pre else ""))
+
+
+def _floor(major: int, minor: int = 0, patch: int = 0) -> Version:
+    """Lowest version with this release, including pre-releases (npm's ``-0``)"""
+    return _v(major, minor, patch, "0")
+
+
+def _npm_comparator(token: str) -> Tuple[List[Tuple[_Bound, _Bound]], Optional[Tuple[int, ...]]]:
+    match = _NPM_COMPARATOR_RE.match(token)
+    if not match:
+        raise InvalidVersion(f"Invalid npm range: {token!r}")
+    op, text = match.group(1) or "", match.group(2)
+    (major, minor, patch), pre = _partial(text)
+    pre_base = (major, minor or 0, patch or 0) if pre else None
+
+    if major is None:
+        return _ANY, None
+
+    if op == "^":
+        lower = _v(major, minor or 0, patch or 0, pre)
+        if major > 0 or minor is None:
+            upper = _floor(major + 1)
+        elif minor > 0 or patch is None:
+            upper = _floor(0, minor + 1)
+        else:
+            upper = _floor(0, 0, patch + 1)
+        return [((lower, True), (upper, False))], pre_base
+
+    if op in ("~", "~>"):
+        lower = _v(major, minor or 0, patch or 0, pre)
+        upper = _floor(major + 1) if minor is None else _floor(major, minor + 1)
+        return [((lower, True), (upper, False))], pre_base
+
+    if minor is None or patch is None:
+        # X-range: 1.x, 1.2.x, or a partial like "1.2"
+        lower = _floor(major, minor or 0)
+        upper = _floor(major + 1) if minor is None else _floor(major, minor + 1)
+        if op in ("", "="):
+            return [((lower, True), (upper, False))], None
+        if op == ">":
+            return [((upper, True), None)], None
+        if op == ">=":
+            return [((lower, True), None)], None
+        if op == "<":
+            return [(None, (lower, False))], None
+        return [(None, (upper, False))], None
+
+    version = _v(major, minor, patch, pre)
+    if op in ("", "="):
+        return [((version, True), (version, True))], pre_base
+    if op == ">":
+        return [((version, False), None)], pre_base
+    if op == ">=":
+        return [((version, True), None)], pre_base
+    if op == "<":
+        return [(None, (version, False))], pre_base
+    return [(None, (version, True))], pre_base
+
+
+def _intersect_intervals(a, b):
+    return VersionRange(a).intersect(VersionRange(b)).intervals
+
+
+def _parse_npm(spec: str) -> VersionRange:
+    intervals: List[Tuple[_Bound, _Bound]] = []
+    prerelease_bases = set()
+    for alternative in spec.split("||"):
+        alternative = alternative.strip()
+        hyphen = re.match(r"^(\S+)\s+-\s+(\S+)$", alternative)
+        if hyphen:
+            (lo_major, lo_minor, lo_patch), lo_pre = _partial(hyphen.group(1).lstrip("v"))
+            (hi_major, hi_minor, hi_patch), hi_pre = _partial(hyphen.group(2).lstrip("v"))
+            lower = None if lo_major is None else (_v(lo_major, lo_minor or 0, lo_patch or 0, lo_pre), True)
+            if hi_major is None:
+                upper = None
+            elif hi_minor is None:
+                upper = (_floor(hi_major + 1), False)
+            elif hi_patch is None:
+                upper = (_floor(hi_major, hi_minor + 1), False)
+            else:
+                upper = (_v(hi_major, hi_minor, hi_patch, hi_pre), True)
+            for pre, parts in ((lo_pre, (lo_major, lo_minor, lo_patch)), (hi_pre, (hi_major, hi_minor, hi_patch))):
+                if pre:
+                    prerelease_bases.add(tuple(p or 0 for p in parts))
+            intervals.append((lower, upper))
+            continue
+
+        # Allow "> = 1.0" style spacing between operator and version
+        tokens = re.findall(r"(?:\^|~>?|>=|<=|>|<|=)?\s*[^\s^~<>=]+", alternative) or ["*"]
+        current = _ANY
+        for token in tokens:
+            comparator, pre_base = _npm_comparator(token.replace(" ", ""))
+            if pre_base:
+                prerelease_bases.add(pre_base)
+            current = _intersect_intervals(current, comparator)
+        intervals.extend(current)
+    return VersionRange(intervals, spec, "npm", frozenset(prerelease_bases))
+
+
+def _pep440_clause(clause: str) -> Tuple[List[Tuple[_Bound, _Bound]], bool]:
+    match = re.match(r"^(~=|===|==|!=|<=|>=|<|>)?\s*(.+)$", clause.strip())
+    if not match:
+        raise InvalidVersion(f"Invalid specifier: {clause!r}")
+    op, text = match.group(1) or "==", match.group(2).strip()
+
+    if op == "===":
+        version = parse_version(text)
+        return [((version, True), (version, True))], version.is_prerelease
+
+    if text.endswith(".*"):
+        if not re.fullmatch(r"\d+(?:\.\d+)*", text[:-2]):
+            raise InvalidVersion(f"Invalid wildcard version: {clause!r}")
+        prefix = [int(p) for p in text[:-2].split(".")]
+        lower = parse_version(".".join(map(str, prefix)) + ".dev0")
+        upper = parse_version(".".join(map(str, prefix[:-1] + [prefix[-1] + 1])) + ".dev0")
+        wildcard = [((lower, True), (upper, False))]
+        if op == "==":
+            return wildcard, False
+        if op == "!=":
+            return [(None, (lower, False)), ((upper, True), None)], False
+        raise InvalidVersion(f"Wildcard not allowed with {op}: {clause!r}")
+
+    version = parse_version(text)
+    allows_pre = version.is_prerelease
+    if op == "~=":
+        if len(version.release) < 2:
+            raise InvalidVersion(f"~= needs at least two release segments: {clause!r}")
+        prefix = list(version.release[:-1])
+        prefix[-1] += 1
+        upper = parse_version(".".join(map(str, prefix)) + ".dev0")
+        return [((version, True), (upper, False))], allows_pre
+    if op == "==":
+        return [((version, True), (version, True))], allows_pre
+    if op == "!=":
+        return [(None, (version, False)), ((version, False), None)], allows_pre
+    if op == ">":
+        return [((version, False), None)], allows_pre
+    if op == ">=":
+        return [((version, True), None)], allows_pre
+    if op == "<":
+        return [(None, (version, False))], allows_pre
+    return [(None, (version, True))], allows_pre
+
+
+def _parse_pep440(spec: str) -> VersionRange:
+    current = _ANY
+    allows_pre = False
+    for clause in spec.split(","):
+        if not clause.strip():
+            continue
+        intervals, clause_pre = _pep440_clause(clause)
+        allows_pre = allows_pre or clause_pre
+        current = _intersect_intervals(current, intervals)
+    return VersionRange(current, spec, "pypi", frozenset({"*"}) if allows_pre else frozenset())
+
+
+# A release segment directly followed by a PEP 440 pre/post/dev suffix (1.0a1, 2.0.post1);
+# npm prerelease tags always follow a hyphen, so they never match
+_PEP440_SUFFIX_RE = re.compile(
+    r"(?:^|[\s<>=!~^])v?\d+(?:\.\d+)*[._]?(?:a|b|c|rc|alpha|beta|pre|preview|post|dev)\d*(?![\w-])",
+    re.IGNORECASE,
+)
+
+
+def detect_ecosystem(spec: str) -> str:
+    """Best-effort guess of a specifier's dialect"""
+    if "," in spec or "~=" in spec or "==" in spec or "!=" in spec or ".*" in spec:
+        return "pypi"
+    if _PEP440_SUFFIX_RE.search(spec):
+        return "pypi"
+    return "npm"
+
+
+@lru_cache(maxsize=65536)
+def parse_range(spec: str, ecosystem: Optional[str] = None) -> VersionRange:
+    """Parse an npm range or PEP 440 specifier set into a ``VersionRange``"""
+    spec = (spec or "").strip()
+    ecosystem = ecosystem or detect_ecosystem(spec)
+    if spec in ("", "*", "latest", "x", "X"):
+        return VersionRange(_ANY, spec or "*", ecosystem)
+    if ecosystem == "pypi":
+        return _parse_pep440(spec)
+    return _parse_npm(spec)
+
+
+def satisfies(version: str, spec: str, ecosystem: Optional[str] = None) -> bool:
+    return parse_range(spec, ecosystem).contains(parse_version(version))
+
+
+def base_version(spec: str, ecosystem: Optional[str] = None) -> Optional[Version]:
+    """Lowest concrete version a range refers to, e.g. ``^17.0.2`` -> ``17.0.2``"""
+    try:
+        version_range = parse_range(spec, ecosystem)
+    except InvalidVersion:
+        return None
+    for lower, _ in version_range.intervals:
+        if lower is not None:
+            version = lower[0]
+            if version.pre == ((0, 0),):
+                return parse_version(".".join(map(str, version.release[:3])))
+            return version
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Constraint index and resolver
+# ---------------------------------------------------------------------------
+
+class ConstraintIndex:
+    """
+    Version constraints grouped by package.
+
+    Conflict checks only intersect constraints that target the same
+    package, so the cost is proportional to the overlaps that exist
+    rather than to the square of the dependency count.  Constraints are
+    tagged with their source so a dependent's constraints can be
+    retracted when it is re-pinned.
+    """
+
+    def __init__(self, ecosystem: Optional[str] = None):
+        self.ecosystem = ecosystem
+        self._constraints: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        # Running intersections: _prefixes[package][i] combines constraints[0..i]
+        self._prefixes: Dict[str, List[VersionRange]] = defaultdict(list)
+        self._by_source: Dict[str, List[str]] = defaultdict(list)
+
+    def add(self, package: str, spec: str, source: str = "root") -> VersionRange:
+        self._constraints[package].append((spec, source))
+        self._by_source[source].append(package)
+        prefixes = self._prefixes[package]
+        version_range = parse_range(spec, self.ecosystem)
+        prefixes.append(prefixes[-1].intersect(version_range) if prefixes else version_range)
+        return prefixes[-1]
+
+    def remove_source(self, source: str) -> List[str]:
+        """Retract every constraint added by ``source``; returns the affected packages"""
+        affected = self._by_source.pop(source, [])
+        for package in set(affected):
+            constraints = self._constraints[package]
+            first = next(i for i, (_, src) in enumerate(constraints) if src == source)
+            # Only the running intersections after the first retracted constraint change;
+            # retraction is mostly of recent pins, so this is usually a short suffix
+            prefixes = self._prefixes[package]
+            del prefixes[first:]
+            remaining = constraints[:first]
+            for spec, src in constraints[first:]:
+                if src == source:
+                    continue
+                remaining.append((spec, src))
+                version_range = parse_range(spec, self.ecosystem)
+                prefixes.append(prefixes[-1].intersect(version_range) if prefixes else version_range)
+            self._constraints[package] = remaining
+        return affected
+
+    def packages(self) -> List[str]:
+        return [package for package, constraints in self._constraints.items() if constraints]
+
+    def constraints(self, package: str) -> List[Tuple[str, str]]:
+        return list(self._constraints.get(package, []))
+
+    def combined(self, package: str) -> Optional[VersionRange]:
+        prefixes = self._prefixes.get(package)
+        return prefixes[-1] if prefixes else None
+
+    def conflicts(self) -> List[Dict[str, Any]]:
+        """Packages whose constraints cannot all be satisfied at once"""
+        conflicts = []
+        for package, prefixes in self._prefixes.items():
+            if not prefixes or not prefixes[-1].is_empty:
+                continue
+            constraints = self._constraints[package]
+            pairs = []
+            for i, (spec1, source1) in enumerate(constraints):
+                for spec2, source2 in constraints[i + 1:]:
+                    if parse_range(spec1, self.ecosystem).intersect(parse_range(spec2, self.ecosystem)).is_empty:
+                        pairs.append({"spec1": spec1, "source1": source1, "spec2": spec2, "source2": source2})
+            conflicts.append({
+                "package": package,
+                "constraints": [{"spec": spec, "source": source} for spec, source in constraints],
+                "incompatible_pairs": pairs
+            })
+        return conflicts
+
+
+@lru_cache(maxsize=1)
+def load_package_snapshot(path: str = SNAPSHOT_PATH) -> Dict[str, Any]:
+    """Bundled offline package metadata: {"npm": {...}, "pypi": {...}}"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"npm": {}, "pypi": {}}
+
+
+class DependencyResolver:
+    """
+    Resolves root requirements against a package metadata snapshot.
+
+    ``metadata`` maps package name to ``{"versions": {version: {dep: spec}}}``.
+    Each package is pinned to the highest version satisfying every
+    constraint seen so far; when a later constraint rules the pin out the
+    package is re-pinned and its dependencies are re-expanded.  When a
+    package's constraints become unsatisfiable, the most recently pinned
+    dependent with an older candidate is stepped back one version.
+    Candidate lists are memoized per (package, combined range).
+    """
+
+    def __init__(
+        self,
+        metadata: Optional[Dict[str, Any]] = None,
+        ecosystem: str = "npm",
+        max_steps: int = 100000,
+        max_backtracks: int = 1000,
+    ):
+        if metadata is None:
+            metadata = load_package_snapshot().get(ecosystem, {})
+        self.metadata = metadata
+        self.ecosystem = ecosystem
+        self.max_steps = max_steps
+        self.max_backtracks = max_backtracks
+        self._sorted_versions: Dict[str, List[Version]] = {}
+        self._candidates_cache: Dict[Tuple[str, Tuple], List[Version]] = {}
+
+    def _versions(self, package: str) -> List[Version]:
+        versions = self._sorted_versions.get(package)
+        if versions is None:
+            raw = self.metadata.get(package, {}).get("versions", {})
+            versions = sorted((parse_version(v) for v in raw), reverse=True)
+            self._sorted_versions[package] = versions
+        return versions
+
+    def _candidates(self, package: str, combined: VersionRange) -> List[Version]:
+        cache_key = (package, combined.key)
+        candidates = self._candidates_cache.get(cache_key)
+        if candidates is None:
+            candidates = [v for v in self._versions(package) if combined.contains(v)]
+            self._candidates_cache[cache_key] = candidates
+        return candidates
+
+    def resolve(self, requirements: Dict[str, str]) -> Dict[str, Any]:
+        index = ConstraintIndex(self.ecosystem)
+        pins: Dict[str, Version] = {}
+        unknown: Dict[str, str] = {}
+        queue: List[str] = []
+
+        for package, spec in requirements.items():
+            index.add(package, spec, "root")
+            queue.append(package)
+
+        steps = backtracks = 0
+        while queue and steps < self.max_steps:
+            steps += 1
+            package = queue.pop()
+            combined = index.combined(package)
+            current = pins.get(package)
+
+            if combined is not None and combined.is_empty and backtracks < self.max_backtracks:
+                culprit = self._backtrack_target(package, index, pins)
+                if culprit is not None:
+                    backtracks += 1
+                    index.add(culprit, self._exclusion(pins[culprit]), "backtrack")
+                    queue.append(culprit)
+                    continue
+
+            if combined is None or combined.is_empty or package not in self.metadata:
+                if current is not None:
+                    queue.extend(self._unpin(package, pins, index))
+                if combined is not None and not combined.is_empty:
+                    unknown[package] = combined.spec
+                continue
+
+            if current is not None and combined.contains(current):
+                continue
+
+            candidates = self._candidates(package, combined)
+            if current is not None:
+                queue.extend(self._unpin(package, pins, index))
+            if not candidates:
+                continue
+
+            pins[package] = candidates[0]
+            dependencies = self.metadata[package]["versions"].get(candidates[0].text, {}) or {}
+            source = f"{package}@{candidates[0].text}"
+            for dependency, spec in dependencies.items():
+                index.add(dependency, spec, source)
+                queue.append(dependency)
+
+        conflicts = index.conflicts()
+        conflicted = {conflict["package"] for conflict in conflicts}
+        unsatisfied = [
+            {"package": package, "range": index.combined(package).spec}
+            for package in index.packages()
+            if package not in pins and package not in unknown and package not in conflicted
+        ]
+        return {
+            "resolved": {package: version.text for package, version in pins.items()},
+            "unknown_packages": unknown,
+            "conflicts": conflicts,
+            "unsatisfied": unsatisfied,
+            "steps": steps,
+            "backtracks": backtracks,
+            "complete": not queue,
+        }
+
+    @staticmethod
+    def _unpin(package: str, pins: Dict[str, Version], index: ConstraintIndex) -> List[str]:
+        """Drop a pin and retract the constraints its dependencies contributed"""
+        version = pins.pop(package)
+        return index.remove_source(f"{package}@{version.text}")
+
+    def _backtrack_target(self, package: str, index: ConstraintIndex, pins: Dict[str, Version]) -> Optional[str]:
+        """Most recent dependent of ``package`` that still has an older candidate"""
+        for _, source in reversed(index.constraints(package)):
+            if source in ("root", "backtrack"):
+                continue
+            dependent = source.rsplit("@", 1)[0]
+            pinned = pins.get(dependent)
+            combined = index.combined(dependent)
+            if pinned is None or combined is None or f"{dependent}@{pinned.text}" != source:
+                continue
+            if len(self._candidates(dependent, combined)) > 1:
+                return dependent
+        return None
+
+    def _exclusion(self, version: Version) -> str:
+        if self.ecosystem == "pypi":
+            return f"!={version.text}"
+        return f"<{version.text} || >{version.text}"
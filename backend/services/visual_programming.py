@@ -6,15 +6,21 @@ import uuid
 import base64
 import re
 import os
+from collections import OrderedDict
 from PIL import Image
 import io
 
+from services.spatial_index import DiagramLayout
+
 class VisualProgramming:
     """AI service for generating code from visual diagrams and wireframes"""
     
     def __init__(self, db_wrapper):
         self.db = db_wrapper
-        self.diagram_cache = {}
+        # Analyses and their spatial layouts, kept so moves and code generation reuse them
+        self.diagram_cache = OrderedDict()
+        self.diagram_layouts = {}
+        self.max_cached_diagrams = int(os.getenv("VISUAL_DIAGRAM_CACHE_SIZE", "100"))
         self.code_generators = {}
         self.visual_patterns = {}
         self.ml_models = {}
@@ -57,7 +63,8 @@ class VisualProgramming:
             analysis["elements"] = await self._extract_visual_elements(diagram_data)
             
             # Analyze relationships between elements
-            analysis["relationships"] = await self._analyze_element_relationships(analysis["elements"])
+            layout = await self._analyze_element_relationships(analysis["elements"])
+            analysis["relationships"] = layout.relationships()
             
             # Identify data flow patterns
             analysis["data_flow"] = await self._identify_data_flow(analysis["elements"], analysis["relationships"])
@@ -77,18 +84,60 @@ class VisualProgramming:
             # Generate recommendations
             analysis["recommendations"] = await self._generate_analysis_recommendations(analysis)
             
-            # Cache analysis
-            self.diagram_cache[analysis["diagram_id"]] = analysis
+            # Cache analysis, with its layout only once the analysis succeeded
+            self._cache_analysis(analysis, layout)
             
             return analysis
         except Exception as e:
             return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
     
+    async def move_elements(self, diagram_id: str, positions: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+        """Move elements of an analyzed diagram, updating only the relationships around them"""
+        try:
+            analysis = self.diagram_cache.get(diagram_id)
+            layout = self.diagram_layouts.get(diagram_id)
+            if analysis is None or layout is None:
+                return {"error": f"Unknown diagram: {diagram_id}"}
+            
+            unknown = [element_id for element_id in positions if element_id not in layout]
+            if unknown:
+                return {"error": f"Unknown elements: {', '.join(map(str, unknown[:10]))}"}
+            
+            for element_id, position in positions.items():
+                layout.move(element_id, position)
+            
+            analysis["relationships"] = layout.relationships()
+            analysis["data_flow"] = await self._identify_data_flow(analysis["elements"], analysis["relationships"])
+            analysis["complexity_score"] = await self._calculate_diagram_complexity(analysis)
+            analysis["code_generation_feasibility"] = await self._assess_generation_feasibility(analysis)
+            analysis["timestamp"] = datetime.utcnow().isoformat()
+            self.diagram_cache.move_to_end(diagram_id)
+            
+            return analysis
+        except Exception as e:
+            return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
+    
+    def _cache_analysis(self, analysis: Dict[str, Any], layout: DiagramLayout):
+        self.diagram_cache[analysis["diagram_id"]] = analysis
+        self.diagram_layouts[analysis["diagram_id"]] = layout
+        self.diagram_cache.move_to_end(analysis["diagram_id"])
+        while len(self.diagram_cache) > self.max_cached_diagrams:
+            evicted, _ = self.diagram_cache.popitem(last=False)
+            self.diagram_layouts.pop(evicted, None)
+    
+    async def _analysis_for(self, diagram_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Reuse the cached analysis (and relationships) of an already analyzed diagram"""
+        cached = self.diagram_cache.get(diagram_data.get("diagram_id"))
+        if cached is not None:
+            self.diagram_cache.move_to_end(cached["diagram_id"])
+            return cached
+        return await self.analyze_diagram(diagram_data)
+    
     async def generate_code_from_flowchart(self, flowchart_data: Dict[str, Any], target_language: str = "python") -> Dict[str, Any]:
         """Generate executable code from flowchart diagram"""
         try:
             # First analyze the flowchart
-            analysis = await self.analyze_diagram(flowchart_data)
+            analysis = await self._analysis_for(flowchart_data)
             
             if analysis["diagram_type"] != "flowchart":
                 return {"error": "Input is not a flowchart diagram"}
@@ -149,7 +198,7 @@ class VisualProgramming:
         """Generate responsive UI code from wireframe or mockup"""
         try:
             # Analyze wireframe
-            analysis = await self.analyze_diagram(wireframe_data)
+            analysis = await self._analysis_for(wireframe_data)
             
             if analysis["diagram_type"] not in ["wireframe", "ui_mockup", "sketch"]:
                 return {"error": "Input is not a wireframe or UI mockup"}
@@ -207,7 +256,7 @@ class VisualProgramming:
     async def generate_api_from_sequence_diagram(self, sequence_data: Dict[str, Any], api_style: str = "rest") -> Dict[str, Any]:
         """Generate API endpoints from sequence diagram"""
         try:
-            analysis = await self.analyze_diagram(sequence_data)
+            analysis = await self._analysis_for(sequence_data)
             
             if analysis["diagram_type"] != "sequence_diagram":
                 return {"error": "Input is not a sequence diagram"}
@@ -316,7 +365,7 @@ class VisualProgramming:
     async def generate_database_schema(self, erd_data: Dict[str, Any], database_type: str = "postgresql") -> Dict[str, Any]:
         """Generate complete database schema from Entity Relationship Diagram"""
         try:
-            analysis = await self.analyze_diagram(erd_data)
+            analysis = await self._analysis_for(erd_data)
             
             if analysis["diagram_type"] != "entity_relationship":
                 return {"error": "Input is not an Entity Relationship Diagram"}
@@ -741,39 +790,10 @@ export default {{name}};""",
         
         return base_confidence
     
-    async def _analyze_element_relationships(self, elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Analyze spatial and logical relationships between elements"""
-        relationships = []
-        
-        for i, element1 in enumerate(elements):
-            for j, element2 in enumerate(elements[i+1:], i+1):
-                if self._elements_are_connected(element1, element2):
-                    relationship = {
-                        "id": f"rel_{i}_{j}",
-                        "source": element1["id"],
-                        "target": element2["id"],
-                        "type": "connection",
-                        "strength": self._calculate_connection_strength(element1, element2)
-                    }
-                    relationships.append(relationship)
-        
-        return relationships
-    
-    def _elements_are_connected(self, element1: Dict[str, Any], element2: Dict[str, Any]) -> bool:
-        """Determine if two elements are visually connected"""
-        pos1 = element1.get("position", {"x": 0, "y": 0})
-        pos2 = element2.get("position", {"x": 0, "y": 0})
-        
-        distance = ((pos1["x"] - pos2["x"]) ** 2 + (pos1["y"] - pos2["y"]) ** 2) ** 0.5
-        return distance < 150  # Threshold for connection
-    
-    def _calculate_connection_strength(self, element1: Dict[str, Any], element2: Dict[str, Any]) -> float:
-        """Calculate strength of connection between elements"""
-        pos1 = element1.get("position", {"x": 0, "y": 0})
-        pos2 = element2.get("position", {"x": 0, "y": 0})
-        
-        distance = ((pos1["x"] - pos2["x"]) ** 2 + (pos1["y"] - pos2["y"]) ** 2) ** 0.5
-        return max(0.1, 1.0 - (distance / 300))  # Inverse relationship with distance
+    async def _analyze_element_relationships(self, elements: List[Dict[str, Any]]) -> DiagramLayout:
+        """Index elements by position; the layout yields and maintains their relationships"""
+        # Grid-indexed, so only elements in neighbouring cells are compared
+        return DiagramLayout(elements)
     
     # More placeholder implementations for remaining complex methods
     async def _identify_data_flow(self, elements: List[Dict[str, Any]], relationships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -6,6 +6,8 @@ from datetime import datetime
 import re
 from enum import Enum
 
+from services.intent_classifier import get_intent_classifier
+
 logger = logging.getLogger(__name__)
 
 class Intent(Enum):
@@ -23,6 +25,9 @@ class VoiceInterface:
     
     def __init__(self):
         self.intent_patterns = self._initialize_intent_patterns()
+        self.intent_classifier = get_intent_classifier(
+            "voice_intents", {intent.value: {"patterns": patterns} for intent, patterns in self.intent_patterns.items()}
+        )
         self.context_memory = {}
         self.conversation_history = {}
         self.voice_enabled = True
@@ -143,16 +148,13 @@ class VoiceInterface:
             confidence = 0.0
             matched_pattern = None
             
-            for intent, patterns in self.intent_patterns.items():
-                for pattern in patterns:
-                    match = re.search(pattern, text_lower)
-                    if match:
-                        detected_intent = intent
-                        confidence = 0.8 + (len(match.group()) / len(text_lower) * 0.2)
-                        matched_pattern = pattern
-                        break
-                if detected_intent != Intent.UNKNOWN:
-                    break
+            scores = self.intent_classifier.classify(text_lower)
+            intent_name = scores.first()
+            if intent_name:
+                hit = scores.first_hit(intent_name)
+                detected_intent = Intent(intent_name)
+                confidence = 0.8 + ((hit.end - hit.start) / len(text_lower) * 0.2)
+                matched_pattern = hit.pattern
             
             # Extract entities
             entities = await self._extract_entities(text_lower, detected_intent)
@@ -10,6 +10,8 @@ import uuid
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from services.shared_state import PickleCodec, get_shared_state
+
 logger = logging.getLogger(__name__)
 
 class WorkflowStatus(Enum):
@@ -91,9 +93,12 @@ class WorkflowBuilderComplete:
     """
     
     def __init__(self):
-        self.workflows: Dict[str, Workflow] = {}
         self.workflow_templates: Dict[str, Dict[str, Any]] = {}
-        self.executions: Dict[str, WorkflowExecution] = {}
+        # Workflows and executions are created, run and read by whichever worker takes the request
+        shared_state = get_shared_state()
+        self.workflows = shared_state.map("workflows", codec=PickleCodec())
+        self.executions = shared_state.map("workflow_executions", codec=PickleCodec())
+        self.execution_stats = shared_state.counter("workflow_execution_stats")
         self.active_triggers: Dict[str, Any] = {}
         
     async def initialize(self):
@@ -152,7 +157,7 @@ class WorkflowBuilderComplete:
             success_rate=0.0
         )
         
-        self.workflows[workflow_id] = workflow
+        await self.workflows.set(workflow_id, workflow)
         
         return {
             "workflow_id": workflow_id,
@@ -193,7 +198,7 @@ class WorkflowBuilderComplete:
             success_rate=0.0
         )
         
-        self.workflows[workflow_id] = workflow
+        await self.workflows.set(workflow_id, workflow)
         
         return {
             "workflow_id": workflow_id,
@@ -214,10 +219,6 @@ class WorkflowBuilderComplete:
         position: Dict[str, float] = None
     ) -> Dict[str, Any]:
         """Add a new node to workflow"""
-        if workflow_id not in self.workflows:
-            return {"error": "Workflow not found"}
-        
-        workflow = self.workflows[workflow_id]
         node_id = str(uuid.uuid4())
         
         node = WorkflowNode(
@@ -232,8 +233,15 @@ class WorkflowBuilderComplete:
             created_at=datetime.utcnow()
         )
         
-        workflow.nodes.append(node)
-        workflow.updated_at = datetime.utcnow()
+        def add_node(workflow: Workflow) -> Workflow:
+            workflow.nodes.append(node)
+            workflow.updated_at = datetime.utcnow()
+            return workflow
+        
+        if not await self.workflows.contains(workflow_id):
+            return {"error": "Workflow not found"}
+        # Compare-and-set, so nodes added through other workers at the same time are kept
+        workflow = await self.workflows.update(workflow_id, add_node)
         
         return {
             "node_id": node_id,
@@ -251,12 +259,27 @@ class WorkflowBuilderComplete:
         condition: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Connect two workflow nodes"""
-        if workflow_id not in self.workflows:
-            return {"error": "Workflow not found"}
+        # Add connection
+        connection = {
+            "source": source_node_id,
+            "target": target_node_id,
+            "condition": condition
+        }
+        
+        def connect(workflow: Workflow) -> Workflow:
+            source = next((node for node in workflow.nodes if node.id == source_node_id), None)
+            target = next((node for node in workflow.nodes if node.id == target_node_id), None)
+            if source and target and connection not in workflow.connections:
+                workflow.connections.append(connection)
+                source.connections.append(target_node_id)
+                workflow.updated_at = datetime.utcnow()
+            return workflow
         
-        workflow = self.workflows[workflow_id]
+        if not await self.workflows.contains(workflow_id):
+            return {"error": "Workflow not found"}
+        workflow = await self.workflows.update(workflow_id, connect)
         
-        # Find source node and add connection
+        # Find source and target nodes
         source_node = next((node for node in workflow.nodes if node.id == source_node_id), None)
         if not source_node:
             return {"error": "Source node not found"}
@@ -265,18 +288,6 @@ class WorkflowBuilderComplete:
         if not target_node:
             return {"error": "Target node not found"}
         
-        # Add connection
-        connection = {
-            "source": source_node_id,
-            "target": target_node_id,
-            "condition": condition
-        }
-        
-        if connection not in workflow.connections:
-            workflow.connections.append(connection)
-            source_node.connections.append(target_node_id)
-            workflow.updated_at = datetime.utcnow()
-        
         return {
             "connection_id": f"{source_node_id}-{target_node_id}",
             "status": "connected",
@@ -293,10 +304,10 @@ class WorkflowBuilderComplete:
         manual_trigger: bool = False
     ) -> Dict[str, Any]:
         """Execute a workflow"""
-        if workflow_id not in self.workflows:
+        workflow = await self.workflows.get(workflow_id)
+        if workflow is None:
             return {"error": "Workflow not found"}
         
-        workflow = self.workflows[workflow_id]
         if workflow.status != WorkflowStatus.ACTIVE and not manual_trigger:
             return {"error": "Workflow is not active"}
         
@@ -315,10 +326,10 @@ class WorkflowBuilderComplete:
             result_data={}
         )
         
-        self.executions[execution_id] = execution
+        await self.executions.set(execution_id, execution)
         
         # Start workflow execution in background
-        asyncio.create_task(self._execute_workflow_async(execution))
+        asyncio.create_task(self._execute_workflow_async(execution, workflow))
         
         return {
             "execution_id": execution_id,
@@ -328,11 +339,9 @@ class WorkflowBuilderComplete:
             "trigger_data": trigger_data
         }
     
-    async def _execute_workflow_async(self, execution: WorkflowExecution):
+    async def _execute_workflow_async(self, execution: WorkflowExecution, workflow: Workflow):
         """Execute workflow asynchronously"""
         try:
-            workflow = self.workflows[execution.workflow_id]
-            
             # Find trigger node
             trigger_nodes = [node for node in workflow.nodes if node.type == NodeType.TRIGGER]
             if not trigger_nodes:
@@ -340,6 +349,7 @@ class WorkflowBuilderComplete:
             
             current_node = trigger_nodes[0]
             execution.current_node = current_node.id
+            await self.executions.set(execution.id, execution)
             
             # Execute workflow nodes
             context_data = execution.trigger_data.copy()
@@ -378,6 +388,7 @@ class WorkflowBuilderComplete:
                     execution.current_node = next_node_id
                 else:
                     current_node = None
+                await self.executions.set(execution.id, execution)
             
             # Complete execution
             if execution.status != WorkflowStatus.ERROR:
@@ -385,18 +396,29 @@ class WorkflowBuilderComplete:
                 execution.result_data = context_data
             
             execution.completed_at = datetime.utcnow()
+            await self.executions.set(execution.id, execution)
             
-            # Update workflow statistics
-            workflow.execution_count += 1
+            # Update workflow statistics from the counts of every worker
+            execution_count = await self.execution_stats.incr(f"{workflow.id}:runs")
             if execution.status == WorkflowStatus.COMPLETED:
-                success_count = len([e for e in self.executions.values() 
-                                   if e.workflow_id == workflow.id and e.status == WorkflowStatus.COMPLETED])
-                workflow.success_rate = (success_count / workflow.execution_count) * 100
+                success_count = await self.execution_stats.incr(f"{workflow.id}:completed")
+            else:
+                success_count = await self.execution_stats.get(f"{workflow.id}:completed")
+            
+            def record_stats(stored: Workflow) -> Workflow:
+                # Runs finishing out of order must not lower the count
+                if stored.execution_count <= execution_count:
+                    stored.execution_count = execution_count
+                    stored.success_rate = (success_count / execution_count) * 100
+                return stored
+            
+            await self.workflows.update(workflow.id, record_stats)
             
         except Exception as e:
             execution.error_message = str(e)
             execution.status = WorkflowStatus.ERROR
             execution.completed_at = datetime.utcnow()
+            await self.executions.set(execution.id, execution)
             logger.error(f"Workflow execution error: {e}")
     
     async def _execute_node(self, node: WorkflowNode, context_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -829,7 +851,7 @@ class WorkflowBuilderComplete:
     # Public API Methods
     async def get_all_workflows(self, created_by: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all workflows, optionally filtered by creator"""
-        workflows = list(self.workflows.values())
+        workflows = await self.workflows.values()
         
         if created_by:
             workflows = [w for w in workflows if w.created_by == created_by]
@@ -867,7 +889,7 @@ class WorkflowBuilderComplete:
     
     async def get_workflow_executions(self, workflow_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get workflow execution history"""
-        executions = list(self.executions.values())
+        executions = await self.executions.values()
         
         if workflow_id:
             executions = [e for e in executions if e.workflow_id == workflow_id]
@@ -14,6 +14,9 @@ import bcrypt
 from cryptography.fernet import Fernet
 import re
 
+from services.audit_log import get_audit_log
+from services.shared_state import get_shared_state
+
 logger = logging.getLogger(__name__)
 
 class SecurityLevel(Enum):
@@ -500,8 +503,13 @@ class ComplianceEngine:
 class BehavioralAnalyzer:
     """Analyze user behavior patterns for anomaly detection"""
     
+    MAX_TYPICAL_RESOURCES = 50
+
     def __init__(self):
-        self.user_baselines = {}
+        # Shared so every worker scores a user against the same history
+        shared_state = get_shared_state()
+        self.user_baselines = shared_state.map("zero_trust_baselines")
+        self.request_counts = shared_state.counter("zero_trust_hourly_requests", ttl=2 * 3600)
         self.pattern_cache = {}
     
     async def initialize(self):
@@ -514,10 +522,9 @@ class BehavioralAnalyzer:
             user_id = request.user_id
             
             # Get or create user baseline
-            if user_id not in self.user_baselines:
-                await self._build_user_baseline(user_id)
-            
-            baseline = self.user_baselines.get(user_id, {})
+            baseline = await self.user_baselines.get(user_id)
+            if baseline is None:
+                baseline = await self._build_user_baseline(user_id)
             score = 1.0  # Start with perfect score
             
             # Check timing patterns
@@ -538,7 +545,7 @@ class BehavioralAnalyzer:
                 score -= 0.3
             
             # Update baseline with new data
-            await self._update_user_baseline(user_id, request)
+            await self._update_user_baseline(user_id, baseline, request)
             
             return max(0.0, score)
             
@@ -546,16 +553,42 @@ class BehavioralAnalyzer:
             logger.error(f"Error analyzing user behavior: {e}")
             return 0.5  # Neutral score on error
     
-    async def _build_user_baseline(self, user_id: str):
+    async def _build_user_baseline(self, user_id: str) -> Dict[str, Any]:
         """Build behavioral baseline for user"""
         # In production, this would analyze historical data
-        self.user_baselines[user_id] = {
+        baseline = {
             "typical_hours": list(range(9, 18)),  # 9 AM to 6 PM
             "typical_resources": [],
             "avg_requests_per_hour": 10,
             "typical_locations": [],
-            "last_updated": datetime.now()
+            "last_updated": datetime.now().isoformat()
         }
+        # Another worker may have built (and already extended) it meanwhile
+        return await self.user_baselines.update(user_id, lambda current: current or baseline)
+    
+    def _hour_key(self, user_id: str, timestamp: datetime) -> str:
+        return f"{user_id}:{timestamp.strftime('%Y%m%d%H')}"
+    
+    async def _count_recent_requests(self, user_id: str, hours: int = 1) -> int:
+        """Requests by the user in the current clock hour, across workers"""
+        return await self.request_counts.get(self._hour_key(user_id, datetime.now()))
+    
+    async def _update_user_baseline(self, user_id: str, baseline: Dict[str, Any], request: AccessRequest):
+        """Count the request and remember the resource as typical for the user"""
+        await self.request_counts.incr(self._hour_key(user_id, request.timestamp))
+        if request.resource in baseline.get("typical_resources", []):
+            return
+        
+        def remember_resource(current: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            current = current or baseline
+            resources = current.get("typical_resources", [])
+            if request.resource not in resources:
+                current["typical_resources"] = (resources + [request.resource])[-self.MAX_TYPICAL_RESOURCES:]
+                current["last_updated"] = datetime.now().isoformat()
+            return current
+        
+        # Compare-and-set, so resources other workers added concurrently are kept
+        await self.user_baselines.update(user_id, remember_resource)
 
 class ThreatDetector:
     """Advanced threat detection system"""
@@ -648,14 +681,35 @@ class EncryptionService:
         return str(data)
 
 class AuditTrail:
+    """Audited actions in the hash-chained, segment-rotated audit log"""
+
     def __init__(self, db_client):
         self.db_client = db_client
+        self.log = None
     
     async def initialize(self):
-        pass
+        # Opening recovers the shard from disk
+        self.log = await asyncio.to_thread(get_audit_log, "zero_trust", ("user", "action", "resource"))
     
     async def record(self, audit_record: Dict[str, Any]):
-        pass
+        if self.log is None:
+            await self.initialize()
+        timestamp = audit_record.get("timestamp") or datetime.now()
+        await asyncio.to_thread(
+            self.log.append, {**audit_record, "timestamp": timestamp.isoformat()}, ts=timestamp.timestamp())
+    
+    async def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
+        """Audited actions in a time range, filtered by user, action or resource"""
+        if self.log is None:
+            await self.initialize()
+        return await asyncio.to_thread(
+            self.log.query,
+            start=start.timestamp() if start else None,
+            end=end.timestamp() if end else None,
+            limit=limit,
+            **filters
+        )
 
 class PrivacyManager:
     pass
\ No newline at end of file
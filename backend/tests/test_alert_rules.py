@@ -0,0 +1,94 @@
+import random
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.alert_rules import AlertEngine, AlertRule, RollingWindow, parse_window
+
+
+def brute_force(points, rule, now):
+    """The rule's aggregate straight from the raw points, bucketed the way RollingWindow buckets them"""
+    granularity = RollingWindow(rule.window).granularity
+    values = [value for name, value, tags, ts in points
+              if name == rule.metric_name
+              and all(str(tags.get(key)) == expected for key, expected in rule.tags.items())
+              and ts - ts % granularity + granularity > now - rule.window]
+    if rule.aggregation == "count":
+        return float(len(values))
+    if rule.aggregation == "rate":
+        return len(values) / rule.window
+    if not values:
+        return None
+    return {"avg": sum(values) / len(values), "sum": sum(values), "min": min(values), "max": max(values)}[
+        rule.aggregation]
+
+
+class TestAlertEngine:
+    """Test cases for indexed alert rules over rolling windows"""
+
+    def test_window_aggregates_match_the_raw_points(self):
+        rng = random.Random(11)
+        engine = AlertEngine()
+        rules = []
+        for i in range(300):
+            tags = {}
+            if rng.random() < 0.6:
+                tags["region"] = rng.choice(["eu", "us", "ap"])
+            if rng.random() < 0.4:
+                tags["status"] = rng.choice(["ok", "error"])
+            rule = AlertRule(id=f"rule{i}", metric_name=f"metric{rng.randrange(8)}", threshold=rng.uniform(0, 100),
+                             window=rng.choice([30, 60, 300]), aggregation=rng.choice(
+                                 ["avg", "sum", "count", "min", "max", "rate"]), tags=tags)
+            engine.add_rule(rule)
+            rules.append(rule)
+        for rule in rules[::7]:
+            engine.remove_rule(rule.id)
+        rules = [rule for rule in rules if rule.id in engine.rules]
+
+        points = []
+        now = 1000.0
+        for step in range(2000):
+            now += rng.uniform(0, 0.5)
+            tags = {"region": rng.choice(["eu", "us", "ap"]), "status": rng.choice(["ok", "error"]), "host": "a"}
+            point = (f"metric{rng.randrange(10)}", rng.uniform(0, 100), tags, now)
+            points.append(point)
+            engine.observe(*point)
+            if step % 100 == 0:
+                engine.evaluate(now)
+
+        now += 45
+        engine.evaluate(now)
+        for rule in rules:
+            expected = brute_force(points, rule, now)
+            actual = engine.value(rule.id)
+            assert (actual is None and expected is None) or abs(actual - expected) < 1e-6
+            if rule.firing:
+                assert not rule.cleared(actual)
+        assert parse_window("5m") == 300 and parse_window("1.5h") == 5400
+
+    def test_hysteresis_dedup_and_cooldown(self):
+        engine = AlertEngine()
+        rule = AlertRule(id="latency", metric_name="performance.api_call", threshold=100, window=10,
+                         aggregation="max", tags={"operation": "login"}, cooldown=30)
+        engine.add_rule(rule)
+        fired = []
+
+        def tick(now, *values, operation="login"):
+            for value in values:
+                engine.observe("performance.api_call", value, {"operation": operation}, now)
+            fired.extend((now, transition.state) for transition in engine.evaluate(now))
+
+        tick(0, 50, operation="search")
+        tick(1, 150)            # breach: fires once
+        tick(2, 160, 170)       # still breached: not re-reported
+        tick(15, 95)            # max is 95: inside the 10% hysteresis band, stays fired
+        tick(16, 80)            # max 95 still in window
+        tick(28, 85)            # the 95 expired: max 85 clears, resolves
+        tick(29, 130)           # breach within the cooldown: suppressed
+        tick(59, 140)           # cooldown over: fires again
+        assert fired == [(1, "fired"), (28, "resolved"), (59, "fired")]
+        assert rule.fire_count == 2 and rule.firing
+        tick(200)               # everything expired: resolves without new points
+        assert fired[-1] == (200, "resolved") and engine.value("latency") is None
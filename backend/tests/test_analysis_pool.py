@@ -0,0 +1,97 @@
+import asyncio
+import sys
+import os
+import threading
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import analysis_pool
+from services.analysis_pool import AnalysisPool, AnalysisQueueFull
+
+
+class TestAnalysisPool:
+    """Test cases for off-loop static analysis"""
+
+    def test_process_pool_matches_inline_analysis(self):
+        code = "if (a = 1) {\n  console.log(a);\n  debugger;\n}\n"
+
+        async def run():
+            pool = AnalysisPool(max_workers=1)
+            try:
+                return await pool.analyze(code, "javascript")
+            finally:
+                pool.shutdown()
+
+        errors = asyncio.run(run())
+        assert errors == analysis_pool.static_analysis.analyze(code, "javascript")
+
+    def test_unchanged_content_is_served_from_cache(self):
+        async def run():
+            pool = AnalysisPool(max_workers=0)
+            first = await pool.analyze("def broken(:\n", "python")
+            second = await pool.analyze("def broken(:\n", "python")
+            return pool, first, second
+
+        pool, first, second = asyncio.run(run())
+        assert first == second and first[0]["type"] == "syntax_error"
+        assert pool.stats["misses"] == 1 and pool.stats["hits"] == 1
+
+    def test_queue_depth_is_bounded_and_abandoned_jobs_are_cancelled(self, monkeypatch):
+        release = threading.Event()
+        started = []
+        monkeypatch.setattr(analysis_pool, "_run_job",
+                            lambda code, file_type, cpu: (started.append(code), release.wait(5)) and [])
+
+        async def run():
+            pool = AnalysisPool(max_workers=0, max_pending=2)
+            running = asyncio.ensure_future(pool.analyze("a", "python"))
+            queued = asyncio.ensure_future(pool.analyze("b", "python"))
+            await asyncio.sleep(0.01)
+            with pytest.raises(AnalysisQueueFull):
+                await pool.analyze("c", "python")
+
+            # The queued job is dropped; the running one keeps its slot until it finishes
+            running.cancel()
+            queued.cancel()
+            await asyncio.sleep(0.01)
+            abandoned = (pool.stats["cancelled"], pool.pending)
+            release.set()
+            for _ in range(100):
+                if not pool.pending:
+                    break
+                await asyncio.sleep(0.01)
+            cached = await pool.analyze("a", "python")
+            return pool, abandoned, cached
+
+        pool, abandoned, cached = asyncio.run(run())
+        assert abandoned == (1, 1) and started == ["a"]
+        assert pool.pending == 0 and cached == [] and pool.stats["hits"] == 1
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="CPU limits need Linux rlimits")
+    def test_cpu_limit_stops_a_single_long_c_call(self, monkeypatch):
+        import re
+        import time
+
+        # Catastrophic backtracking: one regex call that never returns to the interpreter
+        monkeypatch.setattr(analysis_pool.static_analysis, "analyze",
+                            lambda code, file_type: [{"match": bool(re.match(r"(a+)+$", code))}])
+        start = time.monotonic()
+        with pytest.raises(analysis_pool.AnalysisTimeout):
+            analysis_pool._run_job("a" * 64 + "b", "python", 1)
+        assert time.monotonic() - start < 5
+        assert analysis_pool._run_job("aaa", "python", 1) == [{"match": True}]
+
+    def test_timed_out_analysis_is_not_reported_as_clean(self):
+        pytest.importorskip("httpx")
+        from services.smart_error_prevention import SmartErrorPrevention
+
+        class TimingOutPool:
+            async def analyze(self, code, file_type):
+                raise analysis_pool.AnalysisTimeout("analysis exceeded its CPU time limit of 1s")
+
+        service = SmartErrorPrevention(analysis_pool=TimingOutPool())
+        with pytest.raises(analysis_pool.AnalysisTimeout):
+            asyncio.run(service.analyze_code_for_errors("x = 1", "python"))
@@ -0,0 +1,182 @@
+import asyncio
+import random
+import sys
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.analytics_rollups import (
+    DAY, HOUR, RAW, MetricRollups, UsageRollups, bucket_start, fold, plan_window,
+)
+
+
+class Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+def get_path(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+
+class RollupCollection:
+    """Applies the update operators the rollups use, in memory"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def create_index(self, keys):
+        pass
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            doc = self.docs[query["_id"]] = {"_id": query["_id"], **update.get("$setOnInsert", {})}
+        fold(doc, update.get("$inc", {}))
+        for field, value in update.get("$min", {}).items():
+            doc[field] = min(doc.get(field, value), value)
+        for field, value in update.get("$max", {}).items():
+            doc[field] = max(doc.get(field, value), value)
+
+    async def find_one(self, query):
+        return self.docs.get(query["_id"])
+
+    def find(self, query):
+        def matches(doc):
+            for path, condition in query.items():
+                value = get_path(doc, path)
+                if isinstance(condition, dict):
+                    if value is None or not condition["$gte"] <= value < condition["$lt"]:
+                        return False
+                elif value != condition:
+                    return False
+            return True
+        return Cursor([doc for doc in self.docs.values() if matches(doc)])
+
+
+def make_usage(count, start, seed=3):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        usage_type = rng.choice(["tokens", "api_calls"])
+        metadata = ({"model_name": rng.choice(["gpt-4.1", "llama-3"]), "tokens_used": rng.randint(1, 500),
+                     "cost": 0.25} if usage_type == "tokens" else {"endpoint": rng.choice(["/api/a", "/api/b"])})
+        records.append({
+            "user_id": rng.choice(["u1", "u2"]),
+            "usage_type": usage_type,
+            "amount": metadata.get("tokens_used", 1),
+            "timestamp": start + timedelta(minutes=rng.randrange(5 * 24 * 60)),
+            "metadata": metadata,
+        })
+    return records
+
+
+def raw_loader(records, **match):
+    async def load(start, end):
+        return [r for r in records if start <= r["timestamp"] < end
+                and all(get_path(r, k) == v for k, v in match.items())]
+    return load
+
+
+class TestPlanWindow:
+    """Test cases for splitting a window across rollup granularities"""
+
+    def test_segments_tile_the_window_coarsest_first_in_the_middle(self):
+        start, end = datetime(2024, 1, 1, 22, 15), datetime(2024, 1, 4, 3, 40)
+        plan = plan_window(start, end)
+        assert [s.source for s in plan] == [RAW, HOUR, DAY, HOUR, RAW]
+        assert plan[0].start == start and plan[-1].end == end
+        assert all(a.end == b.start for a, b in zip(plan, plan[1:]))
+        assert plan[2].start == datetime(2024, 1, 2) and plan[2].end == datetime(2024, 1, 4)
+
+        assert [s.source for s in plan_window(start, end, coarsest=HOUR)] == [RAW, HOUR, RAW]
+        assert [s.source for s in plan_window(start, start + timedelta(minutes=20))] == [RAW]
+        assert [s.source for s in plan_window(datetime(2024, 1, 1), datetime(2024, 1, 3))] == [DAY]
+
+
+class TestUsageRollups:
+    """Test cases for usage summaries answered from rollups"""
+
+    def test_summary_matches_raw_aggregation(self):
+        start = datetime(2024, 1, 1)
+        records = make_usage(2000, start)
+        rollups = UsageRollups(RollupCollection())
+
+        async def scenario():
+            await rollups.initialize()
+            rollups.covered_from = start
+            for record in records:
+                await rollups.record(record)
+            window = (start + timedelta(hours=7, minutes=13), start + timedelta(days=3, hours=9, minutes=50))
+            return window, await rollups.summarize("u1", *window, raw_loader(records, user_id="u1"))
+
+        (window_start, window_end), summary = asyncio.run(scenario())
+        expected = defaultdict(lambda: [0, 0])
+        tokens = 0
+        by_model = defaultdict(int)
+        for r in records:
+            if r["user_id"] == "u1" and window_start <= r["timestamp"] < window_end:
+                key = (f"{r['timestamp']:%Y-%m-%d}", r["usage_type"])
+                expected[key][0] += r["amount"]
+                expected[key][1] += 1
+                tokens += r["metadata"].get("tokens_used", 0)
+                if "model_name" in r["metadata"]:
+                    by_model[r["metadata"]["model_name"].replace(".", "．")] += 1
+
+        assert [(row["date"], row["usage_type"], row["total_amount"], row["count"]) for row in summary["usage_data"]] == [
+            (date, usage_type, *expected[(date, usage_type)]) for date, usage_type in sorted(expected)]
+        assert summary["totals"]["tokens"] == tokens
+        assert {model: values["count"] for model, values in summary["by_model"].items()} == by_model
+
+    def test_windows_before_coverage_fall_back_to_raw(self):
+        start = datetime(2024, 1, 1)
+        records = make_usage(200, start)
+        rollups = UsageRollups(RollupCollection())
+        rollups.covered_from = start + timedelta(days=10)
+
+        summary = asyncio.run(rollups.summarize("u2", start, start + timedelta(days=5), raw_loader(records, user_id="u2")))
+        assert summary["totals"]["count"] == sum(1 for r in records if r["user_id"] == "u2")
+
+
+class TestMetricRollups:
+    """Test cases for metric series answered from rollups"""
+
+    def test_hourly_series_matches_raw_grouping(self):
+        rng = random.Random(8)
+        start = datetime(2024, 1, 1)
+        points = [
+            {"value": rng.randint(1, 9), "timestamp": start + timedelta(minutes=rng.randrange(3 * 24 * 60)),
+             "tags": {"source": rng.choice(["web", "api"])}}
+            for _ in range(1500)
+        ]
+        rollups = MetricRollups(RollupCollection())
+        rollups.covered_from = start
+        window = (start + timedelta(hours=5, minutes=30), start + timedelta(days=2, hours=1, minutes=10))
+
+        async def scenario():
+            for point in points:
+                await rollups.record("events_total", point["value"], point["timestamp"], point["tags"])
+            load = raw_loader(points, **{"tags.source": "web"})
+            return (await rollups.series("events_total", *window, load, aggregation="max", tags={"source": "web"}),
+                    await rollups.series("events_total", *window, load, tags={"source": "web"}, resolution=DAY))
+
+        hourly, daily = asyncio.run(scenario())
+        expected = defaultdict(list)
+        for point in points:
+            if point["tags"]["source"] == "web" and window[0] <= point["timestamp"] <= window[1]:
+                expected[bucket_start(point["timestamp"], HOUR)].append(point["value"])
+
+        assert [(p["timestamp"], p["value"], p["count"]) for p in hourly] == [
+            (bucket, max(values), len(values)) for bucket, values in sorted(expected.items())]
+        assert sum(p["value"] for p in daily) == sum(sum(values) for values in expected.values())
+        assert [p["timestamp"] for p in daily] == [start, start + timedelta(days=1), start + timedelta(days=2)]
@@ -0,0 +1,164 @@
+import random
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.audit_log import SegmentedAuditLog, ShardedAuditLog
+
+
+def make_events(count):
+    rng = random.Random(7)
+    return [{"user_id": f"user{rng.randrange(12)}", "action": rng.choice(["read", "write", "delete"]),
+             "resource": f"/projects/{rng.randrange(40)}/files", "n": i} for i in range(count)]
+
+
+def naive_query(events, start=None, end=None, **equals):
+    return [event for event in events
+            if (start is None or event["ts"] >= start) and (end is None or event["ts"] <= end)
+            and all(event[field] == value for field, value in equals.items())]
+
+
+class TestSegmentedAuditLog:
+    """Test cases for the segmented, hash-chained audit log"""
+
+    def test_queries_match_a_scan_across_segments(self, tmp_path):
+        audit_log = SegmentedAuditLog(str(tmp_path), segment_bytes=16384)
+        events = []
+        for i, event in enumerate(make_events(2500)):
+            seq = audit_log.append(event, ts=1000 + i * 0.25)
+            events.append({**event, "seq": seq, "ts": 1000 + i * 0.25})
+        assert len(audit_log) == 2500 and len(audit_log.segments) > 10
+
+        rng = random.Random(3)
+        for _ in range(100):
+            start = rng.uniform(900, 1700)
+            end = start + rng.uniform(0, 200)
+            equals = {}
+            if rng.random() < 0.6:
+                equals["user_id"] = f"user{rng.randrange(14)}"
+            if rng.random() < 0.4:
+                equals["action"] = "delete"
+            expected = naive_query(events, start, end, **equals)
+            assert audit_log.query(start, end, **equals) == expected
+            assert audit_log.query(start, end, limit=5, reverse=True, **equals) == expected[::-1][:5]
+            assert audit_log.count(start, end, **equals) == len(expected)
+
+        assert audit_log.query(contains={"resource": "/3"}) == [
+            event for event in events if "/3" in event["resource"]]
+        audit_log.close()
+
+        reopened = SegmentedAuditLog(str(tmp_path), segment_bytes=16384)
+        assert reopened.query() == events
+        assert reopened.verify()["valid"]
+        reopened.close()
+
+    def test_torn_tail_is_dropped_on_open(self, tmp_path):
+        audit_log = SegmentedAuditLog(str(tmp_path))
+        for i, event in enumerate(make_events(20)):
+            audit_log.append(event, ts=100 + i)
+        audit_log.close()
+        segment = audit_log.segments[-1].path
+        with open(segment, "ab") as f:
+            f.write(b"0123abcd {\"user_id\": \"us")
+
+        reopened = SegmentedAuditLog(str(tmp_path))
+        assert len(reopened) == 20
+        reopened.append({"user_id": "user1", "action": "read", "resource": "/x"}, ts=50)
+        assert reopened.query(user_id="user1")[-1]["ts"] == 119
+        assert reopened.verify() == {"valid": True, "verified_events": 21, "first_invalid_seq": None}
+        reopened.close()
+
+    def test_tampering_breaks_the_chain(self, tmp_path):
+        audit_log = SegmentedAuditLog(str(tmp_path), segment_bytes=4096)
+        for i, event in enumerate(make_events(300)):
+            audit_log.append(event, ts=100 + i)
+        audit_log.close()
+
+        target = audit_log.segments[2]
+        with open(target.path, "rb") as f:
+            data = f.read()
+        with open(target.path, "wb") as f:
+            f.write(data.replace(b'"action":"write"', b'"action":"read!"', 1))
+
+        reopened = SegmentedAuditLog(str(tmp_path), segment_bytes=4096)
+        result = reopened.verify()
+        assert not result["valid"] and target.first_seq <= result["first_invalid_seq"] < target.first_seq + target.count
+        reopened.close()
+
+    def test_append_leaves_fsync_and_sealing_to_the_background(self, tmp_path, monkeypatch):
+        import threading
+        fsync_threads = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: (fsync_threads.append(threading.current_thread()), real_fsync(fd)))
+
+        audit_log = SegmentedAuditLog(str(tmp_path), segment_bytes=8192, fsync_batch=50, fsync_interval=0.01)
+        for i, event in enumerate(make_events(1000)):
+            audit_log.append(event, ts=100 + i)
+        assert threading.current_thread() not in fsync_threads
+        # Segments being sealed are queried from memory meanwhile
+        assert [event["n"] for event in audit_log.query(user_id="user3")] == [
+            event["n"] for event in make_events(1000) if event["user_id"] == "user3"]
+        audit_log.sync()
+        assert audit_log.stats["segments_sealed"] == len(audit_log.segments) - 1 > 5
+        audit_log.close()
+
+
+class TestShardedAuditLog:
+    """Test cases for audit streams shared by several workers"""
+
+    def test_workers_write_their_own_shards_and_queries_merge_them(self, tmp_path):
+        events = make_events(900)
+        # flock is per open file, so two logs in one process behave like two workers
+        first = ShardedAuditLog(str(tmp_path), segment_bytes=8192)
+        second = ShardedAuditLog(str(tmp_path), segment_bytes=8192)
+        assert second.writer.directory == os.path.join(str(tmp_path), "worker-1")
+        for i, event in enumerate(events):
+            (first if i % 3 else second).append(event, ts=1000 + i)
+        first.sync()
+        second.sync()
+
+        for log in (first, second):
+            assert [event["n"] for event in log.query(user_id="user5")] == [
+                event["n"] for event in events if event["user_id"] == "user5"]
+            assert [event["n"] for event in log.query(1100, 1200, limit=7, reverse=True)] == list(range(200, 193, -1))
+            assert log.count(action="write") == sum(event["action"] == "write" for event in events)
+            assert len(log) == 900
+
+        # A restarted worker takes its shard over and continues the chain
+        second.close()
+        restarted = ShardedAuditLog(str(tmp_path), segment_bytes=8192)
+        assert restarted.writer.directory == os.path.join(str(tmp_path), "worker-1")
+        restarted.append({"user_id": "user5", "action": "read", "resource": "/late", "n": 900}, ts=5000)
+        restarted.sync()
+        assert first.query(user_id="user5", reverse=True, limit=1)[0]["n"] == 900
+        assert first.verify() == {"valid": True, "verified_events": 901, "first_invalid_seq": None, "shard": None}
+        first.close()
+        restarted.close()
+
+    def test_views_of_idle_shards_are_not_re_read(self, tmp_path, monkeypatch):
+        from services.audit_log import _ShardView
+
+        first = ShardedAuditLog(str(tmp_path), segment_bytes=8192)
+        second = ShardedAuditLog(str(tmp_path), segment_bytes=8192)
+        for i, event in enumerate(make_events(300)):
+            second.append(event, ts=1000 + i)
+        second.sync()
+        assert len(first) == 300
+
+        tailed = []
+        tail = _ShardView._tail
+
+        def counting_tail(view, number, path):
+            tailed.append(number)
+            tail(view, number, path)
+
+        monkeypatch.setattr(_ShardView, "_tail", counting_tail)
+        assert first.count() == 300 and len(first) == 300 and not tailed
+
+        second.append({"user_id": "late", "action": "read", "resource": "/", "n": 300}, ts=5000)
+        second.sync()
+        assert [event["n"] for event in first.query(user_id="late")] == [300] and tailed
+        first.close()
+        second.close()
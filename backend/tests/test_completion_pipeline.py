@@ -0,0 +1,156 @@
+import asyncio
+import random
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.completion_pipeline import IDENTIFIER, CompletionCache, DocumentContext
+
+
+class TestDocumentContext:
+    """Test cases for incrementally updated documents"""
+
+    def test_random_edits_match_the_edited_text(self):
+        rng = random.Random(3)
+        text = "function add(a, b) {\n  return a + b;\n}\n\nconst total = add(1, 2);\n"
+        document = DocumentContext(text)
+        for _ in range(500):
+            start = rng.randint(0, len(text))
+            end = rng.randint(start, min(len(text), start + 8))
+            insert = rng.choice(["", "x", "\n", "let value = 1;\n", "  ", "}\n{"])
+            text = text[:start] + insert + text[end:]
+            document.apply_edit(start, end, insert)
+
+            position = rng.randint(0, len(text))
+            line_index = text[:position].count("\n")
+            window = document.window(position)
+            assert window["current_line"] == text.split("\n")[line_index]
+            assert window["prefix"] == text[:position].split("\n")[-1]
+
+        assert document.text == text and document.version == 500
+        expected = {}
+        for name in IDENTIFIER.findall(text):
+            expected[name] = expected.get(name, 0) + 1
+        assert {name: count for name, count in document.identifiers.items() if count} == expected
+
+    def test_window_key_ignores_typing_before_the_cursor_only(self):
+        document = DocumentContext("def f():\n    ret\n    pass\n", "python")
+        before = document.window(16)
+        document.apply_edit(16, 16, "u")
+        assert document.window(17)["window_key"] == before["window_key"]
+        assert document.window(17)["prefix"] == "    retu"
+
+        document.apply_edit(0, 0, "# edited\n")
+        assert document.window(26)["window_key"] != before["window_key"]
+
+    def test_out_of_range_edits_are_rejected(self):
+        document = DocumentContext("abc")
+        with pytest.raises(ValueError):
+            document.apply_edit(2, 10, "x")
+
+
+class TestCompletionCache:
+    """Test cases for prefix-extended completion reuse"""
+
+    def test_typing_along_a_suggestion_is_served_from_cache(self):
+        cache = CompletionCache()
+        cache.put("w", "    return ", [{"text": "total + tax", "score": 0.9}, {"text": "None", "score": 0.5}])
+
+        assert cache.get("w", "    return tot") == [{"text": "al + tax", "score": 0.9}]
+        assert cache.get("w", "    return total + tax") is None
+        assert cache.get("other", "    return tot") is None
+        assert cache.stats == {"hits": 0, "extended_hits": 1, "misses": 2}
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = CompletionCache(max_entries=2)
+        cache.put("w", "a", [{"text": "1"}])
+        cache.put("w", "b", [{"text": "2"}])
+        cache.get("w", "a")
+        cache.put("w", "c", [{"text": "3"}])
+        assert len(cache) == 2 and cache.get("w", "b") is None and cache.get("w", "a")
+
+
+class TestCompletionService:
+    """Test cases for debouncing and superseding completion requests"""
+
+    def test_superseded_requests_do_not_reach_the_model(self):
+        pytest.importorskip("httpx")
+        from services.ai_code_completion import AICodeCompletion
+
+        class SlowModel:
+            calls = 0
+
+            async def process_message(self, message):
+                SlowModel.calls += 1
+                await asyncio.sleep(0.05)
+                return {"response": '{"completions": [{"text": "ength", "score": 0.9}]}'}
+
+        async def run():
+            service = AICodeCompletion()
+            service.ai_service = SlowModel()
+            service.debounce_seconds = 0.02
+            code = "items.l"
+            first = asyncio.ensure_future(service.get_code_completions(code, 7, user_id="u", document_id="d"))
+            await asyncio.sleep(0)
+            second = await service.get_code_completions(None, 7, user_id="u", document_id="d")
+            typed = await service.get_code_completions(
+                None, 8, user_id="u", document_id="d", edits=[{"start": 7, "end": 7, "text": "e"}])
+            return service, await first, second, typed
+
+        service, first, second, typed = asyncio.run(run())
+        assert first == [] and second[0]["text"] == "ength" and typed[0]["text"] == "ngth"
+        assert SlowModel.calls == 1 and service.stats["superseded"] == 1 and service.stats["cache_hits"] == 1
+
+    def test_requests_without_a_document_id_do_not_supersede_each_other(self):
+        pytest.importorskip("httpx")
+        from services.ai_code_completion import AICodeCompletion
+
+        class SlowModel:
+            async def process_message(self, message):
+                await asyncio.sleep(0.02)
+                return {"response": '{"completions": [{"text": "ength", "score": 0.9}]}'}
+
+        async def run():
+            service = AICodeCompletion()
+            service.ai_service = SlowModel()
+            service.debounce_seconds = 0.02
+            return service, await asyncio.gather(
+                service.get_code_completions("items.l", 7, user_id="u"),
+                service.get_code_completions("names.l", 7, user_id="u"),
+            )
+
+        service, (first, second) = asyncio.run(run())
+        assert first[0]["text"] == second[0]["text"] == "ength" and service.stats["superseded"] == 0
+
+    def test_cached_completions_are_not_shared_across_preferences(self):
+        pytest.importorskip("httpx")
+        from services.ai_code_completion import AICodeCompletion
+
+        class Model:
+            calls = 0
+
+            async def process_message(self, message):
+                Model.calls += 1
+                return {"response": '{"completions": [{"text": "ength", "score": 0.9}]}'}
+
+        async def run():
+            service = AICodeCompletion()
+            service.ai_service = Model()
+            await service.update_user_preferences("a", {"style": "terse"})
+            await service.update_user_preferences("b", {"style": "verbose"})
+            await service.update_user_preferences("c", {"style": "terse"})
+            for user_id in ("a", "b", "c"):
+                await service.get_code_completions("items.l", 7, user_id=user_id)
+            return service
+
+        service = asyncio.run(run())
+        assert Model.calls == 2 and service.stats["cache_hits"] == 1
+
+    def test_unknown_document_message_is_not_quoted(self):
+        from services.completion_pipeline import UnknownDocument
+
+        assert str(UnknownDocument("document d is not open")) == "document d is not open"
@@ -0,0 +1,83 @@
+import asyncio
+import gzip
+import json
+import random
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.i18n_bundles import TranslationCatalog
+from services.i18n_service import I18nService, SupportedLanguage
+
+
+def naive_page(translations, language, page_key):
+    """The prefix scan over the flat table that the catalog replaces"""
+    prefix = f"{language}.{page_key}."
+    return {key[len(prefix):]: value if isinstance(value, str) else value.get("other", key[len(prefix):])
+            for key, value in translations.items() if key.startswith(prefix)}
+
+
+class TestTranslationCatalog:
+    """Test cases for namespace-tree page lookups and page bundles"""
+
+    def test_pages_match_the_prefix_scan(self):
+        rng = random.Random(4)
+        segments = ["home", "nav", "a", "ab", "status", "x"]
+        translations = {}
+        for _ in range(600):
+            language = rng.choice(["en", "fr", "zh-CN"])
+            key = ".".join(rng.choice(segments) for _ in range(rng.randint(1, 4)))
+            translations[f"{language}.{key}"] = rng.choice(["text", {"one": "1 item", "other": "{count} items"}])
+        catalog = TranslationCatalog()
+        catalog.compile(translations)
+
+        for language in ("en", "fr", "zh-CN", "de"):
+            for page_key in segments + ["home.nav", "a.ab.x", "missing"]:
+                assert catalog.page(language, page_key) == naive_page(translations, language, page_key)
+
+    def test_bundles_are_built_once_per_catalog_version(self):
+        catalog = TranslationCatalog()
+        catalog.compile({f"en.home.key{i}": f"Value {i}" for i in range(200)})
+        bundle = catalog.bundle("en", "home")
+        assert catalog.bundle("en", "home") is bundle and catalog.stats == {"bundle_hits": 1, "bundle_builds": 1}
+        assert json.loads(bundle.body)["total_keys"] == 200
+
+        body, encoding = bundle.encode("gzip")
+        assert encoding == "gzip" and gzip.decompress(body) == bundle.body
+        assert bundle.encode("gzip")[0] is body
+
+        catalog.compile({"en.home.key0": "Changed"})
+        assert catalog.bundle("en", "home").etag != bundle.etag
+
+
+class TestI18nService:
+    """Test cases for compiled translation lookups"""
+
+    def test_plurals_interpolation_and_fallback(self):
+        async def run():
+            service = I18nService()
+            await service.initialize()
+            service.translations["ru.files"] = {"one": "{count} файл", "few": "{count} файла",
+                                                "many": "{count} файлов"}
+            service.catalog.compile(service.translations)
+            return service, [
+                await service.get_translation("chat.welcome", params={"name": "Ada"}),
+                await service.get_translation("chat.welcome", "es", {"name": "Ada", "unused": 1}),
+                await service.get_translation("notifications.count", "de", count=0),
+                await service.get_translation("notifications.count", "en", count=5),
+                await service.get_translation("files", "ru", count=3),
+                await service.get_translation("files", "ru", count=11),
+                await service.get_translation("files", "ru", count=21),
+                await service.get_translation("nav.home", "ja"),
+                await service.get_translation("missing.key", "fr"),
+                await service.get_translations_for_page("projects.status", SupportedLanguage.SPANISH),
+            ]
+
+        service, results = asyncio.run(run())
+        assert results == [
+            "Welcome back, Ada!", "¡Bienvenido de nuevo, Ada!", "Keine Benachrichtigungen", "5 notifications",
+            "3 файла", "11 файлов", "21 файл", "Home", "missing.key", {"active": "Activo", "completed": "Completado"},
+        ]
+        assert service.catalog.key_count("en") == len([key for key in service.translations if key.startswith("en.")])
@@ -0,0 +1,164 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.integration_prober import IntegrationProber
+
+
+async def start_stub(delay=0.0, hang=False):
+    """Local TCP server answering one line per connection, after ``delay`` or never"""
+    async def handle(reader, writer):
+        await reader.readline()
+        if hang:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                # Torn down with the event loop; nothing left to answer
+                writer.close()
+                return
+        await asyncio.sleep(delay)
+        writer.write(b"OK\n")
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def tcp_probe(ports):
+    async def probe(integration_id):
+        reader, writer = await asyncio.open_connection("127.0.0.1", ports[integration_id])
+        try:
+            writer.write(b"PING\n")
+            await writer.drain()
+            return await reader.readline() == b"OK\n"
+        finally:
+            writer.close()
+    return probe
+
+
+async def with_stubs(specs, scenario):
+    servers = {}
+    ports = {}
+    for name, spec in specs.items():
+        servers[name], ports[name] = await start_stub(**spec)
+    try:
+        return await scenario(tcp_probe(ports))
+    finally:
+        for server in servers.values():
+            server.close()
+
+
+class TestIntegrationProber:
+    """Test cases for concurrent, deadline-bounded probing"""
+
+    def test_hanging_endpoint_does_not_block_the_report(self):
+        specs = {"fast": {}, "slow": {"delay": 0.2}, "hung": {"hang": True}}
+
+        async def scenario(probe):
+            prober = IntegrationProber(probe, concurrency=4, timeout=0.5, freshness=60, refresh_interval=60)
+            start = time.perf_counter()
+            results = {r.integration_id: r for r in await prober.probe_all(specs)}
+            elapsed = time.perf_counter() - start
+            await prober.stop()
+            return results, elapsed
+
+        results, elapsed = asyncio.run(with_stubs(specs, scenario))
+        assert results["fast"].success and results["slow"].success
+        assert not results["hung"].success and results["hung"].timed_out
+        # Bounded by the deadline, not by the sum of probes plus an unbounded hang
+        assert elapsed < 1.0
+
+    def test_semaphore_bounds_concurrency(self):
+        specs = {f"s{i}": {"delay": 0.1} for i in range(6)}
+
+        async def scenario(probe):
+            running = 0
+            peak = 0
+
+            async def counting(integration_id):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                try:
+                    return await probe(integration_id)
+                finally:
+                    running -= 1
+
+            prober = IntegrationProber(counting, concurrency=2, timeout=1, freshness=60, refresh_interval=60)
+            results = await prober.probe_all(specs)
+            return peak, results
+
+        peak, results = asyncio.run(with_stubs(specs, scenario))
+        assert peak == 2 and all(r.success for r in results)
+
+    def test_snapshot_serves_cache_and_refreshes_in_background(self):
+        specs = {"api": {"delay": 0.1}}
+
+        async def scenario(probe):
+            calls = []
+
+            async def counting(integration_id):
+                calls.append(integration_id)
+                return await probe(integration_id)
+
+            prober = IntegrationProber(counting, concurrency=2, timeout=1, freshness=0.3, refresh_interval=60)
+            # Nothing probed yet: the read returns immediately and kicks off a probe
+            assert prober.snapshot(["api"]) == {"api": None}
+            assert len(prober._background) == 1
+            await asyncio.sleep(0.2)
+            assert not prober._background
+            first = prober.last_result("api")
+            assert first is not None and first.success
+            assert prober.snapshot(["api"])["api"] is first and len(calls) == 1
+            assert await prober.get("api") is first
+
+            await asyncio.sleep(0.3)
+            start = time.perf_counter()
+            assert prober.snapshot(["api"])["api"] is first
+            assert time.perf_counter() - start < 0.05
+            await asyncio.sleep(0.2)
+            assert prober.last_result("api") is not first and len(calls) == 2
+
+        asyncio.run(with_stubs(specs, scenario))
+
+    def test_background_refresher_keeps_results_fresh(self):
+        specs = {"db": {}, "hung": {"hang": True}}
+
+        async def scenario(probe):
+            prober = IntegrationProber(probe, concurrency=4, timeout=0.1, freshness=0.2, refresh_interval=0.05)
+            prober.start(lambda: list(specs))
+            await asyncio.sleep(0.4)
+            snapshot = prober.snapshot(specs)
+            await prober.stop()
+            return prober, snapshot
+
+        prober, snapshot = asyncio.run(with_stubs(specs, scenario))
+        assert snapshot["db"].success and prober.is_fresh(snapshot["db"], 1)
+        assert snapshot["hung"].timed_out
+        assert prober.stats["timeouts"] >= 1
+
+    def test_forget_during_a_probe_neither_cancels_callers_nor_caches(self):
+        specs = {"slow": {"delay": 0.1}}
+        reported = []
+
+        async def scenario(probe):
+            prober = IntegrationProber(probe, timeout=1, on_result=reported.append)
+            first = asyncio.ensure_future(prober.probe("slow"))
+            second = asyncio.ensure_future(prober.probe("slow"))
+            await asyncio.sleep(0.02)
+            prober.forget("slow")
+            # A probe after forget() starts afresh instead of joining the forgotten one
+            third = asyncio.ensure_future(prober.probe("slow"))
+            results = await asyncio.gather(first, second)
+            stale_cache = prober.last_result("slow")
+            return results, stale_cache, await third, prober.last_result("slow")
+
+        (first, second), stale_cache, third, cached = asyncio.run(with_stubs(specs, scenario))
+        assert first is second and first.success
+        assert stale_cache is None
+        assert third is not first and cached is third and reported == [third]
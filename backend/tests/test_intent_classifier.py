@@ -0,0 +1,65 @@
+import json
+import random
+import re
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.intent_classifier import CompiledRules, IntentClassifier
+
+
+class TestIntentClassifier:
+    """Test cases for the compiled keyword and regex intent classifier"""
+
+    def test_keyword_counts_and_regex_matches_agree_with_naive_scans(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            text = "".join(rng.choice("abcd ") for _ in range(80))
+            keywords = sorted({"".join(rng.choice("abc") for _ in range(rng.randint(1, 4))) for _ in range(10)})
+            patterns = ["".join(rng.choice(["a", "b+", "c?", "(ab)", "."]) for _ in range(rng.randint(1, 3)))
+                        for _ in range(6)]
+            rules = {f"k{i}": {"keywords": [keyword]} for i, keyword in enumerate(keywords)}
+            rules.update({f"p{i}": {"patterns": [pattern]} for i, pattern in enumerate(patterns)})
+
+            scores = CompiledRules(rules).scan(text)
+            for i, keyword in enumerate(keywords):
+                assert scores.scores.get(f"k{i}", 0) == text.count(keyword)
+            for i, pattern in enumerate(patterns):
+                match = re.search(pattern, text)
+                hit = scores.first_hit(f"p{i}")
+                assert (hit.start, hit.end) == (match.start(), match.end()) if match else hit is None
+
+    def test_weights_thresholds_and_table_order(self):
+        rules = {
+            "scale": {"keywords": ["scale", "traffic"], "weight": 1.5, "threshold": 3.0},
+            "quick": {"keywords": ["quick", "demo"], "threshold": 1.0},
+            "greeting": {"keywords": ["hi"], "word_boundary": True},
+        }
+        scores = CompiledRules(rules).scan("A QUICK demo at Scale with traffic, this time")
+
+        assert scores.scores == {"scale": 3.0, "quick": 2.0}
+        assert scores.matched() == ["scale", "quick"]
+        assert scores.first() == "scale" and scores.best() == "scale"
+        assert CompiledRules(rules).scan("hi there").first() == "greeting"
+
+    def test_rules_file_is_hot_reloaded(self, tmp_path):
+        path = tmp_path / "intents.json"
+        path.write_text(json.dumps({"deploy": {"keywords": ["ship it"]}}))
+        classifier = IntentClassifier("test", {"deploy": {"keywords": ["deploy"]}}, str(path), check_interval=0)
+        assert classifier.classify("ship it now").first() == "deploy"
+
+        path.write_text(json.dumps({"deploy": {"patterns": ["roll (out|forward)"]}}))
+        os.utime(path, (1, 1))
+        assert classifier.classify("roll out today").first() == "deploy"
+
+        # A broken table keeps the last good one
+        path.write_text("{not json")
+        os.utime(path, (2, 2))
+        assert classifier.classify("roll forward").first() == "deploy"
+        assert classifier.stats["reload_errors"] == 1
+
+        path.unlink()
+        assert classifier.classify("deploy").first() == "deploy"
+        assert classifier.classify("roll out").first() is None
@@ -0,0 +1,177 @@
+import asyncio
+import sys
+import os
+import types
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from middleware.lazy_routers import LazyRouterMiddleware, LazyRouterRegistry, RouterSpec, service_setup
+
+
+class FakeRouter:
+    def __init__(self, paths, on_startup=()):
+        self.paths = paths
+        self.on_startup = list(on_startup)
+
+
+class FakeApp:
+    """The parts of FastAPI the registry touches"""
+
+    openapi_url = "/openapi.json"
+
+    def __init__(self):
+        self.router = types.SimpleNamespace(routes=["/docs"], on_startup=[])
+        self.middleware = []
+        self.openapi_schema = {"cached": True}
+
+    def include_router(self, router, prefix="", tags=None):
+        self.router.routes.extend(prefix + path for path in router.paths)
+        self.router.on_startup.extend(router.on_startup)
+
+    def add_middleware(self, cls, **options):
+        self.middleware.append((cls, options))
+
+    def add_event_handler(self, event, handler):
+        self.router.on_startup.append(handler)
+
+    async def start(self):
+        for handler in self.router.on_startup:
+            await handler()
+
+
+@pytest.fixture
+def route_modules(monkeypatch):
+    """Register fake route modules and record when each one is imported"""
+    imported, started = [], []
+
+    def add(name, paths):
+        async def on_startup():
+            started.append(name)
+        module = types.ModuleType(name)
+        module.router = FakeRouter(paths, [on_startup])
+        monkeypatch.setitem(sys.modules, name, module)
+
+    add("fake_routes.ai", ["/chat", "/models"])
+    add("fake_routes.ai_v2", ["/chat"])
+    add("fake_routes.seo", ["/sitemap.xml"])
+
+    original = __import__("importlib").import_module
+
+    def tracking_import(name, *args):
+        imported.append(name)
+        return original(name, *args)
+
+    monkeypatch.setattr("middleware.lazy_routers.importlib.import_module", tracking_import)
+    return imported, started
+
+
+SPECS = [
+    RouterSpec("fake_routes.ai", "/api/ai", ["AI"]),
+    RouterSpec("fake_routes.ai_v2", "/api/ai/v2", ["AI v2"]),
+    RouterSpec("fake_routes.seo", "/api/seo", ["SEO"]),
+    RouterSpec("fake_routes.missing", "/api/missing", optional=True),
+]
+
+
+class TestLazyRouterRegistry:
+    """Test cases for manifest-driven router mounting"""
+
+    def test_routers_load_on_first_matching_request_in_manifest_order(self, route_modules):
+        imported, started = route_modules
+        app = FakeApp()
+        registry = LazyRouterRegistry(app, SPECS, lazy=True, warmup=[]).install()
+        app.router.routes.append("/api/health")
+        assert app.middleware[0][0] is LazyRouterMiddleware
+        asyncio.run(app.start())
+        assert imported == []
+
+        asyncio.run(registry.ensure_loaded("/api/ai/v2/chat"))
+        assert imported == ["fake_routes.ai", "fake_routes.ai_v2"]
+        assert started == ["fake_routes.ai", "fake_routes.ai_v2"]
+        assert app.openapi_schema is None
+
+        asyncio.run(registry.ensure_loaded("/api/seo/sitemap.xml"))
+        asyncio.run(registry.ensure_loaded("/api/aix"))
+        assert "fake_routes.seo" in imported and len(imported) == 3
+        assert app.router.routes == [
+            "/docs", "/api/ai/chat", "/api/ai/models", "/api/ai/v2/chat", "/api/seo/sitemap.xml", "/api/health"
+        ]
+
+    def test_warm_and_eager_modes(self, route_modules):
+        imported, started = route_modules
+        app = FakeApp()
+        LazyRouterRegistry(app, SPECS, lazy=True, warmup=["/api/seo"]).install()
+        asyncio.run(app.start())
+        assert imported == ["fake_routes.seo"] and started == ["fake_routes.seo"]
+
+        app = FakeApp()
+        registry = LazyRouterRegistry(app, SPECS, lazy=False).install()
+        assert app.middleware == [] and "/api/seo/sitemap.xml" in app.router.routes
+        assert registry.status()["failed"].keys() == {"fake_routes.missing (/api/missing)"}
+
+    def test_openapi_request_loads_everything_and_setup_runs_once(self, route_modules):
+        calls = []
+
+        async def setup():
+            calls.append("setup")
+
+        app = FakeApp()
+        specs = [RouterSpec("fake_routes.ai", "/api/ai", setup=setup), RouterSpec("fake_routes.seo", "/api/seo")]
+        registry = LazyRouterRegistry(app, specs, lazy=True, warmup=[]).install()
+        asyncio.run(app.start())
+
+        asyncio.run(registry.ensure_loaded("/openapi.json"))
+        asyncio.run(registry.ensure_loaded("/api/ai/chat"))
+        assert all(registry.is_loaded(spec) for spec in specs) and calls == ["setup"]
+
+    def test_service_setup_builds_initializes_and_registers(self, monkeypatch):
+        registered = []
+
+        class Service:
+            def __init__(self, db):
+                self.db, self.ready = db, False
+
+            async def initialize(self):
+                self.ready = True
+
+        module = types.ModuleType("fake_services")
+        module.Service, module.register = Service, registered.append
+        monkeypatch.setitem(sys.modules, "fake_services", module)
+
+        asyncio.run(service_setup("fake_services:Service", "fake_services:register", "db")())
+        assert registered[0].db == "db" and registered[0].ready
+
+    def test_missing_required_router_fails_at_install(self, route_modules):
+        specs = SPECS + [RouterSpec("fake_routes.misspelled", "/api/typo")]
+        with pytest.raises(ImportError, match="fake_routes.misspelled"):
+            LazyRouterRegistry(FakeApp(), specs, lazy=True, warmup=[]).install()
+
+        # The import check also catches modules that exist but fail to import
+        broken = types.ModuleType("fake_routes.broken")
+        sys.modules["fake_routes.broken"] = broken
+        try:
+            registry = LazyRouterRegistry(FakeApp(), [RouterSpec("fake_routes.broken", "/api/broken")], lazy=True)
+            registry.check_required(import_modules=False)
+            with pytest.raises(ImportError, match="router"):
+                registry.check_required(import_modules=True)
+        finally:
+            del sys.modules["fake_routes.broken"]
+
+    def test_required_router_load_errors_are_retried_not_cached(self, route_modules, monkeypatch):
+        app = FakeApp()
+        registry = LazyRouterRegistry(app, SPECS, lazy=True, warmup=[]).install()
+        asyncio.run(app.start())
+        seo = sys.modules["fake_routes.seo"]
+        monkeypatch.delattr(seo, "router")
+
+        for _ in range(2):
+            with pytest.raises(AttributeError):
+                asyncio.run(registry.ensure_loaded("/api/seo/sitemap.xml"))
+        assert not registry.healthy and "fake_routes.seo (/api/seo)" in registry.status()["failed"]
+
+        seo.router = FakeRouter(["/sitemap.xml"])
+        asyncio.run(registry.ensure_loaded("/api/seo/sitemap.xml"))
+        assert registry.healthy and "/api/seo/sitemap.xml" in app.router.routes
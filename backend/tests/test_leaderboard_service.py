@@ -0,0 +1,200 @@
+import asyncio
+import bisect
+import random
+import sys
+import os
+from datetime import datetime
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.leaderboard_service import InMemoryLeaderboardBackend, LeaderboardService
+from services.skiplist import SkipList
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    """The handful of motor collection calls the leaderboards and XP awards make"""
+
+    def __init__(self, docs=()):
+        self.docs = [dict(doc) for doc in docs]
+
+    def _matches(self, doc, query):
+        return all(doc.get(key) == value for key, value in query.items())
+
+    def find(self, query, projection=None):
+        return FakeCursor(doc for doc in self.docs if self._matches(doc, query))
+
+    async def find_one(self, query):
+        return next((doc for doc in self.docs if self._matches(doc, query)), None)
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def update_one(self, query, update, upsert=False):
+        doc = await self.find_one(query)
+        if doc is None:
+            doc = dict(query)
+            self.docs.append(doc)
+        doc.update(update["$set"])
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        doc = await self.find_one(query)
+        if doc is None:
+            doc = dict(query)
+            self.docs.append(doc)
+        for key, delta in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + delta
+        doc.update(update.get("$set", {}))
+        return doc
+
+    def aggregate(self, pipeline):
+        window = pipeline[0]["$match"]["timestamp"]
+        totals = {}
+        for doc in self.docs:
+            if window["$gte"] <= doc["timestamp"] < window.get("$lt", datetime.max):
+                totals[doc["user_id"]] = totals.get(doc["user_id"], 0) + doc["xp_amount"]
+        return FakeCursor({"_id": user_id, "xp": xp} for user_id, xp in totals.items())
+
+
+class FakeDatabase:
+    def __init__(self, user_count):
+        now = datetime.utcnow()
+        self.user_stats = FakeCollection(
+            {"user_id": f"user{i}", "xp": 100 * (i + 1), "level": 1, "completed_projects": i}
+            for i in range(user_count))
+        self.xp_transactions = FakeCollection(
+            {"user_id": f"user{i}", "xp_amount": 100 * (i + 1), "timestamp": now} for i in range(user_count))
+        self.user_streaks = FakeCollection({"user_id": f"user{i}", "current": i + 1} for i in range(user_count))
+        self.users = FakeCollection()
+
+
+class OtherWorkerBackend(InMemoryLeaderboardBackend):
+    """Another worker's view of the same boards, which that worker is already hydrating"""
+
+    def __init__(self, shared):
+        super().__init__()
+        self._boards = shared._boards
+
+    async def claim_hydration(self, board):
+        return False
+
+
+class TestSkipList:
+    """Test cases for the indexable skiplist"""
+
+    def test_matches_a_sorted_list(self):
+        rng = random.Random(3)
+        skiplist = SkipList()
+        expected = []
+        scores = {}
+        for step in range(3000):
+            member = f"m{rng.randrange(400)}"
+            if member in scores and rng.random() < 0.4:
+                assert skiplist.remove(scores[member], member)
+                expected.remove((scores.pop(member), member))
+            elif member not in scores:
+                score = float(rng.randrange(50))
+                skiplist.insert(score, member)
+                bisect.insort(expected, (score, member))
+                scores[member] = score
+            if step % 250 == 0:
+                assert len(skiplist) == len(expected)
+                assert skiplist.range_by_index(0, len(expected)) == [(m, s) for s, m in expected]
+                for position, (score, member) in enumerate(expected[::17]):
+                    assert skiplist.rank(score, member) == position * 17
+                assert skiplist.count_at_most(25.0) == sum(1 for score, _ in expected if score <= 25.0)
+        assert not skiplist.remove(-1.0, "missing") and skiplist.rank(-1.0, "missing") is None
+        assert list(skiplist.iter_from(len(expected) - 3)) == [(m, s) for s, m in expected[-3:]]
+
+
+class TestLeaderboardService:
+    """Test cases for incrementally maintained leaderboards"""
+
+    def test_hydrates_every_board_before_the_first_write(self):
+        async def run():
+            db = FakeDatabase(5)
+            service = LeaderboardService()
+            # An award before anything reads the boards
+            await service.ensure_hydrated(db)
+            await service.record_xp("new", 10, 10)
+            await service.record_projects("new", 7)
+            return {
+                (category, timeframe): await service.top(category, timeframe, 10)
+                for category, timeframe in LeaderboardService.BOARDS
+            }, await service.rank("xp", "weekly", "new")
+
+        boards, weekly_rank = asyncio.run(run())
+        assert boards[("xp", "all_time")][0] == ("user4", 500) and len(boards[("xp", "all_time")]) == 6
+        assert boards[("xp", "weekly")] == boards[("xp", "monthly")] == boards[("xp", "all_time")]
+        assert weekly_rank == 6
+        assert boards[("projects", "all_time")][0] == ("new", 7) and len(boards[("projects", "all_time")]) == 6
+        assert boards[("streak", "all_time")] == [(f"user{i}", i + 1) for i in range(4, -1, -1)]
+
+    @pytest.mark.parametrize("collection, method", [("user_stats", "find"), ("xp_transactions", "aggregate")])
+    def test_writes_from_other_workers_during_hydration_are_kept(self, collection, method):
+        async def run():
+            db = FakeDatabase(5)
+            backend = InMemoryLeaderboardBackend()
+            hydrating, other = LeaderboardService(backend), LeaderboardService(OtherWorkerBackend(backend))
+            read, written = asyncio.Event(), asyncio.Event()
+            query = getattr(getattr(db, collection), method)
+
+            def read_then_wait(*args):
+                # Take the snapshot now, hand it over once the other worker has written
+                async def iterate():
+                    await written.wait()
+                    async for doc in cursor:
+                        yield doc
+                cursor = query(*args)
+                read.set()
+                return iterate()
+
+            setattr(getattr(db, collection), method, read_then_wait)
+            hydration = asyncio.create_task(hydrating.ensure_hydrated(db))
+            await read.wait()
+
+            # The other worker finds the boards claimed and awards XP straight away
+            await other.ensure_hydrated(db)
+            await other.record_xp("user0", 1100, 1000)
+            await db.xp_transactions.insert_one(
+                {"user_id": "user0", "xp_amount": 1000, "timestamp": datetime.utcnow()})
+            written.set()
+            await hydration
+            return [await hydrating.top("xp", timeframe, 1) for timeframe in ("all_time", "weekly", "monthly")]
+
+        assert asyncio.run(run()) == [[("user0", 1100)]] * 3
+
+    def test_gamification_awards_and_completed_projects_reach_the_boards(self):
+        pytest.importorskip("motor")
+        from services.gamification_service import GamificationService
+
+        async def run():
+            db = FakeDatabase(5)
+            gamification = GamificationService(LeaderboardService())
+            await gamification.award_xp("new", 10, db=db)
+            await gamification.award_xp("user0", 1000, db=db)
+            for _ in range(5):
+                await gamification.record_project_completed("user0", db=db)
+            return (await gamification.get_leaderboard("weekly", "xp", 3, db=db),
+                    await gamification.get_leaderboard("all_time", "projects", 3, db=db),
+                    await gamification.get_user_rank("new", "weekly", "xp", db=db))
+
+        weekly, projects, rank = asyncio.run(run())
+        # Hydrated history plus both awards, each counted once
+        assert [(entry["user_id"], entry["xp"]) for entry in weekly] == [("user0", 1100), ("user4", 500), ("user3", 400)]
+        assert [(entry["user_id"], entry["projects"]) for entry in projects] == [("user0", 5), ("user4", 4), ("user3", 3)]
+        assert rank == 6
@@ -0,0 +1,124 @@
+import asyncio
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.advanced_analytics_system import AdvancedAnalyticsSystem
+from services.metric_pipeline import MetricPipeline
+
+
+class TestMetricPipeline:
+    """Test cases for batching metric consumers"""
+
+    def test_retries_then_drops_and_bounds_the_queue(self):
+        async def run():
+            pipeline = MetricPipeline()
+            attempts = []
+
+            async def flaky(batch):
+                attempts.append(list(batch))
+                if len(attempts) <= 2:
+                    raise ConnectionError("upstream unavailable")
+
+            async def broken(batch):
+                raise ConnectionError("always down")
+
+            flaky_consumer = pipeline.add_consumer("flaky", flaky, batch_size=10, flush_interval=0.01,
+                                                   backoff_base=0.001)
+            broken_consumer = pipeline.add_consumer("broken", broken, batch_size=10, flush_interval=0.01,
+                                                    max_retries=1, backoff_base=0.001, queue_size=5)
+            for i in range(8):
+                pipeline.publish(i)
+            await pipeline.close()
+            return attempts, flaky_consumer.stats(), broken_consumer.stats()
+
+        attempts, flaky, broken = asyncio.run(run())
+        assert attempts == [list(range(8))] * 3
+        assert flaky["exported"] == 8 and flaky["retries"] == 2 and flaky["dropped_failed"] == 0
+        assert broken["dropped_overflow"] == 3 and broken["dropped_failed"] == 5 and broken["retries"] == 1
+        assert broken["last_error"] == "ConnectionError: always down"
+
+
+class TestAdvancedAnalyticsIngest:
+    """Test cases for recording metrics without waiting on exporters"""
+
+    def test_slow_exporter_does_not_delay_record_metric(self):
+        async def run():
+            system = AdvancedAnalyticsSystem()
+            await system.initialize()
+            delivered = []
+
+            async def slow_exporter(batch):
+                await asyncio.sleep(0.2)
+                delivered.extend(batch)
+
+            system.pipeline.add_consumer("slow_stub", slow_exporter, batch_size=50, flush_interval=0.01)
+            latencies = []
+            for i in range(500):
+                start = time.perf_counter()
+                await system.record_metric("performance.api_call", 2500 if i < 250 else 100, "timer")
+                latencies.append(time.perf_counter() - start)
+            depth = system.get_pipeline_stats()["consumers"]["slow_stub"]["queue_depth"]
+            await system.close()
+            alerts = [alert for alert in system.alerts.values() if alert.metric_name == "performance.api_call"]
+            rule = system.alert_engine.rules[alerts[0].id]
+            return sorted(latencies), depth, delivered, alerts[0], rule, system.get_pipeline_stats()
+
+        latencies, depth, delivered, alert, rule, stats = asyncio.run(run())
+        assert latencies[-1] < 0.05 and depth > 0
+        assert len(delivered) == 500
+        # The 10 minute average crossed 2s and came back under it, evaluated off the request path
+        assert alert.triggered_at is None and alert.resolved_at is not None and rule.fire_count == 1
+        assert stats["consumers"]["alerts"]["exported"] == 500 and stats["queue_depth"] == 0
+
+    def test_inactive_alerts_are_not_triggered(self):
+        async def run():
+            system = AdvancedAnalyticsSystem()
+            await system.initialize()
+            for alert in system.alerts.values():
+                alert.is_active = False
+            for _ in range(50):
+                await system.record_metric("performance.api_call", 2500, "timer")
+            await system.close()
+            return system
+
+        system = asyncio.run(run())
+        assert [a for a in system.alerts.values() if a.metric_name == "performance.api_call"]
+        assert all(alert.triggered_at is None for alert in system.alerts.values())
+
+    def test_pipeline_gauges_skip_the_metric_store_and_survive_errors(self, monkeypatch):
+        monkeypatch.setattr("services.advanced_analytics_system.ANALYTICS_PIPELINE_REPORT_INTERVAL", 0.01)
+
+        async def run():
+            system = AdvancedAnalyticsSystem()
+            await system.initialize()
+            gauges = []
+
+            async def collect(batch):
+                gauges.extend(m for m in batch if m.name.startswith("analytics.pipeline."))
+
+            system.pipeline.add_consumer("collector", collect, flush_interval=0.01)
+            evaluate = system._evaluate_alerts
+            failures = []
+
+            def fail_once():
+                if not failures:
+                    failures.append(True)
+                    raise RuntimeError("boom")
+                evaluate()
+
+            system._evaluate_alerts = fail_once
+            await system.record_metric("performance.api_call", 100, "timer")
+            await asyncio.sleep(0.1)
+            reporter_alive = not system._pipeline_reporter.done()
+            await system.close()
+            return system, gauges, failures, reporter_alive
+
+        system, gauges, failures, reporter_alive = asyncio.run(run())
+        assert failures and reporter_alive and gauges
+        assert [m.name for m in system.metrics] == ["performance.api_call"]
+        summary = asyncio.run(system.get_analytics_summary())
+        assert summary["summary"]["total_metrics"] == 1
@@ -0,0 +1,137 @@
+import asyncio
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.offline_sync import APPLIED, CONFLICT, OfflineSyncService, compare_versions, merge_versions
+from services.shared_state import MmapStateBackend, SharedState
+
+
+class TestVersionVectors:
+    """Test cases for version vector comparison"""
+
+    def test_compare_and_merge(self):
+        assert compare_versions({"a": 2, "b": 1}, {"a": 1}) == "descendant"
+        assert compare_versions({"a": 1}, {"a": 1, "b": 1}) == "ancestor"
+        assert compare_versions({"a": 2}, {"b": 1}) == "concurrent"
+        assert compare_versions({}, {}) == "equal"
+        assert merge_versions({"a": 2, "b": 1}, {"b": 3}) == {"a": 2, "b": 3}
+
+
+class TestOfflineSync:
+    """Test cases for delta push/pull between devices"""
+
+    def test_pull_returns_latest_change_per_entity_since_token(self):
+        async def run():
+            sync = OfflineSyncService(state=SharedState())
+            first = await sync.push("u1", "phone", [{"entity_id": "note", "data_type": "note", "payload": {"v": 1}}])
+            version = first["results"][0]["version"]
+            await sync.push("u1", "phone", [
+                {"entity_id": "note", "payload": {"v": 2}, "base_version": version},
+                {"entity_id": "todo", "data_type": "todo", "payload": {"done": False}},
+            ])
+
+            pulled = await sync.pull("u1", since_token=0)
+            assert [(c["entity_id"], c["payload"]) for c in pulled["changes"]] == [
+                ("note", {"v": 2}), ("todo", {"done": False})
+            ]
+            assert pulled["sync_token"] == await sync.current_token("u1") and not pulled["has_more"]
+            assert (await sync.pull("u1", since_token=pulled["sync_token"]))["changes"] == []
+            assert (await sync.pull("u1", since_token=first["sync_token"], exclude_device="phone"))["changes"] == []
+            # A reinstalled phone resyncing from scratch gets its own earlier writes back
+            assert len((await sync.pull("u1", since_token=0, exclude_device="phone"))["changes"]) == 2
+            assert (await sync.pull("u2"))["changes"] == []
+        asyncio.run(run())
+
+    def test_paged_pull_resumes_from_token(self):
+        async def run():
+            sync = OfflineSyncService(max_batch_size=3, state=SharedState())
+            for i in range(3):
+                await sync.push("u1", "phone", [{"entity_id": f"e{i * 3 + j}", "payload": {}} for j in range(3)])
+
+            seen, token, has_more = [], 0, True
+            while has_more:
+                page = await sync.pull("u1", token)
+                seen += [c["entity_id"] for c in page["changes"]]
+                token, has_more = page["sync_token"], page["has_more"]
+            assert seen == [f"e{i}" for i in range(9)]
+
+            with pytest.raises(ValueError):
+                await sync.push("u1", "phone", [{"payload": {}}] * 4)
+        asyncio.run(run())
+
+    def test_retried_batch_is_not_applied_twice(self):
+        async def run():
+            sync = OfflineSyncService(state=SharedState())
+            batch = [{"entity_id": "note", "payload": {"v": 1}, "idempotency_key": "k1"}]
+            first = await sync.push("u1", "phone", batch)
+            retry = await sync.push("u1", "phone", batch)
+
+            assert retry["applied"] == 0 and retry["results"][0]["duplicate"]
+            assert retry["results"][0]["version"] == first["results"][0]["version"] == {"phone": 1}
+            assert await sync.current_token("u1") == first["sync_token"]
+        asyncio.run(run())
+
+    def test_concurrent_edits_conflict_until_resolved(self):
+        async def run():
+            sync = OfflineSyncService(state=SharedState())
+            created = await sync.push("u1", "phone", [{"entity_id": "note", "payload": {"text": "a"}}])
+            base = created["results"][0]["version"]
+
+            await sync.push("u1", "tablet", [{"entity_id": "note", "payload": {"text": "tablet"}, "base_version": base}])
+            stale = await sync.push("u1", "phone", [
+                {"entity_id": "note", "payload": {"text": "phone"}, "base_version": base}
+            ])
+            result = stale["results"][0]
+            assert result["status"] == CONFLICT and result["server"]["payload"] == {"text": "tablet"}
+
+            resolved = await sync.push("u1", "phone", [{
+                "entity_id": "note", "payload": {"text": "merged"}, "base_version": result["server"]["version"]
+            }])
+            assert resolved["results"][0]["status"] == APPLIED
+            assert resolved["results"][0]["version"] == {"phone": 2, "tablet": 1}
+            assert (await sync.status("u1"))["conflicts"] == 1
+        asyncio.run(run())
+
+    def test_compaction_keeps_latest_state(self):
+        async def run():
+            sync = OfflineSyncService(state=SharedState())
+            for start in range(0, 3000, 500):
+                # Each edit is based on the one before it in the batch
+                result = await sync.push("u1", "phone", [
+                    {"entity_id": "doc", "payload": {"rev": i}, "base_version": {"phone": i} if i else {}}
+                    for i in range(start, start + 500)
+                ])
+                assert all(r["status"] == APPLIED for r in result["results"])
+
+            log = await sync._logs.get("u1")
+            assert len(log.records) <= 1025
+            changes = (await sync.pull("u1", 0))["changes"]
+            assert len(changes) == 1 and changes[0]["payload"] == {"rev": 2999}
+        asyncio.run(run())
+
+    def test_workers_share_one_token_sequence_and_log(self, tmp_path):
+        path = str(tmp_path / "state")
+        # Two uvicorn workers, each with its own service over the host-wide store
+        first = OfflineSyncService(state=SharedState(MmapStateBackend(path, 1024 * 1024)))
+        second = OfflineSyncService(state=SharedState(MmapStateBackend(path, 1024 * 1024)))
+
+        async def run():
+            await asyncio.gather(*[
+                worker.push("u1", device, [{"entity_id": f"{device}-{i}", "payload": {"i": i}}])
+                for i in range(10) for worker, device in ((first, "phone"), (second, "tablet"))
+            ])
+            await first.push("u2", "phone", [{"entity_id": "other", "payload": {}}])
+            pulled = await second.pull("u1", 0)
+            return pulled, await first.pull("u1", pulled["sync_token"]), await second.status("u1")
+
+        pulled, after, status = asyncio.run(run())
+        assert sorted(c["entity_id"] for c in pulled["changes"]) == sorted(
+            f"{device}-{i}" for i in range(10) for device in ("phone", "tablet"))
+        tokens = [c["sync_token"] for c in pulled["changes"]]
+        assert tokens == sorted(set(tokens))
+        assert after["changes"] == [] and status["entities"] == 20
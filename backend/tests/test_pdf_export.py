@@ -0,0 +1,119 @@
+import asyncio
+import re
+import sys
+import os
+import zlib
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pdf_export_pool import PdfExportPool
+from services.pdf_renderer import render_deck_bytes, slide_lines
+from services.presentation_service import PresentationService, PresentationTheme, PresentationType
+
+PROJECT = {"name": "Realtime (Dashboard)", "description": "Live metrics", "tech_stack": ["React", "FastAPI"]}
+
+
+def make_service(tmp_path, max_workers=0):
+    service = PresentationService()
+    service.pdf_exports = PdfExportPool(max_workers=max_workers, cache_dir=str(tmp_path))
+    asyncio.run(service.initialize())
+    return service
+
+
+def generate(service, theme=PresentationTheme.PROFESSIONAL):
+    return asyncio.run(service.generate_presentation("p1", PROJECT, PresentationType.CLIENT_PITCH, theme))
+
+
+class TestPdfRenderer:
+    """Test cases for the pure-Python PDF writer"""
+
+    def test_document_structure_and_offsets(self):
+        deck = {"title": "Deck", "theme": "modern", "presenter_name": "Ana",
+                "slides": [{"title": f"Slide {i}", "content": {"points": ["a", "b"]}} for i in range(3)]}
+        pdf = render_deck_bytes(deck)
+
+        assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+        assert pdf.count(b"/Type /Page ") == 3 and b"/Count 3" in pdf
+
+        xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+        assert pdf[xref:].startswith(b"xref")
+        for number, offset in enumerate(re.findall(rb"(\d{10}) 00000 n", pdf), start=1):
+            assert pdf[int(offset):].startswith(b"%d 0 obj" % number)
+
+    def test_slide_text_is_escaped_and_compressed(self):
+        deck = {"title": "Deck", "slides": [{"title": "Costs (2024) \\ plan", "content": {"roi": "30 days 🚀"}}]}
+        pdf = render_deck_bytes(deck)
+        stream = re.search(rb"stream\n(.*?)\nendstream", pdf, re.S).group(1)
+        text = zlib.decompress(stream)
+
+        assert b"(Costs \\(2024\\) \\\\ plan) Tj" in text
+        assert b"(Roi: 30 days) Tj" in text
+
+    def test_slide_lines_flatten_content(self):
+        lines = slide_lines({"logo": "/x.png", "title": "T", "features": [{"name": "AI", "icon": "🤖",
+                                                                           "description": "Agents"}]})
+        assert lines == [("text", "Title: T"), ("heading", "Features"), ("bullet", "AI — Agents")]
+
+
+class TestPdfExportPool:
+    """Test cases for cached, off-loop presentation exports"""
+
+    def test_export_renders_once_per_content(self, tmp_path):
+        service = make_service(tmp_path)
+        presentation = generate(service)
+
+        async def export_twice():
+            return await asyncio.gather(*[service.render_presentation_pdf(presentation.id) for _ in range(3)])
+
+        paths = asyncio.run(export_twice())
+        assert len(set(paths)) == 1 and open(paths[0], "rb").read(8) == b"%PDF-1.4"
+        assert service.pdf_exports.stats["misses"] == 1
+
+        asyncio.run(service.render_presentation_pdf(presentation.id))
+        assert service.pdf_exports.stats["hits"] == 1
+
+        other = generate(service, PresentationTheme.STARTUP)
+        assert asyncio.run(service.render_presentation_pdf(other.id)) != paths[0]
+
+    def test_renders_in_worker_process_and_evicts(self, tmp_path):
+        service = make_service(tmp_path, max_workers=1)
+        service.pdf_exports.cache_size = 1
+        try:
+            first = asyncio.run(service.render_presentation_pdf(generate(service).id))
+            second = asyncio.run(service.render_presentation_pdf(generate(service, PresentationTheme.MODERN).id))
+        finally:
+            service.shutdown()
+
+        assert os.path.exists(second) and not os.path.exists(first)
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    def test_open_handles_survive_eviction(self, tmp_path):
+        service = make_service(tmp_path)
+        pool = service.pdf_exports
+        pool.cache_size = 1
+        first, second = generate(service), generate(service, PresentationTheme.MODERN)
+        render = pool.render
+        evicted = []
+
+        async def render_then_evict(deck):
+            path = await render(deck)
+            if not evicted:
+                # Another render finishing between ours and the open
+                evicted.append(path)
+                os.remove(path)
+            return path
+
+        pool.render = render_then_evict
+
+        async def run():
+            handle = await service.open_presentation_pdf(first.id)
+            return handle, await service.open_presentation_pdf(second.id)
+
+        handles = asyncio.run(run())
+        assert pool.stats["misses"] == 3 and evicted == [handles[0].name]
+        assert not os.path.exists(handles[0].name)
+        for handle in handles:
+            with handle:
+                pdf = handle.read()
+            assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
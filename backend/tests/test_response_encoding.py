@@ -0,0 +1,209 @@
+import asyncio
+import gzip
+import json
+import sys
+import os
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import response_encoding
+from services.response_encoding import (
+    JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, PrecompressedCache, compress, dumps_json,
+    negotiate_content_encoding, negotiate_media_type,
+)
+
+
+class Status(Enum):
+    ACTIVE = "active"
+
+
+class TestNegotiation:
+    """Test cases for Accept and Accept-Encoding negotiation"""
+
+    def test_content_encoding_honours_quality_and_availability(self, monkeypatch):
+        monkeypatch.setattr(response_encoding, "BROTLI_AVAILABLE", True)
+        monkeypatch.setattr(response_encoding, "ZSTD_AVAILABLE", False)
+        assert negotiate_content_encoding("gzip, deflate, br") == "br"
+        assert negotiate_content_encoding("br;q=0.5, gzip") == "gzip"
+        assert negotiate_content_encoding("zstd") is None
+        assert negotiate_content_encoding("*") == "br"
+        assert negotiate_content_encoding("gzip;q=0, identity") is None
+        assert negotiate_content_encoding(None) is None
+        # Restricted to what the caller has, e.g. precompressed gzip bytes
+        assert negotiate_content_encoding("br, gzip;q=0.5", ("gzip",)) == "gzip"
+        assert negotiate_content_encoding("br, gzip;q=0", ("gzip",)) is None
+
+    def test_msgpack_only_when_preferred_and_installed(self, monkeypatch):
+        monkeypatch.setattr(response_encoding, "MSGPACK_AVAILABLE", True)
+        assert negotiate_media_type("application/msgpack") == MSGPACK_MEDIA_TYPE
+        assert negotiate_media_type("application/x-msgpack, application/json;q=0.5") == MSGPACK_MEDIA_TYPE
+        assert negotiate_media_type("application/json, application/msgpack;q=0.9") == JSON_MEDIA_TYPE
+        assert negotiate_media_type("*/*") == JSON_MEDIA_TYPE
+
+        monkeypatch.setattr(response_encoding, "MSGPACK_AVAILABLE", False)
+        assert negotiate_media_type("application/msgpack") == JSON_MEDIA_TYPE
+
+
+class TestEncoding:
+    """Test cases for body encoding and cached compression"""
+
+    def test_json_matches_stdlib_and_handles_extra_types(self):
+        payload = {"id": "p1", "files": [{"name": "app.py", "size": 120}], "ratio": 0.5, "title": "Café"}
+        assert json.loads(dumps_json(payload)) == payload
+
+        extra = json.loads(dumps_json({"when": datetime(2024, 1, 2, 3, 4, 5), "tags": {"a"},
+                                       "price": Decimal("9.5"), "status": Status.ACTIVE}))
+        assert extra == {"when": "2024-01-02T03:04:05", "tags": ["a"], "price": 9.5, "status": "active"}
+
+    def test_msgpack_round_trip(self):
+        msgpack = pytest.importorskip("msgpack")
+        payload = {"messages": [{"role": "user", "content": "hi"}], "count": 2}
+        assert msgpack.unpackb(response_encoding.dumps_msgpack(payload)) == payload
+
+    def test_immutable_bodies_are_compressed_once(self):
+        cache = PrecompressedCache(max_entries=2)
+        body = dumps_json({"rows": list(range(2000))})
+
+        first = cache.get_or_compress(body, "gzip")
+        assert cache.get_or_compress(body, "gzip") is first
+        assert gzip.decompress(first) == body
+        assert cache.stats == {"hits": 1, "misses": 1}
+
+        cache.get_or_compress(b"x" * 2000, "gzip")
+        cache.get_or_compress(b"y" * 2000, "gzip")
+        assert len(cache) == 2 and cache.get_or_compress(body, "gzip") is not first
+
+    def test_gzip_output_is_deterministic(self):
+        body = dumps_json({"values": list(range(500))})
+        assert compress(body, "gzip") == compress(body, "gzip")
+
+
+def start(content_type=b"application/json", **extra):
+    headers = [(b"content-type", content_type)] + [
+        (key.replace("_", "-").encode(), value) for key, value in extra.items()
+    ]
+    return {"type": "http.response.start", "status": 200, "headers": headers}
+
+
+def run_middleware(messages, request_headers=None, app=None, **options):
+    """Drive the middleware with a stub ASGI app that sends ``messages``; returns what reached the server"""
+    from middleware.response_encoding import ResponseEncodingMiddleware
+
+    async def stub_app(scope, receive, send):
+        for message in messages:
+            await send(message)
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    middleware = ResponseEncodingMiddleware(app or stub_app, **options)
+    scope = {"type": "http", "headers": [
+        (key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in (request_headers or {}).items()
+    ]}
+    asyncio.run(middleware(scope, receive, send))
+    return sent, middleware
+
+
+def header(message, name):
+    return next((value.decode("latin-1") for key, value in message["headers"] if key.lower() == name), None)
+
+
+class TestResponseEncodingMiddleware:
+    """Test cases for the ASGI middleware driven by a stub app"""
+
+    @pytest.fixture(autouse=True)
+    def gzip_only(self, monkeypatch):
+        pytest.importorskip("fastapi")
+        monkeypatch.setattr(response_encoding, "BROTLI_AVAILABLE", False)
+        monkeypatch.setattr(response_encoding, "ZSTD_AVAILABLE", False)
+
+    def test_negotiated_encoding_compresses_and_rewrites_headers(self):
+        body = dumps_json({"rows": list(range(1000))})
+        sent, _ = run_middleware(
+            [start(content_length=str(len(body)).encode(), vary=b"Origin"),
+             {"type": "http.response.body", "body": body}],
+            {"Accept-Encoding": "br, gzip;q=0.8"}, minimum_size=100)
+
+        assert [message["type"] for message in sent] == ["http.response.start", "http.response.body"]
+        assert header(sent[0], b"content-encoding") == "gzip"
+        assert header(sent[0], b"content-length") == str(len(sent[1]["body"]))
+        assert header(sent[0], b"vary") == "Origin, Accept, Accept-Encoding"
+        assert gzip.decompress(sent[1]["body"]) == body
+
+    def test_without_an_accepted_encoding_the_body_is_untouched(self):
+        body = b"x" * 5000
+        for accept_encoding in (None, "identity", "gzip;q=0, br"):
+            sent, _ = run_middleware([start(), {"type": "http.response.body", "body": body}],
+                                     {"Accept-Encoding": accept_encoding} if accept_encoding else {}, minimum_size=100)
+            assert header(sent[0], b"content-encoding") is None and sent[1]["body"] == body
+            assert header(sent[0], b"vary") == "Accept, Accept-Encoding"
+
+    def test_streamed_bodies_pass_through_chunk_by_chunk(self):
+        chunks = [b"a" * 4000, b"b" * 4000, b""]
+        messages = [start()] + [
+            {"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1}
+            for index, chunk in enumerate(chunks)
+        ]
+        sent, _ = run_middleware(messages, {"Accept-Encoding": "gzip"}, minimum_size=100)
+        assert header(sent[0], b"content-encoding") is None
+        assert [message["body"] for message in sent[1:]] == chunks
+        assert [message["more_body"] for message in sent[1:]] == [True, True, False]
+
+    def test_encoded_small_and_binary_responses_pass_through(self):
+        encoded = gzip.compress(b"y" * 5000)
+        cases = [
+            (start(content_encoding=b"gzip"), encoded),
+            (start(), b'{"ok": true}'),
+            (start(content_type=b"image/png"), b"\x89PNG" + b"\x00" * 5000),
+        ]
+        for start_message, body in cases:
+            sent, _ = run_middleware([start_message, {"type": "http.response.body", "body": body}],
+                                     {"Accept-Encoding": "gzip"}, minimum_size=100)
+            assert sent[1]["body"] == body
+            assert header(sent[0], b"content-encoding") == header(start_message, b"content-encoding")
+
+    def test_immutable_responses_are_served_from_the_precompressed_cache(self):
+        body = dumps_json({"bundle": ["x"] * 2000})
+        messages = [start(cache_control=b"public, max-age=31536000, immutable"),
+                    {"type": "http.response.body", "body": body}]
+        from middleware.response_encoding import ResponseEncodingMiddleware
+
+        async def stub_app(scope, receive, send):
+            for message in messages:
+                await send(message)
+
+        middleware = ResponseEncodingMiddleware(stub_app, minimum_size=100)
+        bodies = []
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                bodies.append(message["body"])
+
+        scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+        for _ in range(2):
+            asyncio.run(middleware(scope, None, send))
+        assert bodies[0] is bodies[1] and gzip.decompress(bodies[0]) == body
+        assert middleware.cache.stats == {"hits": 1, "misses": 1}
+
+    def test_default_response_class_renders_the_negotiated_media_type(self, monkeypatch):
+        from middleware.response_encoding import NegotiatedJSONResponse
+
+        monkeypatch.setattr(response_encoding, "MSGPACK_AVAILABLE", False)
+
+        async def app(scope, receive, send):
+            await NegotiatedJSONResponse({"when": datetime(2024, 1, 2)})(scope, receive, send)
+
+        sent, _ = run_middleware([], {"Accept": "application/msgpack"}, app=app)
+        assert header(sent[0], b"content-type") == JSON_MEDIA_TYPE
+        assert json.loads(sent[1]["body"]) == {"when": "2024-01-02T00:00:00"}
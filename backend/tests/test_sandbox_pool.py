@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.sandbox_pool import SandboxLimits, SandboxPool
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="sandbox workers need Linux rlimits")
+
+FORK_BOMB = """
+import os
+while True:
+    try:
+        os.fork()
+    except OSError:
+        pass
+"""
+
+
+def run_jobs(jobs, **pool_kwargs):
+    """Run ``(code, limits)`` pairs in order on one pool; returns the results and final status"""
+    async def run():
+        pool = SandboxPool(workers=1, limits=SandboxLimits(wall_seconds=5, cpu_seconds=2, memory_mb=64),
+                           **pool_kwargs)
+        try:
+            results = [await pool.run(code, "python", limits) for code, limits in jobs]
+            await asyncio.sleep(0)
+            return results, pool.status()
+        finally:
+            await pool.shutdown()
+
+    return asyncio.run(run())
+
+
+class TestSandboxPool:
+    """Test cases for the warm sandbox execution pool"""
+
+    def test_runs_snippets_in_private_directories_on_a_reused_worker(self):
+        code = "import os\nprint(os.getcwd())\nopen('scratch.txt', 'w').write('x')\nprint(sorted(os.listdir('.')))"
+        (first, second), status = run_jobs([(code, None), (code, None)])
+
+        assert first["exit_code"] == 0 and first["limit"] is None
+        first_dir, listing = first["output"].splitlines()
+        assert listing == "['scratch.txt']" and not os.path.exists(first_dir)
+        assert second["output"].splitlines()[0] != first_dir
+        assert status["recycled"] == 0 and status["executions"] == 2
+
+    def test_memory_hog_is_stopped_and_worker_recycled(self):
+        (result,), status = run_jobs([("block = bytearray(512 * 1024 * 1024)", None)])
+        assert result["limit"] == "memory" and "MemoryError" in result["errors"]
+        assert status["limit_breaches"] == 1 and status["recycled"] == 1
+
+    def test_fork_bomb_is_contained_and_cleaned_up(self):
+        # The pool drops root to nobody, so the kernel applies the process limit
+        (result, after), status = run_jobs([(FORK_BOMB, {"wall_seconds": 1, "max_processes": 16}),
+                                            ("print('still alive')", None)])
+        assert result["limit"] in ("timeout", "processes") and result["strays"] > 0
+        assert after["output"] == "still alive\n" and after["strays"] == 0
+        assert status["recycled"] == 1
+
+    def test_output_is_streamed_and_capped(self):
+        # Pauses after the first lines so they arrive as separate reads even on a busy machine
+        code = "import time\nfor i in range(1000):\n    print('line', i, flush=True)\n    if i < 3: time.sleep(0.05)"
+
+        async def run():
+            pool = SandboxPool(workers=1, limits=SandboxLimits(max_output_bytes=200))
+            try:
+                return [event async for event in pool.stream(code)]
+            finally:
+                await pool.shutdown()
+
+        events = asyncio.run(run())
+        done = events[-1]
+        chunks = [event["data"] for event in events[:-1]]
+        assert done["done"] and done["truncated"] and done["limit"] == "output"
+        assert len(chunks) > 1 and len("".join(chunks).encode()) == 200
+
+    def test_worker_is_recycled_after_max_jobs(self):
+        results, status = run_jobs([("print(1)", None)] * 3, max_jobs_per_worker=2)
+        assert all(result["output"] == "1\n" for result in results)
+        assert status["recycled"] == 1 and status["limit_breaches"] == 0
@@ -0,0 +1,112 @@
+import asyncio
+import gzip
+import sys
+import os
+import threading
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import seo_service
+from services.seo_service import SEOService, SitemapEntry
+
+
+def make_service():
+    service = SEOService()
+    asyncio.run(service.initialize())
+    return service
+
+
+def entries(count):
+    return [SitemapEntry(f"https://aitempo.dev/p/{i}?a=1&b=2", datetime(2024, 1, 1), "weekly", 0.5) for i in range(count)]
+
+
+class TestSitemap:
+    """Test cases for streamed, sharded sitemaps"""
+
+    def test_stream_matches_document_and_escapes_urls(self):
+        service = make_service()
+        service.set_sitemap_entries(entries(3))
+        xml = asyncio.run(service.generate_sitemap_xml())
+        assert xml == "".join(service.iter_sitemap_xml())
+        assert "?a=1&amp;b=2" in xml and xml.count("<url>") == 3
+        assert gzip.decompress(service.get_sitemap_document().body).decode() == xml
+
+    def test_sitemap_is_sharded_behind_an_index(self, monkeypatch):
+        monkeypatch.setattr(seo_service, "SITEMAP_URL_LIMIT", 10)
+        service = make_service()
+        service.set_sitemap_entries(entries(25))
+
+        root = "".join(service.iter_sitemap_xml())
+        assert "<sitemapindex" in root and root.count("<sitemap>") == 3
+        assert "".join(service.iter_sitemap_xml(2)).count("<url>") == 5
+        assert service.get_sitemap_document(3) is None
+
+    def test_cached_document_is_rebuilt_after_entries_change(self):
+        service = make_service()
+        first = service.get_sitemap_document()
+        assert service.get_sitemap_document() is first
+
+        service.add_sitemap_entries(entries(1))
+        second = service.get_sitemap_document()
+        assert second is not first and second.etag != first.etag
+
+    def test_loads_build_off_the_event_loop_and_compress_only_for_gzip(self):
+        service = make_service()
+        service.set_sitemap_entries(entries(3))
+        threads = []
+        build = service._build_sitemap_document
+
+        def recording_build(*args):
+            threads.append(threading.current_thread())
+            return build(*args)
+
+        service._build_sitemap_document = recording_build
+
+        async def run():
+            identity = await service.load_sitemap_document(compressed=False)
+            both = await asyncio.gather(*(service.load_sitemap_document(compressed=True) for _ in range(5)))
+            return identity, both
+
+        identity, compressed = asyncio.run(run())
+        assert identity.body is None
+        assert all(document is compressed[0] for document in compressed)
+        assert compressed[0].etag == identity.etag
+        assert gzip.decompress(compressed[0].body).decode() == "".join(service.iter_sitemap_xml())
+        # One hashing pass, one compression pass shared by the five gzip requests
+        assert len(threads) == 2 and threading.main_thread() not in threads
+        assert service.get_sitemap_document() is compressed[0]
+
+    def test_build_finishing_after_entries_change_is_not_cached(self):
+        service = make_service()
+
+        async def run():
+            load = asyncio.ensure_future(service.load_sitemap_document())
+            await asyncio.sleep(0)
+            service.set_sitemap_entries(entries(2))
+            stale = await load
+            return stale, await service.load_sitemap_document()
+
+        stale, fresh = asyncio.run(run())
+        assert fresh is not stale and fresh.url_count == 2 and fresh.etag != stale.etag
+
+
+class TestMetaTags:
+    """Test cases for cached meta tag fragments"""
+
+    def test_fragment_is_cached_until_page_seo_changes(self):
+        service = make_service()
+        first = asyncio.run(service.generate_meta_tags("/templates"))
+        assert asyncio.run(service.generate_meta_tags("/templates")) is first
+
+        updated = seo_service.SEOData(**{**service.page_seo_data["/templates"].__dict__, "title": "New Title"})
+        service.set_page_seo("/templates", updated)
+        assert "<title>New Title</title>" in asyncio.run(service.generate_meta_tags("/templates"))
+
+    def test_dynamic_data_bypasses_cache(self):
+        service = make_service()
+        asyncio.run(service.generate_meta_tags("/"))
+        tags = asyncio.run(service.generate_meta_tags("/", {"title": "Custom"}))
+        assert "<title>Custom</title>" in tags
+        assert "<title>Custom</title>" not in asyncio.run(service.generate_meta_tags("/"))
@@ -0,0 +1,254 @@
+import asyncio
+import fcntl
+import multiprocessing
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.shared_state import (
+    REDIS_AVAILABLE, InProcessStateBackend, MmapStateBackend, PickleCodec, RedisStateBackend, SharedState,
+    SharedStateConflict,
+)
+from utils.unmanaged_state import scan_source
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def worker(path, capacity, worker_id, rounds, barrier):
+    """One uvicorn worker's share of the traffic, against the host-wide store"""
+    state = SharedState(MmapStateBackend(path, capacity))
+    hits, sessions, events = state.counter("hits"), state.map("sessions"), state.list("events", maxlen=50)
+    totals = state.map("totals")
+    barrier.wait()
+
+    def count(current):
+        current = current or {}
+        current[str(worker_id)] = current.get(str(worker_id), 0) + 1
+        return current
+
+    async def run():
+        for i in range(rounds):
+            await hits.incr()
+            await hits.incr(f"worker-{worker_id}")
+            await sessions.set(f"{worker_id}:{i % 10}", {"worker": worker_id, "round": i})
+            await events.append([worker_id, i])
+            await totals.update("per-worker", count, attempts=1000)
+    asyncio.run(run())
+
+
+def run_workers(path, capacity, workers=4, rounds=150):
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(workers)
+    processes = [context.Process(target=worker, args=(path, capacity, w, rounds, barrier)) for w in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+
+@pytest.fixture(params=["memory", "mmap"])
+def state(request, tmp_path):
+    clock = FakeClock()
+    if request.param == "memory":
+        backend = InProcessStateBackend(clock)
+    else:
+        backend = MmapStateBackend(str(tmp_path / "state"), 64 * 1024, clock)
+    shared = SharedState(backend)
+    shared.clock = clock
+    yield shared
+    asyncio.run(backend.close())
+
+
+class TestSharedStructures:
+    """The typed structures behave the same on every backend"""
+
+    def test_map_ttl_map_counter_and_list(self, state):
+        async def run():
+            sessions = state.map("sessions", codec=PickleCodec())
+            await sessions.set("a", {"user": "u1", "tags": {"x"}})
+            copy = await sessions.get("a")
+            copy["user"] = "changed"
+            assert (await sessions.get("a"))["user"] == "u1"
+            assert await sessions.delete("a") and not await sessions.delete("a")
+
+            tokens = state.ttl_map("tokens", ttl=60)
+            await tokens.set("t1", 1)
+            await tokens.set("t2", 2, ttl=600)
+            state.clock.now += 61
+            assert await tokens.get("t1") is None and await tokens.items() == [("t2", 2)]
+
+            hourly = state.counter("hourly", ttl=3600)
+            assert [await hourly.incr("u1") for _ in range(3)] == [1, 2, 3]
+            state.clock.now += 3601
+            assert await hourly.get("u1") == 0 and await hourly.incr("u1", 5) == 5
+
+            events = state.list("events", maxlen=3)
+            for i in range(5):
+                await events.append({"i": i})
+            assert [e["i"] for e in await events.items()] == [2, 3, 4]
+            assert [e["i"] for e in await events.items(-2)] == [3, 4]
+
+            with pytest.raises(ValueError):
+                state.counter("events")
+        asyncio.run(run())
+
+    def test_update_keeps_concurrent_changes(self, state):
+        async def run():
+            baselines = state.map("baselines")
+
+            async def add(resource):
+                async def change(current):
+                    current = current or {"resources": []}
+                    # Yield mid-change so the other updates read the same value
+                    await asyncio.sleep(0)
+                    current["resources"].append(resource)
+                    return current
+                return await baselines.update("u1", change)
+
+            await asyncio.gather(*[add(f"/r{i}") for i in range(10)])
+            assert sorted((await baselines.get("u1"))["resources"]) == sorted(f"/r{i}" for i in range(10))
+
+            tokens = state.ttl_map("tokens", ttl=60)
+            assert await tokens.update("t1", lambda current: (current or 0) + 1) == 1
+            state.clock.now += 61
+            assert await tokens.update("t1", lambda current: (current or 0) + 1) == 1
+
+            async def always_loses(current):
+                await baselines.set("u1", {"resources": (current or {}).get("resources", []) + ["other"]})
+                return {"resources": ["lost"]}
+            with pytest.raises(SharedStateConflict):
+                await baselines.update("u1", always_loses, attempts=3)
+        asyncio.run(run())
+
+    def test_mmap_compacts_when_the_log_fills(self, tmp_path):
+        async def run():
+            backend = MmapStateBackend(str(tmp_path / "state"), 8 * 1024)
+            state = SharedState(backend)
+            config, hits = state.map("config"), state.counter("hits")
+            for i in range(2000):
+                await config.set("version", i)
+                await hits.incr()
+            assert backend.compactions > 0
+            reader = SharedState(MmapStateBackend(str(tmp_path / "state")))
+            assert await reader.map("config").get("version") == 1999
+            assert await reader.counter("hits").get() == 2000
+        asyncio.run(run())
+
+    def test_mmap_waits_for_another_workers_lock_without_blocking_the_loop(self, tmp_path):
+        path = str(tmp_path / "state")
+        state = SharedState(MmapStateBackend(path, 64 * 1024))
+        # Another worker's open file description, holding the lock
+        other = os.open(path, os.O_RDWR)
+        fcntl.flock(other, fcntl.LOCK_EX)
+
+        async def run():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            ticker = asyncio.create_task(tick())
+            write = asyncio.create_task(state.map("config").set("version", 1))
+            await asyncio.sleep(0.1)
+            assert not write.done() and ticks > 5
+            fcntl.flock(other, fcntl.LOCK_UN)
+            await asyncio.wait_for(write, 1)
+            ticker.cancel()
+            return await state.map("config").get("version")
+
+        try:
+            assert asyncio.run(run()) == 1
+        finally:
+            os.close(other)
+
+
+class TestMultiWorkerConsistency:
+    """Several processes sharing one mmap store see one consistent state"""
+
+    @pytest.mark.parametrize("capacity", [4 * 1024 * 1024, 16 * 1024])
+    def test_concurrent_workers(self, tmp_path, capacity):
+        path = str(tmp_path / "state")
+        run_workers(path, capacity, workers=4, rounds=150)
+
+        async def check():
+            state = SharedState(MmapStateBackend(path, capacity))
+            hits = state.counter("hits")
+            assert await hits.get() == 600
+            assert [await hits.get(f"worker-{w}") for w in range(4)] == [150] * 4
+            sessions = dict(await state.map("sessions").items())
+            assert len(sessions) == 40 and all(value["round"] >= 140 for value in sessions.values())
+            assert await state.map("totals").get("per-worker") == {str(w): 150 for w in range(4)}
+            events = await state.list("events", maxlen=50).items()
+            assert len(events) == 50
+            # Each worker's own events stay in order
+            for w in range(4):
+                rounds = [i for worker_id, i in events if worker_id == w]
+                assert rounds == sorted(rounds)
+        asyncio.run(check())
+
+    def test_redis_backend(self):
+        if not REDIS_AVAILABLE:
+            pytest.skip("redis package not installed")
+        import redis.asyncio as redis
+
+        async def run():
+            client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379"), decode_responses=True)
+            try:
+                await client.ping()
+            except Exception:
+                pytest.skip("Redis not reachable")
+            state = SharedState(RedisStateBackend(client, prefix="aether:test:"))
+            counter = state.counter("hits")
+            await asyncio.gather(*[counter.incr() for _ in range(100)])
+            assert await counter.get() == 100
+            hourly = state.counter("hourly", ttl=3600)
+            assert [await hourly.incr() for _ in range(3)] == [1, 2, 3]
+            assert 0 < await client.ttl("aether:test:counter:hourly:value") <= 3600
+            totals = state.map("totals")
+            await asyncio.gather(*[totals.update("n", lambda current: (current or 0) + 1) for _ in range(20)])
+            assert await totals.get("n") == 20
+            await client.delete("aether:test:counter:hits:value", "aether:test:counter:hourly:value",
+                                "aether:test:map:totals")
+            await client.close()
+        asyncio.run(run())
+
+
+class TestUnmanagedStateScan:
+    def test_reports_process_local_containers_only(self):
+        source = '''
+CACHE_LIMITS = {"a": 1}
+_registry = {}
+_service = None
+
+class Service:
+    def __init__(self):
+        self.sessions = {}
+        self.history: list = []
+        self.name = "x"
+        self.managed = get_shared_state().map("managed")
+        shared_state = get_shared_state()
+        self.events = shared_state.list("events", maxlen=10)
+
+def get_service():
+    global _service
+    return _service
+'''
+        findings = [(f.kind, f.label) for f in scan_source(source, "services.example")]
+        assert findings == [
+            ("module", "_registry"), ("instance", "Service.sessions"), ("instance", "Service.history"),
+            ("global", "_service"),
+        ]
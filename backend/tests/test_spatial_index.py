@@ -0,0 +1,87 @@
+import asyncio
+import random
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.spatial_index import DiagramLayout, SpatialGrid
+from services.visual_programming import VisualProgramming
+
+
+def pairwise_relationships(elements):
+    """The all-pairs scan the layout replaces"""
+    relationships = []
+    for i, element1 in enumerate(elements):
+        for j, element2 in enumerate(elements[i + 1:], i + 1):
+            pos1, pos2 = element1["position"], element2["position"]
+            distance = ((pos1["x"] - pos2["x"]) ** 2 + (pos1["y"] - pos2["y"]) ** 2) ** 0.5
+            if distance < 150:
+                relationships.append({
+                    "id": f"rel_{i}_{j}",
+                    "source": element1["id"],
+                    "target": element2["id"],
+                    "type": "connection",
+                    "strength": max(0.1, 1.0 - (distance / 300)),
+                })
+    return relationships
+
+
+def make_elements(rng, count, side):
+    return [{"id": f"e{i}", "position": {"x": rng.uniform(-side, side), "y": rng.uniform(-side, side)}}
+            for i in range(count)]
+
+
+class TestDiagramLayout:
+    """Test cases for grid-indexed element relationships"""
+
+    def test_relationships_match_the_pairwise_scan(self):
+        rng = random.Random(7)
+        elements = make_elements(rng, 400, 1200)
+        # Points exactly on cell borders and at the threshold distance
+        elements += [{"id": "b0", "position": {"x": 0, "y": 0}}, {"id": "b1", "position": {"x": 150, "y": 0}},
+                     {"id": "b2", "position": {"x": -149.5, "y": 0}}]
+
+        assert DiagramLayout(elements).relationships() == pairwise_relationships(elements)
+
+    def test_moves_update_relationships_incrementally(self):
+        rng = random.Random(11)
+        elements = make_elements(rng, 300, 900)
+        layout = DiagramLayout(elements)
+        for _ in range(50):
+            element = rng.choice(elements)
+            layout.move(element["id"], {"x": rng.uniform(-900, 900), "y": rng.uniform(-900, 900)})
+            assert layout.relationships() == pairwise_relationships(elements)
+
+        layout.add({"id": "new", "position": {"x": 0.0, "y": 0.0}})
+        assert layout.relationships() == pairwise_relationships(elements + [layout.elements[-1]])
+        assert {neighbour["id"] for neighbour in layout.neighbours("new")} == {
+            rel["source"] for rel in layout.relationships() if rel["target"] == "new"}
+
+    def test_grid_moves_between_cells(self):
+        grid = SpatialGrid(10)
+        grid.insert("a", 5, 5)
+        grid.move("a", 25, -5)
+        assert list(grid.candidates(5, 5, 1)) == [] and list(grid.candidates(25, -5, 1)) == ["a"]
+        grid.remove("a")
+        assert len(grid) == 0 and not grid._cells
+
+
+class TestDiagramCache:
+    """Test cases for the layouts kept alongside cached analyses"""
+
+    def test_failed_analysis_keeps_no_layout(self):
+        service = VisualProgramming(None)
+
+        async def failing(analysis):
+            raise RuntimeError("feasibility model unavailable")
+
+        async def run():
+            analyzed = await service.analyze_diagram({"metadata": {"type": "flowchart"}})
+            service._assess_generation_feasibility = failing
+            return analyzed, await service.analyze_diagram({"metadata": {"type": "flowchart"}})
+
+        analyzed, failed = asyncio.run(run())
+        assert "error" not in analyzed and failed["error"] == "feasibility model unavailable"
+        assert list(service.diagram_layouts) == list(service.diagram_cache) == [analyzed["diagram_id"]]
@@ -0,0 +1,86 @@
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.startup_profiler import (
+    ImportRecorder, OfflineDatabase, OfflineDatabaseWrapper, compare_profiles, format_report, profile_services,
+)
+
+
+def write_module(directory, name, source):
+    with open(os.path.join(directory, f"{name}.py"), "w") as handle:
+        handle.write(source)
+
+
+class TestStartupProfiler:
+    """Test cases for the startup profiler"""
+
+    def test_import_recorder_splits_self_and_cumulative_time(self, tmp_path, monkeypatch):
+        write_module(tmp_path, "profiled_child", "import time\ntime.sleep(0.05)\nTABLE = list(range(50000))\n")
+        write_module(tmp_path, "profiled_parent", "import time\nimport profiled_child\ntime.sleep(0.02)\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        import tracemalloc
+        tracemalloc.start()
+        try:
+            recorder = ImportRecorder()
+            with recorder.installed():
+                import profiled_parent  # noqa: F401
+        finally:
+            tracemalloc.stop()
+            sys.modules.pop("profiled_parent", None)
+            sys.modules.pop("profiled_child", None)
+
+        parent, child = recorder.records["profiled_parent"], recorder.records["profiled_child"]
+        assert child.self_ms >= 45 and parent.cumulative_ms >= child.cumulative_ms + 15
+        assert 15 <= parent.self_ms < child.self_ms
+        # The list stays referenced by the child module, so it is retained there
+        assert child.self_kb > 1000 and parent.self_kb < child.self_kb
+        assert recorder not in sys.meta_path
+
+    def test_services_initialize_against_offline_database(self):
+        class Service:
+            def __init__(self, db_wrapper):
+                self.db_wrapper = db_wrapper
+
+            async def initialize(self):
+                db = await self.db_wrapper.get_database()
+                await db.templates.create_index("id")
+                assert await db.templates.find(({"featured": True})).sort("rating").to_list(10) == []
+                asyncio.ensure_future(asyncio.sleep(3600))
+
+        class Picky:
+            def __init__(self, db, cache):
+                pass
+
+            async def initialize(self):
+                pass
+
+        class Broken:
+            async def initialize(self):
+                raise RuntimeError("boom")
+
+        records = asyncio.run(profile_services(
+            [Service, Picky, Broken], OfflineDatabaseWrapper(OfflineDatabase()), memory=False))
+        assert records[0].error is None and records[0].total_ms < 1000
+        assert records[1].error.startswith("skipped")
+        assert records[2].error == "RuntimeError: boom"
+
+    def test_compare_flags_regressions_above_noise_floor(self):
+        baseline = {"imports": [{"module": "services.a", "self_ms": 10.0, "self_kb": 100.0}], "services": []}
+        current = {
+            "imports": [
+                {"module": "services.a", "self_ms": 30.0, "self_kb": 110.0},
+                {"module": "services.b", "self_ms": 2.0, "self_kb": 4096.0},
+            ],
+            "services": [{"service": "services.a.A", "total_ms": 1.0, "memory_kb": 0.0, "peak_kb": 0.0}],
+        }
+        assert compare_profiles(baseline, current) == [
+            "services.a self_ms: 10.0 -> 30.0", "services.b self_kb: 0.0 -> 4096.0 (new)",
+        ]
+        assert compare_profiles(current, current) == []
+        report = format_report({**current, "imports": [{**r, "cumulative_ms": r["self_ms"]} for r in current["imports"]]})
+        assert report.index("services.a") < report.index("services.b")
@@ -0,0 +1,75 @@
+import random
+import re
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.static_analysis import (PATTERN_RULES, LineIndex, compile_rules, pattern_based_detection,
+                                      static_analysis)
+
+
+def naive_detection(code):
+    """Per-rule scan with prefix newline counting, as the rules were first written"""
+    errors = []
+    for pattern, info in PATTERN_RULES.items():
+        for match in re.finditer(pattern, code, re.IGNORECASE):
+            errors.append({
+                **info,
+                "line": code[:match.start()].count("\n") + 1,
+                "column": match.start() - code.rfind("\n", 0, match.start())
+            })
+    return errors
+
+
+def as_set(errors):
+    return {(e["type"], e["message"], e["line"], e["column"]) for e in errors}
+
+
+class TestLineIndex:
+    """Test cases for offset to line/column mapping"""
+
+    def test_locate_matches_prefix_counting(self):
+        code = "a\n\nbc\ndef\n"
+        index = LineIndex(code)
+        for offset in range(len(code)):
+            expected_line = code[:offset].count("\n") + 1
+            expected_column = offset - code.rfind("\n", 0, offset)
+            assert index.locate(offset) == (expected_line, expected_column)
+
+
+class TestPatternRules:
+    """Test cases for the compiled rule engine"""
+
+    def test_matches_per_rule_scan(self):
+        rng = random.Random(3)
+        snippets = ["if (a = b) {", "console.log(x);", "DEBUGGER;", "if (a == b) {", "let y = 2;", "", "}"]
+        code = "\n".join(" " * rng.randint(0, 4) + rng.choice(snippets) for _ in range(2000))
+        assert as_set(pattern_based_detection(code, "javascript")) == as_set(naive_detection(code))
+
+    def test_overlapping_rules_in_different_groups_both_fire(self):
+        errors = pattern_based_detection("if (x = console.log(y)) {}", "javascript")
+        assert {e["type"] for e in errors} == {"logic_error", "cleanup"}
+
+    def test_overlapping_rules_of_the_same_type_are_not_merged(self):
+        rules = {
+            r"print\(": {"message": "print", "severity": "low", "type": "cleanup"},
+            r"\(debug": {"message": "paren debug", "severity": "low", "type": "cleanup"},
+            r"todo\b": {"message": "todo", "severity": "low", "type": "cleanup"},
+            r"fixme": {"message": "fixme", "severity": "low", "type": "cleanup"},
+            r"debugger;": {"message": "debugger", "severity": "low", "type": "cleanup"},
+        }
+        groups = compile_rules(rules)
+        # print( and (debug overlap on "(" and todo\b is not a literal; fixme and debugger; join print(
+        assert [[rule.pattern for rule in group.rules.values()] for group in groups] == [
+            [r"print\(", "fixme", "debugger;"], [r"\(debug"], [r"todo\b"]
+        ]
+        code = "print(debug) # TODO fixme debugger;"
+        lines = LineIndex(code)
+        found = {e["message"] for group in groups for e in group.scan(code, lines)}
+        assert found == {"print", "paren debug", "todo", "fixme", "debugger"}
+
+    def test_var_warning_reports_line_number(self):
+        errors = static_analysis("const a = 1;\nlet b = 2;\nvar c = 3;\n", "javascript")
+        assert errors[0]["line"] == 3
@@ -0,0 +1,115 @@
+import random
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.template_marketplace_comprehensive import (
+    DifficultyLevel, TechStack, Template, TemplateCategory, TemplateMetrics, TemplateStatus,
+)
+from services.template_search_index import TemplateSearchIndex
+
+TAGS = ["react", "auth", "stripe", "charts", "blog", "seo"]
+
+
+def make_templates(count, seed=5):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    templates = []
+    for i in range(count):
+        tags = rng.sample(TAGS, 2)
+        templates.append(Template(
+            template_id=f"t{i:04d}",
+            name=f"{tags[0].title()} Starter {i}",
+            description=f"Template with {' and '.join(tags)}",
+            category=rng.choice(list(TemplateCategory)[:3]),
+            tech_stack=rng.choice(list(TechStack)[:3]),
+            difficulty=rng.choice(list(DifficultyLevel)),
+            author_id="author",
+            author_name="Author",
+            status=rng.choice([TemplateStatus.PUBLISHED, TemplateStatus.FEATURED, TemplateStatus.DRAFT]),
+            tags=tags,
+            features=[],
+            # Distinct scores so the expected order has no ties
+            metrics=TemplateMetrics(downloads=i * 7 % count, average_rating=(i * 13 % count) / count * 5),
+            created_at=now - timedelta(minutes=i * 11 % count),
+            updated_at=now,
+            price=0.0 if i % 3 else 9.0,
+        ))
+    return templates
+
+
+def brute_force(templates, statuses, category=None, tag=None, min_rating=None, sort_key=None, offset=0, limit=10):
+    matches = [
+        t for t in templates
+        if t.status.value in statuses
+        and (category is None or t.category == category)
+        and (tag is None or tag in t.tags)
+        and (not min_rating or t.metrics.average_rating >= min_rating)
+    ]
+    matches.sort(key=sort_key)
+    return [t.template_id for t in matches[offset:offset + limit]], len(matches)
+
+
+class TestTemplateSearchIndex:
+    """Test cases for the faceted template index"""
+
+    def test_matches_brute_force_for_mixed_filters(self):
+        templates = make_templates(300)
+        index = TemplateSearchIndex()
+        for template in templates:
+            index.upsert(template)
+
+        orderings = {
+            "popularity": lambda t: -t.metrics.downloads,
+            "rating": lambda t: -t.metrics.average_rating,
+            "newest": lambda t: -t.created_at.timestamp(),
+        }
+        rng = random.Random(1)
+        for _ in range(100):
+            statuses = rng.choice([["published", "featured"], ["featured"]])
+            category = rng.choice([None, TemplateCategory.WEB_APP])
+            tag = rng.choice([None, "react", "seo"])
+            min_rating = rng.choice([None, 2.5])
+            sort_by = rng.choice(list(orderings))
+            offset = rng.choice([0, 5, 40])
+
+            facets = {"status": statuses}
+            if category:
+                facets["category"] = [category.value]
+            if tag:
+                facets["tag"] = [tag]
+            result = index.search(facets, min_rating=min_rating, sort_by=sort_by, offset=offset, limit=10)
+            expected = brute_force(templates, statuses, category, tag, min_rating, orderings[sort_by], offset)
+            assert result == expected
+
+    def test_updates_reorder_and_refilter(self):
+        templates = make_templates(50)
+        index = TemplateSearchIndex()
+        for template in templates:
+            index.upsert(template)
+
+        target = templates[10]
+        target.status = TemplateStatus.PUBLISHED
+        target.metrics.downloads = 10_000
+        index.upsert(target)
+        assert index.search({"status": ["published"]}, limit=1)[0] == [target.template_id]
+
+        target.status = TemplateStatus.ARCHIVED
+        index.upsert(target)
+        assert target.template_id not in index.search({"status": ["published", "featured"]}, limit=50)[0]
+
+        index.remove(target.template_id)
+        assert len(index) == 49
+
+    def test_query_words_match_word_prefixes(self):
+        templates = make_templates(30)
+        index = TemplateSearchIndex()
+        for template in templates:
+            index.upsert(template)
+
+        ids, total = index.search({}, query="strip start", limit=100)
+        expected = {t.template_id for t in templates if "stripe" in t.tags}
+        assert set(ids) == expected and total == len(expected)
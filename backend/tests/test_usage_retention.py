@@ -0,0 +1,134 @@
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.usage_retention import UsagePartitions, chunked_delete
+
+
+def matches(doc, query_filter):
+    for field, condition in query_filter.items():
+        value = doc[field]
+        for op, bound in condition.items():
+            if op == "$lt" and not value < bound:
+                return False
+            if op == "$gt" and not value > bound:
+                return False
+            if op == "$lte" and not value <= bound:
+                return False
+    return True
+
+
+class MemoryCollection:
+    """Just enough of a motor collection for the retention helpers"""
+
+    def __init__(self, docs=()):
+        self.docs = sorted(docs, key=lambda d: d["_id"])
+        self.delete_calls = 0
+
+    async def find_one(self, query_filter, projection=None, sort=None, skip=0):
+        found = [d for d in self.docs if matches(d, query_filter)]
+        return found[skip] if skip < len(found) else None
+
+    async def delete_many(self, query_filter):
+        self.delete_calls += 1
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not matches(d, query_filter)]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def create_index(self, keys):
+        pass
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, MemoryCollection())
+
+    async def list_collection_names(self):
+        return list(self.collections)
+
+    async def drop_collection(self, name):
+        self.collections.pop(name, None)
+
+
+class TestUsagePartitions:
+    """Test cases for partition naming and expiry"""
+
+    def test_daily_and_weekly_names_round_trip(self):
+        timestamp = datetime(2024, 3, 14, 17, 30)
+        daily = UsagePartitions("day")
+        weekly = UsagePartitions("week")
+
+        assert daily.partition_name(timestamp) == "usage_records_d20240314"
+        assert weekly.partition_name(timestamp) == "usage_records_w20240311"
+        assert UsagePartitions.parse_partition("usage_records_w20240311") == (
+            datetime(2024, 3, 11), datetime(2024, 3, 18))
+        assert UsagePartitions.parse_partition("usage_records") is None
+        assert daily.partitions_between(datetime(2024, 2, 28, 23), datetime(2024, 3, 1, 1)) == [
+            "usage_records_d20240228", "usage_records_d20240229", "usage_records_d20240301"]
+
+    def test_drop_expired_keeps_partitions_overlapping_the_cutoff(self):
+        partitions = UsagePartitions("day")
+        db = MemoryDatabase()
+        start = datetime(2024, 1, 1)
+
+        async def scenario():
+            for day in range(10):
+                collection = await partitions.collection_for(db, start + timedelta(days=day, hours=3))
+                collection.docs = [{"_id": i} for i in range(day + 1)]
+            db["usage_records"].docs = [{"_id": 0}]
+            return await partitions.drop_expired(db, start + timedelta(days=4, hours=12))
+
+        dropped = asyncio.run(scenario())
+        assert sorted(dropped) == [f"usage_records_d2024010{d}" for d in range(1, 5)]
+        assert sum(dropped.values()) == 1 + 2 + 3 + 4
+        assert "usage_records_d20240105" in db.collections and "usage_records" in db.collections
+
+
+class TestChunkedDelete:
+    """Test cases for throttled range deletes"""
+
+    def test_deletes_only_expired_records_in_bounded_batches(self):
+        cutoff = datetime(2024, 1, 1)
+        docs = [
+            {"_id": f"usage_{i:05d}", "timestamp": cutoff + timedelta(minutes=-1 if i % 3 else 1)}
+            for i in range(1000)
+        ]
+        collection = MemoryCollection(docs)
+        expired = sum(1 for d in docs if d["timestamp"] < cutoff)
+        reports = []
+
+        progress = asyncio.run(chunked_delete(
+            collection, {"timestamp": {"$lt": cutoff}}, batch_size=100, pause=0,
+            progress=lambda state: reports.append(state.deleted),
+        ))
+
+        assert progress.done and progress.deleted == expired
+        assert all(d["timestamp"] >= cutoff for d in collection.docs)
+        assert len(collection.docs) == 1000 - expired
+        # Every batch but the last removes exactly batch_size records
+        assert reports == [min(expired, 100 * n) for n in range(1, len(reports) + 1)]
+        assert collection.delete_calls == len(reports) == 7
+
+    def test_max_batches_stops_early_and_resumes_by_id(self):
+        cutoff = datetime(2024, 1, 1)
+        collection = MemoryCollection(
+            {"_id": i, "timestamp": cutoff - timedelta(days=1)} for i in range(50))
+
+        first = asyncio.run(chunked_delete(collection, {"timestamp": {"$lt": cutoff}},
+                                           batch_size=10, pause=0, max_batches=2))
+        assert not first.done and first.deleted == 20 and first.last_id == 19
+        assert collection.docs[0]["_id"] == 20
+
+        rest = asyncio.run(chunked_delete(collection, {"timestamp": {"$lt": cutoff}}, batch_size=10, pause=0))
+        assert rest.done and rest.deleted == 30 and not collection.docs
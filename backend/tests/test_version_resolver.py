@@ -0,0 +1,148 @@
+import asyncio
+import sys
+import os
+
+import pytest
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.version_resolver import (
+    ConstraintIndex, DependencyResolver, InvalidVersion, base_version, compare_versions, parse_range, parse_version,
+    satisfies
+)
+
+
+class TestVersionOrdering:
+    """Test cases for semver and PEP 440 ordering"""
+
+    def test_semver_precedence(self):
+        ordered = [
+            "1.0.0-alpha", "1.0.0-alpha.1", "1.0.0-alpha.beta", "1.0.0-beta",
+            "1.0.0-beta.2", "1.0.0-beta.11", "1.0.0-rc.1", "1.0.0", "1.0.1", "1.10.0"
+        ]
+        for lower, higher in zip(ordered, ordered[1:]):
+            assert parse_version(lower) < parse_version(higher)
+
+    def test_build_metadata_is_ignored(self):
+        assert compare_versions("1.0.0+build.5", "1.0.0") == 0
+
+    def test_pep440_precedence(self):
+        ordered = ["1.0.dev1", "1.0a1", "1.0a2.dev1", "1.0a2", "1.0b1", "1.0rc1", "1.0", "1.0.post1", "1.1", "1!0.5"]
+        for lower, higher in zip(ordered, ordered[1:]):
+            assert parse_version(lower) < parse_version(higher)
+
+    def test_trailing_zeros_are_equal(self):
+        assert parse_version("1.0") == parse_version("1.0.0")
+
+
+class TestRanges:
+    """Test cases for npm ranges and PEP 440 specifiers"""
+
+    def test_npm_ranges(self):
+        cases = [
+            ("1.2.3", "^1.2.0", True), ("2.0.0", "^1.2.0", False),
+            ("0.2.5", "^0.2.3", True), ("0.3.0", "^0.2.3", False), ("0.0.4", "^0.0.3", False),
+            ("1.2.9", "~1.2.3", True), ("1.3.0", "~1.2.3", False),
+            ("1.9.0", "1.x", True), ("2.0.0", "1.x", False),
+            ("1.5.0", ">=1.0.0 <2.0.0", True), ("3.1.0", "1.x || >=3.0.0", True), ("2.5.0", "1.x || >=3.0.0", False),
+            ("1.5.0", "1.2.3 - 2.3", True), ("2.4.0", "1.2.3 - 2.3", False),
+        ]
+        for version, spec, expected in cases:
+            assert satisfies(version, spec) == expected, (version, spec)
+
+    def test_npm_prereleases_need_opt_in(self):
+        assert not satisfies("1.2.4-beta", "^1.2.3")
+        assert satisfies("1.2.3-beta.2", "^1.2.3-beta.1")
+
+    def test_pep440_specifiers(self):
+        cases = [
+            ("1.4.5", "~=1.4.2", True), ("1.5.0", "~=1.4.2", False),
+            ("1.4.9", "==1.4.*", True), ("1.5", "==1.4.*", False),
+            ("1.9", ">=1.0,<2.0", True), ("2.0", ">=1.0,<2.0", False),
+            ("1.0", ">=1.0,!=1.0", False), ("2.0rc1", ">=1.0", False),
+        ]
+        for version, spec, expected in cases:
+            assert satisfies(version, spec, "pypi") == expected, (version, spec)
+
+    def test_malformed_specifiers_raise_invalid_version(self):
+        for spec in ("==v1.*", "==1.x.*", "!=1..*", "==.*"):
+            with pytest.raises(InvalidVersion):
+                parse_range(spec, "pypi")
+        for spec in ("foo - bar", "1.2.3 - 2.x.y", "1.2.3.4 - 2"):
+            with pytest.raises(InvalidVersion):
+                parse_range(spec)
+
+    def test_pep440_suffixes_are_detected_without_an_ecosystem(self):
+        assert parse_range(">=1.0a1").ecosystem == "pypi" and parse_range(">=1.0a1").contains(parse_version("1.0"))
+        assert parse_range(">=2.0.post1").ecosystem == "pypi" and not satisfies("2.0", ">=2.0.post1")
+        assert parse_range("<1.0.dev3").ecosystem == "pypi"
+        for spec in (">=1.0.0-beta.1", "^1.0.0-alpha.1.beta", "~2.0.0-rc.1"):
+            assert parse_range(spec).ecosystem == "npm", spec
+
+    def test_intersection(self):
+        assert parse_range("^1.0.0").intersect(parse_range("^2.0.0")).is_empty
+        assert not parse_range(">=1.0,<2", "pypi").intersect(parse_range("~=1.5", "pypi")).is_empty
+
+    def test_base_version(self):
+        assert str(base_version("^17.0.2")) == "17.0.2"
+        assert str(base_version("1.x")) == "1.0.0"
+
+
+class TestResolver:
+    """Test cases for constraint indexing and resolution"""
+
+    METADATA = {
+        "a": {"versions": {"1.0.0": {"c": "^1.0.0"}, "2.0.0": {"c": "^2.0.0"}}},
+        "b": {"versions": {"1.0.0": {"c": "^1.1.0"}}},
+        "c": {"versions": {"1.0.0": {}, "1.1.0": {}, "1.2.0": {}, "2.0.0": {}}},
+    }
+
+    def test_constraint_index_reports_conflicting_pairs(self):
+        index = ConstraintIndex("npm")
+        index.add("c", "^1.0.0", "a@1.0.0")
+        index.add("c", "^2.0.0", "b@1.0.0")
+        index.add("d", "^1.0.0", "root")
+        conflicts = index.conflicts()
+        assert [c["package"] for c in conflicts] == ["c"]
+        assert len(conflicts[0]["incompatible_pairs"]) == 1
+
+    def test_resolver_backtracks_to_compatible_versions(self):
+        result = DependencyResolver(self.METADATA).resolve({"a": "*", "b": "^1.0.0"})
+        assert result["conflicts"] == []
+        assert result["resolved"] == {"a": "1.0.0", "b": "1.0.0", "c": "1.2.0"}
+
+    def test_resolver_reports_unresolvable_conflict(self):
+        result = DependencyResolver(self.METADATA).resolve({"a": "^2.0.0", "b": "^1.0.0"})
+        assert [c["package"] for c in result["conflicts"]] == ["c"]
+
+    def test_bundled_snapshot(self):
+        result = DependencyResolver(ecosystem="npm").resolve({"react": "^18.2.0", "react-dom": "^18.2.0"})
+        assert result["conflicts"] == []
+        assert parse_version(result["resolved"]["react"]) >= parse_version("18.2.0")
+
+
+class TestDependencyIntelligence:
+    """Test cases for the service's handling of malformed versions"""
+
+    def test_bad_wildcards_and_snapshot_versions_do_not_escape(self, monkeypatch):
+        from services import dependency_intelligence
+        from services.dependency_intelligence import DependencyIntelligence
+
+        service = DependencyIntelligence(None)
+        resolution = asyncio.run(service._resolve_dependencies({"requests": "==v1.*", "flask": "==1.x.*"}))
+        assert "error" in resolution and resolution["resolved"] == {}
+
+        snapshot = {"pypi": {"leftpad": {"versions": {"1.0.0": {}, "1.2.0": {}, "not-a-version": {}, "2.0.0rc1": {}}}}}
+        monkeypatch.setattr(dependency_intelligence, "load_package_snapshot", lambda: snapshot)
+        assert asyncio.run(service._get_latest_version("leftpad")) == "1.2.0"
+
+    def test_vulnerability_patterns_use_the_project_ecosystem(self):
+        from services.dependency_intelligence import DependencyIntelligence
+
+        service = DependencyIntelligence(None)
+        service.security_database = {"vulnerable_versions": {"django": ["<3.2.post1"], "lodash": ["<4.17.21"]}}
+        found = asyncio.run(service._check_security_vulnerabilities("django", "3.2", "pypi"))
+        assert len(found) == 1
+        assert not asyncio.run(service._check_security_vulnerabilities("django", "3.2.post1", "pypi"))
+        assert asyncio.run(service._check_security_vulnerabilities("lodash", "^4.17.20", "npm"))
@@ -0,0 +1,30 @@
+import asyncio
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.workflow_builder_complete import WorkflowBuilderComplete
+
+
+class TestSharedWorkflows:
+    """Workflows created through one worker are edited and listed through any other"""
+
+    def test_nodes_added_through_two_workers_are_all_kept(self):
+        first, second = WorkflowBuilderComplete(), WorkflowBuilderComplete()
+
+        async def run():
+            created = await first.create_workflow("Shared", "Edited from two workers", "u1")
+            workflow_id = created["workflow_id"]
+            await asyncio.gather(*[
+                builder.add_workflow_node(workflow_id, "action", f"step {i}", {})
+                for i in range(5) for builder in (first, second)
+            ])
+            missing = await second.add_workflow_node("missing", "action", "step", {})
+            return workflow_id, missing, await second.get_all_workflows(created_by="u1")
+
+        workflow_id, missing, workflows = asyncio.run(run())
+        assert missing == {"error": "Workflow not found"}
+        shared = next(w for w in workflows if w["id"] == workflow_id)
+        assert shared["nodes_count"] == 10
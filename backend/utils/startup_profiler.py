@@ -0,0 +1,544 @@
+"""
+Startup import-time and memory profiler.
+
+Imports every backend module (or one app module) with a timing import
+hook, then constructs and initializes every service class that has an
+async ``initialize`` method, recording wall time and the memory each step
+leaves allocated (via tracemalloc).  Database clients are replaced with
+in-memory stubs so the whole run is offline.
+
+    cd backend
+    python -m utils.startup_profiler --output startup_profile.json
+    python -m utils.startup_profiler --compare startup_profile.json
+
+The report is sorted by cost; the JSON artifact can be kept as a
+baseline and later runs compared against it to catch regressions.
+Import times include tracemalloc overhead unless ``--no-memory`` is
+given.
+"""
+
+import argparse
+import asyncio
+import importlib
+import importlib.abc
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGES = ("models", "middleware", "utils", "services", "routes")
+ARTIFACT_VERSION = 1
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_ms: float = 0.0
+    cumulative_ms: float = 0.0
+    self_kb: float = 0.0
+    cumulative_kb: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class ServiceRecord:
+    service: str
+    construct_ms: float = 0.0
+    initialize_ms: float = 0.0
+    memory_kb: float = 0.0
+    peak_kb: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def total_ms(self) -> float:
+        return self.construct_ms + self.initialize_ms
+
+
+@dataclass
+class StartupProfile:
+    imports: List[ImportRecord] = field(default_factory=list)
+    services: List[ServiceRecord] = field(default_factory=list)
+    memory: bool = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": ARTIFACT_VERSION,
+            "generated_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "memory_tracing": self.memory,
+            "imports": [asdict(record) for record in self.imports],
+            "services": [{**asdict(record), "total_ms": record.total_ms} for record in self.services],
+        }
+
+
+# =============================================================================
+# IMPORT TIMING
+# =============================================================================
+
+class _TimedLoader:
+    """Wraps a module loader to time ``exec_module``; everything else is delegated"""
+
+    def __init__(self, loader, recorder: "ImportRecorder", name: str):
+        self._loader = loader
+        self._recorder = recorder
+        self._name = name
+
+    def __getattr__(self, attribute):
+        return getattr(self._loader, attribute)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._recorder.enter(self._name)
+        error = None
+        try:
+            self._loader.exec_module(module)
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._recorder.exit(error)
+
+
+class ImportRecorder(importlib.abc.MetaPathFinder):
+    """Meta path hook recording self and cumulative time/memory per imported module"""
+
+    def __init__(self, memory: bool = True):
+        self.memory = memory
+        self.records: Dict[str, ImportRecord] = {}
+        # [name, started, memory at start, child time, child memory]
+        self._stack: List[list] = []
+
+    def _memory(self) -> int:
+        return tracemalloc.get_traced_memory()[0] if self.memory else 0
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def enter(self, name: str):
+        self._stack.append([name, time.perf_counter(), self._memory(), 0.0, 0])
+
+    def exit(self, error: Optional[str]):
+        name, started, memory_start, child_time, child_memory = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        retained = self._memory() - memory_start
+        if self._stack:
+            self._stack[-1][3] += elapsed
+            self._stack[-1][4] += retained
+        self.records[name] = ImportRecord(
+            module=name,
+            self_ms=(elapsed - child_time) * 1000,
+            cumulative_ms=elapsed * 1000,
+            self_kb=(retained - child_memory) / 1024,
+            cumulative_kb=retained / 1024,
+            error=error,
+        )
+
+    @contextmanager
+    def installed(self):
+        sys.meta_path.insert(0, self)
+        try:
+            yield self
+        finally:
+            sys.meta_path.remove(self)
+
+
+# =============================================================================
+# OFFLINE DATABASE STUBS
+# =============================================================================
+
+class OfflineCursor:
+    """Empty motor-style cursor"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        # sort(), skip(), limit(), batch_size() ... all chain
+        return lambda *args, **kwargs: self
+
+    async def to_list(self, length=None):
+        return []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+
+class OfflineCollection:
+    """Motor-style collection that accepts writes and returns nothing"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def find(self, *args, **kwargs):
+        return OfflineCursor()
+
+    def aggregate(self, *args, **kwargs):
+        return OfflineCursor()
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def find_one_and_update(self, *args, **kwargs):
+        return None
+
+    async def insert_one(self, document, *args, **kwargs):
+        return SimpleNamespace(inserted_id=document.get("_id", str(uuid.uuid4())) if isinstance(document, dict) else None)
+
+    async def insert_many(self, documents, *args, **kwargs):
+        return SimpleNamespace(inserted_ids=[str(uuid.uuid4()) for _ in documents])
+
+    async def _update(self, *args, **kwargs):
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    update_one = update_many = replace_one = _update
+
+    async def _delete(self, *args, **kwargs):
+        return SimpleNamespace(deleted_count=0)
+
+    delete_one = delete_many = _delete
+
+    async def count_documents(self, *args, **kwargs):
+        return 0
+
+    async def estimated_document_count(self, *args, **kwargs):
+        return 0
+
+    async def create_index(self, keys, *args, **kwargs):
+        return f"{self.name}_index"
+
+    async def create_indexes(self, indexes, *args, **kwargs):
+        return [f"{self.name}_index_{i}" for i, _ in enumerate(indexes)]
+
+    async def drop(self, *args, **kwargs):
+        return None
+
+
+class OfflineDatabase:
+    def __init__(self, name: str = "offline"):
+        self.name = name
+        self._collections: Dict[str, OfflineCollection] = {}
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self[name]
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = OfflineCollection(name)
+        return self._collections[name]
+
+    async def list_collection_names(self, *args, **kwargs):
+        return list(self._collections)
+
+    async def command(self, *args, **kwargs):
+        return {"ok": 1}
+
+
+class OfflineClient:
+    """Stands in for ``AsyncIOMotorClient``"""
+
+    def __init__(self, *args, **kwargs):
+        self._database = OfflineDatabase()
+        self.admin = self._database
+
+    def get_database(self, *args, **kwargs):
+        return self._database
+
+    get_default_database = get_database
+
+    def __getitem__(self, name):
+        return self._database
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self._database
+
+    def close(self):
+        pass
+
+
+class OfflineDatabaseWrapper:
+    """The ``db_wrapper`` services are constructed with"""
+
+    def __init__(self, database: OfflineDatabase):
+        self.database = database
+
+    async def get_database(self):
+        return self.database
+
+
+@contextmanager
+def offline_databases():
+    """Route motor clients and ``models.database`` to in-memory stubs"""
+    database = OfflineDatabase()
+    restore = []
+
+    def patch(owner, name, value):
+        restore.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    try:
+        import motor.motor_asyncio as motor_asyncio
+        patch(motor_asyncio, "AsyncIOMotorClient", OfflineClient)
+    except ImportError:
+        pass
+
+    try:
+        from models import database as models_database
+
+        async def get_database():
+            return database
+
+        patch(models_database, "init_db", get_database)
+        patch(models_database, "get_database", get_database)
+        patch(models_database, "database", database)
+    except ImportError:
+        pass
+
+    try:
+        yield database
+    finally:
+        for owner, name, value in reversed(restore):
+            setattr(owner, name, value)
+
+
+# =============================================================================
+# PROFILING
+# =============================================================================
+
+def backend_modules(packages: Iterable[str] = PACKAGES) -> List[str]:
+    """Every module under the backend packages, parents first"""
+    names = []
+    for package in packages:
+        directory = os.path.join(BACKEND_DIR, package)
+        if not os.path.isdir(directory):
+            continue
+        names.append(package)
+        for info in pkgutil.walk_packages([directory], prefix=f"{package}."):
+            names.append(info.name)
+    return names
+
+
+def profile_imports(modules: Iterable[str], memory: bool = True) -> List[ImportRecord]:
+    recorder = ImportRecorder(memory=memory)
+    failed: Dict[str, str] = {}
+    with recorder.installed():
+        for name in modules:
+            if name in sys.modules or name == __name__:
+                continue
+            try:
+                importlib.import_module(name)
+            except BaseException as e:  # SystemExit from scripts included
+                failed[name] = f"{type(e).__name__}: {e}"
+    for name, error in failed.items():
+        record = recorder.records.setdefault(name, ImportRecord(module=name))
+        record.error = record.error or error
+    return list(recorder.records.values())
+
+
+def discover_services(packages: Iterable[str] = ("services",)) -> List[type]:
+    """Classes defined in the service modules that have an async ``initialize``"""
+    services = []
+    for name in backend_modules(packages):
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ == name and inspect.iscoroutinefunction(getattr(cls, "initialize", None)):
+                services.append(cls)
+    return services
+
+
+def _constructor_args(cls: type, db_wrapper) -> Optional[list]:
+    """No arguments, or the database wrapper for one required argument"""
+    try:
+        parameters = list(inspect.signature(cls).parameters.values())
+    except (TypeError, ValueError):
+        return []
+    required = [
+        p for p in parameters
+        if p.default is p.empty and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+    ]
+    if not required:
+        return []
+    if len(required) == 1:
+        return [db_wrapper]
+    return None
+
+
+async def _profile_service(cls: type, db_wrapper, timeout: float, memory: bool) -> ServiceRecord:
+    record = ServiceRecord(service=f"{cls.__module__}.{cls.__qualname__}")
+    args = _constructor_args(cls, db_wrapper)
+    if args is None:
+        record.error = "skipped: constructor needs more than a database"
+        return record
+
+    tasks_before = asyncio.all_tasks()
+    if memory:
+        tracemalloc.reset_peak()
+    memory_before = tracemalloc.get_traced_memory()[0] if memory else 0
+    try:
+        started = time.perf_counter()
+        instance = cls(*args)
+        record.construct_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        await asyncio.wait_for(instance.initialize(), timeout)
+        record.initialize_ms = (time.perf_counter() - started) * 1000
+    except asyncio.TimeoutError:
+        record.error = f"initialize() did not finish within {timeout:g}s"
+    except Exception as e:
+        record.error = f"{type(e).__name__}: {e}"
+    finally:
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            record.memory_kb = (current - memory_before) / 1024
+            record.peak_kb = (peak - memory_before) / 1024
+        # Background loops started by initialize() would skew the next service
+        for task in asyncio.all_tasks() - tasks_before:
+            task.cancel()
+    return record
+
+
+async def profile_services(services: Iterable[type], db_wrapper, timeout: float = 10.0,
+                           memory: bool = True) -> List[ServiceRecord]:
+    return [await _profile_service(cls, db_wrapper, timeout, memory) for cls in services]
+
+
+def run_profile(modules: Optional[List[str]] = None, services: bool = True, memory: bool = True,
+                timeout: float = 10.0) -> StartupProfile:
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    if memory:
+        tracemalloc.start()
+    try:
+        with offline_databases() as database:
+            profile = StartupProfile(memory=memory)
+            profile.imports = profile_imports(modules or backend_modules(), memory)
+            if services:
+                wrapper = OfflineDatabaseWrapper(database)
+                profile.services = asyncio.run(profile_services(discover_services(), wrapper, timeout, memory))
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return profile
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def format_report(profile: Dict[str, Any], top: int = 25) -> str:
+    imports = profile["imports"]
+    services = profile["services"]
+    lines = ["🔬 STARTUP PROFILE", "=" * 60]
+
+    app_imports = [r for r in imports if r["module"].split(".")[0] in PACKAGES]
+    lines.append(
+        f"{len(imports)} modules imported ({len(app_imports)} backend), "
+        f"{sum(r['self_ms'] for r in imports):.0f}ms, "
+        f"{sum(r['self_kb'] for r in imports) / 1024:.1f}MB retained"
+    )
+
+    lines.append(f"\nSlowest imports (self time, top {top})")
+    for record in sorted(imports, key=lambda r: r["self_ms"], reverse=True)[:top]:
+        lines.append(f"  {record['self_ms']:8.1f}ms  {record['cumulative_ms']:8.1f}ms cum  "
+                     f"{record['self_kb'] / 1024:7.2f}MB  {record['module']}")
+
+    lines.append(f"\nLargest imports (retained memory, top {top})")
+    for record in sorted(imports, key=lambda r: r["self_kb"], reverse=True)[:top]:
+        lines.append(f"  {record['self_kb'] / 1024:7.2f}MB  {record['self_ms']:8.1f}ms  {record['module']}")
+
+    if services:
+        lines.append(f"\nService initialization (top {top} by time)")
+        for record in sorted(services, key=lambda r: r["total_ms"], reverse=True)[:top]:
+            lines.append(f"  {record['total_ms']:8.1f}ms  {record['memory_kb'] / 1024:7.2f}MB "
+                         f"(peak {record['peak_kb'] / 1024:6.2f}MB)  {record['service']}")
+
+    errors = [r for r in imports + services if r.get("error")]
+    if errors:
+        lines.append(f"\n{len(errors)} modules or services failed")
+        for record in errors[:top]:
+            lines.append(f"  {record.get('module') or record.get('service')}: {record['error']}")
+    return "\n".join(lines)
+
+
+def compare_profiles(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2,
+                     min_ms: float = 5.0, min_kb: float = 256.0) -> List[str]:
+    """Regressions: entries at least ``threshold`` slower/larger and above the noise floors"""
+    regressions = []
+    for section, key, metrics in (("imports", "module", (("self_ms", min_ms), ("self_kb", min_kb))),
+                                  ("services", "service", (("total_ms", min_ms), ("memory_kb", min_kb)))):
+        before = {record[key]: record for record in baseline.get(section, [])}
+        for record in current.get(section, []):
+            old = before.get(record[key])
+            for metric, floor in metrics:
+                new_value = record.get(metric, 0.0)
+                old_value = old.get(metric, 0.0) if old else 0.0
+                if new_value - old_value >= floor and new_value > old_value * (1 + threshold):
+                    regressions.append(f"{record[key]} {metric}: {old_value:.1f} -> {new_value:.1f}"
+                                       + ("" if old else " (new)"))
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile backend import time, memory and service initialization")
+    parser.add_argument("--module", action="append", help="profile importing these modules instead of every backend module")
+    parser.add_argument("--no-services", action="store_true", help="skip service initialization")
+    parser.add_argument("--no-memory", action="store_true", help="time only, without tracemalloc overhead")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds allowed per initialize()")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--output", help="write the JSON artifact here")
+    parser.add_argument("--compare", help="baseline JSON artifact to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("LAZY_ROUTERS", "false")
+    profile = run_profile(args.module, services=not args.no_services, memory=not args.no_memory,
+                          timeout=args.timeout).to_dict()
+    print(format_report(profile, args.top))
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(profile, handle, indent=2)
+        print(f"\n📝 Profile written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare_profiles(json.load(handle), profile, args.threshold)
+        print(f"\n{len(regressions)} regressions against {args.compare}")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
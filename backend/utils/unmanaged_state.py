@@ -0,0 +1,160 @@
+"""
+List in-process state that is not multi-worker safe.
+
+Scans the service (and optionally route) modules without importing them
+and reports mutable containers kept for the life of the process:
+
+* module-level dicts, lists, sets, deques... (UPPER_CASE names are taken to
+  be constant tables and skipped unless ``--include-constants``)
+* module-level names rebound through ``global`` (lazy singletons)
+* attributes set to mutable containers in ``__init__``
+
+Attributes built from ``services.shared_state`` structures are managed and
+not reported.
+
+    cd backend
+    python -m utils.unmanaged_state
+    python -m utils.unmanaged_state --json --packages services routes
+"""
+
+import argparse
+import ast
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MUTABLE_CALLS = {"dict", "list", "set", "defaultdict", "OrderedDict", "deque", "Counter", "WeakValueDictionary"}
+SHARED_STATE_FACTORIES = {"map", "ttl_map", "counter", "list"}
+# The shared state implementation keeps its backends' data in containers by design
+EXCLUDED_MODULES = {"services.shared_state"}
+
+
+@dataclass
+class StateFinding:
+    module: str
+    line: int
+    kind: str  # "module", "global" or "instance"
+    name: str
+    owner: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.owner}.{self.name}" if self.owner else self.name
+
+
+def _call_name(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Call):
+        func = node.func
+        if isinstance(func, ast.Name):
+            return func.id
+        if isinstance(func, ast.Attribute):
+            return func.attr
+    return None
+
+
+def is_mutable_container(node: Optional[ast.AST]) -> bool:
+    if isinstance(node, (ast.Dict, ast.List, ast.Set, ast.DictComp, ast.ListComp, ast.SetComp)):
+        return True
+    return _call_name(node) in MUTABLE_CALLS and not _is_shared_state(node)
+
+
+def _is_shared_state(node: ast.AST) -> bool:
+    """``shared_state.map(...)``, ``get_shared_state().counter(...)`` and the like"""
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+        return False
+    if node.func.attr not in SHARED_STATE_FACTORIES:
+        return False
+    return "shared_state" in ast.unparse(node.func.value)
+
+
+def _assignments(nodes: Iterable[ast.AST]):
+    for node in nodes:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                yield target, node.value, node.lineno
+        elif isinstance(node, ast.AnnAssign):
+            yield node.target, node.value, node.lineno
+
+
+def scan_source(source: str, module: str, include_constants: bool = False) -> List[StateFinding]:
+    tree = ast.parse(source)
+    findings: List[StateFinding] = []
+
+    for target, value, line in _assignments(tree.body):
+        if isinstance(target, ast.Name) and is_mutable_container(value):
+            if target.id.isupper() and not include_constants:
+                continue
+            findings.append(StateFinding(module, line, "module", target.id))
+
+    reported = {f.name for f in findings}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Global):
+            for name in node.names:
+                if name not in reported:
+                    reported.add(name)
+                    findings.append(StateFinding(module, node.lineno, "global", name))
+
+    for cls in (n for n in ast.walk(tree) if isinstance(n, ast.ClassDef)):
+        for init in (n for n in cls.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+                     and n.name == "__init__"):
+            for target, value, line in _assignments(ast.walk(init)):
+                if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                        and target.value.id == "self" and is_mutable_container(value)):
+                    findings.append(StateFinding(module, line, "instance", target.attr, cls.name))
+    return sorted(findings, key=lambda f: f.line)
+
+
+def scan_packages(packages: Iterable[str] = ("services",), include_constants: bool = False) -> Dict[str, List[StateFinding]]:
+    results: Dict[str, List[StateFinding]] = {}
+    for package in packages:
+        directory = os.path.join(BACKEND_DIR, package)
+        for root, _, files in os.walk(directory):
+            if "__pycache__" in root:
+                continue
+            for filename in sorted(files):
+                if not filename.endswith(".py"):
+                    continue
+                path = os.path.join(root, filename)
+                module = os.path.relpath(path, BACKEND_DIR)[:-3].replace(os.sep, ".")
+                if module in EXCLUDED_MODULES:
+                    continue
+                try:
+                    with open(path, encoding="utf-8") as handle:
+                        findings = scan_source(handle.read(), module, include_constants)
+                except SyntaxError as e:
+                    print(f"⚠️ {module}: cannot parse ({e.msg}, line {e.lineno})", file=sys.stderr)
+                    continue
+                if findings:
+                    results[module] = findings
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="List process-local state that is not shared between workers")
+    parser.add_argument("--packages", nargs="+", default=["services"])
+    parser.add_argument("--include-constants", action="store_true", help="also report UPPER_CASE module tables")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    results = scan_packages(args.packages, args.include_constants)
+    if args.json:
+        print(json.dumps({module: [asdict(f) for f in findings] for module, findings in results.items()}, indent=2))
+        return 0
+
+    total = sum(len(findings) for findings in results.values())
+    print("🧭 UNMANAGED IN-PROCESS STATE")
+    print("=" * 60)
+    print(f"{total} containers in {len(results)} modules are local to each worker\n")
+    for module, findings in sorted(results.items(), key=lambda item: len(item[1]), reverse=True):
+        print(f"{module} ({len(findings)})")
+        for finding in findings:
+            print(f"  {finding.line:5d}  {finding.kind:8}  {finding.label}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Code Detection Benchmark for Aether AI Platform
+Measures MinHash/LSH indexing and query throughput on synthetic functions
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "tests"))
+
+from services.code_similarity_index import CodeSimilarityIndex
+from test_code_similarity_index import make_function, render
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MinHash/LSH near-duplicate detection")
+    parser.add_argument("--functions", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"🔍 NEAR-DUPLICATE DETECTION BENCHMARK - {args.functions:,} FUNCTIONS")
+    print("=" * 60)
+
+    functions = [make_function(rng, f"func_{i}") for i in range(args.functions)]
+    sources = [render(function) for function in functions]
+
+    index = CodeSimilarityIndex()
+    start = time.perf_counter()
+    for i, code in enumerate(sources):
+        index.add_block(f"proj_{i % 100}", f"file_{i}.py", {"code": code, "start_line": 1})
+    elapsed = time.perf_counter() - start
+    print(f"Indexing:       {elapsed:.2f}s ({args.functions / elapsed:,.0f} functions/s)")
+
+    queries = [
+        render(functions[i], rename={v: v + "_x" for v in functions[i]["variables"]}, reformat=True)
+        for i in rng.sample(range(args.functions), args.queries)
+    ]
+    start = time.perf_counter()
+    hits = sum(1 for code in queries if index.query(code))
+    elapsed = time.perf_counter() - start
+    print(f"Query:          {elapsed / args.queries * 1000:.2f}ms avg ({hits}/{args.queries} clones found)")
+
+    start = time.perf_counter()
+    pairs = index.duplicate_pairs(project_id="proj_0")
+    print(f"Project scan:   {time.perf_counter() - start:.2f}s ({len(pairs)} near-duplicate pairs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Code Completion Latency Benchmark for Aether AI Platform
+Replays a typing trace against the completion service, once the old way
+(full text per keystroke, every request sent to the model) and once
+through the incremental pipeline (edit deltas, debounce, superseding and
+the prefix cache), and reports p95 latency and model calls
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.ai_code_completion import AICodeCompletion
+
+# What the simulated user is about to type, set per request and inherited by its tasks
+expected_text = contextvars.ContextVar("expected_text", default="")
+
+
+class OracleModel:
+    """Stands in for the LLM: after a fixed latency it suggests the rest of the line the user will type"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def process_message(self, message):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        rest = expected_text.get().split("\n", 1)[0]
+        completions = [{"text": rest, "type": "snippet", "score": 0.9}] if rest else []
+        completions.append({"text": "()", "type": "method", "score": 0.3})
+        return {"response": json.dumps({"completions": completions})}
+
+
+def synthesize_trace(source: str, seed: int = 11) -> dict:
+    """Type ``source`` out key by key with human-like gaps and the odd corrected typo"""
+    rng = random.Random(seed)
+    events = []
+    t = 0.0
+    offset = 0
+    for char in source:
+        if char != "\n" and rng.random() < 0.03:
+            t += rng.lognormvariate(math.log(0.09), 0.4)
+            events.append({"t": round(t, 4), "start": offset, "end": offset, "text": "#"})
+            t += rng.lognormvariate(math.log(0.25), 0.3)
+            events.append({"t": round(t, 4), "start": offset, "end": offset + 1, "text": ""})
+        pause = 0.6 if char == "\n" and rng.random() < 0.2 else 0.0
+        t += pause + rng.lognormvariate(math.log(0.09), 0.4)
+        events.append({"t": round(t, 4), "start": offset, "end": offset, "text": char})
+        offset += 1
+    return {"file_type": "python", "initial_text": "", "final_text": source, "events": events}
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def replay(trace: dict, latency: float, incremental: bool) -> dict:
+    service = AICodeCompletion()
+    model = OracleModel(latency)
+    service.ai_service = model
+    final_text = trace["final_text"]
+    text = trace["initial_text"]
+    latencies = []
+    superseded = 0
+    tasks = []
+
+    async def request(index, event, snapshot):
+        cursor = event["start"] + len(event["text"])
+        # The oracle only helps while the document agrees with the final text
+        expected_text.set(final_text[cursor:] if final_text.startswith(snapshot[:cursor]) else "")
+        started = time.perf_counter()
+        if incremental:
+            kwargs = {"edits": [event]} if index else {"code_context": snapshot}
+            completions = await service.get_code_completions(
+                cursor_position=cursor, file_type=trace["file_type"], user_id="bench", document_id="trace", **kwargs)
+            if not completions:
+                # Superseded by a later keystroke; the oracle always answers something otherwise
+                return None
+        else:
+            # Before the pipeline: split the whole file and call the model on every keystroke
+            context = await service._analyze_code_context(snapshot, cursor, trace["file_type"])
+            completions = await service._rank_completions(
+                await service._generate_completions(context, {}, trace["file_type"]), context, {})
+        return time.perf_counter() - started
+
+    loop_start = time.perf_counter()
+    for index, event in enumerate(trace["events"]):
+        delay = loop_start + event["t"] - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        text = text[:event["start"]] + event["text"] + text[event["end"]:]
+        tasks.append(asyncio.ensure_future(request(index, event, text)))
+        # Requests are sent in keystroke order, as an editor would
+        await asyncio.sleep(0)
+
+    for result in await asyncio.gather(*tasks):
+        if result is None:
+            superseded += 1
+        else:
+            latencies.append(result)
+
+    if incremental:
+        assert service.documents[("bench", "trace")].text == text
+    return {
+        "requests": len(trace["events"]),
+        "answered": len(latencies),
+        "superseded": superseded,
+        "model_calls": model.calls,
+        "cache_hits": service.stats["cache_hits"],
+        "p50": percentile(latencies, 0.5),
+        "p95": percentile(latencies, 0.95),
+    }
+
+
+async def main_async(args):
+    if args.trace:
+        with open(args.trace) as f:
+            trace = json.load(f)
+    else:
+        with open(args.source) as f:
+            trace = synthesize_trace(f.read()[:args.chars])
+    if args.save_trace:
+        with open(args.save_trace, "w") as f:
+            json.dump(trace, f)
+
+    duration = trace["events"][-1]["t"] if trace["events"] else 0
+    print(f"⌨️ COMPLETION LATENCY BENCHMARK - {len(trace['events'])} KEYSTROKES OVER {duration:.0f}s, "
+          f"MODEL {args.model_latency_ms:.0f}ms")
+    print("=" * 60)
+    for label, incremental in (("Full text, every key", False), ("Incremental pipeline", True)):
+        result = await replay(trace, args.model_latency_ms / 1000, incremental)
+        print(f"{label:22} p50 {result['p50'] * 1000:7.1f}ms  p95 {result['p95'] * 1000:7.1f}ms  "
+              f"model calls {result['model_calls']:5d}  cache hits {result['cache_hits']:5d}  "
+              f"superseded {result['superseded']:5d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a typing trace against the completion service")
+    parser.add_argument("--trace", help="recorded trace JSON (file_type, initial_text, final_text, events)")
+    parser.add_argument("--source", default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         "backend", "services", "completion_pipeline.py"),
+                        help="file to type out when no trace is given")
+    parser.add_argument("--chars", type=int, default=1500)
+    parser.add_argument("--save-trace", help="write the synthesized trace here")
+    parser.add_argument("--model-latency-ms", type=float, default=250)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
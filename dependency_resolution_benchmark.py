@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Dependency Resolution Benchmark for Aether AI Platform
+Resolves a synthetic lockfile against generated package metadata
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.version_resolver import DependencyResolver
+
+
+def build_metadata(packages: int, versions_per_package: int, deps_per_version: int, rng: random.Random):
+    """
+    Layered package graph: each package only depends on later packages,
+    mostly with ranges on that package's current major (like a real
+    lockfile) and occasionally with a range that forces backtracking.
+    """
+    names = [f"pkg-{i}" for i in range(packages)]
+    current_major = {name: rng.choice([1, 2]) for name in names}
+    metadata = {}
+    for i, name in enumerate(names):
+        versions = {}
+        for major in range(1, 3):
+            for minor in range(versions_per_package // 2):
+                deps = {}
+                if i + 1 < packages:
+                    for dep in rng.sample(names[i + 1:], min(deps_per_version, packages - i - 1)):
+                        major_of_dep = current_major[dep]
+                        deps[dep] = rng.choices(
+                            [f"^{major_of_dep}.0.0", f"^{major_of_dep}.{rng.randrange(versions_per_package // 2)}.0",
+                             f">={major_of_dep}.1.0 <3.0.0", "1.x || 2.x", f"^{3 - major_of_dep}.0.0"],
+                            weights=[50, 20, 15, 14, 1],
+                        )[0]
+                versions[f"{major}.{minor}.0"] = deps
+            versions[f"{major + 1}.0.0-rc.1"] = {}
+        metadata[name] = {"versions": versions, "current_major": current_major[name]}
+    return names, metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark semver resolution")
+    parser.add_argument("--packages", type=int, default=2000)
+    parser.add_argument("--versions", type=int, default=10)
+    parser.add_argument("--deps", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    names, metadata = build_metadata(args.packages, args.versions, args.deps, rng)
+    # Root requirements agree with the graph's current majors, as in a consistent lockfile
+    lockfile = {name: rng.choice(["*", f"^{metadata[name]['current_major']}.0.0", "1.x || 2.x"]) for name in names}
+
+    print(f"📦 DEPENDENCY RESOLUTION BENCHMARK - {args.packages:,} PACKAGES")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    resolver = DependencyResolver(metadata)
+    result = resolver.resolve(lockfile)
+    cold = time.perf_counter() - start
+    print(f"Cold resolve:   {cold * 1000:8.1f}ms  ({len(result['resolved'])} pinned, "
+          f"{len(result['conflicts'])} conflicts, {result['backtracks']} backtracks, {result['steps']} steps)")
+
+    start = time.perf_counter()
+    resolver.resolve(lockfile)
+    print(f"Warm resolve:   {(time.perf_counter() - start) * 1000:8.1f}ms  (memoized candidate lists)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+I18n Page Bundle Benchmark for Aether AI Platform
+Compares the prefix scan over the flat translation table against the
+compiled namespace trees and the cached, pre-serialized page bundles
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.i18n_bundles import TranslationCatalog
+from services.response_encoding import dumps_json
+
+
+def make_translations(rng: random.Random, languages: int, keys: int, pages: int, coverage: float):
+    codes = ["en"] + [f"l{i:02d}" for i in range(1, languages)]
+    translations = {}
+    for code in codes:
+        share = 1.0 if code == "en" else coverage
+        for i in range(keys):
+            if share < 1.0 and rng.random() >= share:
+                continue
+            key = f"page{i % pages}.group{i // pages % 20}.key{i}"
+            if i % 50 == 0:
+                translations[f"{code}.{key}"] = {"one": f"{code} one item {i}", "other": f"{code} {{count}} items {i}"}
+            else:
+                translations[f"{code}.{key}"] = f"{code} text for {{name}} number {i}"
+    return codes, translations
+
+
+def naive_page(translations, language, page_key):
+    """I18nService.get_translations_for_page before the catalog: a prefix scan of every key"""
+    page_translations = {}
+    prefix = f"{language}.{page_key}."
+    for key, value in translations.items():
+        if key.startswith(prefix):
+            clean_key = key[len(prefix):]
+            page_translations[clean_key] = value if isinstance(value, str) else value.get("other", clean_key)
+    return page_translations
+
+
+def page_response(language, page_key, translations):
+    return dumps_json({"page_key": page_key, "language": language, "translations": translations,
+                       "total_keys": len(translations)})
+
+
+def measure(label, serve, requests):
+    timings = []
+    for language, page_key in requests:
+        start = time.perf_counter()
+        serve(language, page_key)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1000
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000
+    print(f"{label:30} p50 {p50:9.3f}ms  p95 {p95:9.3f}ms  ({len(requests)} requests)")
+    return p50
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark i18n page bundle latency")
+    parser.add_argument("--languages", type=int, default=50)
+    parser.add_argument("--keys", type=int, default=100000, help="keys in the default language")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--coverage", type=float, default=0.4, help="share of keys other languages translate")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--naive-requests", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    codes, translations = make_translations(rng, args.languages, args.keys, args.pages, args.coverage)
+    print(f"🌍 I18N BUNDLE BENCHMARK - {args.languages} LANGUAGES, {args.keys} KEYS, "
+          f"{len(translations)} TRANSLATIONS")
+    print("=" * 60)
+
+    catalog = TranslationCatalog(max_bundles=args.languages * args.pages)
+    start = time.perf_counter()
+    catalog.compile(translations)
+    print(f"Compiled namespace trees in {time.perf_counter() - start:.2f}s")
+
+    requests = [(rng.choice(codes), f"page{rng.randrange(args.pages)}") for _ in range(args.requests)]
+    for language, page_key in requests[:5]:
+        if catalog.page(language, page_key) != naive_page(translations, language, page_key):
+            print(f"❌ {language}/{page_key}: compiled page differs from the prefix scan")
+            return 1
+
+    naive = measure("Prefix scan + serialize",
+                    lambda language, page_key: page_response(
+                        language, page_key, naive_page(translations, language, page_key)),
+                    requests[:args.naive_requests])
+    tree = measure("Namespace tree + serialize",
+                   lambda language, page_key: page_response(
+                       language, page_key, catalog.page(language, page_key)),
+                   requests)
+    cold = measure("Bundle, first request (gzip)",
+                   lambda language, page_key: catalog.bundle(language, page_key).encode("gzip"),
+                   list(dict.fromkeys(requests)))
+    warm = measure("Bundle, cached (gzip)",
+                   lambda language, page_key: catalog.bundle(language, page_key).encode("gzip"),
+                   requests)
+    etags = {key: catalog.bundle(*key).etag for key in set(requests)}
+    revalidate = measure("Bundle, 304 revalidation",
+                         lambda language, page_key: catalog.bundle(language, page_key).etag
+                         == etags[(language, page_key)],
+                         requests)
+
+    bundle = catalog.bundle(*requests[0])
+    print(f"Typical bundle: {bundle.key_count} keys, {len(bundle.body) / 1024:.1f}KB JSON, "
+          f"{len(bundle.encode('gzip')[0]) / 1024:.1f}KB gzip")
+    print(f"✅ Pages identical; {naive / tree:.0f}x from the tree, {naive / warm:.0f}x from cached bundles, "
+          f"{naive / revalidate:.0f}x for revalidation")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Benchmark for Aether AI Platform
+Measures incremental leaderboard updates, top-k reads and rank lookups
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.leaderboard_service import LeaderboardService
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(users: int, reads: int, limit: int):
+    service = LeaderboardService()
+    user_ids = [f"user_{i}" for i in range(users)]
+
+    print(f"🏆 LEADERBOARD BENCHMARK - {users:,} USERS")
+    print("=" * 60)
+
+    # Same path as hydrating the all-time board from user_stats
+    board = service.board_key("xp")
+    start = time.perf_counter()
+    for user_id in user_ids:
+        await service.backend.set_score(board, user_id, random.randint(0, 1_000_000))
+    elapsed = time.perf_counter() - start
+    print(f"Hydration:      {elapsed:.2f}s ({users / elapsed:,.0f} inserts/s)")
+
+    update_times = []
+    for _ in range(reads):
+        user_id = random.choice(user_ids)
+        t0 = time.perf_counter()
+        await service.record_xp(user_id, random.randint(0, 1_000_000), random.randint(1, 500))
+        update_times.append((time.perf_counter() - t0) * 1e6)
+
+    top_times = []
+    for _ in range(reads):
+        t0 = time.perf_counter()
+        await service.top("xp", "all_time", limit)
+        top_times.append((time.perf_counter() - t0) * 1e6)
+
+    rank_times = []
+    for _ in range(reads):
+        user_id = random.choice(user_ids)
+        t0 = time.perf_counter()
+        await service.rank("xp", "all_time", user_id)
+        rank_times.append((time.perf_counter() - t0) * 1e6)
+
+    for label, samples in (
+        ("XP award", update_times),
+        (f"Top-{limit} read", top_times),
+        ("Rank lookup", rank_times),
+    ):
+        print(f"{label:<16} mean {statistics.mean(samples):8.1f}µs   p95 {percentile(samples, 95):8.1f}µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental leaderboards")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--reads", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.reads, args.limit))
+
+
+if __name__ == "__main__":
+    main()
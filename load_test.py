@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Async Load Test for Aether AI Platform
+Open-loop load generator driven by scenario files in load_scenarios/.
+
+Sessions start on a fixed schedule (``--rate`` per second) however fast the
+server answers, and each session's first request is timed from when it was
+*due* to start rather than when it got a connection.  A server that stalls
+therefore shows up in the percentiles instead of quietly lowering the
+offered load (coordinated omission).  Service time - from the actual send -
+is reported alongside for comparison.
+
+Step kinds: ``http`` requests, ``sse`` streams (time to first event and to
+the end of the stream) and ``websocket`` rooms (several clients in one room,
+timing how long each broadcast takes to reach the others).
+
+For repeatable AI latency run the backend against the Groq mock:
+    python mock_groq_server.py --latency-ms 200 --tokens-per-second 400
+    GROQ_API_KEY=mock GROQ_BASE_URL=http://localhost:8090 uvicorn server:app --port 8001   (in backend/)
+    python load_test.py load_scenarios/chat.json --rate 20 --duration 60 --output chat.json
+    python load_test.py load_scenarios/chat.json --rate 20 --duration 60 --baseline chat.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+RESULT_VERSION = 1
+PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram (~1% resolution) of latencies in seconds"""
+
+    BASE = 1.01
+
+    def __init__(self):
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        micros = max(seconds * 1e6, 1.0)
+        self.buckets[int(math.log(micros, self.BASE))] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.BASE ** (bucket + 1) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        summary = {f"p{str(p).replace('.', '_')}": round(self.percentile(p) * 1000, 2) for p in (50, 90, 99, 99.9)}
+        summary.update({
+            "mean": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "max": round(self.max * 1000, 2),
+        })
+        return summary
+
+
+class StepStats:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.first_event = LatencyHistogram()
+        self.status: Counter = Counter()
+        self.errors = 0
+        self.events = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            "kind": self.kind,
+            "count": self.latency.count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / max(1, self.latency.count + self.errors), 4),
+            "status": {str(code): count for code, count in sorted(self.status.items(), key=lambda item: str(item[0]))},
+            "latency_ms": self.latency.to_dict(),
+            "service_ms": self.service.to_dict(),
+        }
+        if self.kind in ("sse", "websocket"):
+            result["first_event_ms"] = self.first_event.to_dict()
+            result["events"] = self.events
+        return result
+
+
+def render(template: Any, variables: Dict[str, Any]) -> Any:
+    """Fill ``{{name}}`` placeholders in strings, lists and dicts"""
+    if isinstance(template, str):
+        whole = PLACEHOLDER.fullmatch(template)
+        if whole:
+            return variables.get(whole.group(1), template)
+        return PLACEHOLDER.sub(lambda m: str(variables.get(m.group(1), m.group(0))), template)
+    if isinstance(template, list):
+        return [render(item, variables) for item in template]
+    if isinstance(template, dict):
+        return {key: render(value, variables) for key, value in template.items()}
+    return template
+
+
+def extract(document: Any, path: str) -> Any:
+    """``project.id`` or ``items.0.name`` from a JSON response"""
+    for part in path.split("."):
+        if isinstance(document, list) and part.isdigit():
+            document = document[int(part)] if int(part) < len(document) else None
+        elif isinstance(document, dict):
+            document = document.get(part)
+        else:
+            return None
+    return document
+
+
+class LoadTest:
+    def __init__(self, scenario: Dict[str, Any], base_url: str, rate: float, duration: float, warmup: float,
+                 max_in_flight: int, timeout: float):
+        self.scenario = scenario
+        self.base_url = base_url.rstrip("/")
+        self.rate = rate
+        self.duration = duration
+        self.warmup = warmup
+        self.max_in_flight = max_in_flight
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.steps: Dict[str, StepStats] = {}
+        self.sessions = LatencyHistogram()
+        self.sessions_failed = 0
+        self.headers: Dict[str, str] = {}
+        # Values extracted by setup steps, visible to every session
+        self.shared: Dict[str, Any] = {}
+
+    def _stats(self, step: Dict[str, Any]) -> StepStats:
+        name = step.get("name") or f"{step.get('method', 'GET')} {step['path']}"
+        if name not in self.steps:
+            self.steps[name] = StepStats(step.get("kind", "http"))
+        return self.steps[name]
+
+    def _variables(self, index: int) -> Dict[str, Any]:
+        """Round-robin over each variable's values, so runs are repeatable"""
+        variables = {**self.shared, "session": index, "uuid": uuid.uuid4().hex}
+        for name, values in self.scenario.get("variables", {}).items():
+            variables[name] = values[index % len(values)] if isinstance(values, list) else values
+        return variables
+
+    async def authenticate(self, http: aiohttp.ClientSession):
+        auth = self.scenario.get("auth")
+        if not auth:
+            return
+        async with http.post(self.base_url + auth["path"], json=auth["json"]) as response:
+            response.raise_for_status()
+            token = extract(await response.json(), auth.get("token", "access_token"))
+        self.headers["Authorization"] = f"Bearer {token}"
+
+    async def run(self) -> Dict[str, Any]:
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as http:
+            await self.authenticate(http)
+            for setup in self.scenario.get("setup", []):
+                await self._run_step(http, setup, self.shared, time.perf_counter(), record=False)
+
+            in_flight = asyncio.Semaphore(self.max_in_flight)
+            loop = asyncio.get_running_loop()
+            started = loop.time() + 0.05
+            measured_from = started + self.warmup
+            total = int((self.warmup + self.duration) * self.rate)
+            tasks = []
+            for index in range(total):
+                due = started + index / self.rate
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Converted to the perf_counter clock the steps are timed with
+                due_perf = time.perf_counter() - (loop.time() - due)
+                tasks.append(asyncio.ensure_future(
+                    self._session(http, in_flight, index, due_perf, record=due >= measured_from)))
+            await asyncio.gather(*tasks)
+            elapsed = loop.time() - measured_from
+
+        return {
+            "version": RESULT_VERSION,
+            "scenario": self.scenario.get("name"),
+            "target": self.base_url,
+            "started_at": datetime.utcnow().isoformat(),
+            "rate": self.rate,
+            "duration": self.duration,
+            "warmup": self.warmup,
+            "max_in_flight": self.max_in_flight,
+            "sessions": {
+                "completed": self.sessions.count,
+                "failed": self.sessions_failed,
+                "achieved_rate": round(self.sessions.count / elapsed, 2) if elapsed > 0 else 0.0,
+                "latency_ms": self.sessions.to_dict(),
+            },
+            "steps": {name: stats.to_dict() for name, stats in self.steps.items()},
+        }
+
+    async def _session(self, http, in_flight: asyncio.Semaphore, index: int, due: float, record: bool):
+        variables = self._variables(index)
+        async with in_flight:
+            # The first step is timed from ``due``, so waiting for a slot counts
+            step_due = due
+            ok = True
+            for step in self.scenario["steps"]:
+                for _ in range(step.get("repeat", 1)):
+                    ok = await self._run_step(http, step, variables, step_due, record) and ok
+                    if not ok:
+                        break
+                    if step.get("think_ms"):
+                        await asyncio.sleep(step["think_ms"] / 1000)
+                    step_due = time.perf_counter()
+                if not ok:
+                    break
+        if record:
+            if ok:
+                self.sessions.record(time.perf_counter() - due)
+            else:
+                self.sessions_failed += 1
+
+    async def _run_step(self, http, step: Dict[str, Any], variables: Dict[str, Any], due: float, record: bool) -> bool:
+        kind = step.get("kind", "http")
+        stats = self._stats(step)
+        sent = time.perf_counter()
+        try:
+            if kind == "websocket":
+                status, first_event, events = await self._websocket_room(http, step, variables, record)
+            else:
+                status, first_event, events = await self._request(http, step, variables, sent)
+            expect = step.get("expect", 101 if kind == "websocket" else 200)
+            ok = status in expect if isinstance(expect, list) else status == expect
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status, ok, first_event, events = type(e).__name__, False, None, 0
+        finished = time.perf_counter()
+
+        if record:
+            stats.status[status] += 1
+            if ok:
+                stats.latency.record(finished - due)
+                stats.service.record(finished - sent)
+                if first_event is not None:
+                    stats.first_event.record(first_event)
+                stats.events += events
+            else:
+                stats.errors += 1
+        return ok
+
+    async def _request(self, http, step: Dict[str, Any], variables: Dict[str, Any], sent: float):
+        method = step.get("method", "GET")
+        url = self.base_url + render(step["path"], variables)
+        options = {"headers": {**self.headers, **step.get("headers", {})}}
+        if "json" in step:
+            options["json"] = render(step["json"], variables)
+        if "params" in step:
+            options["params"] = render(step["params"], variables)
+
+        async with http.request(method, url, **options) as response:
+            if step.get("kind") == "sse":
+                first_event, events = None, 0
+                async for line in response.content:
+                    if line.startswith(b"data:"):
+                        if first_event is None:
+                            first_event = time.perf_counter() - sent
+                        events += 1
+                return response.status, first_event, events
+
+            body = await response.read()
+            try:
+                document = json.loads(body) if step.get("extract") and body else None
+            except ValueError:
+                # An HTML error page from a proxy, say: fail this step, not the whole run
+                return response.status if response.status >= 400 else "non-JSON body", None, 0
+            for name, path in step.get("extract", {}).items():
+                variables[name] = extract(document, path)
+            return response.status, None, 0
+
+    async def _websocket_room(self, http, step: Dict[str, Any], variables: Dict[str, Any], record: bool):
+        """
+        ``clients`` sockets join one room; each sends ``messages`` messages and
+        every other client must receive each one.  The step latency is the
+        whole exchange; ``first_event_ms`` records each broadcast delivery.
+        """
+        clients = step.get("clients", 3)
+        messages = step.get("messages", 5)
+        interval = step.get("interval_ms", 50) / 1000
+        url = self.base_url.replace("http", "ws", 1) + render(step["path"], variables)
+        stats = self._stats(step)
+        expected = clients * messages * (clients - 1)
+        delivered = 0
+        all_delivered = asyncio.Event()
+        sent_at: Dict[str, float] = {}
+
+        sockets = [await http.ws_connect(url, headers=self.headers) for _ in range(clients)]
+        try:
+            async def listen(index: int):
+                nonlocal delivered
+                while True:
+                    message = await sockets[index].receive()
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        return
+                    marker = extract(json.loads(message.data), step.get("marker_path", "data.marker"))
+                    if marker in sent_at and not marker.startswith(f"{index}:"):
+                        if record:
+                            stats.first_event.record(time.perf_counter() - sent_at[marker])
+                        delivered += 1
+                        if delivered >= expected:
+                            all_delivered.set()
+
+            async def talk(index: int):
+                for number in range(messages):
+                    marker = f"{index}:{number}:{uuid.uuid4().hex[:8]}"
+                    sent_at[marker] = time.perf_counter()
+                    await sockets[index].send_str(json.dumps(render(step["send"], {**variables, "marker": marker})))
+                    await asyncio.sleep(interval)
+
+            listeners = [asyncio.ensure_future(listen(i)) for i in range(clients)]
+            await asyncio.gather(*[talk(i) for i in range(clients)])
+            try:
+                await asyncio.wait_for(all_delivered.wait(), step.get("deliver_timeout_s", 5))
+            except asyncio.TimeoutError:
+                pass
+            for listener in listeners:
+                listener.cancel()
+        finally:
+            for socket in sockets:
+                await socket.close()
+        status = 101 if delivered >= expected else f"lost {expected - delivered}/{expected}"
+        return status, None, delivered
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2,
+            floor_ms: float = 5.0) -> List[str]:
+    """Steps whose median or p99 grew by ``threshold`` (and ``floor_ms``) or whose error rate rose"""
+    regressions = []
+    for name, step in current["steps"].items():
+        before = baseline.get("steps", {}).get(name)
+        if not before:
+            continue
+        for percentile in ("p50", "p99"):
+            old, new = before["latency_ms"][percentile], step["latency_ms"][percentile]
+            if new - old >= floor_ms and new > old * (1 + threshold):
+                regressions.append(f"{name} {percentile}: {old:.1f}ms -> {new:.1f}ms")
+        if step["error_rate"] - before["error_rate"] > 0.01:
+            regressions.append(f"{name} error rate: {before['error_rate']:.2%} -> {step['error_rate']:.2%}")
+    return regressions
+
+
+def print_summary(result: Dict[str, Any]):
+    print(f"\n{'step':32} {'count':>7} {'err':>5} {'p50':>9} {'p90':>9} {'p99':>9} {'p99.9':>9} {'max':>9}")
+    rows = [("session", result["sessions"]["completed"], result["sessions"]["failed"], result["sessions"]["latency_ms"])]
+    rows += [(name, s["count"], s["errors"], s["latency_ms"]) for name, s in result["steps"].items()]
+    for name, count, errors, latency in rows:
+        print(f"{name[:32]:32} {count:7d} {errors:5d} {latency['p50']:8.1f}ms {latency['p90']:8.1f}ms "
+              f"{latency['p99']:8.1f}ms {latency['p99_9']:8.1f}ms {latency['max']:8.1f}ms")
+    for name, step in result["steps"].items():
+        if "first_event_ms" in step:
+            first = step["first_event_ms"]
+            print(f"  {name}: first event p50 {first['p50']:.1f}ms p99 {first['p99']:.1f}ms, {step['events']} events")
+        failures = {code: n for code, n in step["status"].items() if code not in ("200", "201", "101")}
+        if failures:
+            print(f"  {name}: {failures}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop async load test")
+    parser.add_argument("scenario", help="scenario JSON file")
+    parser.add_argument("--target", default="http://localhost:8001")
+    parser.add_argument("--rate", type=float, help="sessions started per second (default: scenario's)")
+    parser.add_argument("--duration", type=float, help="measured seconds (default: scenario's)")
+    parser.add_argument("--warmup", type=float, help="unmeasured seconds first (default: scenario's)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="concurrent sessions / connections")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="write the JSON result here")
+    parser.add_argument("--baseline", help="JSON result to compare against; exits 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with open(args.scenario) as handle:
+        scenario = json.load(handle)
+    rate = args.rate or scenario.get("rate", 10)
+    duration = args.duration or scenario.get("duration", 30)
+    warmup = args.warmup if args.warmup is not None else scenario.get("warmup", 5)
+
+    print(f"🔥 LOAD TEST - {scenario.get('name', args.scenario)} at {rate:g} sessions/s for {duration:g}s")
+    print("=" * 60)
+    print(scenario.get("description", ""))
+
+    test = LoadTest(scenario, args.target, rate, duration, warmup, args.max_in_flight, args.timeout)
+    result = asyncio.run(test.run())
+    print(f"\nAchieved {result['sessions']['achieved_rate']:.1f} sessions/s of {rate:g} offered")
+    print_summary(result)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(result, handle, indent=2)
+        print(f"\n📝 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(json.load(handle), result, args.threshold)
+        print(f"\n{len(regressions)} regressions against {args.baseline}")
+        for line in regressions:
+            print(f"  {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
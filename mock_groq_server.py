@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Mock Groq Server for Load Testing
+Speaks the Groq (OpenAI-compatible) chat completions API, including SSE
+streaming, with configurable time to first token, token rate, jitter and
+rate-limit errors, so load tests are repeatable and need no API key.
+
+Point the backend at it with GROQ_BASE_URL=http://localhost:8090 - both the
+``groq`` SDK clients and GroqAIService read it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+app = FastAPI(title="Mock Groq Server", version="1.0.0")
+
+
+class MockConfig:
+    """Behaviour knobs; set from the command line or MOCK_GROQ_* variables"""
+
+    def __init__(self):
+        self.latency_ms = float(os.getenv("MOCK_GROQ_LATENCY_MS", "150"))
+        self.jitter_ms = float(os.getenv("MOCK_GROQ_JITTER_MS", "30"))
+        self.tokens_per_second = float(os.getenv("MOCK_GROQ_TOKENS_PER_SECOND", "400"))
+        self.completion_tokens = int(os.getenv("MOCK_GROQ_COMPLETION_TOKENS", "200"))
+        self.error_rate = float(os.getenv("MOCK_GROQ_ERROR_RATE", "0"))
+        self.seed = int(os.getenv("MOCK_GROQ_SEED", "7"))
+
+
+config = MockConfig()
+stats = {"requests": 0, "streams": 0, "rate_limited": 0, "tokens": 0}
+
+AVAILABLE_MODELS = ["llama-3.1-8b-instant", "llama-3.3-70b-versatile", "mixtral-8x7b-32768", "gemma2-9b-it"]
+
+VOCABULARY = (
+    "the component state render async await function return value request response api database "
+    "query index cache user project deploy build test error handle route service model schema "
+    "react fastapi python javascript typescript performance latency scale optimize design pattern"
+).split()
+
+
+class ChatMessage(BaseModel):
+    role: str
+    content: str
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str
+    messages: List[ChatMessage]
+    stream: bool = False
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+
+
+def completion_tokens(request: ChatCompletionRequest) -> List[str]:
+    """Deterministic per prompt, so repeated runs stream identical bodies"""
+    prompt = " ".join(message.content for message in request.messages)
+    rng = random.Random(f"{config.seed}:{prompt}")
+    count = min(request.max_tokens or config.completion_tokens, config.completion_tokens)
+    return [rng.choice(VOCABULARY) + " " for _ in range(count)]
+
+
+def prompt_tokens(request: ChatCompletionRequest) -> int:
+    return sum(len(message.content.split()) for message in request.messages)
+
+
+def usage(request: ChatCompletionRequest, completion: int, started: float) -> Dict:
+    elapsed = time.perf_counter() - started
+    return {
+        "prompt_tokens": prompt_tokens(request),
+        "completion_tokens": completion,
+        "total_tokens": prompt_tokens(request) + completion,
+        "total_time": round(elapsed, 4),
+    }
+
+
+async def time_to_first_token():
+    jitter = random.uniform(-config.jitter_ms, config.jitter_ms)
+    await asyncio.sleep(max(0.0, config.latency_ms + jitter) / 1000)
+
+
+def rate_limited() -> Optional[JSONResponse]:
+    if config.error_rate and random.random() < config.error_rate:
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": "1"},
+            content={"error": {"message": "Rate limit reached (mock)", "type": "tokens", "code": "rate_limit_exceeded"}},
+        )
+    return None
+
+
+@app.get("/openai/v1/models")
+async def list_models():
+    return {
+        "object": "list",
+        "data": [{"id": model, "object": "model", "created": 1700000000, "owned_by": "mock"} for model in AVAILABLE_MODELS],
+    }
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: ChatCompletionRequest):
+    stats["requests"] += 1
+    limited = rate_limited()
+    if limited:
+        return limited
+
+    started = time.perf_counter()
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    tokens = completion_tokens(request)
+    stats["tokens"] += len(tokens)
+
+    if not request.stream:
+        await time_to_first_token()
+        await asyncio.sleep(len(tokens) / config.tokens_per_second)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": request.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                "finish_reason": "stop",
+            }],
+            "usage": usage(request, len(tokens), started),
+        }
+
+    stats["streams"] += 1
+
+    def chunk(delta: Dict, finish_reason: Optional[str] = None, extra: Optional[Dict] = None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": request.model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        if extra:
+            body.update(extra)
+        return f"data: {json.dumps(body)}\n\n"
+
+    async def events():
+        await time_to_first_token()
+        yield chunk({"role": "assistant", "content": ""})
+        # Emit whatever tokens are due every 10ms rather than sleeping per token
+        interval = 1 / config.tokens_per_second
+        stream_started = time.perf_counter()
+        sent = 0
+        while sent < len(tokens):
+            due = min(len(tokens), int((time.perf_counter() - stream_started) / interval) + 1)
+            if due > sent:
+                yield chunk({"content": "".join(tokens[sent:due])})
+                sent = due
+            await asyncio.sleep(min(0.01, interval))
+        yield chunk({}, "stop", {"x_groq": {"id": completion_id, "usage": usage(request, len(tokens), started)}})
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/mock/stats")
+async def mock_stats():
+    return {**stats, "config": vars(config)}
+
+
+@app.post("/mock/config")
+async def update_config(changes: Dict[str, float]):
+    """Change behaviour between load-test phases without restarting"""
+    for key, value in changes.items():
+        if hasattr(config, key):
+            setattr(config, key, type(getattr(config, key))(value))
+    return vars(config)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock Groq chat completions server")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms, help="time to first token")
+    parser.add_argument("--jitter-ms", type=float, default=config.jitter_ms)
+    parser.add_argument("--tokens-per-second", type=float, default=config.tokens_per_second)
+    parser.add_argument("--completion-tokens", type=int, default=config.completion_tokens)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate, help="fraction answered with 429")
+    args = parser.parse_args()
+    for name in ("latency_ms", "jitter_ms", "tokens_per_second", "completion_tokens", "error_rate"):
+        setattr(config, name, getattr(args, name))
+
+    print("🚀 Starting Mock Groq Server...")
+    print(f"📍 Available at: http://localhost:{args.port}/openai/v1 (set GROQ_BASE_URL=http://localhost:{args.port})")
+    print(f"⚡ {config.latency_ms:.0f}ms to first token, {config.tokens_per_second:.0f} tokens/s, "
+          f"{config.error_rate:.0%} rate limited")
+    uvicorn.run(app, host="0.0.0.0", port=args.port, log_level="warning")
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Offline Sync Benchmark for Aether AI Platform
+A mobile client reconnects after a thousand offline edits while another
+device kept editing the same workspace.  Compares the item-by-item
+upload plus full refetch the old queue required against batched delta
+push/pull with sync tokens: round trips, bytes on the wire, server time
+and estimated wall-clock time over a mobile link.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.offline_sync import OfflineSyncService
+
+# Request line, headers and auth token of one HTTP round trip, both directions
+HTTP_OVERHEAD_BYTES = 700
+
+
+def wire(payload) -> int:
+    return len(json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def note(rng, entity_id):
+    return {"title": f"Note {entity_id}", "body": " ".join(rng.choice("lorem ipsum dolor sit amet".split())
+                                                           for _ in range(rng.randint(20, 60))),
+            "tags": rng.sample(["work", "ideas", "todo", "ai", "draft"], 2)}
+
+
+def legacy_sync(args, entities, edits, other_edits):
+    """One request per queued item, then a full refetch since nothing says what changed"""
+    queue = []
+    server_state = dict(entities)
+    for entity_id, payload in other_edits:
+        server_state[entity_id] = payload
+    # Items other users and earlier sessions left in the shared queue
+    for _ in range(args.backlog):
+        queue.append({"data_id": str(uuid.uuid4()), "user_id": "other", "sync_status": "synced"})
+
+    sent = received = trips = 0
+    began = time.perf_counter()
+    for entity_id, payload in edits:
+        request = {"data_type": "note", "payload": {"entity_id": entity_id, **payload}}
+        item = {"data_id": str(uuid.uuid4()), "user_id": "u1", "payload": request["payload"],
+                "created_offline": datetime.utcnow(), "sync_status": "pending"}
+        queue.append(item)
+        response = {"success": True, "data_id": item["data_id"], "message": "Data stored for offline sync",
+                    "sync_status": "pending"}
+        sent += wire(request) + HTTP_OVERHEAD_BYTES
+        received += wire(response)
+        trips += 1
+
+    pending = [d for d in queue if d["sync_status"] == "pending" and d["user_id"] == "u1"]
+    for item in pending:
+        server_state[item["payload"]["entity_id"]] = item["payload"]
+        item["sync_status"] = "synced"
+    response = {"success": True, "sync_results": {"synced": len(pending), "failed": 0, "errors": []}}
+    sent += HTTP_OVERHEAD_BYTES
+    received += wire(response)
+    trips += 1
+
+    snapshot = {"items": [{"entity_id": k, **v} for k, v in server_state.items()]}
+    sent += HTTP_OVERHEAD_BYTES
+    received += wire(snapshot)
+    trips += 1
+    return trips, sent, received, time.perf_counter() - began
+
+
+async def delta_sync(args, entities, edits, other_edits):
+    sync = OfflineSyncService()
+    versions = {}
+    created = [{"entity_id": entity_id, "data_type": "note", "payload": payload}
+               for entity_id, payload in entities.items()]
+    for start in range(0, len(created), args.batch):
+        result = await sync.push("u1", "phone", created[start:start + args.batch])
+        versions.update((r["entity_id"], r["version"]) for r in result["results"])
+    token = await sync.current_token("u1")
+    for entity_id, payload in other_edits:
+        result = await sync.push("u1", "tablet", [{"entity_id": entity_id, "payload": payload,
+                                                   "base_version": versions[entity_id]}])
+        versions[entity_id] = result["results"][0]["version"]
+
+    # What the phone knew when it went offline; each offline edit advances its own counter
+    local = {entity_id: {"phone": 1} for entity_id in entities}
+    latest = {}
+    outbox = []
+    for entity_id, payload in edits:
+        outbox.append({"entity_id": entity_id, "data_type": "note", "payload": payload,
+                       "base_version": dict(local[entity_id]), "idempotency_key": str(uuid.uuid4())})
+        local[entity_id]["phone"] += 1
+        latest[entity_id] = payload
+
+    sent = received = trips = 0
+    began = time.perf_counter()
+    has_more = True
+    while outbox or has_more:
+        batch, outbox = outbox[:args.batch], outbox[args.batch:]
+        request = {"device_id": "phone", "since_token": token, "changes": batch}
+        pushed = await sync.push("u1", "phone", batch)
+        pulled = await sync.pull("u1", token, exclude_device="phone")
+        response = {"success": True, "sync_results": {"results": pushed["results"], **pulled}}
+        sent += wire(request) + HTTP_OVERHEAD_BYTES
+        received += wire(response)
+        trips += 1
+        token, has_more = pulled["sync_token"], pulled["has_more"]
+        # Client keeps its latest text for each conflicting note and resends it on top of the server version
+        conflicts = {r["entity_id"]: r["server"]["version"] for r in pushed["results"] if r["status"] == "conflict"}
+        outbox = [change for change in outbox if change["entity_id"] not in conflicts] + [
+            {"entity_id": entity_id, "payload": latest[entity_id], "base_version": version,
+             "idempotency_key": str(uuid.uuid4())}
+            for entity_id, version in conflicts.items()
+        ]
+    return trips, sent, received, time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline reconnect sync")
+    parser.add_argument("--entities", type=int, default=5000)
+    parser.add_argument("--edits", type=int, default=1000)
+    parser.add_argument("--other-edits", type=int, default=200)
+    parser.add_argument("--backlog", type=int, default=50_000, help="items other users left in the legacy queue")
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=120.0)
+    parser.add_argument("--bandwidth-kbps", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    entities = {f"note_{i}": note(rng, i) for i in range(args.entities)}
+    hot = rng.sample(sorted(entities), args.entities // 10)
+    edits = [(rng.choice(hot), note(rng, "edit")) for _ in range(args.edits)]
+    other_edits = [(rng.choice(hot), note(rng, "other")) for _ in range(args.other_edits)]
+
+    print(f"📡 OFFLINE SYNC BENCHMARK - RECONNECT AFTER {args.edits} OFFLINE EDITS")
+    print("=" * 60)
+    print(f"{args.entities} notes, {args.other_edits} edits from another device, "
+          f"{args.rtt_ms:.0f}ms RTT, {args.bandwidth_kbps:.0f}kbps")
+    runs = (("item-by-item + refetch", legacy_sync),
+            ("delta push/pull", lambda *a: asyncio.run(delta_sync(*a))))
+    for label, run in runs:
+        trips, sent, received, server = run(args, entities, edits, other_edits)
+        transfer = (sent + received) * 8 / (args.bandwidth_kbps * 1000)
+        wall = trips * args.rtt_ms / 1000 + transfer + server
+        print(f"{label:24} {trips:5d} round trips   up {sent / 1024:8.1f}KB   down {received / 1024:8.1f}KB   "
+              f"server {server * 1000:7.1f}ms   ~{wall:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
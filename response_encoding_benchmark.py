@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Response Encoding Benchmark for Aether AI Platform
+Serialization CPU time and bytes on the wire for large project,
+conversation and analytics payloads: the default JSON encoder against
+orjson / MessagePack, each with the negotiated compression
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services import response_encoding
+from services.response_encoding import PrecompressedCache, available_encodings, compress, dumps_json
+
+
+def project_payload(rng):
+    files = []
+    for i in range(300):
+        lines = [f"    value_{j} = compute_{rng.randrange(50)}(items[{j}])  # step {j}" for j in range(rng.randint(20, 80))]
+        files.append({"id": f"file_{i}", "path": f"src/module_{i // 20}/file_{i}.py", "language": "python",
+                      "size": sum(map(len, lines)), "updated_at": "2024-05-01T12:00:00",
+                      "content": "def handler(items):\n" + "\n".join(lines)})
+    return {"id": "proj_1", "name": "Realtime Dashboard", "status": "active", "files": files,
+            "settings": {"framework": "fastapi", "python": "3.11", "features": ["auth", "ws", "charts"]}}
+
+
+def conversation_payload(rng):
+    words = "the model returns a streaming response with code blocks and explanations for each step".split()
+    return {"conversation_id": "conv_1", "messages": [
+        {"id": f"msg_{i}", "role": "user" if i % 2 == 0 else "assistant",
+         "content": " ".join(rng.choice(words) for _ in range(rng.randint(10, 250))),
+         "timestamp": f"2024-05-01T12:{i % 60:02d}:00", "tokens": rng.randint(10, 900),
+         "model": "llama-3.3-70b-versatile"} for i in range(800)]}
+
+
+def analytics_payload(rng):
+    start = datetime(2024, 1, 1)
+    return {"metric": "events_total", "series": [
+        {"timestamp": (start + timedelta(hours=h)).isoformat(), "value": rng.randint(0, 5000),
+         "count": rng.randint(1, 400), "tags": {"source": rng.choice(["web", "api", "mobile"])}}
+        for h in range(24 * 90)]}
+
+
+def default_json(content) -> bytes:
+    """What JSONResponse.render does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(4)
+    payloads = {"project": project_payload(rng), "conversation": conversation_payload(rng),
+                "analytics": analytics_payload(rng)}
+
+    encoders = {"json (default)": default_json}
+    if response_encoding.ORJSON_AVAILABLE:
+        encoders["orjson"] = dumps_json
+    if response_encoding.MSGPACK_AVAILABLE:
+        encoders["msgpack"] = response_encoding.dumps_msgpack
+
+    print("📦 RESPONSE ENCODING BENCHMARK")
+    print("=" * 60)
+    print(f"Encoders: {', '.join(encoders)}   compression: {', '.join(available_encodings())}")
+    for name, payload in payloads.items():
+        print(f"\n{name}")
+        for label, encode in encoders.items():
+            body, encode_time = timed(lambda: encode(payload), args.repeat)
+            print(f"  {label:15} encode {encode_time * 1000:7.2f}ms   {len(body) / 1024:8.1f}KB identity")
+            for encoding in available_encodings():
+                compressed, compress_time = timed(lambda: compress(body, encoding), args.repeat)
+                print(f"  {'':15}   + {encoding:4} {compress_time * 1000:7.2f}ms   {len(compressed) / 1024:8.1f}KB "
+                      f"({len(compressed) / len(body):5.1%})")
+
+        body = dumps_json(payload)
+        cache = PrecompressedCache()
+        encoding = available_encodings()[0]
+        _, first = timed(lambda: cache.get_or_compress(body, encoding), 1)
+        _, hit = timed(lambda: cache.get_or_compress(body, encoding), args.repeat)
+        print(f"  immutable {encoding}: first response {first * 1000:.2f}ms (max level), cached {hit * 1e6:.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Sandbox Execution Benchmark for Aether AI Platform
+Compares executions per second for trivial snippets between a fresh
+interpreter per run and the warm sandbox pool, then checks that fork
+bombs, memory hogs, CPU spinners and output floods are stopped
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.sandbox_pool import SandboxLimits, SandboxPool
+
+SNIPPET = "import json\nprint(json.dumps({'sum': sum(range(100))}))\n"
+
+ABUSE_CASES = [
+    ("Fork bomb", "import os\nwhile True:\n    try:\n        os.fork()\n    except OSError:\n        pass\n"),
+    ("Memory hog", "blocks = []\nwhile True:\n    blocks.append(bytearray(16 * 1024 * 1024))\n"),
+    ("CPU spinner", "while True:\n    pass\n"),
+    ("Output flood", "while True:\n    print('x' * 1000)\n"),
+    ("Disk filler", "with open('big.bin', 'wb') as f:\n    while True:\n        f.write(b'0' * 1024 * 1024)\n"),
+    ("Orphan process", "import subprocess\nsubprocess.Popen(['sleep', '60'])\n"),
+]
+
+
+async def fresh_subprocess_run(path: str) -> int:
+    """What ExperimentalSandbox used to do: one interpreter per execution"""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        cwd=os.path.dirname(path),
+    )
+    await asyncio.wait_for(process.communicate(), 60)
+    return process.returncode
+
+
+async def throughput(run_one, runs: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def guarded():
+        async with semaphore:
+            await run_one()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(guarded() for _ in range(runs)))
+    return runs / (time.perf_counter() - start)
+
+
+async def main_async(args):
+    workdir = tempfile.mkdtemp(prefix="sandbox_bench_")
+    path = os.path.join(workdir, "snippet.py")
+    with open(path, "w") as f:
+        f.write(SNIPPET)
+
+    limits = SandboxLimits(wall_seconds=args.wall_seconds, cpu_seconds=args.wall_seconds / 2, memory_mb=128,
+                           max_processes=32, max_output_bytes=64 * 1024, max_file_bytes=8 * 1024 * 1024)
+    pool = SandboxPool(workers=args.workers, limits=limits)
+    # Start the workers before measuring so their spawn is not counted
+    await pool.start()
+
+    print(f"🧪 SANDBOX EXECUTION BENCHMARK - {args.runs} RUNS, CONCURRENCY {args.concurrency}")
+    print("=" * 60)
+    fresh = await throughput(lambda: fresh_subprocess_run(path), args.runs, args.concurrency)
+    warm = await throughput(lambda: pool.run(SNIPPET), args.runs, args.concurrency)
+    print(f"{'Fresh subprocess':18} {fresh:8.1f} executions/s")
+    print(f"{'Warm pool':18} {warm:8.1f} executions/s  ({warm / fresh:.1f}x)")
+
+    print(f"\n🛡️ LIMIT ENFORCEMENT (wall {limits.wall_seconds:.0f}s, cpu {limits.cpu_seconds:.1f}s, "
+          f"{limits.memory_mb}MB, {limits.max_processes} processes)")
+    print("=" * 60)
+    failures = 0
+    for label, code in ABUSE_CASES:
+        start = time.perf_counter()
+        result = await pool.run(code)
+        elapsed = time.perf_counter() - start
+        contained = result.get("limit") is not None
+        failures += not contained
+        print(f"{'✅' if contained else '❌'} {label:15} limit={str(result.get('limit')):10} exit={result.get('exit_code'):4}  "
+              f"strays={result.get('strays', 0):3}  {elapsed:5.2f}s")
+
+    check = await pool.run("print('ok')")
+    healthy = check.get("output") == "ok\n"
+    print(f"{'✅' if healthy else '❌'} Pool healthy after abuse: {pool.status()['recycled']} workers recycled")
+    await pool.shutdown()
+    return 0 if failures == 0 and healthy else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark warm sandbox execution against fresh subprocesses")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--wall-seconds", type=float, default=3.0)
+    return asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Sitemap Generation Benchmark for Aether AI Platform
+Compares building the sitemap by string concatenation against streaming,
+sharded, gzip-cached sitemap files
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.seo_service import SEOService, SitemapEntry
+
+
+def legacy_sitemap(entries) -> str:
+    """The previous implementation: one growing string per request"""
+    sitemap_xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
+    sitemap_xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for entry in entries:
+        sitemap_xml += '  <url>\n'
+        sitemap_xml += f'    <loc>{entry.url}</loc>\n'
+        sitemap_xml += f'    <lastmod>{entry.last_modified.strftime("%Y-%m-%d")}</lastmod>\n'
+        sitemap_xml += f'    <changefreq>{entry.change_frequency}</changefreq>\n'
+        sitemap_xml += f'    <priority>{entry.priority}</priority>\n'
+        sitemap_xml += '  </url>\n'
+    sitemap_xml += '</urlset>'
+    return sitemap_xml
+
+
+def measure(fn):
+    """Wall time and peak traced allocation of ``fn``"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+async def load_with_ticker(service, compressed: bool):
+    """Build one shard the way the route does while timing the event loop's longest gap"""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await service.load_sitemap_document(0, compressed=compressed)
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, stall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sitemap generation")
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    service = SEOService()
+    asyncio.run(service.initialize())
+    now = datetime.utcnow()
+    service.set_sitemap_entries(
+        SitemapEntry(
+            url=f"https://aitempo.dev/templates/{i}?ref=sitemap&v=2",
+            last_modified=now - timedelta(hours=i % 5000),
+            change_frequency="weekly",
+            priority=0.6,
+        )
+        for i in range(args.entries)
+    )
+
+    print(f"🗺️  SITEMAP BENCHMARK - {args.entries:,} URLS")
+    print("=" * 60)
+
+    # Timing runs without tracemalloc first, since tracing slows allocation-heavy code
+    start = time.perf_counter()
+    legacy_sitemap(service.sitemap_entries)
+    legacy_time = time.perf_counter() - start
+    _, _, legacy_peak = measure(lambda: len(legacy_sitemap(service.sitemap_entries)))
+    print(f"Legacy concat:     {legacy_time:6.2f}s total, first byte after full build, peak {legacy_peak / 1e6:7.1f}MB")
+
+    def first_chunk():
+        return next(iter(service.iter_sitemap_xml(0)))
+
+    start = time.perf_counter()
+    first_chunk()
+    ttfb = time.perf_counter() - start
+
+    def stream_shard():
+        return sum(len(chunk) for chunk in service.iter_sitemap_xml(0))
+
+    start = time.perf_counter()
+    for shard in range(service.sitemap_shard_count):
+        for _ in service.iter_sitemap_xml(shard):
+            pass
+    stream_time = time.perf_counter() - start
+    _, _, stream_peak = measure(stream_shard)
+    print(f"Streamed shards:   {stream_time:6.2f}s total, first byte {ttfb * 1000:.2f}ms, "
+          f"peak {stream_peak / 1e6:7.1f}MB per shard ({service.sitemap_shard_count} shards)")
+
+    start = time.perf_counter()
+    index = service.get_sitemap_document()
+    documents = [service.get_sitemap_document(shard) for shard in range(service.sitemap_shard_count)]
+    build_time = time.perf_counter() - start
+    compressed = len(index.body) + sum(len(d.body) for d in documents)
+    print(f"Gzip build (once): {build_time:6.2f}s, {compressed / 1e6:.1f}MB compressed across {len(documents) + 1} files")
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        service.get_sitemap_document(3)
+    print(f"Cached serve:      {(time.perf_counter() - start) * 1000:.3f}µs per lookup")
+
+    for label, compressed in (("identity", False), ("gzip", True)):
+        service._invalidate_sitemap()
+        elapsed, stall = asyncio.run(load_with_ticker(service, compressed))
+        print(f"Request build ({label:8}) {elapsed * 1000:6.0f}ms per shard, event loop stalled at most {stall * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for Aether AI Platform
+Imports the app module in a fresh interpreter with every router mounted
+up front (LAZY_ROUTERS=false) and in lazy mode, and reports import wall
+time, peak resident memory and the slowest modules from ``-X importtime``.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss_kb, "modules": len(sys.modules)}}))
+"""
+
+
+def run_probe(module: str, lazy: bool, importtime: bool):
+    env = {**os.environ, "LAZY_ROUTERS": "true" if lazy else "false", "PYTHONDONTWRITEBYTECODE": "1"}
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", PROBE.format(module=module)]
+    result = subprocess.run(command, cwd=BACKEND, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr: str):
+    """``(self_us, cumulative_us, module)`` rows from ``-X importtime`` output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time and memory, eager vs lazy routers")
+    parser.add_argument("--module", default="server", help="app module to import (server or main)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"🚀 STARTUP BENCHMARK - import {args.module}")
+    print("=" * 60)
+
+    profiles = {}
+    for label, lazy in (("eager (all routers)", False), ("lazy", True)):
+        try:
+            samples = [run_probe(args.module, lazy, importtime=False)[0] for _ in range(args.repeat)]
+            _, stderr = run_probe(args.module, lazy, importtime=True)
+        except RuntimeError as e:
+            print(f"{label:20} failed to import: {e}")
+            return 1
+        profiles[label] = parse_importtime(stderr)
+        print(f"{label:20} {statistics.median(s['seconds'] for s in samples):6.2f}s   "
+              f"peak RSS {max(s['rss_kb'] for s in samples) / 1024:7.1f}MB   "
+              f"{samples[0]['modules']} modules loaded")
+
+    print(f"\nSlowest modules in eager mode (self time, top {args.top})")
+    for self_us, cumulative_us, name in sorted(profiles["eager (all routers)"], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f}ms  (cumulative {cumulative_us / 1000:8.1f}ms)  {name}")
+
+    print(f"\nHeaviest top-level app modules (cumulative, top {args.top})")
+    app_modules = [row for row in profiles["eager (all routers)"]
+                   if row[2].startswith(("routes.", "services.", "models.", "middleware."))
+                   and row[2].count(".") == 1]
+    for self_us, cumulative_us, name in sorted(app_modules, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
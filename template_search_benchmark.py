@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Template Marketplace Search Benchmark for Aether AI Platform
+Compares the faceted index against filtering and sorting the full catalog
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.template_marketplace_comprehensive import (
+    DifficultyLevel, TechStack, Template, TemplateCategory, TemplateMetrics, TemplateStatus,
+)
+from services.template_search_index import TemplateSearchIndex
+
+TAGS = ["react", "dashboard", "auth", "stripe", "tailwind", "graphql", "charts", "blog", "seo", "pwa",
+        "realtime", "admin", "ai", "mobile", "docker", "testing", "i18n", "maps", "chat", "analytics"]
+WORDS = ["starter", "modern", "minimal", "complete", "responsive", "enterprise", "portfolio", "kit", "pro", "lite"]
+
+
+def make_catalog(count: int, rng: random.Random):
+    now = datetime.utcnow()
+    statuses = [TemplateStatus.PUBLISHED] * 7 + [TemplateStatus.FEATURED, TemplateStatus.DRAFT, TemplateStatus.UNDER_REVIEW]
+    templates = []
+    for i in range(count):
+        tags = rng.sample(TAGS, rng.randint(2, 5))
+        templates.append(Template(
+            template_id=f"t{i}",
+            name=f"{rng.choice(WORDS).title()} {tags[0].title()} Template {i}",
+            description=f"A {rng.choice(WORDS)} {' '.join(tags)} template",
+            category=rng.choice(list(TemplateCategory)),
+            tech_stack=rng.choice(list(TechStack)),
+            difficulty=rng.choice(list(DifficultyLevel)),
+            author_id=f"u{i % 5000}",
+            author_name=f"Author {i % 5000}",
+            status=rng.choice(statuses),
+            tags=tags,
+            features=[],
+            metrics=TemplateMetrics(downloads=int(rng.paretovariate(1.2) * 10),
+                                    average_rating=round(rng.uniform(1, 5), 1)),
+            created_at=now - timedelta(minutes=rng.randrange(10 ** 6)),
+            updated_at=now,
+            price=0.0 if rng.random() < 0.7 else 19.0,
+        ))
+    return templates
+
+
+def legacy_search(templates, query=None, category=None, tech_stack=None, difficulty=None, tags=None,
+                  min_rating=None, free_only=False, featured_only=False, sort_by="popularity", limit=20, offset=0):
+    """The previous implementation: filter the whole catalog, sort, then slice"""
+    filtered = [t for t in templates.values() if t.status in [TemplateStatus.PUBLISHED, TemplateStatus.FEATURED]]
+    if query:
+        q = query.lower()
+        filtered = [t for t in filtered if q in t.name.lower() or q in t.description.lower()
+                    or any(q in tag.lower() for tag in t.tags)]
+    if category:
+        filtered = [t for t in filtered if t.category == category]
+    if tech_stack:
+        filtered = [t for t in filtered if t.tech_stack == tech_stack]
+    if difficulty:
+        filtered = [t for t in filtered if t.difficulty == difficulty]
+    if tags:
+        filtered = [t for t in filtered if any(tag in t.tags for tag in tags)]
+    if min_rating:
+        filtered = [t for t in filtered if t.metrics.average_rating >= min_rating]
+    if free_only:
+        filtered = [t for t in filtered if t.price == 0]
+    if featured_only:
+        filtered = [t for t in filtered if t.status == TemplateStatus.FEATURED]
+    if sort_by == "popularity":
+        filtered.sort(key=lambda x: x.metrics.downloads, reverse=True)
+    elif sort_by == "newest":
+        filtered.sort(key=lambda x: x.created_at, reverse=True)
+    elif sort_by == "rating":
+        filtered.sort(key=lambda x: x.metrics.average_rating, reverse=True)
+    return [t.template_id for t in filtered[offset:offset + limit]], len(filtered)
+
+
+def indexed_search(index, query=None, category=None, tech_stack=None, difficulty=None, tags=None,
+                   min_rating=None, free_only=False, featured_only=False, sort_by="popularity", limit=20, offset=0):
+    """Mirrors TemplateMarketplaceComprehensive.search_templates"""
+    facets = {"status": ["featured"] if featured_only else ["published", "featured"]}
+    if category:
+        facets["category"] = [category.value]
+    if tech_stack:
+        facets["tech_stack"] = [tech_stack.value]
+    if difficulty:
+        facets["difficulty"] = [difficulty.value]
+    if tags:
+        facets["tag"] = tags
+    if free_only:
+        facets["price_tier"] = ["free"]
+    return index.search(facets, query=query, min_rating=min_rating, sort_by=sort_by, offset=offset, limit=limit)
+
+
+def random_query(rng: random.Random):
+    params = {"sort_by": rng.choice(["popularity", "newest", "rating"]), "offset": rng.choice([0, 0, 20, 100])}
+    if rng.random() < 0.5:
+        params["category"] = rng.choice(list(TemplateCategory))
+    if rng.random() < 0.4:
+        params["tech_stack"] = rng.choice(list(TechStack))
+    if rng.random() < 0.3:
+        params["difficulty"] = rng.choice(list(DifficultyLevel))
+    if rng.random() < 0.3:
+        params["tags"] = rng.sample(TAGS, rng.randint(1, 2))
+    if rng.random() < 0.2:
+        params["min_rating"] = rng.choice([3.0, 4.0, 4.5])
+    if rng.random() < 0.3:
+        params["free_only"] = True
+    if rng.random() < 0.1:
+        params["featured_only"] = True
+    if rng.random() < 0.2:
+        params["query"] = rng.choice(TAGS)
+    return params
+
+
+def run(label, fn, queries):
+    timings = []
+    for params in queries:
+        start = time.perf_counter()
+        fn(**params)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"{label:18} avg {statistics.mean(timings) * 1000:8.2f}ms   p50 {timings[len(timings) // 2] * 1000:8.2f}ms"
+          f"   p99 {timings[int(len(timings) * 0.99) - 1] * 1000:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark template marketplace search")
+    parser.add_argument("--templates", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    print(f"🏪 TEMPLATE SEARCH BENCHMARK - {args.templates:,} TEMPLATES")
+    print("=" * 60)
+    catalog = make_catalog(args.templates, rng)
+    templates = {t.template_id: t for t in catalog}
+
+    index = TemplateSearchIndex()
+    start = time.perf_counter()
+    for template in catalog:
+        index.upsert(template)
+    elapsed = time.perf_counter() - start
+    print(f"Index build:       {elapsed:.1f}s ({args.templates / elapsed:,.0f} templates/s)")
+
+    start = time.perf_counter()
+    for template in rng.sample(catalog, 10_000):
+        template.metrics.downloads += 1
+        index.upsert(template)
+    print(f"Download update:   {(time.perf_counter() - start) / 10_000 * 1e6:.0f}µs per upsert")
+
+    queries = [random_query(rng) for _ in range(args.queries)]
+    for params in queries:
+        if "query" not in params:
+            assert indexed_search(index, **params)[1] == legacy_search(templates, **params)[1]
+    run("Full scan + sort:", lambda **p: legacy_search(templates, **p), queries)
+    run("Faceted index:", lambda **p: indexed_search(index, **p), queries)
+
+
+if __name__ == "__main__":
+    main()
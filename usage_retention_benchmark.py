@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Usage Record Retention Benchmark for Aether AI Platform
+Deletes 50M simulated usage records three ways - one unbounded delete_many,
+throttled _id-range batches and dropping daily partitions - while a
+foreground query loop measures how long reads wait behind the cleanup.
+
+Records are simulated as contiguous _id ranges per day, and the database
+cost model is scaled down (DELETE_COST per deleted record, paid while
+holding the collection's write lock) so the run finishes in seconds.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.usage_retention import UsagePartitions, chunked_delete
+
+DELETE_COST = 0.2e-6   # seconds of write lock per deleted record
+SCAN_COST = 0.01e-6    # seconds per index entry skipped while finding a batch boundary
+QUERY_COST = 0.2e-3    # seconds of lock per foreground query
+DROP_COST = 1e-3       # seconds of lock per dropped collection
+
+
+class SimulatedCollection:
+    """Usage records as [first_id, last_id, timestamp] runs, with a write lock cost model"""
+
+    def __init__(self, lock, segments=None, count=0):
+        self.lock = lock
+        self.segments = segments or []
+        self.count = count
+
+    def _selected(self, query_filter):
+        cutoff = query_filter["timestamp"]["$lt"]
+        id_range = query_filter.get("_id", {})
+        low = id_range.get("$gt", -1) + 1
+        high = id_range.get("$lte", float("inf"))
+        for segment in self.segments:
+            first, last, timestamp = segment
+            if timestamp >= cutoff or last < low or first > high:
+                continue
+            yield segment, max(first, low), min(last, high)
+
+    async def find_one(self, query_filter, projection=None, sort=None, skip=0):
+        await asyncio.sleep(skip * SCAN_COST)
+        for _, first, last in self._selected(query_filter):
+            if skip <= last - first:
+                return {"_id": first + skip}
+            skip -= last - first + 1
+        return None
+
+    async def delete_many(self, query_filter):
+        selected = list(self._selected(query_filter))
+        deleted = sum(last - first + 1 for _, first, last in selected)
+        async with self.lock:
+            await asyncio.sleep(deleted * DELETE_COST)
+            for segment, first, last in selected:
+                self.segments.remove(segment)
+                if segment[0] < first:
+                    self.segments.append([segment[0], first - 1, segment[2]])
+                if last < segment[1]:
+                    self.segments.append([last + 1, segment[1], segment[2]])
+            self.segments.sort()
+        self.count -= deleted
+        return SimpleNamespace(deleted_count=deleted)
+
+    async def estimated_document_count(self):
+        return self.count
+
+    async def query(self):
+        async with self.lock:
+            await asyncio.sleep(QUERY_COST)
+
+
+class SimulatedDatabase:
+    def __init__(self, lock):
+        self.lock = lock
+        self.collections = {}
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+    async def list_collection_names(self):
+        return list(self.collections)
+
+    async def drop_collection(self, name):
+        async with self.lock:
+            await asyncio.sleep(DROP_COST)
+            del self.collections[name]
+
+
+def daily_runs(now, days, per_day):
+    return [[day * per_day, (day + 1) * per_day - 1, now - timedelta(days=days - day)] for day in range(days)]
+
+
+async def foreground(collection, stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await collection.query()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+
+
+async def measure(label, collection, cleanup):
+    latencies = []
+    stop = asyncio.Event()
+    reader = asyncio.ensure_future(foreground(collection, stop, latencies))
+    start = time.perf_counter()
+    deleted = await cleanup()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await reader
+    latencies.sort()
+    print(f"{label:22} {deleted / 1e6:5.1f}M deleted in {elapsed:6.2f}s   query p50 "
+          f"{statistics.median(latencies) * 1000:7.2f}ms  p99 {latencies[int(len(latencies) * 0.99)] * 1000:8.2f}ms"
+          f"  max {latencies[-1] * 1000:8.2f}ms")
+
+
+async def run(args):
+    now = datetime.utcnow()
+    days = 180
+    per_day = args.records * 2 // days  # half of the history is past the cutoff
+    cutoff = now - timedelta(days=days // 2)
+    query_filter = {"timestamp": {"$lt": cutoff}}
+
+    print(f"🧹 USAGE RETENTION BENCHMARK - {args.records / 1e6:.0f}M EXPIRED RECORDS")
+    print("=" * 60)
+
+    lock = asyncio.Lock()
+    legacy = SimulatedCollection(lock, daily_runs(now, days, per_day), days * per_day)
+
+    async def unbounded():
+        return (await legacy.delete_many(query_filter)).deleted_count
+    await measure("Single delete_many:", legacy, unbounded)
+
+    legacy = SimulatedCollection(lock, daily_runs(now, days, per_day), days * per_day)
+    reports = []
+
+    async def chunked():
+        state = await chunked_delete(legacy, query_filter, batch_size=args.batch_size, pause=args.pause,
+                                     progress=lambda s: reports.append(s.deleted))
+        return state.deleted
+    await measure("Chunked _id ranges:", legacy, chunked)
+    print(f"{'':22} {len(reports)} batches of {args.batch_size:,}, progress reported after each")
+
+    partitions = UsagePartitions("day")
+    db = SimulatedDatabase(lock)
+    for first, last, timestamp in daily_runs(now, days, per_day):
+        db.collections[partitions.partition_name(timestamp)] = SimulatedCollection(
+            lock, [[first, last, timestamp]], last - first + 1)
+    current = db[partitions.partition_name(now - timedelta(days=1))]
+
+    async def drop_partitions():
+        return sum((await partitions.drop_expired(db, cutoff)).values())
+    await measure("Drop daily partitions:", current, drop_partitions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark usage record retention cleanup")
+    parser.add_argument("--records", type=int, default=50_000_000)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    parser.add_argument("--pause", type=float, default=0.01)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Diagram Relationship Benchmark for Aether AI Platform
+Compares the pairwise element-relationship scan against the grid-indexed
+DiagramLayout on large diagrams, and incremental moves against
+re-analyzing the whole diagram
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+from services.spatial_index import CONNECTION_DISTANCE, DiagramLayout, connection_strength, element_distance
+
+
+def pairwise_relationships(elements):
+    """The O(n^2) scan VisualProgramming used before"""
+    relationships = []
+    for i, element1 in enumerate(elements):
+        for j, element2 in enumerate(elements[i + 1:], i + 1):
+            distance = element_distance(element1["position"], element2["position"])
+            if distance < CONNECTION_DISTANCE:
+                relationships.append({
+                    "id": f"rel_{i}_{j}",
+                    "source": element1["id"],
+                    "target": element2["id"],
+                    "type": "connection",
+                    "strength": connection_strength(distance),
+                })
+    return relationships
+
+
+def make_diagram(rng: random.Random, count: int, neighbours: float):
+    # Keep density constant so every size has about ``neighbours`` relationships per element
+    side = math.sqrt(count * math.pi * CONNECTION_DISTANCE ** 2 / neighbours)
+    return [{"id": f"element_{i}", "type": "process",
+             "position": {"x": rng.uniform(0, side), "y": rng.uniform(0, side)}}
+            for i in range(count)], side
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark diagram element-relationship analysis")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated element counts")
+    parser.add_argument("--neighbours", type=float, default=4.0, help="average relationships per element")
+    parser.add_argument("--moves", type=int, default=2000)
+    parser.add_argument("--pairwise-limit", type=int, default=10000,
+                        help="largest diagram timed with the pairwise scan; larger ones are extrapolated")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"🗺️ DIAGRAM RELATIONSHIP BENCHMARK - {', '.join(map(str, sizes))} ELEMENTS, "
+          f"~{args.neighbours:g} NEIGHBOURS EACH")
+    print("=" * 60)
+
+    pairwise_rate = None
+    for count in sizes:
+        elements, side = make_diagram(rng, count, args.neighbours)
+
+        start = time.perf_counter()
+        layout = DiagramLayout(elements)
+        relationships = layout.relationships()
+        grid_seconds = time.perf_counter() - start
+
+        if count <= args.pairwise_limit:
+            start = time.perf_counter()
+            expected = pairwise_relationships(elements)
+            pairwise_seconds = time.perf_counter() - start
+            pairwise_rate = pairwise_seconds / (count * count)
+            if expected != relationships:
+                print(f"❌ {count} elements: grid relationships differ from the pairwise scan")
+                return 1
+            pairwise_label = f"{pairwise_seconds:8.2f}s"
+        elif pairwise_rate:
+            pairwise_seconds = pairwise_rate * count * count
+            pairwise_label = f"~{pairwise_seconds:7.0f}s (extrapolated)"
+        else:
+            pairwise_seconds, pairwise_label = 0.0, "skipped"
+
+        start = time.perf_counter()
+        for _ in range(args.moves):
+            element = elements[rng.randrange(count)]
+            layout.move(element["id"], {"x": rng.uniform(0, side), "y": rng.uniform(0, side)})
+        layout.relationships()
+        move_ms = (time.perf_counter() - start) * 1000 / args.moves
+
+        speedup = f"{pairwise_seconds / grid_seconds:8.0f}x" if pairwise_seconds else ""
+        print(f"{count:7d} elements  {len(relationships):7d} relationships  pairwise {pairwise_label:24}  "
+              f"grid {grid_seconds:6.2f}s {speedup}  move {move_ms:6.3f}ms")
+
+    print("✅ Grid relationships identical to the pairwise scan where both ran")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())